@@ -177,15 +177,42 @@ class Config:
 
     # Data fetching
     BATCH_SIZE = 1000  # Binance allows 1000 candles per request
-    RATE_LIMIT_DELAY = 0.5  # Minimum delay between API calls (seconds)
+    # Exchange request weight budget shared by all callers (app.services.rate_scheduler)
+    EXCHANGE_WEIGHT_LIMIT = int(os.getenv('EXCHANGE_WEIGHT_LIMIT', 6000))  # Binance REQUEST_WEIGHT per minute
+    EXCHANGE_WEIGHT_HEADROOM = float(os.getenv('EXCHANGE_WEIGHT_HEADROOM', 0.9))  # Fraction of it we use
     MAX_CONCURRENT_REQUESTS = 5  # Max parallel API requests (Binance limit: 1200/min = 20/sec, this is conservative)
     RATE_LIMIT_RETRY_DELAY = 2.0  # Delay before retrying after rate limit error (seconds)
     MAX_RETRIES = 3  # Max retries for rate-limited requests
     INTER_SYMBOL_DELAY = 0.1  # Delay between starting each symbol fetch (seconds)
+    # Worker processes for post-fetch symbol processing in fetch.py --daemon/--stream; 1 = in-process
+    FETCH_PROCESS_WORKERS = int(os.getenv('FETCH_PROCESS_WORKERS', 4))
+    # Largest per-symbol gap fetched in a regular cycle (1000 = one Binance request);
+    # symbols further behind catch up in chunks of this size
+    FETCH_CATCHUP_MAX_MINUTES = int(os.getenv('FETCH_CATCHUP_MAX_MINUTES', 1000))
+    # Seconds before the in-process symbol registry reloads (picks up changes made by other processes)
+    SYMBOL_CACHE_TTL = int(os.getenv('SYMBOL_CACHE_TTL', 60))
+    # Seconds between checks of the shared settings version (Setting.get() is served from memory in between)
+    SETTINGS_CACHE_CHECK_SECONDS = int(os.getenv('SETTINGS_CACHE_CHECK_SECONDS', 5))
+    # Seconds before the settings snapshot is reloaded even if the version did not move
+    SETTINGS_CACHE_MAX_AGE = int(os.getenv('SETTINGS_CACHE_MAX_AGE', 300))
+    # In-memory ring of the newest candles per (symbol, timeframe) in fetch workers (0 = off)
+    CANDLE_CACHE_SIZE = int(os.getenv('CANDLE_CACHE_SIZE', 500))
+    CANDLE_CACHE_TTL = int(os.getenv('CANDLE_CACHE_TTL', 300))  # Seconds before a ring is reloaded from the DB
+    # Seconds before a symbol's in-memory active patterns are reloaded (picks up other processes' writes)
+    ACTIVE_PATTERN_TTL = int(os.getenv('ACTIVE_PATTERN_TTL', 300))
+    # Seconds between full signal sweeps over all symbols (in between only symbols whose patterns changed)
+    SIGNAL_FULL_SWEEP_SECONDS = int(os.getenv('SIGNAL_FULL_SWEEP_SECONDS', 900))
+    # Historical backfill: candles per resumable chunk and chunks fetched concurrently
+    BACKFILL_CHUNK_CANDLES = int(os.getenv('BACKFILL_CHUNK_CANDLES', 10000))
+    BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', 8))
+    # Combined kline stream endpoint for `fetch.py --stream`
+    KLINE_STREAM_URL = os.getenv('KLINE_STREAM_URL', 'wss://stream.binance.com:9443/stream')
 
     # Pattern detection
     MIN_ZONE_PERCENT = 0.15  # Minimum zone size as % of price
     ORDER_BLOCK_STRENGTH_MULTIPLIER = 1.5  # Body must be this much larger than avg
+    # Use Numba-compiled detection loops when numba is installed (pure Python otherwise)
+    PATTERN_JIT_ENABLED = os.getenv('PATTERN_JIT_ENABLED', 'true').lower() == 'true'
 
     # Timeframe overlap thresholds (for pattern deduplication)
     OVERLAP_THRESHOLDS = {
@@ -248,6 +275,15 @@ class Config:
     }
     DEFAULT_PATTERN_EXPIRY_HOURS = 72  # 3 days default
 
+    # Local candle store (memory-mapped verified candles for backtests/optimizer)
+    CANDLE_STORE_ENABLED = os.getenv('CANDLE_STORE_ENABLED', 'true').lower() == 'true'
+    CANDLE_STORE_DIR = os.getenv(
+        'CANDLE_STORE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'candles')
+    )
+    # Seconds between full checks of a stored series against the DB (invalidate_candles() is immediate)
+    CANDLE_STORE_VERIFY_SECONDS = int(os.getenv('CANDLE_STORE_VERIFY_SECONDS', 3600))
+
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -264,6 +300,8 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     WTF_CSRF_ENABLED = False
+    # Store is shared on disk across tests; tests that need it enable it explicitly
+    CANDLE_STORE_ENABLED = False
     # Test database: uses TEST_DB_* env vars or defaults to cryptolens_test on localhost
     SQLALCHEMY_DATABASE_URI = os.getenv(
         'TEST_DATABASE_URL',
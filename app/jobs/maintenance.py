@@ -187,40 +187,26 @@ def expire_patterns_job() -> Dict[str, Any]:
     """
     from app import create_app, db
     from app.models import Pattern
-    from app.config import Config
+    from app.services.patterns import expire_patterns
 
     app = create_app()
     with app.app_context():
         start_time = datetime.now(timezone.utc)
-        now_ms = int(start_time.timestamp() * 1000)
-
-        # Get all active patterns
-        active_patterns = Pattern.query.filter_by(status='active').all()
-        expired_count = 0
-
-        for pattern in active_patterns:
-            # Calculate expiry based on timeframe
-            expiry_hours = Config.PATTERN_EXPIRY_HOURS.get(
-                pattern.timeframe,
-                Config.DEFAULT_PATTERN_EXPIRY_HOURS
-            )
-            expiry_ms = expiry_hours * 60 * 60 * 1000
-            expires_at = pattern.detected_at + expiry_ms
-
-            if now_ms > expires_at:
-                pattern.status = 'expired'
-                expired_count += 1
 
+        by_timeframe = expire_patterns(int(start_time.timestamp() * 1000))
+        expired_count = sum(by_timeframe.values())
         db.session.commit()
+        remaining = db.session.query(db.func.count(Pattern.id)).filter(Pattern.status == 'active').scalar()
 
         elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
 
         logger.info(
-            f"[JOB] Pattern expiry: {expired_count}/{len(active_patterns)} patterns expired"
+            f"[JOB] Pattern expiry: {expired_count}/{expired_count + remaining} patterns expired"
         )
 
         return {
-            'patterns_checked': len(active_patterns),
+            'patterns_checked': expired_count + remaining,
             'patterns_expired': expired_count,
+            'by_timeframe': by_timeframe,
             'elapsed_seconds': elapsed
         }
@@ -27,6 +27,7 @@ from app.models.base import (
 from app.models.system import (
     Log,
     Setting,
+    SettingsVersion,
     StatsCache,
     Backtest,
     Payment,
@@ -47,6 +48,7 @@ from app.models.trading import (
     Signal,
     Notification,
     KnownGap,
+    BackfillChunk,
     UserSymbolPreference,
 )
 
@@ -112,6 +114,7 @@ __all__ = [
     # System models
     'Log',
     'Setting',
+    'SettingsVersion',
     'StatsCache',
     'Backtest',
     'Payment',
@@ -129,6 +132,7 @@ __all__ = [
     'Signal',
     'Notification',
     'KnownGap',
+    'BackfillChunk',
     'UserSymbolPreference',
     # Portfolio models
     'trade_tags',
@@ -1,5 +1,5 @@
 """
-System models: Log, Setting, StatsCache, Backtest, Payment, CronJob, CronRun
+System models: Log, Setting, SettingsVersion, StatsCache, Backtest, Payment, CronJob, CronRun
 """
 from datetime import datetime, timezone, timedelta
 from app import db
@@ -49,9 +49,9 @@ class Setting(db.Model):
 
     @classmethod
     def get(cls, key, default=None):
-        """Get a setting value"""
-        setting = db.session.get(cls, key)
-        return setting.value if setting else default
+        """Get a setting value (from the process-wide settings cache)"""
+        from app.services.settings_cache import get_setting
+        return get_setting(key, default)
 
     @classmethod
     def set(cls, key, value):
@@ -68,6 +68,17 @@ class Setting(db.Model):
         return f'<Setting {self.key}>'
 
 
+class SettingsVersion(db.Model):
+    """Single-row counter bumped in the same transaction as every settings write"""
+    __tablename__ = 'settings_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SettingsVersion {self.version}>'
+
+
 class StatsCache(db.Model):
     """Pre-computed statistics cache for fast page loads"""
     __tablename__ = 'stats_cache'
@@ -111,6 +111,7 @@ class Pattern(db.Model):
         db.Index('idx_pattern_active', 'symbol_id', 'timeframe', 'status'),
         db.Index('idx_pattern_detected', 'detected_at'),
         db.Index('idx_pattern_list', 'status', 'detected_at'),  # For pattern list page queries
+        db.Index('idx_pattern_expiry', 'status', 'timeframe', 'detected_at'),  # For expire_patterns()
         db.Index('idx_pattern_direction', 'direction'),
         db.Index('idx_pattern_type', 'pattern_type'),
     )
@@ -350,6 +351,42 @@ class KnownGap(db.Model):
         ).all()
 
 
+class BackfillChunk(db.Model):
+    """
+    Checkpoint of one historical backfill chunk.
+
+    Backfills split each symbol's range into fixed, epoch-aligned chunks that
+    are fetched independently. next_ts is the first timestamp not yet saved,
+    so an interrupted backfill resumes each chunk where it stopped.
+    """
+    __tablename__ = 'backfill_chunks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    symbol_id = db.Column(db.Integer, db.ForeignKey('symbols.id', ondelete='CASCADE'), nullable=False)
+    timeframe = db.Column(db.String(5), nullable=False)
+    chunk_start = db.Column(db.BigInteger, nullable=False)  # Aligned chunk start (ms)
+    chunk_end = db.Column(db.BigInteger, nullable=False)    # Exclusive chunk end (ms)
+    next_ts = db.Column(db.BigInteger, nullable=False)      # First timestamp still to fetch (ms)
+    candles = db.Column(db.Integer, default=0)              # New candles saved by this chunk
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    symbol = db.relationship('Symbol', backref=db.backref('backfill_chunks', lazy='dynamic',
+                                                          cascade='all, delete-orphan',
+                                                          passive_deletes=True))
+
+    __table_args__ = (
+        db.UniqueConstraint('symbol_id', 'timeframe', 'chunk_start', name='uix_backfill_chunk'),
+    )
+
+    @property
+    def is_complete(self):
+        return self.next_ts >= self.chunk_end
+
+    def __repr__(self):
+        return f'<BackfillChunk {self.symbol_id} {self.timeframe} {self.chunk_start} next={self.next_ts}>'
+
+
 class UserSymbolPreference(db.Model):
     """User-specific symbol notification preferences (for Premium users)"""
     __tablename__ = 'user_symbol_preferences'
@@ -272,8 +272,11 @@ class User(db.Model):
             UserNotification.success.is_(True)
         ).count()
 
-    def can_receive_notification_now(self):
-        """Check if user can receive a notification based on daily limit."""
+    def can_receive_notification_now(self, daily_count=None):
+        """Check if user can receive a notification based on daily limit.
+
+        daily_count: today's count if already known (see notification_quota), else queried.
+        """
         if not self.can_receive_notifications:
             return False
 
@@ -281,7 +284,7 @@ class User(db.Model):
         if limit is None:  # Unlimited
             return True
 
-        current_count = self.get_daily_notification_count()
+        current_count = self.get_daily_notification_count() if daily_count is None else daily_count
         return current_count < limit
 
     def get_notification_delay_seconds(self):
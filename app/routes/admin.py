@@ -1174,11 +1174,12 @@ def api_exchange_symbols():
     import ccxt
     from app.models import Symbol
     from app.services.logger import log_admin
+    from app.services.rate_scheduler import attach_rate_scheduler, PRIORITY_HEALTH
 
     log_admin("Symbols: Fetching available symbols from Binance exchange...")
 
     try:
-        exchange = ccxt.binance({'enableRateLimit': True})
+        exchange = attach_rate_scheduler(ccxt.binance({'enableRateLimit': True}), PRIORITY_HEALTH)
         markets = exchange.load_markets()
 
         # Filter USDT pairs only, sorted alphabetically
@@ -1815,13 +1816,14 @@ def api_fetch_historical(symbol_id):
     def run_fetch_in_background(sym_name, start_date):
         """Run historical fetch in a separate thread with its own app context"""
         import ccxt
-        import time
         import traceback
         from datetime import datetime, timezone
         from app import create_app, db as app_db
-        from app.models import Symbol, Candle, CronJob, CronRun
+        from app.models import Symbol, CronJob, CronRun
         from app.services.aggregator import aggregate_candles_realtime
+        from app.services.candle_writer import bulk_insert_candles
         from app.services.logger import log_admin
+        from app.services.rate_scheduler import attach_rate_scheduler, get_rate_scheduler, PRIORITY_BACKFILL
 
         app = create_app()
         with app.app_context():
@@ -1856,10 +1858,10 @@ def api_fetch_historical(symbol_id):
                 log_admin(f"Historical fetch: {sym_name} - fetching from {start_date} to now...")
 
                 # Initialize exchange
-                exchange = ccxt.binance({
+                exchange = attach_rate_scheduler(ccxt.binance({
                     'enableRateLimit': True,
                     'options': {'defaultType': 'spot'}
-                })
+                }), PRIORITY_BACKFILL)
 
                 # Fetch in batches of 1000 candles
                 since = start_ts
@@ -1870,33 +1872,9 @@ def api_fetch_historical(symbol_id):
                         if not ohlcv:
                             break
 
-                        # Get existing timestamps to avoid duplicates
-                        timestamps = [c[0] for c in ohlcv]
-                        existing = set(
-                            c.timestamp for c in Candle.query.filter(
-                                Candle.symbol_id == sym.id,
-                                Candle.timeframe == '1m',
-                                Candle.timestamp.in_(timestamps)
-                            ).all()
-                        )
-
-                        # Insert new candles
-                        new_count = 0
-                        for candle in ohlcv:
-                            ts, o, h, low, c, v = candle
-                            if ts not in existing:
-                                app_db.session.add(Candle(
-                                    symbol_id=sym.id,
-                                    timeframe='1m',
-                                    timestamp=ts,
-                                    open=o, high=h, low=low, close=c,
-                                    volume=v or 0
-                                ))
-                                new_count += 1
-
-                        if new_count > 0:
-                            app_db.session.commit()
-                            total_candles += new_count
+                        # Bulk insert (duplicates skipped by uix_candle)
+                        new_count = bulk_insert_candles(sym.id, '1m', ohlcv).inserted
+                        total_candles += new_count
 
                         # Move to next batch
                         since = ohlcv[-1][0] + 60000
@@ -1907,9 +1885,6 @@ def api_fetch_historical(symbol_id):
                             progress_date = datetime.fromtimestamp(since / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
                             log_admin(f"Historical fetch: {sym_name} - progress: {progress_date}, {total_candles:,} candles so far")
 
-                        # Rate limit delay
-                        time.sleep(0.3)
-
                         # Break if we got less than 1000 candles (reached end)
                         if len(ohlcv) < 1000:
                             break
@@ -1918,7 +1893,7 @@ def api_fetch_historical(symbol_id):
                         error_str = str(e).lower()
                         if 'rate' in error_str or '429' in error_str:
                             log_admin(f"Historical fetch: {sym_name} - rate limited, waiting 5s...")
-                            time.sleep(5)
+                            get_rate_scheduler().pause(5)
                             continue
                         raise
 
@@ -20,6 +20,7 @@ from app.models import (
 )
 from app.config import Config
 from app import db, csrf, limiter, cache
+from app.services.symbol_registry import get_symbol_id
 
 api_bp = Blueprint('api', __name__)
 
@@ -292,8 +293,8 @@ def get_candles(symbol: str, timeframe: str):
     # Normalize symbol format
     symbol_normalized = symbol.replace('-', '/')
 
-    sym = Symbol.query.filter_by(symbol=symbol_normalized).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol_normalized)
+    if symbol_id is None:
         return ApiResponse.not_found(f'Symbol {symbol} not found')
 
     # Validate timeframe
@@ -307,7 +308,7 @@ def get_candles(symbol: str, timeframe: str):
     limit = min(max(limit, 1), 2000)
 
     candles = Candle.query.filter_by(
-        symbol_id=sym.id,
+        symbol_id=symbol_id,
         timeframe=timeframe
     ).order_by(Candle.timestamp.desc()).limit(limit).all()
 
@@ -348,9 +349,9 @@ def get_patterns():
     query = Pattern.query
 
     if symbol:
-        sym = Symbol.query.filter_by(symbol=symbol.replace('-', '/')).first()
-        if sym:
-            query = query.filter_by(symbol_id=sym.id)
+        symbol_id = get_symbol_id(symbol.replace('-', '/'))
+        if symbol_id is not None:
+            query = query.filter_by(symbol_id=symbol_id)
 
     if timeframe:
         if timeframe not in Config.TIMEFRAMES:
@@ -546,8 +547,8 @@ def trigger_fetch():
         return ApiResponse.bad_request('Symbol and timeframe are required')
 
     # Validate symbol exists
-    sym = Symbol.query.filter_by(symbol=symbol.replace('-', '/')).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol.replace('-', '/'))
+    if symbol_id is None:
         return ApiResponse.not_found(f'Symbol {symbol} not found')
 
     # Validate timeframe
@@ -7,6 +7,7 @@ from flask import Blueprint, render_template, request, jsonify
 import json
 from app.models import Symbol, Pattern, Candle, StatsCache
 from app.config import Config
+from app.services.symbol_registry import get_symbol_id
 from app.decorators import feature_required, login_required, get_current_user, check_feature_limit, filter_symbols_by_tier
 
 
@@ -62,9 +63,9 @@ def index():
         query = query.filter(Pattern.symbol_id.in_(allowed_symbol_ids))
 
     if symbol_filter:
-        symbol = Symbol.query.filter_by(symbol=symbol_filter).first()
-        if symbol and symbol.id in allowed_symbol_ids:
-            query = query.filter_by(symbol_id=symbol.id)
+        symbol_id = get_symbol_id(symbol_filter)
+        if symbol_id is not None and symbol_id in allowed_symbol_ids:
+            query = query.filter_by(symbol_id=symbol_id)
 
     if timeframe_filter:
         query = query.filter_by(timeframe=timeframe_filter)
@@ -173,8 +174,8 @@ def chart(symbol, timeframe):
         JSON with 'candles' (OHLC data), 'patterns' (active zones),
         and 'has_more' (boolean for lazy loading indicator)
     """
-    sym = Symbol.query.filter_by(symbol=symbol.replace('-', '/')).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol.replace('-', '/'))
+    if symbol_id is None:
         return jsonify({'error': 'Symbol not found'}), 404
 
     # Adjust candle limit based on timeframe
@@ -193,7 +194,7 @@ def chart(symbol, timeframe):
 
     # Build query
     query = Candle.query.filter_by(
-        symbol_id=sym.id,
+        symbol_id=symbol_id,
         timeframe=timeframe
     )
 
@@ -207,7 +208,7 @@ def chart(symbol, timeframe):
     patterns = []
     if not before:
         patterns = Pattern.query.filter_by(
-            symbol_id=sym.id,
+            symbol_id=symbol_id,
             timeframe=timeframe,
             status='active'
         ).all()
@@ -217,7 +218,7 @@ def chart(symbol, timeframe):
     if candles:
         oldest_ts = candles[-1].timestamp
         has_more = Candle.query.filter(
-            Candle.symbol_id == sym.id,
+            Candle.symbol_id == symbol_id,
             Candle.timeframe == timeframe,
             Candle.timestamp < oldest_ts
         ).first() is not None
@@ -11,10 +11,13 @@ Smart aggregation approach:
 import logging
 import pandas as pd
 from datetime import datetime, timezone
+from typing import Union
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import Symbol, Candle
+from app.services.candle_cache import get_candle_cache
+from app.services.symbol_registry import get_symbol_id
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +50,7 @@ TIMEFRAME_MINUTES = {
 }
 
 
-def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -> int:
+def aggregate_new_candles(symbol: Union[str, int], from_tf: str = '1m', to_tf: str = '5m') -> int:
     """
     Smart aggregation - only processes candles that haven't been aggregated yet.
 
@@ -64,15 +67,15 @@ def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -
     - Historical backfill (no existing): loads all, creates all
 
     Args:
-        symbol: Trading pair (e.g., 'BTC/USDT')
+        symbol: Trading pair (e.g., 'BTC/USDT') or symbol id
         from_tf: Source timeframe (usually '1m')
         to_tf: Target timeframe (e.g., '5m', '1h')
 
     Returns:
         Number of candles created
     """
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
         return 0
 
     tf_minutes = TIMEFRAME_MINUTES.get(to_tf, 5)
@@ -80,7 +83,7 @@ def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -
 
     # 1. Find last aggregated candle for this target timeframe
     last_target = Candle.query.filter_by(
-        symbol_id=sym.id,
+        symbol_id=symbol_id,
         timeframe=to_tf
     ).order_by(Candle.timestamp.desc()).first()
 
@@ -107,7 +110,7 @@ def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -
         query,
         db.engine,
         params={
-            'symbol_id': sym.id,
+            'symbol_id': symbol_id,
             'timeframe': from_tf,
             'start_from': start_from
         }
@@ -158,7 +161,7 @@ def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -
     # 5. Check which candles already exist (batch query)
     existing_ts = set(
         c.timestamp for c in Candle.query.filter(
-            Candle.symbol_id == sym.id,
+            Candle.symbol_id == symbol_id,
             Candle.timeframe == to_tf,
             Candle.timestamp.in_(timestamps)
         ).all()
@@ -178,7 +181,7 @@ def aggregate_new_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m') -
             continue
 
         candle = Candle(
-            symbol_id=sym.id,
+            symbol_id=symbol_id,
             timeframe=to_tf,
             timestamp=timestamp,
             open=row['open'],
@@ -243,7 +246,7 @@ def update_aggregations_for_all_symbols() -> dict:
 # Legacy functions - kept for backward compatibility with backfill scripts
 # =============================================================================
 
-def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
+def aggregate_candles(symbol: Union[str, int], from_tf: str = '1m', to_tf: str = '5m',
                       progress_callback=None) -> int:
     """
     FULL aggregation - loads ALL candles. Use only for historical backfill.
@@ -252,7 +255,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
     what's needed.
 
     Args:
-        symbol: Trading pair (e.g., 'BTC/USDT')
+        symbol: Trading pair (e.g., 'BTC/USDT') or symbol id
         from_tf: Source timeframe (usually '1m')
         to_tf: Target timeframe (e.g., '5m', '1h')
         progress_callback: Optional callback(stage, current, total) for progress updates
@@ -260,8 +263,8 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
     Returns:
         Number of candles created
     """
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
         return 0
 
     if progress_callback:
@@ -269,7 +272,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
 
     # Get source candle count first for progress
     source_count = Candle.query.filter_by(
-        symbol_id=sym.id,
+        symbol_id=symbol_id,
         timeframe=from_tf
     ).count()
 
@@ -290,7 +293,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
     df = pd.read_sql(
         query,
         db.engine,
-        params={'symbol_id': sym.id, 'timeframe': from_tf}
+        params={'symbol_id': symbol_id, 'timeframe': from_tf}
     )
 
     if progress_callback:
@@ -329,7 +332,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
 
     existing_timestamps = set(
         c.timestamp for c in Candle.query.filter_by(
-            symbol_id=sym.id,
+            symbol_id=symbol_id,
             timeframe=to_tf
         ).with_entities(Candle.timestamp).all()
     )
@@ -349,7 +352,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
             continue
 
         candle = Candle(
-            symbol_id=sym.id,
+            symbol_id=symbol_id,
             timeframe=to_tf,
             timestamp=timestamp,
             open=row['open'],
@@ -369,7 +372,7 @@ def aggregate_candles(symbol: str, from_tf: str = '1m', to_tf: str = '5m',
                 db.session.rollback()
                 existing_timestamps = set(
                     c.timestamp for c in Candle.query.filter_by(
-                        symbol_id=sym.id,
+                        symbol_id=symbol_id,
                         timeframe=to_tf
                     ).with_entities(Candle.timestamp).all()
                 )
@@ -396,7 +399,7 @@ aggregate_candles_windowed = aggregate_new_candles
 
 
 def get_candles_as_dataframe(
-    symbol: str,
+    symbol: Union[str, int],
     timeframe: str,
     limit: int = None,
     verified_only: bool = False
@@ -405,7 +408,7 @@ def get_candles_as_dataframe(
     Get candles as a pandas DataFrame for analysis (optimized: direct SQL to DataFrame)
 
     Args:
-        symbol: Trading pair (e.g., 'BTC/USDT')
+        symbol: Trading pair (e.g., 'BTC/USDT') or symbol id
         timeframe: Candle timeframe (e.g., '1h', '4h')
         limit: Maximum number of candles to return (None = all candles)
         verified_only: If True, return continuous verified candles from start
@@ -414,10 +417,16 @@ def get_candles_as_dataframe(
     Returns:
         DataFrame with columns: timestamp, open, high, low, close, volume
     """
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
         return pd.DataFrame()
 
+    # Newest candles straight from the in-memory ring (fetch workers only)
+    if limit and not verified_only:
+        df = get_candle_cache().get_dataframe(symbol_id, timeframe, limit)
+        if df is not None:
+            return df
+
     # Build query based on whether limit is specified
     if verified_only:
         # Get continuous verified candles: all candles up to the first unverified one
@@ -436,7 +445,7 @@ def get_candles_as_dataframe(
                 ORDER BY timestamp DESC
                 LIMIT :limit
             """)
-            params = {'symbol_id': sym.id, 'timeframe': timeframe, 'limit': limit}
+            params = {'symbol_id': symbol_id, 'timeframe': timeframe, 'limit': limit}
         else:
             query = text("""
                 SELECT timestamp, open, high, low, close, volume
@@ -450,7 +459,7 @@ def get_candles_as_dataframe(
                   )
                 ORDER BY timestamp ASC
             """)
-            params = {'symbol_id': sym.id, 'timeframe': timeframe}
+            params = {'symbol_id': symbol_id, 'timeframe': timeframe}
     else:
         if limit:
             query = text("""
@@ -460,7 +469,7 @@ def get_candles_as_dataframe(
                 ORDER BY timestamp DESC
                 LIMIT :limit
             """)
-            params = {'symbol_id': sym.id, 'timeframe': timeframe, 'limit': limit}
+            params = {'symbol_id': symbol_id, 'timeframe': timeframe, 'limit': limit}
         else:
             query = text("""
                 SELECT timestamp, open, high, low, close, volume
@@ -468,7 +477,7 @@ def get_candles_as_dataframe(
                 WHERE symbol_id = :symbol_id AND timeframe = :timeframe
                 ORDER BY timestamp ASC
             """)
-            params = {'symbol_id': sym.id, 'timeframe': timeframe}
+            params = {'symbol_id': symbol_id, 'timeframe': timeframe}
 
     df = pd.read_sql(
         query,
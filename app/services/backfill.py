@@ -0,0 +1,240 @@
+"""
+Historical Backfill Engine
+Parallel, resumable multi-symbol candle backfill
+
+Usage:
+    from app.services.backfill import BackfillEngine
+
+    engine = BackfillEngine(exchange, app)
+    results = await engine.run([('BTC/USDT', 1), ('ETH/USDT', 2)], start_ts, end_ts)
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ccxt
+
+from app import db
+from app.config import Config
+from app.models import BackfillChunk
+from app.services.candle_writer import bulk_insert_candles
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000        # Candles per exchange request (Binance max)
+FLUSH_EVERY = 5000      # Candles buffered before a bulk insert + checkpoint
+RETRY_DELAY_SECONDS = 5
+
+
+def plan_chunks(start_ts: int, end_ts: int, chunk_ms: int) -> List[Tuple[int, int]]:
+    """
+    Epoch-aligned chunks covering [start_ts, end_ts).
+
+    The first chunk starts at the aligned boundary at or before start_ts, so a
+    chunk always has the same key regardless of the requested range.
+
+    Example:
+        >>> plan_chunks(150, 420, 100)
+        [(100, 200), (200, 300), (300, 400), (400, 500)]
+    """
+    first = (start_ts // chunk_ms) * chunk_ms
+    return [(s, s + chunk_ms) for s in range(first, end_ts, chunk_ms)]
+
+
+@dataclass
+class _ChunkJob:
+    symbol: str
+    symbol_id: int
+    chunk_start: int
+    chunk_end: int
+    next_ts: int
+    until: int  # Exclusive end for this run (chunk_end, or end_ts for the newest chunk)
+
+
+class BackfillEngine:
+    """Fetches many symbols' history concurrently with per-chunk checkpoints."""
+
+    def __init__(
+        self,
+        exchange,
+        app,
+        timeframe: str = '1m',
+        chunk_candles: int = None,
+        concurrency: int = None,
+        flush_every: int = FLUSH_EVERY,
+        progress: Optional[Callable[[int, int, int], None]] = None
+    ):
+        """
+        Args:
+            exchange: ccxt async exchange (rate scheduler attached)
+            app: Flask application instance
+            timeframe: Candle timeframe to backfill
+            chunk_candles: Candles per chunk (default Config.BACKFILL_CHUNK_CANDLES)
+            concurrency: Chunks fetched at once (default Config.BACKFILL_CONCURRENCY)
+            flush_every: Candles buffered before a bulk insert + checkpoint
+            progress: Optional callback(chunks_done, chunks_total, new_candles)
+        """
+        self.exchange = exchange
+        self.app = app
+        self.timeframe = timeframe
+        self.tf_ms = Config.TIMEFRAME_MS.get(timeframe, 60000)
+        self.chunk_ms = (chunk_candles or Config.BACKFILL_CHUNK_CANDLES) * self.tf_ms
+        self.concurrency = concurrency or Config.BACKFILL_CONCURRENCY
+        self.flush_every = flush_every
+        self.progress = progress
+
+        self._results: Dict[str, dict] = {}
+        self._done = 0
+        self._total = 0
+        self._new = 0
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run_db(self, func, *args):
+        """Run DB work on the engine's DB thread so chunk fetchers keep running meanwhile."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, functools.partial(func, *args))
+
+    async def run(self, symbols: List[Tuple[str, int]], start_ts: int, end_ts: int) -> Dict[str, dict]:
+        """
+        Backfill [start_ts, end_ts) for every (symbol_name, symbol_id).
+
+        Returns:
+            {symbol: {'symbol', 'fetched', 'new', 'chunks', 'resumed', 'errors'}}
+            where 'resumed' counts chunks skipped because a checkpoint had
+            already completed them
+        """
+        # One thread: flushes commit in order and never share the scoped DB session
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backfill-db')
+        try:
+            jobs = await self._run_db(self._plan, symbols, start_ts, end_ts)
+            self._total = len(jobs)
+            logger.info(
+                f"Backfill: {len(jobs)} chunks to fetch for {len(symbols)} symbols "
+                f"({sum(r['resumed'] for r in self._results.values())} already complete)"
+            )
+
+            queue = iter(jobs)
+
+            async def worker():
+                for job in queue:
+                    await self._run_chunk(job)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(jobs)) or 1)))
+        finally:
+            self._db_executor.shutdown(wait=True)
+            self._db_executor = None
+        return self._results
+
+    def _plan(self, symbols: List[Tuple[str, int]], start_ts: int, end_ts: int) -> List[_ChunkJob]:
+        """Chunks still to fetch, interleaved across symbols so every symbol progresses."""
+        chunks = plan_chunks(start_ts, end_ts, self.chunk_ms)
+        per_symbol = []
+        with self.app.app_context():
+            for name, symbol_id in symbols:
+                self._results[name] = {
+                    'symbol': name, 'fetched': 0, 'new': 0, 'chunks': 0, 'resumed': 0, 'errors': 0
+                }
+                if not chunks:
+                    per_symbol.append([])
+                    continue
+                checkpoints = {
+                    c.chunk_start: c.next_ts
+                    for c in BackfillChunk.query.filter(
+                        BackfillChunk.symbol_id == symbol_id,
+                        BackfillChunk.timeframe == self.timeframe,
+                        BackfillChunk.chunk_start >= chunks[0][0],
+                        BackfillChunk.chunk_start < chunks[-1][1]
+                    ).with_entities(BackfillChunk.chunk_start, BackfillChunk.next_ts)
+                }
+                pending = []
+                for chunk_start, chunk_end in chunks:
+                    next_ts = checkpoints.get(chunk_start, chunk_start)
+                    until = min(chunk_end, end_ts)
+                    if next_ts >= until:
+                        self._results[name]['resumed'] += 1
+                        continue
+                    pending.append(_ChunkJob(name, symbol_id, chunk_start, chunk_end, next_ts, until))
+                per_symbol.append(pending)
+
+        jobs = []
+        for i in range(max((len(p) for p in per_symbol), default=0)):
+            jobs.extend(p[i] for p in per_symbol if i < len(p))
+        return jobs
+
+    async def _run_chunk(self, job: _ChunkJob) -> None:
+        result = self._results[job.symbol]
+        buffer = []
+        since = job.next_ts
+
+        while since < job.until:
+            try:
+                page = await self._fetch_page(job.symbol, since)
+            except Exception as e:
+                logger.error(f"{job.symbol}: Backfill chunk {job.chunk_start} stopped at {since}: {e}")
+                result['errors'] += 1
+                break
+
+            rows = [r for r in page if since <= r[0] < job.until]
+            if not rows:
+                # Nothing listed from `since` to the end of this chunk
+                since = job.until
+                break
+
+            buffer.extend(rows)
+            result['fetched'] += len(rows)
+            since = int(rows[-1][0]) + self.tf_ms
+            if len(buffer) >= self.flush_every:
+                await self._checkpoint(job, buffer, since)
+                buffer = []
+
+        # Always checkpoint: also records empty ranges (pre-listing) as done
+        if since > job.next_ts or buffer:
+            await self._checkpoint(job, buffer, since)
+        result['chunks'] += 1
+        self._done += 1
+        if self.progress:
+            self.progress(self._done, self._total, self._new)
+
+    async def _fetch_page(self, symbol: str, since: int) -> List[List]:
+        """One exchange page, retried on errors (rate limits pause via the scheduler)."""
+        for attempt in range(Config.MAX_RETRIES):
+            try:
+                return await self.exchange.fetch_ohlcv(symbol, self.timeframe, since=since, limit=PAGE_SIZE)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                if attempt == Config.MAX_RETRIES - 1:
+                    raise
+                # The rate scheduler is paused; the retry waits in throttle()
+            except (ccxt.NetworkError, ccxt.ExchangeNotAvailable):
+                if attempt == Config.MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+        return []
+
+    async def _checkpoint(self, job: _ChunkJob, rows: List[List], next_ts: int) -> None:
+        """Flush on the DB thread, then advance the job and the counters."""
+        inserted = await self._run_db(self._flush, job, rows, next_ts)
+        job.next_ts = next_ts
+        self._results[job.symbol]['new'] += inserted
+        self._new += inserted
+
+    def _flush(self, job: _ChunkJob, rows: List[List], next_ts: int) -> int:
+        """Bulk insert buffered candles and advance the chunk checkpoint in one commit (returns rows inserted)."""
+        with self.app.app_context():
+            inserted = bulk_insert_candles(job.symbol_id, self.timeframe, rows, commit=False).inserted if rows else 0
+            checkpoint = BackfillChunk.query.filter_by(
+                symbol_id=job.symbol_id, timeframe=self.timeframe, chunk_start=job.chunk_start
+            ).first()
+            if checkpoint is None:
+                checkpoint = BackfillChunk(
+                    symbol_id=job.symbol_id, timeframe=self.timeframe, chunk_start=job.chunk_start,
+                    chunk_end=job.chunk_end, next_ts=next_ts, candles=inserted
+                )
+                db.session.add(checkpoint)
+            else:
+                checkpoint.next_ts = max(checkpoint.next_ts, next_ts)
+                checkpoint.candles = (checkpoint.candles or 0) + inserted
+            db.session.commit()
+        return inserted
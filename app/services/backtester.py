@@ -11,6 +11,7 @@ import pandas as pd
 from app.models import Backtest
 from app import db
 from app.services.logger import log_backtest
+from app.services.first_touch import FirstTouchIndex
 from app.services.patterns.fair_value_gap import FVGDetector
 from app.services.patterns.order_block import OrderBlockDetector
 from app.services.patterns.liquidity import LiquiditySweepDetector
@@ -58,7 +59,7 @@ def run_backtest(symbol: str, timeframe: str, start_date: str, end_date: str,
     Returns:
         Backtest results with paginated trades
     """
-    from app.services.aggregator import get_candles_as_dataframe
+    from app.services.candle_store import get_all_candles
 
     # Validate pattern type
     valid_types = ['imbalance', 'order_block', 'liquidity_sweep']
@@ -94,7 +95,7 @@ def run_backtest(symbol: str, timeframe: str, start_date: str, end_date: str,
     )
 
     # Get historical data (no limit - date range filtering handles boundaries)
-    df = get_candles_as_dataframe(symbol, timeframe)
+    df = get_all_candles(symbol, timeframe)
 
     if df.empty:
         log_backtest(
@@ -224,12 +225,13 @@ def simulate_trades(df: pd.DataFrame, pattern_type: str, rr_target: float,
     # Detect patterns using production logic (no DB interaction)
     patterns = detector.detect_historical(df, skip_overlap=True)
 
-    # Simulate trades for each detected pattern
+    # Simulate trades for each detected pattern (one first-touch index for all of them)
+    touch_index = FirstTouchIndex(df['high'].to_numpy(), df['low'].to_numpy())
     trades = []
     for pattern in patterns:
         trade = simulate_single_trade(
             df, pattern['detected_at'], pattern, rr_target, sl_buffer_pct,
-            slippage_pct, lookback
+            slippage_pct, lookback, touch_index
         )
         if trade:
             trade['pattern_type'] = pattern_type
@@ -240,7 +242,8 @@ def simulate_trades(df: pd.DataFrame, pattern_type: str, rr_target: float,
 
 def simulate_single_trade(df: pd.DataFrame, entry_idx: int, pattern: Dict,
                           rr_target: float, sl_buffer_pct: float = 10.0,
-                          slippage_pct: float = 0.0, lookback: int = 100) -> Optional[Dict]:
+                          slippage_pct: float = 0.0, lookback: int = 100,
+                          touch_index: Optional[FirstTouchIndex] = None) -> Optional[Dict]:
     """
     Simulate a single trade from pattern detection to outcome.
 
@@ -257,6 +260,8 @@ def simulate_single_trade(df: pd.DataFrame, entry_idx: int, pattern: Dict,
         sl_buffer_pct: Stop loss buffer as percentage of zone size
         slippage_pct: Slippage as percentage of entry price (default 0%)
         lookback: Maximum candles to look ahead for trade completion
+        touch_index: First-touch index over df's highs/lows (built if not given;
+                     pass one in when simulating many trades on the same df)
 
     Returns:
         Trade result dict or None if trade didn't trigger/complete
@@ -267,6 +272,13 @@ def simulate_single_trade(df: pd.DataFrame, entry_idx: int, pattern: Dict,
     zone_size = zone_high - zone_low
     buffer = zone_size * (sl_buffer_pct / 100.0)
 
+    if touch_index is None:
+        touch_index = FirstTouchIndex(df['high'].to_numpy(), df['low'].to_numpy())
+
+    search_end = min(entry_idx + lookback, len(df))
+    opens = df['open'].to_numpy()
+    timestamps = df['timestamp'].to_numpy()
+
     if pattern['direction'] == 'bullish':
         # For long: entry at zone high, with slippage we get worse price (higher)
         ideal_entry = zone_high
@@ -274,6 +286,23 @@ def simulate_single_trade(df: pd.DataFrame, entry_idx: int, pattern: Dict,
         entry = ideal_entry + slippage_amount  # Worse entry for long
         stop_loss = zone_low - buffer
         direction = 'long'
+
+        # Entry triggered when price comes back into the zone
+        entry_candle = touch_index.first_low_at_or_below(entry_idx + 1, ideal_entry, search_end)
+        if entry_candle >= search_end:
+            return None
+
+        # More realistic: entry might be at open if gapped, or at zone edge
+        if opens[entry_candle] <= ideal_entry:
+            actual_entry_price = opens[entry_candle] + slippage_amount
+        else:
+            actual_entry_price = entry
+
+        # Recalculate TP based on actual entry
+        actual_risk = actual_entry_price - stop_loss
+        actual_tp = actual_entry_price + (actual_risk * rr_target)
+        sl_idx = touch_index.first_low_at_or_below(entry_candle + 1, stop_loss, search_end)
+        tp_idx = touch_index.first_high_at_or_above(entry_candle + 1, actual_tp, search_end)
     else:
         # For short: entry at zone low, with slippage we get worse price (lower)
         ideal_entry = zone_low
@@ -282,134 +311,68 @@ def simulate_single_trade(df: pd.DataFrame, entry_idx: int, pattern: Dict,
         stop_loss = zone_high + buffer
         direction = 'short'
 
-    # Look for entry trigger and outcome
-    entry_triggered = False
-    entry_candle = None
-    actual_entry_price = entry  # May be updated based on candle
-
-    for j in range(entry_idx + 1, min(entry_idx + lookback, len(df))):
-        candle = df.iloc[j]
-
-        if not entry_triggered:
-            # Check if price enters the zone (entry triggered)
-            if direction == 'long':
-                if candle['low'] <= ideal_entry:
-                    entry_triggered = True
-                    entry_candle = j
-                    # More realistic: entry might be at open if gapped, or at zone edge
-                    if candle['open'] <= ideal_entry:
-                        actual_entry_price = candle['open'] + slippage_amount
-                    else:
-                        actual_entry_price = entry
-            else:  # short
-                if candle['high'] >= ideal_entry:
-                    entry_triggered = True
-                    entry_candle = j
-                    if candle['open'] >= ideal_entry:
-                        actual_entry_price = candle['open'] - slippage_amount
-                    else:
-                        actual_entry_price = entry
+        entry_candle = touch_index.first_high_at_or_above(entry_idx + 1, ideal_entry, search_end)
+        if entry_candle >= search_end:
+            return None
 
+        if opens[entry_candle] >= ideal_entry:
+            actual_entry_price = opens[entry_candle] - slippage_amount
         else:
-            # Trade is active, check for SL or TP
-            # Recalculate TP based on actual entry
-            if direction == 'long':
-                actual_risk = actual_entry_price - stop_loss
-                actual_tp = actual_entry_price + (actual_risk * rr_target)
-
-                sl_hit = candle['low'] <= stop_loss
-                tp_hit = candle['high'] >= actual_tp
-
-                # Handle same-candle ambiguity
-                if sl_hit and tp_hit:
-                    # Both SL and TP could have been hit - mark as inconclusive
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(actual_entry_price),  # No P&L for inconclusive
-                        'direction': direction,
-                        'result': 'inconclusive',
-                        'rr_achieved': 0.0,
-                        'profit_pct': 0.0,
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle),
-                        'note': 'Both SL and TP touched in same candle - outcome uncertain'
-                    }
-                elif sl_hit:
-                    # Stop loss hit
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(stop_loss),
-                        'direction': direction,
-                        'result': 'loss',
-                        'rr_achieved': -1.0,
-                        'profit_pct': float(-abs((stop_loss - actual_entry_price) / actual_entry_price * 100)),
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle)
-                    }
-                elif tp_hit:
-                    # Take profit hit
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(actual_tp),
-                        'direction': direction,
-                        'result': 'win',
-                        'rr_achieved': float(rr_target),
-                        'profit_pct': float(abs((actual_tp - actual_entry_price) / actual_entry_price * 100)),
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle)
-                    }
-            else:  # short
-                actual_risk = stop_loss - actual_entry_price
-                actual_tp = actual_entry_price - (actual_risk * rr_target)
-
-                sl_hit = candle['high'] >= stop_loss
-                tp_hit = candle['low'] <= actual_tp
-
-                # Handle same-candle ambiguity
-                if sl_hit and tp_hit:
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(actual_entry_price),
-                        'direction': direction,
-                        'result': 'inconclusive',
-                        'rr_achieved': 0.0,
-                        'profit_pct': 0.0,
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle),
-                        'note': 'Both SL and TP touched in same candle - outcome uncertain'
-                    }
-                elif sl_hit:
-                    # Stop loss hit
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(stop_loss),
-                        'direction': direction,
-                        'result': 'loss',
-                        'rr_achieved': -1.0,
-                        'profit_pct': float(-abs((stop_loss - actual_entry_price) / actual_entry_price * 100)),
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle)
-                    }
-                elif tp_hit:
-                    # Take profit hit
-                    return {
-                        'entry_price': float(actual_entry_price),
-                        'exit_price': float(actual_tp),
-                        'direction': direction,
-                        'result': 'win',
-                        'rr_achieved': float(rr_target),
-                        'profit_pct': float(abs((actual_entry_price - actual_tp) / actual_entry_price * 100)),
-                        'entry_time': int(df.iloc[entry_candle]['timestamp']),
-                        'exit_time': int(candle['timestamp']),
-                        'duration_candles': int(j - entry_candle)
-                    }
-
-    return None  # Trade didn't complete in the lookback period
+            actual_entry_price = entry
+
+        actual_risk = stop_loss - actual_entry_price
+        actual_tp = actual_entry_price - (actual_risk * rr_target)
+        sl_idx = touch_index.first_high_at_or_above(entry_candle + 1, stop_loss, search_end)
+        tp_idx = touch_index.first_low_at_or_below(entry_candle + 1, actual_tp, search_end)
+
+    exit_idx = min(sl_idx, tp_idx)
+    if exit_idx >= search_end:
+        return None  # Trade didn't complete in the lookback period
+
+    entry_time = int(timestamps[entry_candle])
+    exit_time = int(timestamps[exit_idx])
+    duration = int(exit_idx - entry_candle)
+
+    if sl_idx == tp_idx:
+        # Both SL and TP could have been hit - mark as inconclusive
+        return {
+            'entry_price': float(actual_entry_price),
+            'exit_price': float(actual_entry_price),  # No P&L for inconclusive
+            'direction': direction,
+            'result': 'inconclusive',
+            'rr_achieved': 0.0,
+            'profit_pct': 0.0,
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'duration_candles': duration,
+            'note': 'Both SL and TP touched in same candle - outcome uncertain'
+        }
+    elif sl_idx < tp_idx:
+        # Stop loss hit
+        return {
+            'entry_price': float(actual_entry_price),
+            'exit_price': float(stop_loss),
+            'direction': direction,
+            'result': 'loss',
+            'rr_achieved': -1.0,
+            'profit_pct': float(-abs((stop_loss - actual_entry_price) / actual_entry_price * 100)),
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'duration_candles': duration
+        }
+    else:
+        # Take profit hit
+        return {
+            'entry_price': float(actual_entry_price),
+            'exit_price': float(actual_tp),
+            'direction': direction,
+            'result': 'win',
+            'rr_achieved': float(rr_target),
+            'profit_pct': float(abs((actual_tp - actual_entry_price) / actual_entry_price * 100)),
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'duration_candles': duration
+        }
 
 
 def calculate_statistics(trades: List[Dict]) -> Dict:
@@ -0,0 +1,257 @@
+"""
+Hot Candle Cache
+In-process ring buffers of the most recent candles per (symbol, timeframe)
+
+Usage:
+    from app.services.candle_cache import enable_candle_cache, get_candle_cache
+
+    enable_candle_cache()                                  # fetch worker start-up
+    df = get_candle_cache().get_dataframe(symbol_id, '1h', 200)  # None = read the DB
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app import db
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# session.info key for candles written in the current transaction
+STAGED_KEY = 'candle_cache_staged'
+
+
+class CandleRing:
+    """
+    Newest candles of one series as contiguous arrays (timestamp + 5 value rows).
+
+    Rows live in [_start, _end) of over-allocated arrays. Appends fill the
+    free tail; when it runs out the newest `capacity` rows move to freshly
+    allocated arrays, so memory an earlier view points at is never rewritten.
+    """
+    __slots__ = ('capacity', 'tf_ms', 'complete', 'loaded_at', '_ts', '_values', '_start', '_end')
+
+    def __init__(self, capacity: int, tf_ms: int, timestamps: np.ndarray, values: np.ndarray,
+                 complete: bool, loaded_at: float):
+        self.capacity = capacity
+        self.tf_ms = tf_ms
+        self.complete = complete  # Ring holds the whole series (DB had fewer rows than capacity)
+        self.loaded_at = loaded_at
+        self._ts = np.empty(0, dtype=np.int64)
+        self._values = np.empty((len(VALUE_COLUMNS), 0), dtype=np.float64)
+        self._start = self._end = 0
+        self.append(timestamps, values)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def first_ts(self) -> Optional[int]:
+        return int(self._ts[self._start]) if len(self) else None
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self._ts[self._end - 1]) if len(self) else None
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append rows newer than last_ts (timestamps ascending, values shaped (n, 5))."""
+        n = len(timestamps)
+        if n == 0:
+            return
+        if self._end + n > len(self._ts):
+            keep = min(len(self), max(self.capacity - n, 0))
+            size = max(self.capacity, n) + max(self.capacity // 4, 64)
+            new_ts = np.empty(size, dtype=np.int64)
+            new_values = np.empty((len(VALUE_COLUMNS), size), dtype=np.float64)
+            new_ts[:keep] = self._ts[self._end - keep:self._end]
+            new_values[:, :keep] = self._values[:, self._end - keep:self._end]
+            if keep < len(self):
+                self.complete = False
+            self._ts, self._values, self._start, self._end = new_ts, new_values, 0, keep
+
+        self._ts[self._end:self._end + n] = timestamps
+        self._values[:, self._end:self._end + n] = np.asarray(values, dtype=np.float64).T
+        self._end += n
+        if self._end - self._start > self.capacity:
+            self._start = self._end - self.capacity
+            self.complete = False
+
+    def contains(self, timestamps: np.ndarray) -> np.ndarray:
+        """Mask of timestamps present in the ring."""
+        ts = self._ts[self._start:self._end]
+        idx = np.clip(np.searchsorted(ts, timestamps), 0, max(len(ts) - 1, 0))
+        return (ts[idx] == timestamps) if len(ts) else np.zeros(len(timestamps), dtype=bool)
+
+    def frame(self, start: int) -> pd.DataFrame:
+        """DataFrame over rows [start, end) (absolute indexes), same columns as the DB readers."""
+        if start >= self._end:
+            return pd.DataFrame()
+        ts = self._ts[start:self._end]
+        ts.flags.writeable = False
+        columns = {'timestamp': ts}
+        for k, name in enumerate(VALUE_COLUMNS):
+            view = self._values[k, start:self._end]
+            view.flags.writeable = False
+            columns[name] = view
+        columns['datetime'] = ts.view('datetime64[ms]')
+        return pd.DataFrame(columns, copy=False)
+
+    def tail(self, limit: int) -> pd.DataFrame:
+        return self.frame(max(self._start, self._end - limit))
+
+    def after(self, ts: int) -> pd.DataFrame:
+        """Rows with timestamp > ts."""
+        return self.frame(self._start + int(np.searchsorted(self._ts[self._start:self._end], ts, side='right')))
+
+
+class CandleCache:
+    """Ring buffers for every (symbol_id, timeframe) read or written in this process."""
+
+    def __init__(self, capacity: int = 0, ttl: float = None, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.ttl = Config.CANDLE_CACHE_TTL if ttl is None else ttl
+        self.clock = clock
+        self._rings: Dict[Tuple[int, str], CandleRing] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _load(self, symbol_id: int, timeframe: str) -> Optional[CandleRing]:
+        tf_ms = Config.TIMEFRAME_MS.get(timeframe)
+        if tf_ms is None:
+            return None
+        with db.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT timestamp, open, high, low, close, volume
+                FROM candles
+                WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+                ORDER BY timestamp DESC
+                LIMIT :limit
+            """), {'symbol_id': symbol_id, 'timeframe': timeframe, 'limit': self.capacity}).fetchall()
+        arr = np.array(rows[::-1], dtype=np.float64).reshape(-1, 6)
+        return CandleRing(
+            self.capacity, tf_ms, arr[:, 0].astype(np.int64), arr[:, 1:],
+            complete=len(rows) < self.capacity, loaded_at=self.clock()
+        )
+
+    def _ring(self, symbol_id: int, timeframe: str) -> Optional[CandleRing]:
+        key = (symbol_id, timeframe)
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is not None and self.clock() - ring.loaded_at <= self.ttl:
+                return ring
+            # TTL expiry: pick up rows written by other processes (gap repair, backfill)
+            ring = self._load(symbol_id, timeframe)
+            if ring is not None:
+                self._rings[key] = ring
+            return ring
+
+    def get_dataframe(self, symbol_id: int, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+        """Newest `limit` candles, oldest first; None when the DB has to be read instead."""
+        if not self.enabled or not limit or limit > self.capacity:
+            return None
+        ring = self._ring(symbol_id, timeframe)
+        if ring is None or (len(ring) < limit and not ring.complete):
+            return None
+        return ring.tail(limit)
+
+    def get_since(self, symbol_id: int, timeframe: str, after_ts: int) -> Optional[pd.DataFrame]:
+        """Candles with timestamp > after_ts, oldest first; None when the ring does not reach back that far."""
+        if not self.enabled:
+            return None
+        ring = self._ring(symbol_id, timeframe)
+        if ring is None or not (ring.complete or (len(ring) and after_ts >= ring.first_ts)):
+            return None
+        return ring.after(after_ts)
+
+    def stage(self, symbol_id: int, timeframe: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Remember rows written in the current transaction; applied after commit."""
+        if self.enabled:
+            db.session.info.setdefault(STAGED_KEY, []).append((symbol_id, timeframe, timestamps, values))
+
+    def apply(self, staged: List[Tuple[int, str, np.ndarray, np.ndarray]]) -> None:
+        """Fold committed rows into existing rings (no SQL: runs in after_commit)."""
+        with self._lock:
+            for symbol_id, timeframe, timestamps, values in staged:
+                key = (symbol_id, timeframe)
+                ring = self._rings.get(key)
+                if ring is not None and not self._extend(ring, timestamps, values):
+                    del self._rings[key]
+
+    @staticmethod
+    def _extend(ring: CandleRing, timestamps: np.ndarray, values: np.ndarray) -> bool:
+        """Add rows to a ring; False if it can no longer mirror the DB and must be dropped."""
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
+        timestamps, first = np.unique(timestamps, return_index=True)
+        values = values[first]
+
+        last = ring.last_ts
+        if last is not None:
+            old = timestamps <= last
+            if old.any():
+                old_ts = timestamps[old]
+                in_range = old_ts >= ring.first_ts
+                if not ring.contains(old_ts[in_range]).all():
+                    return False  # Gap filled inside the cached range
+                if (~in_range).any():
+                    ring.complete = False  # History extended before the ring
+                timestamps, values = timestamps[~old], values[~old]
+            if len(timestamps) and timestamps[0] != last + ring.tf_ms:
+                return False  # Rows between the ring and this batch may exist in the DB
+        if len(timestamps) > 1 and (np.diff(timestamps) != ring.tf_ms).any():
+            return False
+        ring.append(timestamps, values)
+        return True
+
+    def invalidate(self, symbol_id: int = None, timeframe: str = None) -> None:
+        """Drop rings (all, one symbol, or one symbol/timeframe); they are reloaded on the next read."""
+        with self._lock:
+            if symbol_id is None:
+                self._rings.clear()
+                return
+            for key in list(self._rings):
+                if key[0] == symbol_id and (timeframe is None or key[1] == timeframe):
+                    del self._rings[key]
+
+
+_cache = CandleCache()
+
+
+def get_candle_cache() -> CandleCache:
+    """Process-wide cache (disabled until enable_candle_cache())."""
+    return _cache
+
+
+def enable_candle_cache(capacity: int = None) -> CandleCache:
+    """Turn the cache on for this process (capacity defaults to Config.CANDLE_CACHE_SIZE; 0 = off)."""
+    _cache.capacity = Config.CANDLE_CACHE_SIZE if capacity is None else capacity
+    _cache.invalidate()
+    return _cache
+
+
+def reset_candle_cache(symbol_id: int = None, timeframe: str = None) -> None:
+    """Drop cached rings (e.g. after candles were written outside bulk_insert_candles)."""
+    _cache.invalidate(symbol_id, timeframe)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_staged(session):
+    staged = session.info.pop(STAGED_KEY, None)
+    if staged:
+        _cache.apply(staged)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_staged(session):
+    session.info.pop(STAGED_KEY, None)
@@ -0,0 +1,416 @@
+"""
+Columnar Candle Store
+Local memory-mapped cache of verified candles for backtests and optimization
+
+Instead of pulling the whole verified history from MySQL on every
+optimizer run / backtest, the verified prefix of each series is kept on disk:
+- One directory per (symbol, timeframe): CANDLE_STORE_DIR/BTC-USDT/1h/
+- One raw little-endian file per column (timestamp.i8, open.f8, ... volume.f8)
+- meta.json holds the committed row count (written last, atomically)
+
+Reads are np.memmap views (copy-on-write), so detectors and simulators get
+column arrays without copying. Each read first appends any newly verified
+rows from the DB (timestamp > stored watermark, before the first unverified
+candle), which is one indexed query that usually returns nothing.
+
+Verified candles can still be rewritten or deleted (db_health re-aggregation
+and --reset, fetch_historical --delete). Those paths call invalidate_candles(),
+which drops the stored series. As a backstop, a sync at most every
+CANDLE_STORE_VERIFY_SECONDS (or sync(verify=True)) also checks the stored range
+against the DB (row count, first timestamp, no unverified candle inside it)
+and rebuilds the series when they differ. A rebuild writes fresh column files
+and swaps them in with os.replace, so existing memmaps keep the old inode;
+files that may be mapped are never shrunk in place.
+
+Usage:
+    from app.services.candle_store import get_verified_candles
+
+    df = get_verified_candles('BTC/USDT', '1h')   # same shape as get_candles_as_dataframe(..., verified_only=True)
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+from flask import current_app, has_app_context
+from sqlalchemy import text
+
+from app import db
+from app.services.symbol_registry import get_symbol, get_symbol_id
+
+logger = logging.getLogger(__name__)
+
+# Column layout (name, dtype) - order matches get_candles_as_dataframe
+COLUMNS = [
+    ('timestamp', np.dtype('<i8')),
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('volume', np.dtype('<f8')),
+]
+
+DEFAULT_VERIFY_SECONDS = 3600
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data', 'candles'
+)
+
+
+class CandleStore:
+    """Append-only columnar store of verified candles, keyed by symbol/timeframe."""
+
+    def __init__(self, root: str = None, verify_seconds: float = DEFAULT_VERIFY_SECONDS):
+        self.root = root or DEFAULT_STORE_DIR
+        self.verify_seconds = verify_seconds  # Interval of the full-range DB check in sync()
+
+    # -------------------------------------------------------------------------
+    # Layout
+    # -------------------------------------------------------------------------
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '-'), timeframe)
+
+    def _column_path(self, series_dir: str, name: str, dtype: np.dtype) -> str:
+        return os.path.join(series_dir, f"{name}.{dtype.kind}{dtype.itemsize}")
+
+    @contextmanager
+    def _locked(self, series_dir: str, operation: int):
+        """Hold a flock on the series (LOCK_SH for readers, LOCK_EX for sync)."""
+        with open(os.path.join(series_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, operation)
+            yield
+
+    def _read_meta(self, series_dir: str) -> dict:
+        try:
+            with open(os.path.join(series_dir, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_count(self, series_dir: str) -> int:
+        try:
+            return int(self._read_meta(series_dir).get('count', 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _write_count(self, series_dir: str, count: int, watermark: Optional[int],
+                     verified_at: Optional[float] = None) -> None:
+        meta_path = os.path.join(series_dir, 'meta.json')
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'count': count, 'watermark': watermark, 'verified_at': verified_at}, f)
+        os.replace(tmp_path, meta_path)
+
+    # -------------------------------------------------------------------------
+    # Read / write
+    # -------------------------------------------------------------------------
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        """Number of committed rows for a series."""
+        return self._read_count(self._series_dir(symbol, timeframe))
+
+    def read(self, symbol: str, timeframe: str) -> Dict[str, np.ndarray]:
+        """
+        Memory-map a series.
+
+        Returns:
+            Dict of column name -> array (copy-on-write memmap; empty arrays if missing)
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(series_dir):
+            return self._map(series_dir, 0)
+
+        # Shared lock: meta.json and the column files must come from the same rebuild
+        with self._locked(series_dir, fcntl.LOCK_SH):
+            return self._map(series_dir, self._read_count(series_dir))
+
+    def _map(self, series_dir: str, count: int) -> Dict[str, np.ndarray]:
+        columns = {}
+        for name, dtype in COLUMNS:
+            if count == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(
+                    self._column_path(series_dir, name, dtype),
+                    dtype=dtype, mode='c', shape=(count,)
+                )
+        return columns
+
+    def append(self, symbol: str, timeframe: str, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Append rows to a series (timestamps must be after the stored watermark).
+
+        Column files are written first and meta.json last, so a crash mid-append
+        leaves trailing bytes that are ignored and truncated on the next append.
+        An empty series (new or being rebuilt) gets fresh files swapped in with
+        os.replace instead, since readers may still map the old ones.
+        """
+        n = len(columns['timestamp'])
+        if n == 0:
+            return 0
+
+        series_dir = self._series_dir(symbol, timeframe)
+        os.makedirs(series_dir, exist_ok=True)
+        meta = self._read_meta(series_dir)
+        count = int(meta.get('count', 0))
+
+        for name, dtype in COLUMNS:
+            path = self._column_path(series_dir, name, dtype)
+            data = np.ascontiguousarray(columns[name], dtype=dtype).tobytes()
+            if count == 0:
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                continue
+            with open(path, 'ab') as f:
+                # Only drops bytes past the committed count, which no reader maps
+                f.truncate(count * dtype.itemsize)
+                f.seek(count * dtype.itemsize)
+                f.write(data)
+
+        self._write_count(series_dir, count + n, int(columns['timestamp'][-1]), meta.get('verified_at'))
+        return n
+
+    def invalidate(self, symbol: str = None, timeframe: str = None) -> None:
+        """
+        Drop stored series so they are rebuilt from the DB.
+
+        Args:
+            symbol: Symbol name (None = every symbol)
+            timeframe: Timeframe (None = every timeframe)
+        """
+        if symbol is not None:
+            symbol_dirs = [os.path.join(self.root, symbol.replace('/', '-'))]
+        elif os.path.isdir(self.root):
+            symbol_dirs = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        else:
+            symbol_dirs = []
+
+        for symbol_dir in symbol_dirs:
+            path = os.path.join(symbol_dir, timeframe) if timeframe else symbol_dir
+            shutil.rmtree(path, ignore_errors=True)
+
+    # -------------------------------------------------------------------------
+    # DB sync
+    # -------------------------------------------------------------------------
+
+    def _matches_db(self, symbol_id: int, timeframe: str, timestamps: np.ndarray) -> bool:
+        """Whether the stored range is still the DB's verified prefix (same rows, none unverified)."""
+        row = db.session.execute(text("""
+            SELECT COUNT(*), MIN(timestamp),
+                   SUM(CASE WHEN verified_at IS NULL THEN 1 ELSE 0 END)
+            FROM candles
+            WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+              AND timestamp <= :watermark
+        """), {
+            'symbol_id': symbol_id,
+            'timeframe': timeframe,
+            'watermark': int(timestamps[-1])
+        }).one()
+        count, first, unverified = row
+        return count == len(timestamps) and first == int(timestamps[0]) and not unverified
+
+    def sync(self, symbol: str, timeframe: str, verify: bool = False) -> int:
+        """
+        Append newly verified candles from the DB.
+
+        Only the continuous verified prefix is stored (candles before the
+        first unverified one), matching get_candles_as_dataframe(verified_only=True).
+        The stored range is checked against the DB when verify is set or the
+        last check is older than verify_seconds (the check scans the whole
+        range); a range that no longer matches is rebuilt from scratch.
+
+        Returns:
+            Number of rows appended
+        """
+        symbol_id = get_symbol_id(symbol)
+        if symbol_id is None:
+            return 0
+
+        series_dir = self._series_dir(symbol, timeframe)
+        os.makedirs(series_dir, exist_ok=True)
+
+        # flock: optimizer workers and the web app may sync the same series
+        with self._locked(series_dir, fcntl.LOCK_EX):
+            meta = self._read_meta(series_dir)
+            columns = self._map(series_dir, self._read_count(series_dir))
+            watermark = -1
+            if len(columns['timestamp']):
+                watermark = int(columns['timestamp'][-1])
+                now = time.time()
+                if verify or now - (meta.get('verified_at') or 0) >= self.verify_seconds:
+                    if self._matches_db(symbol_id, timeframe, columns['timestamp']):
+                        self._write_count(series_dir, len(columns['timestamp']), watermark, now)
+                    else:
+                        logger.info(f"{symbol} {timeframe}: stored candles no longer match the DB, rebuilding")
+                        # Next append replaces the column files
+                        self._write_count(series_dir, 0, None, now)
+                        watermark = -1
+            else:
+                self._write_count(series_dir, 0, None, time.time())  # Built from scratch below
+            del columns
+
+            query = text("""
+                SELECT timestamp, open, high, low, close, volume
+                FROM candles
+                WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+                  AND timestamp > :watermark
+                  AND timestamp < COALESCE(
+                      (SELECT MIN(timestamp) FROM candles
+                       WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+                         AND verified_at IS NULL),
+                      9999999999999
+                  )
+                ORDER BY timestamp ASC
+            """)
+            rows = db.session.execute(query, {
+                'symbol_id': symbol_id,
+                'timeframe': timeframe,
+                'watermark': watermark
+            }).fetchall()
+
+            if not rows:
+                return 0
+
+            arr = np.array(rows, dtype=np.float64)
+            appended = self.append(symbol, timeframe, {
+                'timestamp': arr[:, 0].astype(np.int64),
+                'open': arr[:, 1],
+                'high': arr[:, 2],
+                'low': arr[:, 3],
+                'close': arr[:, 4],
+                'volume': np.nan_to_num(arr[:, 5], nan=0.0),
+            })
+
+        logger.debug(f"{symbol} {timeframe}: appended {appended} verified candles to store")
+        return appended
+
+    def load_dataframe(self, symbol: str, timeframe: str, sync: bool = True) -> pd.DataFrame:
+        """
+        Get a series as a DataFrame backed by the memory-mapped columns.
+
+        Returns:
+            DataFrame with columns: timestamp, open, high, low, close, volume, datetime
+            (empty DataFrame if no data)
+        """
+        if sync:
+            self.sync(symbol, timeframe)
+
+        columns = self.read(symbol, timeframe)
+        if len(columns['timestamp']) == 0:
+            return pd.DataFrame()
+
+        df = pd.DataFrame(columns, copy=False)
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+
+_store: Optional[CandleStore] = None
+
+
+def get_candle_store() -> CandleStore:
+    """Get the process-wide candle store (rooted at CANDLE_STORE_DIR)."""
+    global _store
+    root = None
+    verify_seconds = DEFAULT_VERIFY_SECONDS
+    if has_app_context():
+        root = current_app.config.get('CANDLE_STORE_DIR')
+        verify_seconds = current_app.config.get('CANDLE_STORE_VERIFY_SECONDS', DEFAULT_VERIFY_SECONDS)
+    if _store is None or (root and _store.root != root):
+        _store = CandleStore(root)
+    _store.verify_seconds = verify_seconds
+    return _store
+
+
+def invalidate_candles(symbol: Union[str, int] = None, timeframe: str = None) -> None:
+    """
+    Drop stored series after their candles were rewritten or deleted in the DB.
+
+    Args:
+        symbol: Symbol name or id (None = every symbol)
+        timeframe: Timeframe (None = every timeframe)
+    """
+    if isinstance(symbol, int):
+        info = get_symbol(symbol)
+        if info is None:
+            return
+        symbol = info.symbol
+    try:
+        get_candle_store().invalidate(symbol, timeframe)
+    except OSError as e:
+        logger.warning(f"Failed to invalidate candle store ({symbol or 'all'} {timeframe or ''}): {e}")
+
+
+def is_store_enabled() -> bool:
+    """Whether the local candle store is enabled (CANDLE_STORE_ENABLED)."""
+    return has_app_context() and bool(current_app.config.get('CANDLE_STORE_ENABLED', False))
+
+
+def get_verified_candles(symbol: str, timeframe: str) -> pd.DataFrame:
+    """
+    Get the verified candle history for a symbol/timeframe.
+
+    Served from the local store when enabled (falls back to the DB on any
+    store error); otherwise straight from the DB.
+    """
+    from app.services.aggregator import get_candles_as_dataframe
+
+    if is_store_enabled():
+        try:
+            return get_candle_store().load_dataframe(symbol, timeframe)
+        except Exception as e:
+            logger.warning(f"{symbol} {timeframe}: candle store read failed, using DB: {e}")
+
+    return get_candles_as_dataframe(symbol, timeframe, verified_only=True)
+
+
+def get_all_candles(symbol: str, timeframe: str) -> pd.DataFrame:
+    """
+    Get the full candle history (verified + unverified tail).
+
+    The verified prefix comes from the local store when enabled; only rows
+    after the store watermark are read from the DB.
+    """
+    from app.services.aggregator import get_candles_as_dataframe
+
+    if not is_store_enabled():
+        return get_candles_as_dataframe(symbol, timeframe)
+
+    try:
+        verified = get_candle_store().load_dataframe(symbol, timeframe)
+    except Exception as e:
+        logger.warning(f"{symbol} {timeframe}: candle store read failed, using DB: {e}")
+        return get_candles_as_dataframe(symbol, timeframe)
+
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
+        return pd.DataFrame()
+
+    watermark = int(verified['timestamp'].iloc[-1]) if not verified.empty else -1
+    tail = pd.read_sql(
+        text("""
+            SELECT timestamp, open, high, low, close, volume
+            FROM candles
+            WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+              AND timestamp > :watermark
+            ORDER BY timestamp ASC
+        """),
+        db.engine,
+        params={'symbol_id': symbol_id, 'timeframe': timeframe, 'watermark': watermark}
+    )
+    if tail.empty:
+        return verified
+
+    tail['datetime'] = pd.to_datetime(tail['timestamp'], unit='ms')
+    if verified.empty:
+        return tail
+    return pd.concat([verified, tail], ignore_index=True)
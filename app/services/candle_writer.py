@@ -0,0 +1,168 @@
+"""
+Bulk Candle Writer
+Shared multi-row insert path for every candle ingest (live fetch, backfill, gap repair)
+
+Instead of a SELECT ... IN (timestamps) followed by one ORM add() per row,
+candles are written with a single executemany that relies on the
+uix_candle (symbol_id, timeframe, timestamp) unique constraint to skip
+rows that already exist:
+- MySQL:  INSERT IGNORE INTO candles ...
+- SQLite: INSERT OR IGNORE INTO candles ... (tests)
+
+Usage:
+    from app.services.candle_writer import bulk_insert_candles
+
+    result = bulk_insert_candles(symbol_id, '1m', ohlcv)
+    print(f"{result.inserted} new, {result.ignored} already existed")
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sqlalchemy import insert
+
+from app import db
+from app.models import Candle
+from app.services.candle_cache import get_candle_cache
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany call (keeps MySQL packets well under max_allowed_packet)
+WRITE_CHUNK_SIZE = 5000
+
+# Column order of a raw ccxt OHLCV row
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+@dataclass
+class CandleWriteResult:
+    """Outcome of a bulk candle write"""
+    inserted: int = 0  # New rows written
+    ignored: int = 0   # Rows skipped because they already existed (uix_candle)
+    invalid: int = 0   # Rows dropped by validation (non-positive/NaN prices, high < low)
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.ignored + self.invalid
+
+
+def _to_ohlcv_array(candles: Any) -> np.ndarray:
+    """
+    Normalize candle input into an (n, 6) float64 array.
+
+    Accepts raw ccxt OHLCV lists, (n, 6) NumPy arrays or DataFrames with
+    timestamp/open/high/low/close/volume columns. Missing volumes (None) become NaN.
+    """
+    if hasattr(candles, 'columns'):
+        candles = candles[OHLCV_COLUMNS].to_numpy()
+
+    arr = np.asarray(candles, dtype=np.float64)
+    if arr.ndim != 2 or arr.shape[1] < 6:
+        raise ValueError(f"Expected OHLCV rows with 6 columns, got shape {arr.shape}")
+    return arr[:, :6]
+
+
+def _build_insert(dialect_name: str):
+    """Build the dialect-specific insert-or-ignore statement for candles."""
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(Candle.__table__).on_conflict_do_nothing(
+            index_elements=['symbol_id', 'timeframe', 'timestamp']
+        )
+    if dialect_name == 'mysql':
+        # INSERT IGNORE rather than a no-op ON DUPLICATE KEY UPDATE: with the
+        # CLIENT_FOUND_ROWS flag set by the driver, a no-op update counts as an
+        # affected row, so rowcount could no longer tell inserts from duplicates.
+        return insert(Candle.__table__).prefix_with('IGNORE')
+    return insert(Candle.__table__)
+
+
+def bulk_insert_candles(
+    symbol_id: int,
+    timeframe: str,
+    candles: Any,
+    commit: bool = True,
+    chunk_size: int = WRITE_CHUNK_SIZE
+) -> CandleWriteResult:
+    """
+    Insert candles in bulk, skipping rows that already exist.
+
+    No pre-SELECT is done: duplicates are resolved by the uix_candle unique
+    constraint, so the same batch can safely be written twice (cron overlap,
+    retried backfill chunk, gap repair).
+
+    Args:
+        symbol_id: Symbol ID
+        timeframe: Candle timeframe (e.g., '1m', '1h')
+        candles: ccxt OHLCV rows [[ts, o, h, l, c, v], ...], an (n, 6) NumPy
+                 array or a DataFrame with OHLCV columns
+        commit: Whether to commit immediately (False to let caller batch)
+        chunk_size: Rows per executemany call
+
+    Returns:
+        CandleWriteResult with inserted/ignored/invalid counts
+    """
+    result = CandleWriteResult()
+    if candles is None or len(candles) == 0:
+        return result
+
+    arr = _to_ohlcv_array(candles)
+    prices = arr[:, 1:5]
+
+    # Vectorized validation (same rules as the old per-row checks)
+    valid = (
+        np.isfinite(arr[:, 0]) &
+        np.isfinite(prices).all(axis=1) &
+        (prices > 0).all(axis=1) &
+        (arr[:, 2] >= arr[:, 3])
+    )
+    result.invalid = int((~valid).sum())
+    arr = arr[valid]
+    if len(arr) == 0:
+        return result
+
+    arr[:, 5] = np.nan_to_num(arr[:, 5], nan=0.0)
+    timestamps = arr[:, 0].astype(np.int64).tolist()
+    opens, highs, lows, closes, volumes = (arr[:, k].tolist() for k in range(1, 6))
+
+    rows = [
+        {
+            'symbol_id': symbol_id,
+            'timeframe': timeframe,
+            'timestamp': timestamps[i],
+            'open': opens[i],
+            'high': highs[i],
+            'low': lows[i],
+            'close': closes[i],
+            'volume': volumes[i],
+        }
+        for i in range(len(timestamps))
+    ]
+
+    stmt = _build_insert(db.engine.dialect.name)
+
+    try:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            res = db.session.execute(stmt, chunk)
+            inserted = res.rowcount if res.rowcount is not None and res.rowcount >= 0 else len(chunk)
+            result.inserted += inserted
+            result.ignored += len(chunk) - inserted
+
+        # Hot candle rings pick the rows up once they are committed
+        get_candle_cache().stage(symbol_id, timeframe, arr[:, 0].astype(np.int64), arr[:, 1:])
+
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if result.inserted or result.invalid:
+        logger.debug(
+            f"symbol_id={symbol_id} {timeframe}: inserted {result.inserted}, "
+            f"ignored {result.ignored}, invalid {result.invalid}"
+        )
+
+    return result
@@ -3,14 +3,18 @@ Data Fetcher Service
 Fetches OHLC candles via CCXT (Binance by default - 1000 candles/request)
 """
 from typing import Tuple
+import asyncio
 import ccxt
-import time
 import logging
 import threading
 from datetime import datetime, timedelta, timezone
 from app import db
 from app.models import Symbol, Candle
 from app.config import Config
+from app.services.candle_writer import bulk_insert_candles
+from app.services.backfill import BackfillEngine
+from app.services.rate_scheduler import attach_rate_scheduler, PRIORITY_BACKFILL, PRIORITY_REPAIR
+from app.services.symbol_registry import get_symbol_id
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +46,12 @@ def get_exchange():
 
         # Create new instance
         exchange_class = getattr(ccxt, exchange_id, ccxt.binance)
-        _exchange_instance = exchange_class({
+        _exchange_instance = attach_rate_scheduler(exchange_class({
             'enableRateLimit': True,
             'options': {
                 'defaultType': 'spot'
             }
-        })
+        }), PRIORITY_REPAIR)
         _exchange_id = exchange_id
 
         return _exchange_instance
@@ -77,6 +81,17 @@ def cleanup_exchange():
         _cleanup_exchange_unsafe()
 
 
+def _get_or_create_symbol_id(symbol: str) -> int:
+    """Registry lookup; unknown symbols are created (which invalidates the registry)."""
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
+        sym = Symbol(symbol=symbol, exchange=Config.EXCHANGE)
+        db.session.add(sym)
+        db.session.commit()
+        symbol_id = sym.id
+    return symbol_id
+
+
 def fetch_candles(symbol: str, timeframe: str, limit: int = None, since: int = None) -> Tuple[int, int]:
     """
     Fetch candles for a symbol/timeframe
@@ -95,12 +110,7 @@ def fetch_candles(symbol: str, timeframe: str, limit: int = None, since: int = N
 
     exchange = get_exchange()
 
-    # Get or create symbol
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
-        sym = Symbol(symbol=symbol, exchange=Config.EXCHANGE)
-        db.session.add(sym)
-        db.session.commit()
+    symbol_id = _get_or_create_symbol_id(symbol)
 
     try:
         # Fetch OHLCV data
@@ -109,44 +119,9 @@ def fetch_candles(symbol: str, timeframe: str, limit: int = None, since: int = N
         if not ohlcv:
             return (0, 0)
 
-        # Get existing timestamps in one query (batch check)
-        timestamps = [c[0] for c in ohlcv]
-        existing_timestamps = set(
-            c.timestamp for c in Candle.query.filter(
-                Candle.symbol_id == sym.id,
-                Candle.timeframe == timeframe,
-                Candle.timestamp.in_(timestamps)
-            ).all()
-        )
-
-        count = 0
-        for candle in ohlcv:
-            timestamp, open_price, high, low, close, volume = candle
-
-            # Skip if exists (using batch-queried set)
-            if timestamp in existing_timestamps:
-                continue
-
-            # Validate OHLC data
-            if high < low or open_price <= 0 or close <= 0:
-                continue
-
-            new_candle = Candle(
-                symbol_id=sym.id,
-                timeframe=timeframe,
-                timestamp=timestamp,
-                open=open_price,
-                high=high,
-                low=low,
-                close=close,
-                volume=volume
-            )
-            db.session.add(new_candle)
-            count += 1
-
-        # Commit after each batch
-        db.session.commit()
-        return (count, len(ohlcv))
+        # Bulk insert (duplicates skipped by uix_candle, invalid OHLC dropped)
+        result = bulk_insert_candles(symbol_id, timeframe, ohlcv)
+        return (result.inserted, len(ohlcv))
 
     except ccxt.NetworkError as e:
         logger.error(f"Network error fetching {symbol} {timeframe}: {e}")
@@ -166,87 +141,54 @@ def fetch_historical(symbol: str, timeframe: str, days: int = 30, progress_callb
     """
     Fetch historical candles for backtesting
 
+    Runs the resumable backfill engine for one symbol: the range is fetched
+    in concurrent checkpointed chunks, so a repeated call only fetches what
+    is still missing.
+
     Args:
         symbol: Trading pair
         timeframe: Candle timeframe
         days: Number of days of history to fetch
-        progress_callback: Optional callback(batch_num, total_batches, candles_fetched)
-        verbose: Print progress to stdout
+        progress_callback: Optional callback(chunks_done, total_chunks, candles_saved)
+        verbose: Log progress
 
     Returns:
         Total candles saved
     """
-    exchange = get_exchange()
+    import ccxt.async_support as ccxt_async
+    from flask import current_app
 
-    # Calculate start timestamp (timezone-aware)
-    now_dt = datetime.now(timezone.utc)
-    start_time = now_dt - timedelta(days=days)
-    since = int(start_time.timestamp() * 1000)
-    now = int(now_dt.timestamp() * 1000)
+    symbol_id = _get_or_create_symbol_id(symbol)
 
-    # Get candle duration from config
     candle_duration = Config.TIMEFRAME_MS.get(timeframe, 60 * 1000)
-
-    # Calculate total batches needed
-    batch_size = Config.BATCH_SIZE
-    total_candles_needed = (now - since) // candle_duration
-    total_batches = max(1, (total_candles_needed // batch_size) + 1)
+    now_dt = datetime.now(timezone.utc)
+    since = int((now_dt - timedelta(days=days)).timestamp() * 1000)
+    until = (int(now_dt.timestamp() * 1000) // candle_duration) * candle_duration  # Closed candles only
 
     if verbose:
-        logger.info(f"{symbol} - Fetching ~{total_candles_needed:,} candles in {total_batches} batches...")
+        logger.info(f"{symbol} - Fetching ~{(until - since) // candle_duration:,} {timeframe} candles...")
 
-    total_new = 0
-    total_api = 0
-    current_since = since
-    batch_num = 0
-    last_progress = 0
-    empty_batches = 0
-
-    while current_since < now:
-        batch_num += 1
+    app = current_app._get_current_object()
 
+    async def run():
+        exchange_class = getattr(ccxt_async, getattr(Config, 'EXCHANGE', 'binance'), ccxt_async.binance)
+        exchange = attach_rate_scheduler(exchange_class({
+            'enableRateLimit': True,
+            'options': {'defaultType': 'spot'}
+        }), PRIORITY_BACKFILL)
         try:
-            new_count, api_count = fetch_candles(symbol, timeframe, limit=batch_size, since=current_since)
-            total_new += new_count
-            total_api += api_count
-
-            # Track empty API responses (means we've caught up)
-            if api_count == 0:
-                empty_batches += 1
-                if empty_batches >= 3:
-                    if verbose:
-                        logger.info(f"{symbol}: No more data from API, stopping early")
-                    break
-            else:
-                empty_batches = 0
-
-            # Progress callback
-            if progress_callback:
-                progress_callback(batch_num, total_batches, total_new)
-
-            # Verbose progress (every 10% or 50 batches)
-            if verbose:
-                pct = int((batch_num / total_batches) * 100)
-                if pct >= last_progress + 10 or batch_num % 50 == 0:
-                    last_progress = pct
-                    status = f"new: {total_new:,}" if new_count > 0 else "exists"
-                    logger.info(f"{symbol}: {batch_num}/{total_batches} ({pct}%) [{status}]")
-
-            # Move to next batch
-            current_since += batch_size * candle_duration
-
-            # Rate limiting
-            time.sleep(max(exchange.rateLimit / 1000, Config.RATE_LIMIT_DELAY))
+            engine = BackfillEngine(exchange, app, timeframe, progress=progress_callback)
+            return await engine.run([(symbol, symbol_id)], since, until)
+        finally:
+            await exchange.close()
 
-        except Exception as e:
-            logger.warning(f"{symbol} batch {batch_num}: {e}")
-            time.sleep(1)
-            continue
+    result = asyncio.run(run())[symbol]
 
     if verbose:
-        logger.info(f"{symbol}: Done! {total_new:,} new candles ({total_api:,} from API)")
+        logger.info(f"{symbol}: Done! {result['new']:,} new candles ({result['fetched']:,} from API, "
+                    f"{result['resumed']} chunks already complete)")
 
-    return total_new
+    return result['new']
 
 
 def fetch_all_symbols(timeframe: str = '1m', limit: int = 200) -> dict:
@@ -262,7 +204,6 @@ def fetch_all_symbols(timeframe: str = '1m', limit: int = 200) -> dict:
     for symbol in symbols:
         new_count, _ = fetch_candles(symbol.symbol, timeframe, limit=limit)
         results[symbol.symbol] = new_count
-        time.sleep(0.05)  # Small delay between symbols
 
     return results
 
@@ -274,12 +215,12 @@ def get_latest_candles(symbol: str, timeframe: str, limit: int = 200) -> list:
     Returns:
         List of candle dicts
     """
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
         return []
 
     candles = Candle.query.filter_by(
-        symbol_id=sym.id,
+        symbol_id=symbol_id,
         timeframe=timeframe
     ).order_by(Candle.timestamp.desc()).limit(limit).all()
 
@@ -287,7 +228,7 @@ def get_latest_candles(symbol: str, timeframe: str, limit: int = 200) -> list:
     if not candles:
         fetch_candles(symbol, timeframe, limit=limit)
         candles = Candle.query.filter_by(
-            symbol_id=sym.id,
+            symbol_id=symbol_id,
             timeframe=timeframe
         ).order_by(Candle.timestamp.desc()).limit(limit).all()
 
@@ -0,0 +1,168 @@
+"""
+First-Touch Index
+Answer "first candle at or after i where low <= x / high >= x" in O(log n)
+
+Usage:
+    from app.services.first_touch import get_first_touch_index
+
+    index = get_first_touch_index(ohlcv)          # cached on the ohlcv dict
+    sl_idx = index.first_low_at_or_below(start, stop_loss)
+    tp_idx = index.first_high_at_or_above(start, take_profit)
+    # == len(lows) (or `stop`) when the level is never touched
+"""
+from typing import Dict, Union
+
+import numpy as np
+
+BLOCK_SIZE = 64
+
+# Key under which get_first_touch_index() caches the index on an OHLCV dict
+CACHE_KEY = 'first_touch'
+
+Levels = Union[float, np.ndarray]
+
+
+class _FirstAtOrBelow:
+    """First index >= start with values[index] <= x."""
+
+    def __init__(self, values: np.ndarray, block_size: int = BLOCK_SIZE):
+        values = np.asarray(values, dtype=np.float64)
+        self.n = len(values)
+        self.block_size = block_size
+        n_blocks = max(1, -(-self.n // block_size))
+
+        # Pad the tail with +inf so every block is full and never matches
+        padded = np.full(n_blocks * block_size, np.inf)
+        padded[:self.n] = values
+        self.blocks = padded.reshape(n_blocks, block_size)
+
+        # table[k][b] = min of blocks b .. b + 2**k - 1
+        table = [self.blocks.min(axis=1)]
+        span = 1
+        while span * 2 <= n_blocks:
+            prev = table[-1]
+            table.append(np.minimum(prev[:-span], prev[span:]))
+            span *= 2
+        self.table = table
+
+    def query_one(self, start: int, level: float, stop: int) -> int:
+        """Scalar query (same algorithm without the array bookkeeping); misses return stop."""
+        if start >= stop:
+            return stop
+
+        bs = self.block_size
+        blocks = self.blocks
+        first_block = start // bs
+        head = blocks[first_block, start - first_block * bs:]
+        hits = np.flatnonzero(head <= level)
+        if len(hits):
+            return min(start + int(hits[0]), stop)
+
+        table = self.table
+        block = first_block + 1
+        for k in range(len(table) - 1, -1, -1):
+            level_table = table[k]
+            if block < len(level_table) and level_table[block] > level:
+                block += 1 << k
+                if block * bs >= stop:
+                    return stop
+
+        if block >= len(table[0]):
+            return stop
+        within = int(np.argmax(blocks[block] <= level))
+        if not blocks[block, within] <= level:
+            return stop  # NaN level never compares true
+        return min(block * bs + within, stop)
+
+    def query(self, start: int, levels: np.ndarray, stop: int) -> np.ndarray:
+        """Vectorized query for many levels from one start; misses return stop."""
+        result = np.full(len(levels), stop, dtype=np.int64)
+        if start >= stop or len(levels) == 0:
+            return result
+
+        bs = self.block_size
+        first_block = start // bs
+        offset = start - first_block * bs
+
+        # Partial first block: prefix minima are monotonic, so binary search
+        head = np.minimum.accumulate(self.blocks[first_block, offset:])
+        pos = np.searchsorted(-head, -levels, side='left')
+        in_head = pos < len(head)
+        result[in_head] = start + pos[in_head]
+
+        pending = np.flatnonzero(~in_head)
+        if len(pending) == 0 or first_block + 1 >= len(self.table[0]):
+            return np.minimum(result, stop)
+
+        # Skip whole blocks whose minimum stays above the level
+        targets = levels[pending]
+        block = np.full(len(pending), first_block + 1, dtype=np.int64)
+        for k in range(len(self.table) - 1, -1, -1):
+            level_table = self.table[k]
+            can_jump = block < len(level_table)
+            idx = np.where(can_jump, block, 0)
+            skip = can_jump & (level_table[idx] > targets)
+            block[skip] += 1 << k
+
+        found = block < len(self.table[0])
+        if np.any(found):
+            rows = pending[found]
+            hit_blocks = block[found]
+            hit_mask = self.blocks[hit_blocks] <= targets[found, None]
+            within = np.argmax(hit_mask, axis=1)
+            touched = hit_mask[np.arange(len(rows)), within]
+            result[rows[touched]] = (hit_blocks * bs + within)[touched]
+
+        return np.minimum(result, stop)
+
+
+class FirstTouchIndex:
+    """First-touch queries over the lows and highs of one OHLCV series."""
+
+    def __init__(self, highs: np.ndarray, lows: np.ndarray, block_size: int = BLOCK_SIZE):
+        self.highs = highs
+        self.lows = lows
+        self.n = len(lows)
+        self._lows = _FirstAtOrBelow(lows, block_size)
+        # high >= x  <=>  -high <= -x
+        self._neg_highs = _FirstAtOrBelow(-np.asarray(highs, dtype=np.float64), block_size)
+
+    def first_low_at_or_below(self, start: int, level: Levels, stop: int = None) -> Union[int, np.ndarray]:
+        """
+        First index in [start, stop) where low <= level.
+
+        Args:
+            start: First candle index to consider
+            level: Price level, or array of levels
+            stop: Exclusive end of the search (default: end of data)
+
+        Returns:
+            Index (or array of indices); stop when the level is never touched
+        """
+        return self._query(self._lows, start, level, stop, 1.0)
+
+    def first_high_at_or_above(self, start: int, level: Levels, stop: int = None) -> Union[int, np.ndarray]:
+        """First index in [start, stop) where high >= level (stop if never touched)."""
+        return self._query(self._neg_highs, start, level, stop, -1.0)
+
+    def _query(self, side: _FirstAtOrBelow, start: int, level: Levels, stop: int, sign: float):
+        stop = self.n if stop is None else min(int(stop), self.n)
+        start = max(int(start), 0)
+        if np.ndim(level) == 0:
+            return side.query_one(start, sign * float(level), stop)
+        return side.query(start, sign * np.asarray(level, dtype=np.float64), stop)
+
+
+def get_first_touch_index(ohlcv: Dict[str, np.ndarray]) -> FirstTouchIndex:
+    """
+    Get the first-touch index for an OHLCV dict, building it on first use.
+
+    The index is cached on the dict itself (ohlcv['first_touch']), so every
+    simulation over the same arrays shares one build. A cached index is
+    rebuilt if the dict's high/low arrays have been replaced.
+    """
+    index = ohlcv.get(CACHE_KEY)
+    if index is None or index.lows is not ohlcv['low'] or index.highs is not ohlcv['high']:
+        index = FirstTouchIndex(ohlcv['high'], ohlcv['low'])
+        ohlcv[CACHE_KEY] = index
+    return index
@@ -163,14 +163,15 @@ def check_exchange_api(timeout: float = 5.0) -> Dict[str, Any]:
     start = time.time()
     try:
         import ccxt
+        from app.services.rate_scheduler import attach_rate_scheduler, PRIORITY_HEALTH
 
         # Use the same exchange as configured
         exchange_id = Config.EXCHANGE or 'binance'
         exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class({
+        exchange = attach_rate_scheduler(exchange_class({
             'enableRateLimit': True,
             'timeout': int(timeout * 1000)
-        })
+        }), PRIORITY_HEALTH)
 
         # Simple connectivity test - fetch time from exchange
         exchange.fetch_time()
@@ -0,0 +1,126 @@
+"""
+Indicators
+Array-based true range / ATR and fractal swing points
+
+Usage:
+    from app.services.indicators import atr, swing_mask, trading_context
+
+    precomputed = trading_context(df)
+    highs_mask = swing_mask(df['high'].to_numpy(), order=5, kind='high')
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+ATR_PERIOD = 14
+SWING_LOOKBACK = 50  # Candles searched by swing_level()
+SWING_ORDER = 2      # Neighbours each side for swing_level() fractals
+
+
+def _array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """
+    True range per candle: max(high - low, |high - prev_close|, |low - prev_close|).
+
+    The first candle (no previous close) uses high - low.
+    """
+    high, low, close = _array(high), _array(low), _array(close)
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        # fmax skips NaN, so a missing previous close falls back to high - low
+        tr[1:] = np.fmax(tr[1:], np.fmax(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def atr(high, low, close, period: int = ATR_PERIOD) -> float:
+    """ATR at the last candle (mean of the last `period` true ranges); 0.0 with fewer than `period` candles."""
+    high, low, close = _array(high), _array(low), _array(close)
+    n = len(high)
+    if period < 1 or n < period:
+        return 0.0
+    # Only the last `period` true ranges (plus one previous close) matter
+    start = max(n - period - 1, 0)
+    tr = true_range(high[start:], low[start:], close[start:])[-period:]
+    if np.isnan(tr).all():
+        return 0.0
+    return float(np.nanmean(tr))
+
+
+def swing_mask(values, order: int = SWING_ORDER, kind: str = 'high') -> np.ndarray:
+    """
+    Strict fractal swing points.
+
+    A swing high is a value greater than the `order` values on each side
+    (swing low: lower). The first and last `order` candles are never swings.
+    """
+    values = _array(values)
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    if order < 1 or n < 2 * order + 1:
+        return mask
+
+    centre = values[order:n - order]
+    inner = np.ones(len(centre), dtype=bool)
+    for j in range(1, order + 1):
+        before = values[order - j:n - order - j]
+        after = values[order + j:n - order + j]
+        if kind == 'high':
+            inner &= (centre > before) & (centre > after)
+        else:
+            inner &= (centre < before) & (centre < after)
+    mask[order:n - order] = inner
+    return mask
+
+
+def swing_level(values, end: int, kind: str = 'high', lookback: int = SWING_LOOKBACK,
+                mask: np.ndarray = None) -> Optional[float]:
+    """
+    Highest swing high (lowest swing low) among candles [end - lookback, end).
+
+    Only fractals whose neighbours all lie inside the window count; without
+    any, the window's plain max (min) is returned. None for an empty window.
+
+    Args:
+        values: Highs (kind='high') or lows (kind='low')
+        end: Exclusive end of the window
+        kind: 'high' or 'low'
+        lookback: Window length
+        mask: swing_mask(values, SWING_ORDER, kind), if already computed
+    """
+    values = _array(values)
+    start = max(0, end - lookback)
+    window = values[start:end]
+    if len(window) == 0:
+        return None
+
+    if mask is None:
+        mask = swing_mask(values[start:end], SWING_ORDER, kind)
+    else:
+        mask = mask[start:end].copy()
+        # Fractals at the window edges need neighbours outside it
+        mask[:SWING_ORDER] = False
+        mask[max(len(mask) - SWING_ORDER, 0):] = False
+
+    pick = np.nanmax if kind == 'high' else np.nanmin
+    swings = window[mask]
+    return float(pick(swings)) if len(swings) else float(pick(window))
+
+
+def trading_context(df: pd.DataFrame, period: int = ATR_PERIOD) -> Dict[str, Optional[float]]:
+    """ATR and swing levels at the latest candle (the `precomputed` dict of save_pattern)."""
+    if df is None or df.empty:
+        return {'atr': 0.0, 'swing_high': None, 'swing_low': None}
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    end = len(df) - 1  # Swings are searched before the latest candle
+    return {
+        'atr': atr(high, low, close, period),
+        'swing_high': swing_level(high, end, 'high'),
+        'swing_low': swing_level(low, end, 'low'),
+    }
@@ -0,0 +1,88 @@
+"""
+Notification Quota
+Batched daily notification counts and per-signal recipient lists
+
+Usage:
+    from app.services.notification_quota import get_notification_audience
+
+    audience = get_notification_audience()
+    users = audience.eligible('order_block')   # Under their daily limit, tier allows the pattern
+    by_delay = audience.by_delay()              # {delay_seconds: [users]}
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import User, UserNotification
+
+
+def today_start_utc(now: datetime = None) -> datetime:
+    """Midnight UTC of the current day (the daily limits reset here)."""
+    now = now or datetime.now(timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def daily_notification_counts(user_ids: Iterable[int] = None, now: datetime = None) -> Dict[int, int]:
+    """
+    Successful notifications sent today, per user, in one query.
+
+    Args:
+        user_ids: Limit to these users (default: everyone notified today)
+        now: Reference time (default: current time)
+
+    Returns:
+        Dict of user_id -> count (users without notifications today are absent)
+    """
+    query = db.session.query(UserNotification.user_id, func.count(UserNotification.id)).filter(
+        UserNotification.sent_at >= today_start_utc(now),
+        UserNotification.success.is_(True)
+    )
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        query = query.filter(UserNotification.user_id.in_(user_ids))
+    return {user_id: count for user_id, count in query.group_by(UserNotification.user_id).all()}
+
+
+class NotificationAudience:
+    """Users that can be notified right now, with today's counts already loaded."""
+
+    def __init__(self, users: List[User], counts: Dict[int, int]):
+        self.counts = counts
+        self.users = [u for u in users if u.can_receive_notification_now(counts.get(u.id, 0))]
+        self._tier_allows: Dict[Tuple[str, str], bool] = {}
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def _allows(self, user: User, pattern_type: str) -> bool:
+        key = (user.subscription_tier, pattern_type)
+        if key not in self._tier_allows:
+            allowed_types = user.get_allowed_pattern_types()
+            self._tier_allows[key] = not allowed_types or pattern_type in allowed_types
+        return self._tier_allows[key]
+
+    def eligible(self, pattern_type: str = None) -> List[User]:
+        """Users whose tier can view the pattern type (all users if not specified)."""
+        if not pattern_type:
+            return list(self.users)
+        return [u for u in self.users if self._allows(u, pattern_type)]
+
+    def by_delay(self) -> Dict[int, List[User]]:
+        """Users grouped by their tier's notification delay in seconds."""
+        grouped: Dict[int, List[User]] = {}
+        for u in self.users:
+            grouped.setdefault(u.get_notification_delay_seconds(), []).append(u)
+        return grouped
+
+
+def get_notification_audience(now: datetime = None) -> NotificationAudience:
+    """Load every notifiable user and today's counts (two queries)."""
+    users = User.query.options(
+        joinedload(User.subscription)
+    ).filter_by(is_active=True, is_verified=True).all()
+    return NotificationAudience(users, daily_notification_counts(now=now))
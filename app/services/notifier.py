@@ -12,6 +12,7 @@ import json
 from app.config import Config
 from app import db
 from app.services.logger import log_notify, log_error
+from app.services.notification_quota import get_notification_audience
 from app.constants import (
     CIRCUIT_BREAKER_FAIL_MAX, CIRCUIT_BREAKER_RESET_TIMEOUT,
     HTTP_TIMEOUT_DEFAULT
@@ -348,34 +349,15 @@ def get_eligible_subscribers(pattern_type: str = None):
     - Has not exceeded daily notification limit
     - Can view the pattern type (if specified)
 
+    Daily counts are loaded for all users in one query (notification_quota).
+
     Args:
         pattern_type: Optional pattern type to filter by tier access
 
     Returns:
         List of User objects
     """
-    from sqlalchemy.orm import joinedload
-
-    # Eager load subscriptions to avoid N+1 queries
-    users = User.query.options(
-        joinedload(User.subscription)
-    ).filter_by(is_active=True, is_verified=True).all()
-
-    eligible = []
-    for u in users:
-        # Check basic notification eligibility
-        if not u.can_receive_notification_now():
-            continue
-
-        # Check pattern type access if specified
-        if pattern_type:
-            allowed_types = u.get_allowed_pattern_types()
-            if allowed_types and pattern_type not in allowed_types:
-                continue
-
-        eligible.append(u)
-
-    return eligible
+    return get_notification_audience().eligible(pattern_type)
 
 
 def get_subscribers_with_delay():
@@ -385,23 +367,7 @@ def get_subscribers_with_delay():
     Returns:
         Dict with delay_seconds as keys and list of users as values
     """
-    from sqlalchemy.orm import joinedload
-
-    users = User.query.options(
-        joinedload(User.subscription)
-    ).filter_by(is_active=True, is_verified=True).all()
-
-    by_delay = {}
-    for u in users:
-        if not u.can_receive_notification_now():
-            continue
-
-        delay = u.get_notification_delay_seconds()
-        if delay not in by_delay:
-            by_delay[delay] = []
-        by_delay[delay].append(u)
-
-    return by_delay
+    return get_notification_audience().by_delay()
 
 
 def send_notification_to_user(user: User, signal_id: int, title: str, message: str,
@@ -13,7 +13,7 @@ import json
 import itertools
 import os
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
@@ -24,7 +24,9 @@ from app.models import (
     OptimizationJob, OptimizationRun,
     QUICK_PARAMETER_GRID
 )
-from app.services.aggregator import get_candles_as_dataframe
+from app.services.candle_store import get_verified_candles
+from app.services.first_touch import get_first_touch_index
+from app.services.shared_candles import SharedCandlePool
 from app.services.patterns.fair_value_gap import FVGDetector
 from app.services.patterns.order_block import OrderBlockDetector
 from app.services.patterns.liquidity import LiquiditySweepDetector
@@ -34,9 +36,15 @@ from app.services.logger import log_system
 BATCH_COMMIT_SIZE = 50
 
 # Default number of parallel workers (bounded to prevent memory issues)
-# Each worker can use ~50MB per symbol, so 4 workers = ~200MB peak
+# Candle data is published once into shared memory by the parent and workers
+# return compact results, so per-worker memory is dominated by pattern/trade
+# state rather than DataFrame copies
 DEFAULT_PARALLEL_WORKERS = 4
-MAX_PARALLEL_WORKERS = 8
+MAX_PARALLEL_WORKERS = 16
+
+# Trades kept per result when sending worker results back to the parent
+# (_create_run_from_result only stores the last 100 in results_json)
+WORKER_RESULT_TRADES = 100
 
 # Timeframe drill-down mapping for resolving same-candle SL/TP conflicts
 # When both SL and TP are hit on the same candle, we look at smaller TF to determine which hit first
@@ -110,12 +118,40 @@ _detectors = {
 }
 
 
+def _compact_worker_result(result: Dict) -> Dict:
+    """
+    Strip a _process_symbol() result down to what the parent persists.
+
+    DataFrames (data_cache), pattern lists (pattern_cache) and full trade
+    lists are dropped so only stats, params and the last trades are pickled back.
+    """
+    compact = dict(result)
+    compact['data_cache'] = {}
+    compact['pattern_cache'] = {}
+
+    results = []
+    for r in result.get('results', []):
+        if 'trades' in r:
+            r = dict(r)
+            r['trades'] = r['trades'][-WORKER_RESULT_TRADES:]
+        results.append(r)
+    compact['results'] = results
+
+    best = result.get('best_result')
+    if best is not None and 'trades' in best:
+        best = dict(best)
+        best['trades'] = best['trades'][-WORKER_RESULT_TRADES:]
+    compact['best_result'] = best
+    return compact
+
+
 def _process_symbol_worker(
     symbol: str,
     timeframes: List[str],
     pattern_types: List[str],
     parameter_grid: Dict,
     existing_timestamps: Dict[str, int],
+    shared_series: Dict = None,
 ) -> Dict:
     """
     Worker function for parallel symbol processing.
@@ -130,14 +166,29 @@ def _process_symbol_worker(
         parameter_grid: Parameter combinations to test
         existing_timestamps: Dict of {timeframe: last_candle_ts} from existing runs
                             for skip detection
+        shared_series: Optional {timeframe: SharedSeries} published by the parent.
+                       When given, candles are attached from shared memory
+                       instead of being reloaded from the database.
 
     Returns:
-        Dict with keys from _process_symbol() including:
+        Compact dict with keys from _process_symbol() including:
             - skipped: True if skipped due to no new data
             - skip_count: number of skipped combinations
     """
+    from app.services.shared_candles import attach_frames, close_handles
+
+    handles = []
+    data_override = None
+    result = None
     try:
-        # Create Flask app context for database queries (read-only)
+        if shared_series is not None:
+            data_override, handles = attach_frames(shared_series)
+            # Timeframes without data are published as absent; pass empty frames
+            # so _process_symbol doesn't fall back to the DB for them
+            for timeframe in timeframes:
+                data_override.setdefault(timeframe, pd.DataFrame())
+
+        # Create Flask app context (config/logging; DB only used without shared_series)
         from app import create_app
         app = create_app()
 
@@ -149,10 +200,11 @@ def _process_symbol_worker(
                 timeframes=timeframes,
                 pattern_types=pattern_types,
                 parameter_grid=parameter_grid,
+                data_override=data_override,
                 existing_timestamps=existing_timestamps,
             )
 
-            return result
+            return _compact_worker_result(result)
 
     except Exception as e:
         return {
@@ -165,6 +217,15 @@ def _process_symbol_worker(
             'skip_count': 0,
             'error': str(e),
         }
+    finally:
+        # Drop every reference to the shared views before detaching, otherwise
+        # the mapping would stay alive in this (reused) worker process
+        data_override = None
+        result = None
+        if handles:
+            import gc
+            gc.collect()
+        close_handles(handles)
 
 
 class ParameterOptimizer:
@@ -231,7 +292,7 @@ class ParameterOptimizer:
                     verified_status = ""
                 else:
                     # Use verified candles only - no fallback to unverified
-                    df = get_candles_as_dataframe(symbol, timeframe, verified_only=True)
+                    df = get_verified_candles(symbol, timeframe)
                     verified_status = ""
                 tf_time = time.time() - tf_start
 
@@ -407,39 +468,31 @@ class ParameterOptimizer:
                     n_patterns = len(patterns)
                     pt_start = time.time()
 
-                    # Group params by expiry_multiplier for efficient pre-computation
-                    expiry_values = list(set(p[param_keys.index('expiry_multiplier')] for p in param_combinations))
-                    entry_method = 'zone_edge'  # Fixed for now
-
-                    # Pre-compute entries for each expiry value (3x instead of 192x)
-                    entry_cache = {}
-                    for expiry_mult in expiry_values:
-                        expiry_candles = get_pattern_expiry_candles(timeframe, expiry_mult)
-                        entry_cache[expiry_mult] = self._precompute_entries(
-                            ohlcv, patterns, expiry_candles, entry_method
+                    # Simulate all param combos in one batch: entry search and
+                    # SL/TP scans run once per pattern instead of once per combo
+                    param_dicts = [dict(zip(param_keys, params)) for params in param_combinations]
+                    batch_error = None
+                    try:
+                        trade_lists = self._simulate_trades_batch(
+                            ohlcv, patterns,
+                            # Entry method fixed to zone_edge for now
+                            [dict(p, entry_method='zone_edge') for p in param_dicts],
+                            timeframe=timeframe,
+                            data_cache=result.get('data_cache'),
+                            symbol=symbol,
+                            max_trade_candles=50000
                         )
+                    except Exception as e:
+                        trade_lists = None
+                        batch_error = str(e)
 
-                    n_entries = sum(len(v) for v in entry_cache.values()) // len(expiry_values) if expiry_values else 0
-                    print(f"    → {timeframe} {pattern_type}: {n_patterns} patterns, {n_entries} entries, {len(param_combinations)} combos", flush=True)
-
-                    # Now iterate through all param combos using cached entries
-                    for params in param_combinations:
-                        param_dict = dict(zip(param_keys, params))
+                    print(f"    → {timeframe} {pattern_type}: {n_patterns} patterns, {len(param_combinations)} combos", flush=True)
 
+                    for idx, param_dict in enumerate(param_dicts):
                         try:
-                            expiry_mult = param_dict.get('expiry_multiplier', 1.0)
-                            rr_target = param_dict.get('rr_target', 2.0)
-                            sl_buffer_pct = param_dict.get('sl_buffer_pct', 10.0) / 100.0
-
-                            # Use pre-computed entries for this expiry
-                            precomputed = entry_cache.get(expiry_mult, {})
-
-                            trades = self._simulate_with_precomputed_entries(
-                                ohlcv, precomputed, rr_target, sl_buffer_pct,
-                                timeframe=timeframe,
-                                data_cache=result.get('data_cache'),
-                                symbol=symbol
-                            )
+                            if batch_error is not None:
+                                raise RuntimeError(batch_error)
+                            trades = trade_lists[idx]
                             stats = self._calculate_statistics(trades)
 
                             sweep_result = {
@@ -562,7 +615,7 @@ class ParameterOptimizer:
             job_id: Job ID to execute
             progress_callback: Optional callback(completed, total) for progress updates
             parallel: If True, process symbols in parallel (default: False)
-            max_workers: Number of parallel workers (default: 4, max: 8)
+            max_workers: Number of parallel workers (default: 4, max: 16)
 
         Returns:
             Summary dict with results
@@ -707,7 +760,7 @@ class ParameterOptimizer:
         """
         try:
             # Use verified candles only (required for accurate backtesting)
-            df = get_candles_as_dataframe(symbol, timeframe, verified_only=True)
+            df = get_verified_candles(symbol, timeframe)
 
             if df is None or df.empty:
                 return None
@@ -811,24 +864,38 @@ class ParameterOptimizer:
                                 progress_callback(processed, total)
                         continue
 
-                    for params in param_combinations:
-                        param_dict = dict(zip(param_keys, params))
-                        processed += 1
-
+                    # Simulate every combo sharing a pattern set in one batch
+                    # (entry and SL/TP scans run once per pattern, not per combo)
+                    param_dicts = [dict(zip(param_keys, params)) for params in param_combinations]
+                    batches = {}
+                    for idx, param_dict in enumerate(param_dicts):
+                        min_zone_pct = param_dict.get('min_zone_pct', 0.15)
+                        use_overlap = param_dict.get('use_overlap', True)
+                        cache_key = (symbol, timeframe, pattern_type, min_zone_pct, use_overlap)
+                        batches.setdefault(cache_key, []).append(idx)
+
+                    batch_trades = {}
+                    batch_errors = {}
+                    for cache_key, indices in batches.items():
                         try:
-                            # Get cached patterns
-                            min_zone_pct = param_dict.get('min_zone_pct', 0.15)
-                            use_overlap = param_dict.get('use_overlap', True)
-                            cache_key = (symbol, timeframe, pattern_type, min_zone_pct, use_overlap)
-                            patterns = pattern_cache.get(cache_key, [])
-
-                            # Simulate trades (single shared implementation)
-                            trades = self._simulate_trades_fast(
-                                ohlcv_arrays, patterns, param_dict,
+                            trade_lists = self._simulate_trades_batch(
+                                ohlcv_arrays, pattern_cache.get(cache_key, []),
+                                [param_dicts[idx] for idx in indices],
                                 timeframe=timeframe,
                                 data_cache=data_cache,
                                 symbol=symbol
                             )
+                            batch_trades.update(zip(indices, trade_lists))
+                        except Exception as e:
+                            batch_errors.update((idx, str(e)) for idx in indices)
+
+                    for idx, param_dict in enumerate(param_dicts):
+                        processed += 1
+
+                        try:
+                            if idx in batch_errors:
+                                raise RuntimeError(batch_errors[idx])
+                            trades = batch_trades[idx]
                             stats = self._calculate_statistics(trades)
 
                             result = {
@@ -891,7 +958,7 @@ class ParameterOptimizer:
             for timeframe in timeframes:
                 query_start = datetime.now(timezone.utc)
                 # Use verified candles only (required for accurate backtesting)
-                df = get_candles_as_dataframe(symbol, timeframe, verified_only=True)
+                df = get_verified_candles(symbol, timeframe)
                 query_duration = (datetime.now(timezone.utc) - query_start).total_seconds()
 
                 if df is not None and len(df) >= 20:
@@ -1046,174 +1113,6 @@ class ParameterOptimizer:
 
         return run
 
-    def _precompute_entries(
-        self,
-        ohlcv: Dict[str, np.ndarray],
-        patterns: List[Dict],
-        expiry_candles: int,
-        entry_method: str = 'zone_edge'
-    ) -> Dict[int, Dict]:
-        """
-        Pre-compute entry candles for all patterns with a given expiry.
-        Returns dict mapping pattern index to entry info.
-        """
-        if not patterns:
-            return {}
-
-        highs = ohlcv['high']
-        lows = ohlcv['low']
-        n_candles = len(highs)
-        entries = {}
-
-        for i, pattern in enumerate(patterns):
-            entry_idx = pattern['detected_at']
-            if entry_idx + MIN_CANDLES_AFTER_PATTERN >= n_candles:
-                continue
-
-            zone_high = pattern['zone_high']
-            zone_low = pattern['zone_low']
-            direction = 'long' if pattern['direction'] == 'bullish' else 'short'
-
-            # Entry price based on method
-            if direction == 'long':
-                entry_price = zone_high if entry_method == 'zone_edge' else (zone_high + zone_low) / 2
-            else:
-                entry_price = zone_low if entry_method == 'zone_edge' else (zone_high + zone_low) / 2
-
-            # Entry search window
-            entry_start = entry_idx + 1
-            entry_end = min(entry_idx + expiry_candles, n_candles)
-
-            if entry_start >= entry_end:
-                continue
-
-            # Vectorized entry search
-            if direction == 'long':
-                entry_mask = lows[entry_start:entry_end] <= entry_price
-            else:
-                entry_mask = highs[entry_start:entry_end] >= entry_price
-
-            if not np.any(entry_mask):
-                continue
-
-            entry_candle = entry_start + np.argmax(entry_mask)
-
-            entries[i] = {
-                'entry_candle': entry_candle,
-                'entry_price': entry_price,
-                'direction': direction,
-                'zone_high': zone_high,
-                'zone_low': zone_low,
-                'zone_size': zone_high - zone_low,
-            }
-
-        return entries
-
-    def _simulate_with_precomputed_entries(
-        self,
-        ohlcv: Dict[str, np.ndarray],
-        precomputed_entries: Dict[int, Dict],
-        rr_target: float,
-        sl_buffer_pct: float,
-        timeframe: str = None,
-        data_cache: Dict = None,
-        symbol: str = None
-    ) -> List[Dict]:
-        """
-        Fast simulation using pre-computed entry candles.
-        Only calculates SL/TP outcomes - entry search already done.
-        """
-        if not precomputed_entries:
-            return []
-
-        highs = ohlcv['high']
-        lows = ohlcv['low']
-        timestamps = ohlcv['timestamp']
-        n_candles = len(highs)
-        trades = []
-
-        for entry_info in precomputed_entries.values():
-            entry_candle = entry_info['entry_candle']
-            entry_price = entry_info['entry_price']
-            direction = entry_info['direction']
-            zone_size = entry_info['zone_size']
-            buffer = zone_size * sl_buffer_pct
-
-            # Calculate SL/TP based on direction and params
-            if direction == 'long':
-                stop_loss = entry_info['zone_low'] - buffer
-                risk = entry_price - stop_loss
-                take_profit = entry_price + (risk * rr_target)
-            else:
-                stop_loss = entry_info['zone_high'] + buffer
-                risk = stop_loss - entry_price
-                take_profit = entry_price - (risk * rr_target)
-
-            # Search for SL/TP from entry (with max window for performance)
-            trade_start = entry_candle + 1
-            if trade_start >= n_candles:
-                continue
-
-            # Limit search window for performance (50k candles = ~35 days for 1m)
-            max_trade_candles = 50000
-            trade_end = min(trade_start + max_trade_candles, n_candles)
-
-            h_trade = highs[trade_start:trade_end]
-            l_trade = lows[trade_start:trade_end]
-
-            if direction == 'long':
-                sl_mask = l_trade <= stop_loss
-                tp_mask = h_trade >= take_profit
-            else:
-                sl_mask = h_trade >= stop_loss
-                tp_mask = l_trade <= take_profit
-
-            sl_idx = np.argmax(sl_mask) if np.any(sl_mask) else len(sl_mask)
-            tp_idx = np.argmax(tp_mask) if np.any(tp_mask) else len(tp_mask)
-
-            sl_hit = sl_idx < len(sl_mask) and sl_mask[sl_idx]
-            tp_hit = tp_idx < len(tp_mask) and tp_mask[tp_idx]
-
-            if not sl_hit and not tp_hit:
-                continue
-
-            # Determine outcome
-            if sl_hit and tp_hit:
-                if sl_idx == tp_idx:
-                    # Same candle - use drill-down or assume loss
-                    if timeframe and data_cache and symbol:
-                        conflict_ts = int(timestamps[trade_start + sl_idx])
-                        result = self._resolve_same_candle_conflict(
-                            direction, stop_loss, take_profit, conflict_ts,
-                            timeframe, data_cache, symbol
-                        )
-                    else:
-                        result = 'loss'
-                    exit_idx = trade_start + sl_idx
-                    exit_price = take_profit if result == 'win' else stop_loss
-                elif sl_idx < tp_idx:
-                    result, exit_idx, exit_price = 'loss', trade_start + sl_idx, stop_loss
-                else:
-                    result, exit_idx, exit_price = 'win', trade_start + tp_idx, take_profit
-            elif sl_hit:
-                result, exit_idx, exit_price = 'loss', trade_start + sl_idx, stop_loss
-            else:
-                result, exit_idx, exit_price = 'win', trade_start + tp_idx, take_profit
-
-            trades.append({
-                'entry_price': float(entry_price),
-                'exit_price': float(exit_price),
-                'direction': direction,
-                'result': result,
-                'rr_achieved': float(rr_target) if result == 'win' else -1.0,
-                'profit_pct': float(abs((exit_price - entry_price) / entry_price * 100)) * (1 if result == 'win' else -1),
-                'entry_time': int(timestamps[entry_candle]),
-                'exit_time': int(timestamps[exit_idx]),
-                'duration_candles': int(exit_idx - entry_candle)
-            })
-
-        return trades
-
     def _simulate_trades_fast(
         self,
         ohlcv: Dict[str, np.ndarray],
@@ -1243,10 +1142,9 @@ class ParameterOptimizer:
         entry_method = params.get('entry_method', 'zone_edge')
         expiry_multiplier = params.get('expiry_multiplier', 1.0)
 
-        highs = ohlcv['high']
-        lows = ohlcv['low']
         timestamps = ohlcv['timestamp']
-        n_candles = len(highs)
+        n_candles = len(timestamps)
+        touch = get_first_touch_index(ohlcv)
 
         # Pattern expiry: how long zone is valid for entry (uses Config.PATTERN_EXPIRY_HOURS)
         pattern_expiry_candles = get_pattern_expiry_candles(timeframe, expiry_multiplier)
@@ -1285,22 +1183,15 @@ class ParameterOptimizer:
             if entry_start_idx >= entry_end_idx:
                 continue
 
-            # Get slices for entry search (limited by pattern expiry)
-            h_slice = highs[entry_start_idx:entry_end_idx]
-            l_slice = lows[entry_start_idx:entry_end_idx]
-
-            # Vectorized search for entry trigger
+            # Entry trigger (limited by pattern expiry)
             if direction == 'long':
-                entry_mask = l_slice <= entry
+                entry_candle = touch.first_low_at_or_below(entry_start_idx, entry, entry_end_idx)
             else:
-                entry_mask = h_slice >= entry
+                entry_candle = touch.first_high_at_or_above(entry_start_idx, entry, entry_end_idx)
 
-            if not np.any(entry_mask):
+            if entry_candle >= entry_end_idx:
                 continue  # Pattern expired without entry
 
-            entry_candle_offset = np.argmax(entry_mask)
-            entry_candle = entry_start_idx + entry_candle_offset
-
             # SL/TP search: NO TIMEOUT - trade stays open until resolved
             # Search from entry candle to END of all available data
             trade_start = entry_candle + 1
@@ -1308,23 +1199,16 @@ class ParameterOptimizer:
             if trade_start >= n_candles:
                 continue
 
-            h_trade = highs[trade_start:n_candles]
-            l_trade = lows[trade_start:n_candles]
-
+            # First SL / TP touch, as offsets from trade_start (n_candles - trade_start if never)
             if direction == 'long':
-                sl_mask = l_trade <= stop_loss
-                tp_mask = h_trade >= take_profit
+                sl_idx = touch.first_low_at_or_below(trade_start, stop_loss) - trade_start
+                tp_idx = touch.first_high_at_or_above(trade_start, take_profit) - trade_start
             else:
-                sl_mask = h_trade >= stop_loss
-                tp_mask = l_trade <= take_profit
-
-            # Find first SL or TP hit
-            sl_idx = np.argmax(sl_mask) if np.any(sl_mask) else len(sl_mask)
-            tp_idx = np.argmax(tp_mask) if np.any(tp_mask) else len(tp_mask)
+                sl_idx = touch.first_high_at_or_above(trade_start, stop_loss) - trade_start
+                tp_idx = touch.first_low_at_or_below(trade_start, take_profit) - trade_start
 
-            # Check which was actually hit (argmax returns 0 if all False)
-            sl_hit = sl_mask[sl_idx] if sl_idx < len(sl_mask) else False
-            tp_hit = tp_mask[tp_idx] if tp_idx < len(tp_mask) else False
+            sl_hit = trade_start + sl_idx < n_candles
+            tp_hit = trade_start + tp_idx < n_candles
 
             if not sl_hit and not tp_hit:
                 continue  # Trade not resolved
@@ -1393,6 +1277,157 @@ class ParameterOptimizer:
 
         return trades
 
+    def _simulate_trades_batch(
+        self,
+        ohlcv: Dict[str, np.ndarray],
+        patterns: List[Dict],
+        param_batch: List[Dict],
+        timeframe: str = None,
+        data_cache: Dict = None,
+        symbol: str = None,
+        max_trade_candles: int = None
+    ) -> List[List[Dict]]:
+        """
+        Simulate trades for a whole batch of parameter combinations at once.
+
+        Produces, for each params dict, exactly the trades _simulate_trades_fast()
+        would, but scans the candles once per pattern instead of once per combo:
+        - The entry candle does not depend on expiry, only whether it falls
+          inside the expiry window, so it is searched once over the longest window
+        - SL/TP first touches for every (rr_target, sl_buffer_pct) are resolved
+          together by one vectorized first-touch index query per side
+
+        Args:
+            ohlcv: Dict with 'high', 'low', 'timestamp' numpy arrays
+            patterns: List of pattern dicts with 'detected_at', 'zone_high', 'zone_low', 'direction'
+            param_batch: List of param dicts ('rr_target', 'sl_buffer_pct',
+                         'expiry_multiplier', 'entry_method')
+            timeframe: Current timeframe (expiry and same-candle drill-down)
+            data_cache: Dict[(symbol, tf)] -> (df, ohlcv, first_ts, last_ts) for drill-down
+            symbol: Symbol being processed (for drill-down lookup)
+            max_trade_candles: Optional SL/TP search window after entry (None = to end of data)
+
+        Returns:
+            List of trade lists, aligned with param_batch
+        """
+        trades_per_params = [[] for _ in param_batch]
+        if not patterns or not param_batch:
+            return trades_per_params
+
+        timestamps = ohlcv['timestamp']
+        n_candles = len(timestamps)
+        touch = get_first_touch_index(ohlcv)
+
+        rr_targets = np.array([p.get('rr_target', 2.0) for p in param_batch], dtype=np.float64)
+        sl_buffers = np.array([p.get('sl_buffer_pct', 10.0) / 100.0 for p in param_batch], dtype=np.float64)
+        expiry_candles = np.array([
+            get_pattern_expiry_candles(timeframe, p.get('expiry_multiplier', 1.0)) for p in param_batch
+        ], dtype=np.int64)
+        entry_methods = [p.get('entry_method', 'zone_edge') for p in param_batch]
+
+        method_groups = {}
+        for k, method in enumerate(entry_methods):
+            method_groups.setdefault(method, []).append(k)
+        method_groups = {m: np.array(ks, dtype=np.int64) for m, ks in method_groups.items()}
+
+        for pattern in patterns:
+            entry_idx = pattern['detected_at']
+            if entry_idx + MIN_CANDLES_AFTER_PATTERN >= n_candles:
+                continue
+
+            zone_high = pattern['zone_high']
+            zone_low = pattern['zone_low']
+            zone_size = zone_high - zone_low
+            direction = 'long' if pattern['direction'] == 'bullish' else 'short'
+            entry_start = entry_idx + 1
+
+            for entry_method, group in method_groups.items():
+                if direction == 'long':
+                    entry = zone_high if entry_method == 'zone_edge' else (zone_high + zone_low) / 2
+                else:
+                    entry = zone_low if entry_method == 'zone_edge' else (zone_high + zone_low) / 2
+
+                # Entry search over the longest expiry window in the group
+                entry_ends = np.minimum(entry_idx + expiry_candles[group], n_candles)
+                entry_end_max = int(entry_ends.max())
+                if entry_start >= entry_end_max:
+                    continue
+
+                if direction == 'long':
+                    entry_candle = touch.first_low_at_or_below(entry_start, entry, entry_end_max)
+                else:
+                    entry_candle = touch.first_high_at_or_above(entry_start, entry, entry_end_max)
+                if entry_candle >= entry_end_max:
+                    continue
+
+                # Combos whose expiry window contains the entry candle
+                active = group[entry_candle < entry_ends]
+                if len(active) == 0:
+                    continue
+
+                trade_start = entry_candle + 1
+                if trade_start >= n_candles:
+                    continue
+                trade_end = n_candles if max_trade_candles is None else min(trade_start + max_trade_candles, n_candles)
+                window = trade_end - trade_start
+
+                # First touch of every level at once (offsets from trade_start; window if never)
+                buffers = zone_size * sl_buffers[active]
+                rrs = rr_targets[active]
+                if direction == 'long':
+                    stop_losses = zone_low - buffers
+                    take_profits = entry + ((entry - stop_losses) * rrs)
+                    sl_idx = touch.first_low_at_or_below(trade_start, stop_losses, trade_end) - trade_start
+                    tp_idx = touch.first_high_at_or_above(trade_start, take_profits, trade_end) - trade_start
+                else:
+                    stop_losses = zone_high + buffers
+                    take_profits = entry - ((stop_losses - entry) * rrs)
+                    sl_idx = touch.first_high_at_or_above(trade_start, stop_losses, trade_end) - trade_start
+                    tp_idx = touch.first_low_at_or_below(trade_start, take_profits, trade_end) - trade_start
+
+                for j, k in enumerate(active):
+                    s_idx = int(sl_idx[j])
+                    t_idx = int(tp_idx[j])
+                    sl_hit = s_idx < window
+                    tp_hit = t_idx < window
+                    if not sl_hit and not tp_hit:
+                        continue
+
+                    stop_loss = stop_losses[j]
+                    take_profit = take_profits[j]
+
+                    if sl_hit and tp_hit and s_idx == t_idx:
+                        # Same candle conflict - drill down to smaller TF or assume loss
+                        exit_idx = trade_start + s_idx
+                        result = self._resolve_same_candle_conflict(
+                            direction=direction,
+                            stop_loss=stop_loss,
+                            take_profit=take_profit,
+                            conflict_ts=int(timestamps[exit_idx]),
+                            timeframe=timeframe,
+                            data_cache=data_cache,
+                            symbol=symbol
+                        )
+                        exit_price = take_profit if result == 'win' else stop_loss
+                    elif sl_hit and (not tp_hit or s_idx < t_idx):
+                        result, exit_idx, exit_price = 'loss', trade_start + s_idx, stop_loss
+                    else:
+                        result, exit_idx, exit_price = 'win', trade_start + t_idx, take_profit
+
+                    trades_per_params[k].append({
+                        'entry_price': float(entry),
+                        'exit_price': float(exit_price),
+                        'direction': direction,
+                        'result': result,
+                        'rr_achieved': float(rrs[j]) if result == 'win' else -1.0,
+                        'profit_pct': float(abs((exit_price - entry) / entry * 100)) * (1 if result == 'win' else -1),
+                        'entry_time': int(timestamps[entry_candle]),
+                        'exit_time': int(timestamps[exit_idx]),
+                        'duration_candles': int(exit_idx - entry_candle)
+                    })
+
+        return trades_per_params
+
     def _resolve_same_candle_conflict(
         self,
         direction: str,
@@ -2117,7 +2152,7 @@ class ParameterOptimizer:
             parameter_grid: Parameter combinations to test
             progress_callback: Optional callback for progress updates
             parallel: If True, use parallel processing (default: False)
-            max_workers: Number of parallel workers (default: 4, max: 8)
+            max_workers: Number of parallel workers (default: 4, max: 16)
 
         Returns:
             Summary dict with results
@@ -2268,7 +2303,7 @@ class ParameterOptimizer:
             pattern_types: List of pattern types
             parameter_grid: Parameter combinations
             progress_callback: Optional progress callback
-            max_workers: Number of workers (default: 4, max: 8)
+            max_workers: Number of workers (default: 4, max: 16)
 
         Returns:
             Summary dict with results
@@ -2319,95 +2354,124 @@ class ParameterOptimizer:
         parallel_start = datetime.now(timezone.utc)
         completed_symbols = 0
 
-        # Process symbols in parallel using ProcessPoolExecutor
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all symbol processing tasks with existing timestamps for skip detection
-            future_to_symbol = {
-                executor.submit(
-                    _process_symbol_worker,
-                    symbol,
-                    timeframes,
-                    pattern_types,
-                    parameter_grid,
-                    existing_timestamps_map.get(symbol, {}) if existing_runs_map.get(symbol) else {}
-                ): symbol
-                for symbol in symbols
-            }
-
-            # Process results as they complete
-            total_symbols = len(symbols)
-            for future in as_completed(future_to_symbol):
-                symbol = future_to_symbol[future]
-                completed_symbols += 1
-
-                # Show progress bar
-                pct = int(completed_symbols / total_symbols * 100)
-                bar_len = 30
-                filled = int(bar_len * completed_symbols / total_symbols)
-                bar = '=' * filled + '-' * (bar_len - filled)
-                print(f"\r  Progress: [{bar}] {pct}% ({completed_symbols}/{total_symbols} symbols)", end='', flush=True)
-
-                try:
-                    worker_result = future.result()
-
-                    if worker_result.get('error'):
-                        print(f"\n  ✗ {symbol}: Error - {worker_result['error']}", flush=True)
-                        param_combinations = list(itertools.product(*parameter_grid.values()))
-                        total_errors += len(timeframes) * len(pattern_types) * len(param_combinations)
-                        continue
-
-                    if worker_result.get('skipped'):
-                        total_skipped += worker_result.get('skip_count', 0)
-                        continue
-
-                    # Get existing runs for this symbol
-                    existing_runs = existing_runs_map.get(symbol, {})
+        # Candles are loaded once here and published into shared memory; workers
+        # attach them by name instead of reloading from the database.
+        # Symbols are submitted in a bounded window so only the in-flight
+        # symbols' arrays are resident at any time.
+        shared_pool = SharedCandlePool()
+        pending_symbols = iter(symbols)
+        future_to_symbol = {}
+        max_in_flight = max_workers * 2
+        total_symbols = len(symbols)
+
+        def submit_next(executor) -> bool:
+            symbol = next(pending_symbols, None)
+            if symbol is None:
+                return False
+            try:
+                frames = {tf: get_verified_candles(symbol, tf) for tf in timeframes}
+                shared_series = shared_pool.publish_symbol(symbol, frames)
+            except Exception as e:
+                # Worker falls back to loading from the DB itself
+                print(f"\n  ⚠ {symbol}: Shared memory publish failed ({e}), worker will load from DB", flush=True)
+                shared_pool.release_symbol(symbol)
+                shared_series = None
+            future = executor.submit(
+                _process_symbol_worker,
+                symbol,
+                timeframes,
+                pattern_types,
+                parameter_grid,
+                existing_timestamps_map.get(symbol, {}) if existing_runs_map.get(symbol) else {},
+                shared_series
+            )
+            future_to_symbol[future] = symbol
+            return True
 
-                    # Process results and create/update DB records
-                    pending_commits = 0
-                    symbol_updated = 0
-                    symbol_new = 0
-                    symbol_errors = 0
-
-                    for r in worker_result.get('results', []):
-                        params = r['params']
-                        rr_target = params.get('rr_target', 2.0)
-                        sl_buffer_pct = params.get('sl_buffer_pct', 10.0)
-                        existing_key = (r['symbol'], r['timeframe'], r['pattern_type'], rr_target, sl_buffer_pct)
-                        existing = existing_runs.get(existing_key)
-
-                        if r['status'] == 'completed':
-                            run = self._create_run_from_result(None, r, existing_run=existing)
-                            if existing:
-                                symbol_updated += 1
+        # Process symbols in parallel using ProcessPoolExecutor
+        with shared_pool, ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while len(future_to_symbol) < max_in_flight and submit_next(executor):
+                pass
+
+            # Process results as they complete, topping the window back up
+            while future_to_symbol:
+                done, _ = wait(future_to_symbol, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = future_to_symbol.pop(future)
+                    shared_pool.release_symbol(symbol)
+                    completed_symbols += 1
+
+                    # Show progress bar
+                    pct = int(completed_symbols / total_symbols * 100)
+                    bar_len = 30
+                    filled = int(bar_len * completed_symbols / total_symbols)
+                    bar = '=' * filled + '-' * (bar_len - filled)
+                    print(f"\r  Progress: [{bar}] {pct}% ({completed_symbols}/{total_symbols} symbols)", end='', flush=True)
+
+                    try:
+                        worker_result = future.result()
+
+                        if worker_result.get('error'):
+                            print(f"\n  ✗ {symbol}: Error - {worker_result['error']}", flush=True)
+                            param_combinations = list(itertools.product(*parameter_grid.values()))
+                            total_errors += len(timeframes) * len(pattern_types) * len(param_combinations)
+                            continue
+
+                        if worker_result.get('skipped'):
+                            total_skipped += worker_result.get('skip_count', 0)
+                            continue
+
+                        # Get existing runs for this symbol
+                        existing_runs = existing_runs_map.get(symbol, {})
+
+                        # Process results and create/update DB records
+                        pending_commits = 0
+                        symbol_updated = 0
+                        symbol_new = 0
+                        symbol_errors = 0
+
+                        for r in worker_result.get('results', []):
+                            params = r['params']
+                            rr_target = params.get('rr_target', 2.0)
+                            sl_buffer_pct = params.get('sl_buffer_pct', 10.0)
+                            existing_key = (r['symbol'], r['timeframe'], r['pattern_type'], rr_target, sl_buffer_pct)
+                            existing = existing_runs.get(existing_key)
+
+                            if r['status'] == 'completed':
+                                run = self._create_run_from_result(None, r, existing_run=existing)
+                                if existing:
+                                    symbol_updated += 1
+                                else:
+                                    symbol_new += 1
+                                    existing_runs[existing_key] = run
+
+                                if run.total_profit_pct is not None and run.total_profit_pct > best_profit:
+                                    best_profit = run.total_profit_pct
+                                    best_result = run
                             else:
-                                symbol_new += 1
-                                existing_runs[existing_key] = run
+                                symbol_errors += 1
 
-                            if run.total_profit_pct is not None and run.total_profit_pct > best_profit:
-                                best_profit = run.total_profit_pct
-                                best_result = run
-                        else:
-                            symbol_errors += 1
+                            pending_commits += 1
+                            if pending_commits >= BATCH_COMMIT_SIZE:
+                                db.session.commit()
+                                pending_commits = 0
 
-                        pending_commits += 1
-                        if pending_commits >= BATCH_COMMIT_SIZE:
+                        if pending_commits > 0:
                             db.session.commit()
-                            pending_commits = 0
 
-                    if pending_commits > 0:
-                        db.session.commit()
+                        total_updated += symbol_updated
+                        total_new_runs += symbol_new
+                        total_errors += symbol_errors
 
-                    total_updated += symbol_updated
-                    total_new_runs += symbol_new
-                    total_errors += symbol_errors
+                        print(f"\n  ✓ {symbol}: {symbol_new} new, {symbol_updated} updated", flush=True)
 
-                    print(f"\n  ✓ {symbol}: {symbol_new} new, {symbol_updated} updated", flush=True)
+                    except Exception as e:
+                        print(f"\n  ✗ {symbol}: Exception - {str(e)}", flush=True)
+                        param_combinations = list(itertools.product(*parameter_grid.values()))
+                        total_errors += len(timeframes) * len(pattern_types) * len(param_combinations)
 
-                except Exception as e:
-                    print(f"\n  ✗ {symbol}: Exception - {str(e)}", flush=True)
-                    param_combinations = list(itertools.product(*parameter_grid.values()))
-                    total_errors += len(timeframes) * len(pattern_types) * len(param_combinations)
+                while len(future_to_symbol) < max_in_flight and submit_next(executor):
+                    pass
 
         parallel_duration = (datetime.now(timezone.utc) - parallel_start).total_seconds()
         print(f"\n{'='*60}", flush=True)
@@ -2469,7 +2533,7 @@ class ParameterOptimizer:
         )
 
         # Use verified candles only (required for accurate backtesting)
-        df = get_candles_as_dataframe(symbol, timeframe, verified_only=True)
+        df = get_verified_candles(symbol, timeframe)
         if df is None or df.empty or len(df) < 20:
             return 'skipped'
 
@@ -2745,10 +2809,9 @@ class ParameterOptimizer:
         # Pattern expiry: how long zone is valid for entry (trade stays open until SL/TP)
         pattern_expiry_candles = get_pattern_expiry_candles(timeframe, expiry_multiplier)
 
-        highs = ohlcv['high']
-        lows = ohlcv['low']
         timestamps = ohlcv['timestamp']
-        n_candles = len(highs)
+        n_candles = len(timestamps)
+        touch = get_first_touch_index(ohlcv)
 
         for pattern in patterns:
             entry_idx = pattern['detected_at']
@@ -2785,20 +2848,15 @@ class ParameterOptimizer:
             if entry_start_idx >= entry_end_idx:
                 continue
 
-            h_slice = highs[entry_start_idx:entry_end_idx]
-            l_slice = lows[entry_start_idx:entry_end_idx]
-
             # Find entry trigger (within expiry window)
             if direction == 'long':
-                entry_mask = l_slice <= entry
+                entry_candle = touch.first_low_at_or_below(entry_start_idx, entry, entry_end_idx)
             else:
-                entry_mask = h_slice >= entry
+                entry_candle = touch.first_high_at_or_above(entry_start_idx, entry, entry_end_idx)
 
-            if not np.any(entry_mask):
+            if entry_candle >= entry_end_idx:
                 continue  # Pattern expired without entry
 
-            entry_offset = np.argmax(entry_mask)
-            entry_candle = entry_start_idx + entry_offset
             entry_time = int(timestamps[entry_candle])
 
             # SL/TP search: NO TIMEOUT - search to end of data
@@ -2816,21 +2874,15 @@ class ParameterOptimizer:
                 })
                 continue
 
-            h_trade = highs[trade_start:n_candles]
-            l_trade = lows[trade_start:n_candles]
-
             if direction == 'long':
-                sl_mask = l_trade <= stop_loss
-                tp_mask = h_trade >= take_profit
+                sl_idx = touch.first_low_at_or_below(trade_start, stop_loss) - trade_start
+                tp_idx = touch.first_high_at_or_above(trade_start, take_profit) - trade_start
             else:
-                sl_mask = h_trade >= stop_loss
-                tp_mask = l_trade <= take_profit
+                sl_idx = touch.first_high_at_or_above(trade_start, stop_loss) - trade_start
+                tp_idx = touch.first_low_at_or_below(trade_start, take_profit) - trade_start
 
-            sl_idx = np.argmax(sl_mask) if np.any(sl_mask) else len(sl_mask)
-            tp_idx = np.argmax(tp_mask) if np.any(tp_mask) else len(tp_mask)
-
-            sl_hit = sl_mask[sl_idx] if sl_idx < len(sl_mask) else False
-            tp_hit = tp_mask[tp_idx] if tp_idx < len(tp_mask) else False
+            sl_hit = trade_start + sl_idx < n_candles
+            tp_hit = trade_start + tp_idx < n_candles
 
             if not sl_hit and not tp_hit:
                 # Trade not resolved - still open
@@ -2984,10 +3036,9 @@ class ParameterOptimizer:
         resolved = []
         still_open = []
 
-        highs = ohlcv['high']
-        lows = ohlcv['low']
         timestamps = ohlcv['timestamp']
-        n_candles = len(highs)
+        n_candles = len(timestamps)
+        touch = get_first_touch_index(ohlcv)
 
         for trade in open_trades:
             entry = trade['entry_price']
@@ -2997,74 +3048,45 @@ class ParameterOptimizer:
             entry_time = trade['entry_time']
             rr_target = trade.get('rr_target', 2.0)
 
-            was_resolved = False
-
             # Use binary search to find first candle after entry_time (O(log n) vs O(n))
-            start_idx = np.searchsorted(timestamps, entry_time, side='right')
+            start_idx = int(np.searchsorted(timestamps, entry_time, side='right'))
 
-            for idx in range(start_idx, n_candles):
-
-                if direction == 'long':
-                    if lows[idx] <= stop_loss:
-                        resolved.append({
-                            'entry_price': entry,
-                            'exit_price': stop_loss,
-                            'direction': direction,
-                            'result': 'loss',
-                            'rr_achieved': -1.0,
-                            'profit_pct': float(-abs((stop_loss - entry) / entry * 100)),
-                            'entry_time': entry_time,
-                            'exit_time': int(timestamps[idx]),
-                            'duration_candles': idx
-                        })
-                        was_resolved = True
-                        break
-                    elif highs[idx] >= take_profit:
-                        resolved.append({
-                            'entry_price': entry,
-                            'exit_price': take_profit,
-                            'direction': direction,
-                            'result': 'win',
-                            'rr_achieved': rr_target,
-                            'profit_pct': float(abs((take_profit - entry) / entry * 100)),
-                            'entry_time': entry_time,
-                            'exit_time': int(timestamps[idx]),
-                            'duration_candles': idx
-                        })
-                        was_resolved = True
-                        break
-                else:
-                    if highs[idx] >= stop_loss:
-                        resolved.append({
-                            'entry_price': entry,
-                            'exit_price': stop_loss,
-                            'direction': direction,
-                            'result': 'loss',
-                            'rr_achieved': -1.0,
-                            'profit_pct': float(-abs((stop_loss - entry) / entry * 100)),
-                            'entry_time': entry_time,
-                            'exit_time': int(timestamps[idx]),
-                            'duration_candles': idx
-                        })
-                        was_resolved = True
-                        break
-                    elif lows[idx] <= take_profit:
-                        resolved.append({
-                            'entry_price': entry,
-                            'exit_price': take_profit,
-                            'direction': direction,
-                            'result': 'win',
-                            'rr_achieved': rr_target,
-                            'profit_pct': float(abs((take_profit - entry) / entry * 100)),
-                            'entry_time': entry_time,
-                            'exit_time': int(timestamps[idx]),
-                            'duration_candles': idx
-                        })
-                        was_resolved = True
-                        break
+            if direction == 'long':
+                sl_idx = touch.first_low_at_or_below(start_idx, stop_loss)
+                tp_idx = touch.first_high_at_or_above(start_idx, take_profit)
+            else:
+                sl_idx = touch.first_high_at_or_above(start_idx, stop_loss)
+                tp_idx = touch.first_low_at_or_below(start_idx, take_profit)
 
-            if not was_resolved:
+            if sl_idx >= n_candles and tp_idx >= n_candles:
                 still_open.append(trade)
+                continue
+
+            # SL is checked first, so a same-candle touch counts as a loss
+            if sl_idx <= tp_idx:
+                resolved.append({
+                    'entry_price': entry,
+                    'exit_price': stop_loss,
+                    'direction': direction,
+                    'result': 'loss',
+                    'rr_achieved': -1.0,
+                    'profit_pct': float(-abs((stop_loss - entry) / entry * 100)),
+                    'entry_time': entry_time,
+                    'exit_time': int(timestamps[sl_idx]),
+                    'duration_candles': sl_idx
+                })
+            else:
+                resolved.append({
+                    'entry_price': entry,
+                    'exit_price': take_profit,
+                    'direction': direction,
+                    'result': 'win',
+                    'rr_achieved': rr_target,
+                    'profit_pct': float(abs((take_profit - entry) / entry * 100)),
+                    'entry_time': entry_time,
+                    'exit_time': int(timestamps[tp_idx]),
+                    'duration_candles': tp_idx
+                })
 
         return resolved, still_open
 
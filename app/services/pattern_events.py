@@ -0,0 +1,66 @@
+"""
+Pattern Change Events
+Per-symbol "pattern set changed" notifications for event-driven signal evaluation
+
+Usage:
+    from app.services.pattern_events import publish_pattern_changes, drain_pattern_changes
+
+    publish_pattern_changes([symbol_id])
+    changed = drain_pattern_changes()   # set of symbol ids, cleared
+"""
+import threading
+from typing import Iterable, Set
+
+from sqlalchemy import event, inspect
+
+from app.models import Pattern
+
+
+class PatternChangeTracker:
+    """Set of symbol ids whose active patterns changed since the last drain."""
+
+    def __init__(self):
+        self._changed: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._changed)
+
+    def publish(self, symbol_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._changed.update(int(s) for s in symbol_ids if s is not None)
+
+    def drain(self) -> Set[int]:
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            return changed
+
+
+_tracker = PatternChangeTracker()
+
+
+def get_pattern_change_tracker() -> PatternChangeTracker:
+    """Process-wide tracker."""
+    return _tracker
+
+
+def publish_pattern_changes(symbol_ids: Iterable[int]) -> None:
+    """Record that these symbols' active pattern sets changed."""
+    _tracker.publish(symbol_ids)
+
+
+def drain_pattern_changes() -> Set[int]:
+    """Symbols changed since the last drain (the set is cleared)."""
+    return _tracker.drain()
+
+
+@event.listens_for(Pattern, 'after_insert')
+@event.listens_for(Pattern, 'after_delete')
+def _pattern_added_or_removed(mapper, connection, target):
+    _tracker.publish([target.symbol_id])
+
+
+@event.listens_for(Pattern, 'after_update')
+def _pattern_updated(mapper, connection, target):
+    if inspect(target).attrs.status.history.has_changes():
+        _tracker.publish([target.symbol_id])
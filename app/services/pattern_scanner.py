@@ -0,0 +1,192 @@
+"""
+Incremental Pattern Scanner
+Run pattern detection on newly closed candles only, carrying detector state between fetch cycles
+
+Usage:
+    from app.services.pattern_scanner import enable_incremental_scanning, get_pattern_scanner
+
+    enable_incremental_scanning()          # Resident fetch process start-up
+    scanner = get_pattern_scanner(sym.id, 'BTC/USDT', '1h')
+    if scanner.is_warm:
+        saved = scanner.scan(detectors)
+    else:
+        ...  # full-window detect(), then
+        scanner.warm_up(df, detectors)
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from app import db
+from app.services.candle_cache import get_candle_cache
+
+logger = logging.getLogger(__name__)
+
+# Candles loaded for trading levels when a pattern is found (ATR(14) + 50-candle swing lookback)
+CONTEXT_CANDLES = 60
+
+# Upper bound on candles read per scan (a scanner that fell this far behind is rebuilt)
+MAX_SCAN_CANDLES = 5000
+
+
+class SeriesPatternScanner:
+    """Incremental detector state for one (symbol, timeframe)."""
+
+    def __init__(self, symbol_id: int, symbol: str, timeframe: str):
+        self.symbol_id = symbol_id
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.last_ts: Optional[int] = None
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def is_warm(self) -> bool:
+        return self.last_ts is not None
+
+    def warm_up(self, df: pd.DataFrame, detectors: list) -> None:
+        """Build detector state from candles that have already been scanned."""
+        self.states = {d.pattern_type: d.new_incremental_state() for d in detectors}
+        if df is None or df.empty:
+            self.last_ts = None
+            return
+        self._feed(df, detectors)
+        self.last_ts = int(df['timestamp'].iloc[-1])
+
+    def _feed(self, df: pd.DataFrame, detectors: list) -> List[Tuple[Any, Dict]]:
+        timestamps = df['timestamp'].to_numpy()
+        opens = df['open'].to_numpy()
+        highs = df['high'].to_numpy()
+        lows = df['low'].to_numpy()
+        closes = df['close'].to_numpy()
+
+        found = []
+        for detector in detectors:
+            state = self.states.get(detector.pattern_type)
+            if state is None:
+                raise RuntimeError(f"No incremental state for {detector.pattern_type}")
+            for raw in detector.detect_incremental(state, timestamps, opens, highs, lows, closes):
+                found.append((detector, raw))
+        return found
+
+    def load_new_candles(self) -> pd.DataFrame:
+        """Candles after last_ts, oldest first."""
+        df = get_candle_cache().get_since(self.symbol_id, self.timeframe, self.last_ts)
+        if df is not None:
+            return df
+        df = pd.read_sql(
+            text("""
+                SELECT timestamp, open, high, low, close, volume
+                FROM candles
+                WHERE symbol_id = :symbol_id AND timeframe = :timeframe
+                  AND timestamp > :last_ts
+                ORDER BY timestamp ASC
+                LIMIT :limit
+            """),
+            db.engine,
+            params={
+                'symbol_id': self.symbol_id,
+                'timeframe': self.timeframe,
+                'last_ts': self.last_ts,
+                'limit': MAX_SCAN_CANDLES + 1
+            }
+        )
+        if len(df) > MAX_SCAN_CANDLES:
+            raise RuntimeError(
+                f"{self.symbol} {self.timeframe}: more than {MAX_SCAN_CANDLES} unscanned candles"
+            )
+        return df
+
+    def scan(self, detectors: list) -> List[Dict[str, Any]]:
+        """
+        Detect and save patterns on candles closed since the last scan.
+
+        Overlap with active patterns is checked against the in-memory
+        ActivePatternStore (via prefetch_existing_patterns); the exact-duplicate
+        lookup is skipped. The caller commits.
+
+        Returns:
+            Saved pattern dicts (as returned by save_pattern)
+        """
+        df_new = self.load_new_candles()
+        if df_new.empty:
+            return []
+
+        found = self._feed(df_new, detectors)
+        self.last_ts = int(df_new['timestamp'].iloc[-1])
+        if not found:
+            return []
+
+        precomputed = self._trading_context()
+        for detector in detectors:
+            detector.prefetch_existing_patterns(self.symbol_id, self.timeframe)
+
+        saved = []
+        try:
+            for detector, raw in found:
+                if detector.has_overlapping_pattern(
+                    self.symbol_id, self.timeframe, raw['direction'], raw['zone_low'], raw['zone_high']
+                ):
+                    continue
+                pattern_dict = detector.save_pattern(
+                    self.symbol_id, self.timeframe, raw['direction'], raw['zone_low'], raw['zone_high'],
+                    raw['detected_ts'], self.symbol, precomputed=precomputed, check_existing=False
+                )
+                if pattern_dict:
+                    if raw.get('swept_level'):
+                        pattern_dict['swept_level'] = raw['swept_level']
+                    saved.append(pattern_dict)
+        finally:
+            for detector in detectors:
+                detector.clear_pattern_cache()
+
+        logger.debug(f"{self.symbol} {self.timeframe}: {len(df_new)} new candles, {len(saved)} patterns")
+        return saved
+
+    def _trading_context(self) -> Dict[str, Any]:
+        """ATR and swing levels at the latest candle (for save_pattern's trading levels)."""
+        from app.services.aggregator import get_candles_as_dataframe
+        from app.services.indicators import trading_context
+
+        return trading_context(get_candles_as_dataframe(self.symbol_id, self.timeframe, CONTEXT_CANDLES))
+
+
+# Process-wide registry (one scanner per symbol/timeframe, like the streaming aggregator)
+_scanners: Dict[Tuple[int, str], SeriesPatternScanner] = {}
+
+# Whether this process lives long enough to reuse scanner state (see enable_incremental_scanning)
+_incremental_enabled = False
+
+
+def enable_incremental_scanning(enabled: bool = True) -> None:
+    """Turn incremental scanning on for this (long-lived) process; disabling drops all state."""
+    global _incremental_enabled
+    _incremental_enabled = enabled
+    if not enabled:
+        _scanners.clear()
+
+
+def is_incremental_scanning_enabled() -> bool:
+    """Whether process_symbol() should keep and use scanner state."""
+    return _incremental_enabled
+
+
+def get_pattern_scanner(symbol_id: int, symbol: str, timeframe: str) -> SeriesPatternScanner:
+    """Get (or create) the scanner for a symbol/timeframe."""
+    key = (symbol_id, timeframe)
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = SeriesPatternScanner(symbol_id, symbol, timeframe)
+        _scanners[key] = scanner
+    return scanner
+
+
+def reset_pattern_scanners(symbol_id: int = None, timeframe: str = None) -> None:
+    """Drop scanner state (all, one symbol, or one symbol/timeframe) so it is rebuilt."""
+    if symbol_id is None:
+        _scanners.clear()
+        return
+    for key in list(_scanners):
+        if key[0] == symbol_id and (timeframe is None or key[1] == timeframe):
+            del _scanners[key]
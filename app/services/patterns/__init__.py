@@ -2,10 +2,13 @@
 Pattern Detection Package
 """
 import logging
+import time
+from typing import Dict
 from app.services.patterns.base import PatternDetector
 from app.services.patterns.fair_value_gap import FVGDetector, ImbalanceDetector as ImbalanceDetector
 from app.services.patterns.order_block import OrderBlockDetector
 from app.services.patterns.liquidity import LiquiditySweepDetector
+from app.services import pattern_events  # noqa: F401 - registers the pattern change listeners
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +108,58 @@ def get_all_detectors() -> list:
     ]
 
 
+def expire_patterns(now_ms: int = None) -> Dict[str, int]:
+    """
+    Mark active patterns older than their timeframe's expiry as expired.
+
+    One set-based UPDATE per timeframe (status, timeframe, detected_at are
+    covered by idx_pattern_expiry), plus one for timeframes without an entry
+    in PATTERN_EXPIRY_HOURS. The affected symbols are read first (same
+    index), published as pattern changes and marked stale in the active
+    pattern stores (this process and the fetch workers); the UPDATE is
+    skipped when there are none. The caller commits.
+
+    Args:
+        now_ms: Current time in ms (default: now)
+
+    Returns:
+        Dict of timeframe -> patterns expired ('*' = default expiry)
+    """
+    from sqlalchemy import select, update
+    from app import db
+    from app.config import Config
+    from app.models import Pattern
+    from app.services.pattern_events import publish_pattern_changes
+    from app.services.patterns.active_store import mark_zones_stale
+
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    table = Pattern.__table__
+    hour_ms = 60 * 60 * 1000
+
+    def expire(timeframe_clause, expiry_hours):
+        condition = (
+            table.c.status == 'active',
+            timeframe_clause,
+            table.c.detected_at < now_ms - expiry_hours * hour_ms
+        )
+        symbol_ids = db.session.execute(select(table.c.symbol_id).where(*condition).distinct()).scalars().all()
+        if not symbol_ids:
+            return 0
+        publish_pattern_changes(symbol_ids)
+        mark_zones_stale(symbol_ids)  # Core UPDATEs fire no ORM events
+        return db.session.execute(update(table).where(*condition).values(status='expired')).rowcount
+
+    expired = {}
+    for timeframe, expiry_hours in Config.PATTERN_EXPIRY_HOURS.items():
+        expired[timeframe] = expire(table.c.timeframe == timeframe, expiry_hours)
+    expired['*'] = expire(
+        table.c.timeframe.notin_(list(Config.PATTERN_EXPIRY_HOURS)),
+        Config.DEFAULT_PATTERN_EXPIRY_HOURS
+    )
+    return expired
+
+
 def scan_all_patterns(pattern_types: list = None) -> dict:
     """
     Scan all active symbols for patterns.
@@ -0,0 +1,249 @@
+"""
+Active Pattern Store
+In-memory active zones per symbol, indexed for price-driven status updates and overlap checks
+
+Usage:
+    from app.services.patterns.active_store import get_active_pattern_store
+
+    store = get_active_pattern_store()
+    updated = store.update(symbol_id, current_price, detectors)   # caller commits
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.config import Config
+from app.models import Pattern
+from app.services.pattern_events import PatternChangeTracker, publish_pattern_changes
+from app.services.patterns.zone_index import ZoneOverlapIndex
+
+logger = logging.getLogger(__name__)
+
+ZoneKey = Tuple[str, str, str]  # (timeframe, pattern_type, direction)
+
+# Fill percentage changes smaller than this are not written
+FILL_TOLERANCE = 1e-4
+
+
+class ZoneSet:
+    """Active zones of one (timeframe, pattern_type, direction), sorted by status band low."""
+
+    def __init__(self, ids, lows, highs, fills, band_lows, band_highs):
+        order = np.argsort(np.asarray(band_lows, dtype=np.float64), kind='stable')
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.lows = np.asarray(lows, dtype=np.float64)[order]
+        self.highs = np.asarray(highs, dtype=np.float64)[order]
+        self.fills = np.asarray(fills, dtype=np.float64)[order]  # NaN = never evaluated
+        self.band_lows = np.asarray(band_lows, dtype=np.float64)[order]
+        self.band_highs = np.asarray(band_highs, dtype=np.float64)[order]
+        self.max_band = float((self.band_highs - self.band_lows).max()) if len(self.ids) else 0.0
+        self.last_price: Optional[float] = None  # Price the current fills were computed at
+        self._overlap_indexes: Dict[float, ZoneOverlapIndex] = {}  # By threshold, built on first check
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def touched(self, price_low: float, price_high: float) -> np.ndarray:
+        """Indexes of zones whose status band intersects [price_low, price_high]."""
+        lo = np.searchsorted(self.band_lows, price_low - self.max_band, side='left')
+        hi = np.searchsorted(self.band_lows, price_high, side='right')
+        idx = np.arange(lo, hi)
+        return idx[self.band_highs[lo:hi] >= price_low]
+
+    def remove(self, idx: np.ndarray) -> None:
+        if len(idx) == 0:
+            return
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[idx] = False
+        for name in ('ids', 'lows', 'highs', 'fills', 'band_lows', 'band_highs'):
+            setattr(self, name, getattr(self, name)[keep])
+        self._overlap_indexes = {}
+
+    def overlaps(self, zone_low: float, zone_high: float, threshold: float) -> bool:
+        """Whether any zone overlaps [zone_low, zone_high] by >= threshold (of the smaller zone)."""
+        if len(self.ids) == 0:
+            return False
+        index = self._overlap_indexes.get(threshold)
+        if index is None:
+            index = self._overlap_indexes[threshold] = ZoneOverlapIndex(threshold)
+            for zone in zip(self.lows.tolist(), self.highs.tolist()):
+                index.add(*zone)
+        return index.overlaps(zone_low, zone_high)
+
+
+class ActivePatternStore:
+    """Per-symbol ZoneSets of active patterns, loaded lazily and dropped on ORM changes."""
+
+    def __init__(self, ttl: float = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl = Config.ACTIVE_PATTERN_TTL if ttl is None else ttl
+        self.clock = clock
+        self._symbols: Dict[int, Tuple[float, Dict[ZoneKey, ZoneSet]]] = {}
+        self._lock = threading.RLock()
+
+    def invalidate(self, symbol_id: int = None) -> None:
+        with self._lock:
+            if symbol_id is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol_id, None)
+
+    def _load(self, symbol_id: int) -> Dict[ZoneKey, ZoneSet]:
+        from app.services.patterns import get_detector
+
+        rows = db.session.query(
+            Pattern.id, Pattern.timeframe, Pattern.pattern_type, Pattern.direction,
+            Pattern.zone_low, Pattern.zone_high, Pattern.fill_percentage
+        ).filter(
+            Pattern.symbol_id == symbol_id,
+            Pattern.status == 'active'
+        ).all()
+
+        grouped: Dict[ZoneKey, list] = {}
+        for row in rows:
+            grouped.setdefault((row.timeframe, row.pattern_type, row.direction), []).append(row)
+
+        zones = {}
+        for (timeframe, pattern_type, direction), group in grouped.items():
+            detector = get_detector(pattern_type)
+            if detector is None:
+                continue
+            bands = [detector.status_band(direction, r.zone_low, r.zone_high) for r in group]
+            zones[(timeframe, pattern_type, direction)] = ZoneSet(
+                [r.id for r in group],
+                [r.zone_low for r in group],
+                [r.zone_high for r in group],
+                [np.nan if r.fill_percentage is None else r.fill_percentage for r in group],
+                [b[0] for b in bands],
+                [b[1] for b in bands],
+            )
+        return zones
+
+    def _zones(self, symbol_id: int) -> Dict[ZoneKey, ZoneSet]:
+        with self._lock:
+            entry = self._symbols.get(symbol_id)
+            if entry is None or self.clock() - entry[0] > self.ttl:
+                entry = (self.clock(), self._load(symbol_id))
+                self._symbols[symbol_id] = entry
+            return entry[1]
+
+    def zones(self, symbol_id: int, timeframe: str, pattern_type: str, direction: str) -> Optional[ZoneSet]:
+        """Active zones of one timeframe/type/direction (None if there are none)."""
+        return self._zones(symbol_id).get((timeframe, pattern_type, direction))
+
+    def update(self, symbol_id: int, current_price: float, detectors: list,
+               timeframes: List[str] = None) -> int:
+        """
+        Apply check_fill() at current_price to the zones the price moved through.
+
+        Changed rows are written in one executemany UPDATE; the caller commits.
+
+        Args:
+            symbol_id: Symbol ID
+            current_price: Current market price
+            detectors: Detectors whose pattern types to update
+            timeframes: Timeframes to update (default: all loaded)
+
+        Returns:
+            Number of patterns whose status changed
+        """
+        by_type = {d.pattern_type: d for d in detectors}
+        now_ms = int(time.time() * 1000)
+        changes = []
+        status_changes = 0
+
+        with self._lock:
+            for (timeframe, pattern_type, direction), zone_set in self._zones(symbol_id).items():
+                detector = by_type.get(pattern_type)
+                if detector is None or (timeframes is not None and timeframe not in timeframes):
+                    continue
+                if zone_set.last_price is None:
+                    idx = np.arange(len(zone_set))  # First update since load: evaluate everything
+                else:
+                    idx = zone_set.touched(min(zone_set.last_price, current_price),
+                                           max(zone_set.last_price, current_price))
+                zone_set.last_price = current_price
+
+                closed = []
+                for i in idx.tolist():
+                    result = detector.check_fill({
+                        'zone_low': float(zone_set.lows[i]),
+                        'zone_high': float(zone_set.highs[i]),
+                        'direction': direction
+                    }, current_price)
+                    status = result['status']
+                    fill = float(result.get('fill_percentage', 0))
+                    old_fill = zone_set.fills[i]
+                    if status == 'active' and abs(fill - old_fill) < FILL_TOLERANCE:
+                        continue  # NaN (never evaluated) compares False
+                    changes.append({
+                        'b_id': int(zone_set.ids[i]),
+                        'b_status': status,
+                        'b_fill': fill,
+                        'b_filled_at': now_ms if status == 'filled' else None,
+                    })
+                    if status == 'active':
+                        zone_set.fills[i] = fill
+                    else:
+                        closed.append(i)
+                        status_changes += 1
+                zone_set.remove(np.asarray(closed, dtype=np.int64))
+
+        if changes:
+            table = Pattern.__table__
+            stmt = update(table).where(
+                table.c.id == bindparam('b_id'),
+                table.c.status == 'active'
+            ).values(
+                status=bindparam('b_status'),
+                fill_percentage=bindparam('b_fill'),
+                filled_at=bindparam('b_filled_at')
+            )
+            db.session.execute(stmt, changes)
+            logger.debug(f"symbol_id={symbol_id}: {len(changes)} pattern rows updated, {status_changes} closed")
+        if status_changes:
+            publish_pattern_changes([symbol_id])
+
+        return status_changes
+
+
+_store = ActivePatternStore()
+
+# Symbols whose zones were changed without ORM events, for stores in other processes
+_stale = PatternChangeTracker()
+
+
+def get_active_pattern_store() -> ActivePatternStore:
+    """Process-wide active pattern store."""
+    return _store
+
+
+def mark_zones_stale(symbol_ids: Iterable[int]) -> None:
+    """Drop these symbols here and queue them for the stores of fetch worker processes."""
+    symbol_ids = list(symbol_ids)
+    for symbol_id in symbol_ids:
+        _store.invalidate(symbol_id)
+    _stale.publish(symbol_ids)
+
+
+def drain_stale_zones() -> Set[int]:
+    """Symbols marked stale since the last drain (the set is cleared)."""
+    return _stale.drain()
+
+
+@event.listens_for(Pattern, 'after_insert')
+@event.listens_for(Pattern, 'after_update')
+@event.listens_for(Pattern, 'after_delete')
+def _pattern_changed(mapper, connection, target):
+    _store.invalidate(target.symbol_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _rolled_back(session):
+    # Status changes applied in memory may not have reached the DB
+    _store.invalidate()
@@ -3,7 +3,7 @@ Base Pattern Detector
 Abstract base class for all pattern detectors
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import pandas as pd
 from app.config import Config
 
@@ -15,37 +15,30 @@ class PatternDetector(ABC):
         # Cache for existing patterns to avoid N+1 queries
         self._existing_patterns_cache = {}
 
-    def _get_cached_patterns(self, symbol_id: int, timeframe: str, direction: str) -> list:
+    def _get_cached_patterns(self, symbol_id: int, timeframe: str, direction: str):
         """
-        Get cached active patterns for overlap checking.
+        Get cached active zones (ZoneSet, or None) for overlap checking.
         Call prefetch_existing_patterns() before detection to populate cache.
         """
         key = (symbol_id, timeframe, self.pattern_type, direction)
-        return self._existing_patterns_cache.get(key, [])
+        return self._existing_patterns_cache.get(key)
 
     def prefetch_existing_patterns(self, symbol_id: int, timeframe: str):
         """
         Prefetch all active patterns for a symbol/timeframe to avoid N+1 queries.
         Call this once before running detection loop.
-        """
-        from app.models import Pattern
 
-        patterns = Pattern.query.filter_by(
-            symbol_id=symbol_id,
-            timeframe=timeframe,
-            pattern_type=self.pattern_type,
-            status='active'
-        ).all()
+        Served from the in-memory active pattern store (no query once the
+        symbol is loaded); overlap checks then go through the ZoneSet's
+        interval index. Both directions are cached, so a direction without
+        active patterns no longer falls through to a DB query.
+        """
+        from app.services.patterns.active_store import get_active_pattern_store
 
-        # Cache by direction
-        for pattern in patterns:
-            key = (symbol_id, timeframe, self.pattern_type, pattern.direction)
-            if key not in self._existing_patterns_cache:
-                self._existing_patterns_cache[key] = []
-            self._existing_patterns_cache[key].append({
-                'zone_low': pattern.zone_low,
-                'zone_high': pattern.zone_high
-            })
+        store = get_active_pattern_store()
+        for direction in ('bullish', 'bearish'):
+            key = (symbol_id, timeframe, self.pattern_type, direction)
+            self._existing_patterns_cache[key] = store.zones(symbol_id, timeframe, self.pattern_type, direction)
 
     def clear_pattern_cache(self):
         """Clear the pattern cache after detection completes."""
@@ -100,15 +93,8 @@ class PatternDetector(ABC):
         # Try to use cache first (populated by prefetch_existing_patterns)
         cache_key = (symbol_id, timeframe, self.pattern_type, direction)
         if cache_key in self._existing_patterns_cache:
-            existing_patterns = self._existing_patterns_cache[cache_key]
-            for existing in existing_patterns:
-                overlap = self._calculate_zone_overlap(
-                    existing['zone_low'], existing['zone_high'],
-                    zone_low, zone_high
-                )
-                if overlap >= threshold:
-                    return True
-            return False
+            zones = self._existing_patterns_cache[cache_key]
+            return zones is not None and zones.overlaps(zone_low, zone_high, threshold)
 
         # Fallback to DB query if cache not populated
         from app.models import Pattern
@@ -168,7 +154,8 @@ class PatternDetector(ABC):
         detected_at: int,
         symbol_name: str,
         df: pd.DataFrame = None,
-        precomputed: dict = None
+        precomputed: dict = None,
+        check_existing: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Common pattern saving logic. Checks for duplicates and saves to DB.
@@ -184,39 +171,40 @@ class PatternDetector(ABC):
             symbol_name: Symbol name for return dict
             df: DataFrame with candle data for ATR/swing calculations
             precomputed: Optional dict with pre-calculated {'atr', 'swing_high', 'swing_low'}
+            check_existing: Look up an existing pattern at detected_at first. Incremental
+                            detection only sees each candle once, so it skips the lookup.
 
         Returns:
             Pattern dict if saved, None if already exists
         """
         from app.models import Pattern
         from app import db
-        from app.services.trading import calculate_trading_levels, calculate_atr, find_swing_high, find_swing_low
+        from app.services.trading import calculate_trading_levels
+        from app.services.indicators import trading_context
 
         # Check if exact pattern already exists
-        existing = Pattern.query.filter_by(
-            symbol_id=symbol_id,
-            timeframe=timeframe,
-            pattern_type=self.pattern_type,
-            detected_at=detected_at
-        ).first()
+        if check_existing:
+            existing = Pattern.query.filter_by(
+                symbol_id=symbol_id,
+                timeframe=timeframe,
+                pattern_type=self.pattern_type,
+                detected_at=detected_at
+            ).first()
 
-        if existing:
-            return None
+            if existing:
+                return None
 
         # Use precomputed values if available (HUGE performance gain)
         if precomputed:
             atr = precomputed.get('atr', 0.0)
             swing_high = precomputed.get('swing_high')
             swing_low = precomputed.get('swing_low')
-        elif df is not None and not df.empty:
-            # Fallback to computing (slower path)
-            atr = calculate_atr(df)
-            swing_high = find_swing_high(df, len(df) - 1)
-            swing_low = find_swing_low(df, len(df) - 1)
         else:
-            atr = 0.0
-            swing_high = None
-            swing_low = None
+            # Fallback to computing from df (once per pattern)
+            context = trading_context(df)
+            atr = context['atr']
+            swing_high = context['swing_high']
+            swing_low = context['swing_low']
 
         levels = calculate_trading_levels(
             pattern_type=self.pattern_type,
@@ -294,12 +282,25 @@ class PatternDetector(ABC):
             else:
                 return {**pattern, 'status': 'active', 'fill_percentage': 0}
 
-    def update_pattern_status(self, symbol: str, timeframe: str, current_price: float, commit: bool = True) -> int:
+    def status_band(self, direction: str, zone_low: float, zone_high: float) -> tuple:
+        """
+        Price interval outside which check_fill() gives a constant result.
+
+        The active pattern store only re-evaluates zones whose band the price
+        moved through. Detectors overriding check_fill() must keep this in sync.
+        """
+        return zone_low, zone_high
+
+    def update_pattern_status(self, symbol: Union[str, int], timeframe: str, current_price: float,
+                              commit: bool = True) -> int:
         """
         Update the status of all active patterns for a symbol/timeframe.
 
+        Only zones the price moved through since the previous update are
+        re-evaluated, and only changed rows are written (see active_store).
+
         Args:
-            symbol: Trading pair (e.g., 'BTC/USDT')
+            symbol: Trading pair (e.g., 'BTC/USDT') or symbol id
             timeframe: Timeframe (e.g., '1h')
             current_price: Current market price
             commit: Whether to commit immediately (False for batching)
@@ -307,34 +308,15 @@ class PatternDetector(ABC):
         Returns:
             Number of patterns updated
         """
-        from app.models import Symbol, Pattern
+        from app.services.patterns.active_store import get_active_pattern_store
+        from app.services.symbol_registry import get_symbol_id
         from app import db
 
-        sym = Symbol.query.filter_by(symbol=symbol).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol)
+        if symbol_id is None:
             return 0
 
-        patterns = Pattern.query.filter_by(
-            symbol_id=sym.id,
-            timeframe=timeframe,
-            pattern_type=self.pattern_type,
-            status='active'
-        ).all()
-
-        updated = 0
-        for pattern in patterns:
-            pattern_dict = pattern.to_dict()
-            pattern_dict['direction'] = pattern.direction
-
-            result = self.check_fill(pattern_dict, current_price)
-
-            if result['status'] != pattern.status:
-                pattern.status = result['status']
-                if result['status'] == 'filled':
-                    pattern.filled_at = int(pd.Timestamp.now(tz="UTC").timestamp() * 1000)
-                updated += 1
-
-            pattern.fill_percentage = result.get('fill_percentage', 0)
+        updated = get_active_pattern_store().update(symbol_id, current_price, [self], timeframes=[timeframe])
 
         if commit:
             db.session.commit()
@@ -391,6 +373,57 @@ class PatternDetector(ABC):
         # Default implementation - subclasses should override for specific logic
         raise NotImplementedError(f"{self.__class__.__name__} must implement detect_historical()")
 
+    def new_incremental_state(self) -> Dict[str, Any]:
+        """
+        Create the per-series state consumed by detect_incremental().
+
+        The state holds only what the next candle's detection needs (e.g. the
+        last two bars for FVG), so it can be kept between fetch cycles.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} must implement new_incremental_state()")
+
+    def detect_incremental(
+        self,
+        state: Dict[str, Any],
+        timestamps,
+        opens,
+        highs,
+        lows,
+        closes
+    ) -> List[Dict[str, Any]]:
+        """
+        Detect patterns on newly closed candles only (tail-only detection).
+
+        Feeding a series in any number of chunks yields the same patterns as
+        detect_historical(df, skip_overlap=True) over the whole series.
+
+        Args:
+            state: State from new_incremental_state(), updated in place
+            timestamps, opens, highs, lows, closes: Arrays of the new candles, oldest first
+
+        Returns:
+            Raw patterns found on the new candles (same dicts as detect_historical();
+            detected_at counts candles fed into the state)
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} must implement detect_incremental()")
+
+    def _incremental_pattern(
+        self,
+        direction: str,
+        zone_low: float,
+        zone_high: float,
+        bar_index: int,
+        timestamp
+    ) -> Dict[str, Any]:
+        return {
+            'pattern_type': self.pattern_type,
+            'direction': direction,
+            'zone_high': zone_high,
+            'zone_low': zone_low,
+            'detected_at': bar_index,
+            'detected_ts': int(timestamp)
+        }
+
     def get_candles_df(self, symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
         """Get candles as DataFrame"""
         from app.services.aggregator import get_candles_as_dataframe
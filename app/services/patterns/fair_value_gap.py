@@ -7,10 +7,14 @@ Detects price gaps where:
 
 These gaps often get "filled" when price returns to them.
 """
+from collections import deque
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 from app.services.patterns.base import PatternDetector
-from app.models import Symbol
+from app.services.patterns import kernels
+from app.services.patterns.zone_index import ZoneOverlapIndex
+from app.services.symbol_registry import get_symbol_id
 from app.config import Config
 
 
@@ -54,8 +58,8 @@ class FVGDetector(PatternDetector):
         if df.empty or len(df) < 3:
             return []
 
-        sym = Symbol.query.filter_by(symbol=symbol).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol)
+        if symbol_id is None:
             return []
 
         # Use shared detection algorithm (skip_overlap=True since we check DB overlap below)
@@ -70,11 +74,11 @@ class FVGDetector(PatternDetector):
             detected_at = raw['detected_ts']
 
             # Check DB overlap (production uses persistent pattern storage)
-            if self.has_overlapping_pattern(sym.id, timeframe, direction, zone_low, zone_high):
+            if self.has_overlapping_pattern(symbol_id, timeframe, direction, zone_low, zone_high):
                 continue
 
             pattern_dict = self.save_pattern(
-                sym.id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
+                symbol_id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
                 precomputed=precomputed
             )
             if pattern_dict:
@@ -90,7 +94,8 @@ class FVGDetector(PatternDetector):
         df: pd.DataFrame,
         min_zone_pct: float = None,
         skip_overlap: bool = False,
-        verbose: int = 0
+        verbose: int = 0,
+        vectorized: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Detect FVG patterns in historical data WITHOUT database interaction.
@@ -101,12 +106,15 @@ class FVGDetector(PatternDetector):
             min_zone_pct: Minimum zone size as % of price (None = use Config.MIN_ZONE_PERCENT)
             skip_overlap: If True, skip overlap detection (faster for backtesting)
             verbose: 0=silent, 1=summary only, 2=detailed timing
+            vectorized: Find candidates with array ops and dedup with a sorted zone
+                        index (default); False runs the per-candle reference loop.
+                        Both give identical patterns; the Numba kernel is used
+                        instead when available.
 
         Returns:
             List of detected patterns (dicts with zone_high, zone_low, direction, detected_at, etc.)
         """
         from app.config import Config
-        import numpy as np
         from datetime import datetime, timezone
 
         if df.empty or len(df) < 3:
@@ -122,6 +130,28 @@ class FVGDetector(PatternDetector):
 
         t1 = datetime.now(timezone.utc)
         n = len(df)
+
+        if kernels.jit_enabled():
+            patterns = kernels.build_patterns(
+                self.pattern_type,
+                *kernels.fvg_kernel(
+                    np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64),
+                    float(min_zone), bool(skip_overlap), float(Config.DEFAULT_OVERLAP_THRESHOLD)
+                ),
+                timestamps
+            )
+            if verbose >= 1 and len(patterns) > 0:
+                print(f"      [FVG] Found {len(patterns)} patterns in {n:,} candles (jit)", flush=True)
+            return patterns
+
+        if vectorized:
+            patterns = self._detect_historical_vectorized(
+                highs, lows, timestamps, min_zone, skip_overlap, Config.DEFAULT_OVERLAP_THRESHOLD
+            )
+            if verbose >= 1 and len(patterns) > 0:
+                print(f"      [FVG] Found {len(patterns)} patterns in {n:,} candles (vectorized)", flush=True)
+            return patterns
+
         patterns = []
 
         # Pre-allocate numpy arrays for overlap tracking (avoids O(n²) list-to-array conversions)
@@ -259,6 +289,93 @@ class FVGDetector(PatternDetector):
 
         return patterns
 
+    def new_incremental_state(self) -> Dict[str, Any]:
+        """FVG state: highs/lows of the last two candles."""
+        return {'bar_index': 0, 'highs': deque(maxlen=2), 'lows': deque(maxlen=2)}
+
+    def detect_incremental(self, state, timestamps, opens, highs, lows, closes) -> List[Dict[str, Any]]:
+        """Tail-only FVG detection (see PatternDetector.detect_incremental)."""
+        min_zone = Config.MIN_ZONE_PERCENT
+        prev_highs = state['highs']
+        prev_lows = state['lows']
+        patterns = []
+
+        for k in range(len(highs)):
+            i = state['bar_index']
+            c3_high = float(highs[k])
+            c3_low = float(lows[k])
+
+            if len(prev_highs) == 2:
+                c1_high = prev_highs[0]
+                c1_low = prev_lows[0]
+
+                # Bullish FVG: Gap between c1 high and c3 low
+                if c1_high < c3_low and c1_high > 0 and ((c3_low - c1_high) / c1_high) * 100 >= min_zone:
+                    patterns.append(self._incremental_pattern('bullish', c1_high, c3_low, i, timestamps[k]))
+
+                # Bearish FVG: Gap between c1 low and c3 high
+                if c1_low > c3_high and c3_high > 0 and ((c1_low - c3_high) / c3_high) * 100 >= min_zone:
+                    patterns.append(self._incremental_pattern('bearish', c3_high, c1_low, i, timestamps[k]))
+
+            prev_highs.append(c3_high)
+            prev_lows.append(c3_low)
+            state['bar_index'] = i + 1
+
+        return patterns
+
+    def _detect_historical_vectorized(
+        self,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        timestamps: Optional[np.ndarray],
+        min_zone: float,
+        skip_overlap: bool,
+        overlap_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Array-op FVG detection: every candidate at once, then keep-first overlap
+        dedup per direction through a ZoneOverlapIndex (O(log k) per candidate).
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        c1_high, c1_low = highs[:-2], lows[:-2]
+        c3_high, c3_low = highs[2:], lows[2:]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Bullish FVG: c1 high < c3 low, zone [c1 high, c3 low]
+            bullish = (c1_high < c3_low) & (c1_high > 0)
+            bullish &= ((c3_low - c1_high) / c1_high) * 100 >= min_zone
+            # Bearish FVG: c1 low > c3 high, zone [c3 high, c1 low]
+            bearish = (c1_low > c3_high) & (c3_high > 0)
+            bearish &= ((c1_low - c3_high) / c3_high) * 100 >= min_zone
+
+        bull_at = np.flatnonzero(bullish)
+        bear_at = np.flatnonzero(bearish)
+        bull_lows, bull_highs = c1_high[bull_at], c3_low[bull_at]
+        bear_lows, bear_highs = c3_high[bear_at], c1_low[bear_at]
+
+        if not skip_overlap:
+            keep = ZoneOverlapIndex(overlap_threshold).filter(bull_lows, bull_highs)
+            bull_at, bull_lows, bull_highs = bull_at[keep], bull_lows[keep], bull_highs[keep]
+            keep = ZoneOverlapIndex(overlap_threshold).filter(bear_lows, bear_highs)
+            bear_at, bear_lows, bear_highs = bear_at[keep], bear_lows[keep], bear_highs[keep]
+
+        # A candle can't close both a bullish and a bearish gap, so ordering by index is total
+        detected_at = np.concatenate([bull_at, bear_at]) + 2
+        order = np.argsort(detected_at, kind='stable')
+        directions = np.concatenate([
+            np.full(len(bull_at), kernels.BULLISH, dtype=np.int8),
+            np.full(len(bear_at), kernels.BEARISH, dtype=np.int8)
+        ])
+        return kernels.build_patterns(
+            self.pattern_type,
+            detected_at[order],
+            directions[order],
+            np.concatenate([bull_lows, bear_lows])[order],
+            np.concatenate([bull_highs, bear_highs])[order],
+            timestamps
+        )
+
     def _is_valid_historical_pattern(
         self,
         zone_low: float,
@@ -0,0 +1,323 @@
+"""
+Pattern Detection Kernels
+Optional Numba-compiled loops for FVG, Order Block and Liquidity Sweep detection
+
+Usage:
+    from app.services.patterns import kernels
+
+    if kernels.jit_enabled():
+        idx, dirs, lows, highs = kernels.fvg_kernel(highs, lows, min_zone, skip_overlap, threshold)
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so kernels stay plain Python functions without Numba."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+BULLISH = 1
+BEARISH = -1
+
+
+def jit_enabled() -> bool:
+    """Whether detectors should use the compiled kernels."""
+    return HAS_NUMBA and getattr(Config, 'PATTERN_JIT_ENABLED', True)
+
+
+@njit(cache=True)
+def _overlaps_seen(seen_lows, seen_highs, count, zone_low, zone_high, threshold):
+    """True if the zone overlaps any of the first `count` seen zones by >= threshold."""
+    zone_size = zone_high - zone_low
+    for k in range(count):
+        overlap = min(seen_highs[k], zone_high) - max(seen_lows[k], zone_low)
+        if overlap < 0.0:
+            overlap = 0.0
+        smaller = min(seen_highs[k] - seen_lows[k], zone_size)
+        if smaller > 0.0 and overlap / smaller >= threshold:
+            return True
+    return False
+
+
+@njit(cache=True)
+def fvg_kernel(highs, lows, min_zone, skip_overlap, threshold):
+    """
+    Fair Value Gap detection loop (see FVGDetector.detect_historical).
+
+    Returns:
+        (detected_at int64[], direction int8[], zone_low float64[], zone_high float64[])
+    """
+    n = len(highs)
+    out_idx = np.empty(2 * n, dtype=np.int64)
+    out_dir = np.empty(2 * n, dtype=np.int8)
+    out_low = np.empty(2 * n, dtype=np.float64)
+    out_high = np.empty(2 * n, dtype=np.float64)
+    bull_lows = np.empty(n, dtype=np.float64)
+    bull_highs = np.empty(n, dtype=np.float64)
+    bear_lows = np.empty(n, dtype=np.float64)
+    bear_highs = np.empty(n, dtype=np.float64)
+    n_bull = 0
+    n_bear = 0
+    count = 0
+
+    for i in range(2, n):
+        c1_high = highs[i - 2]
+        c1_low = lows[i - 2]
+        c3_high = highs[i]
+        c3_low = lows[i]
+
+        # Bullish FVG: gap between c1 high and c3 low
+        if c1_high < c3_low:
+            zone_low = c1_high
+            zone_high = c3_low
+            if zone_low > 0 and ((zone_high - zone_low) / zone_low) * 100 >= min_zone:
+                is_valid = True
+                if not skip_overlap:
+                    if _overlaps_seen(bull_lows, bull_highs, n_bull, zone_low, zone_high, threshold):
+                        is_valid = False
+                    else:
+                        bull_lows[n_bull] = zone_low
+                        bull_highs[n_bull] = zone_high
+                        n_bull += 1
+                if is_valid:
+                    out_idx[count] = i
+                    out_dir[count] = BULLISH
+                    out_low[count] = zone_low
+                    out_high[count] = zone_high
+                    count += 1
+
+        # Bearish FVG: gap between c1 low and c3 high
+        if c1_low > c3_high:
+            zone_high = c1_low
+            zone_low = c3_high
+            if zone_low > 0 and ((zone_high - zone_low) / zone_low) * 100 >= min_zone:
+                is_valid = True
+                if not skip_overlap:
+                    if _overlaps_seen(bear_lows, bear_highs, n_bear, zone_low, zone_high, threshold):
+                        is_valid = False
+                    else:
+                        bear_lows[n_bear] = zone_low
+                        bear_highs[n_bear] = zone_high
+                        n_bear += 1
+                if is_valid:
+                    out_idx[count] = i
+                    out_dir[count] = BEARISH
+                    out_low[count] = zone_low
+                    out_high[count] = zone_high
+                    count += 1
+
+    return out_idx[:count], out_dir[:count], out_low[:count], out_high[:count]
+
+
+@njit(cache=True)
+def order_block_kernel(opens, closes, avg_body, strength, min_zone, skip_overlap, threshold):
+    """
+    Order Block detection loop (see OrderBlockDetector.detect_historical).
+
+    avg_body is the 20-candle rolling mean of |close - open| (NaN during warm-up),
+    computed by the caller so it matches the pandas rolling mean exactly.
+
+    Returns:
+        (detected_at int64[], direction int8[], zone_low float64[], zone_high float64[])
+    """
+    n = len(opens)
+    out_idx = np.empty(n, dtype=np.int64)
+    out_dir = np.empty(n, dtype=np.int8)
+    out_low = np.empty(n, dtype=np.float64)
+    out_high = np.empty(n, dtype=np.float64)
+    bull_lows = np.empty(n, dtype=np.float64)
+    bull_highs = np.empty(n, dtype=np.float64)
+    bear_lows = np.empty(n, dtype=np.float64)
+    bear_highs = np.empty(n, dtype=np.float64)
+    n_bull = 0
+    n_bear = 0
+    count = 0
+
+    for i in range(3, n):
+        avg = avg_body[i]
+        if np.isnan(avg) or avg == 0:
+            continue
+
+        body = closes[i] - opens[i]
+        if abs(body) <= avg * strength:
+            continue
+
+        # Bullish OB: last bearish candle before a strong bullish move (and vice versa)
+        direction = BULLISH if body > 0 else BEARISH
+
+        for j in range(i - 1, max(i - 4, 0), -1):
+            opposing_body = closes[j] - opens[j]
+            if direction == BULLISH and not opposing_body < 0:
+                continue
+            if direction == BEARISH and not opposing_body > 0:
+                continue
+
+            zone_high = max(opens[j], closes[j])
+            zone_low = min(opens[j], closes[j])
+            if zone_low <= 0:
+                continue
+            if ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                continue
+
+            if not skip_overlap:
+                if direction == BULLISH:
+                    if _overlaps_seen(bull_lows, bull_highs, n_bull, zone_low, zone_high, threshold):
+                        continue
+                    bull_lows[n_bull] = zone_low
+                    bull_highs[n_bull] = zone_high
+                    n_bull += 1
+                else:
+                    if _overlaps_seen(bear_lows, bear_highs, n_bear, zone_low, zone_high, threshold):
+                        continue
+                    bear_lows[n_bear] = zone_low
+                    bear_highs[n_bear] = zone_high
+                    n_bear += 1
+
+            out_idx[count] = i
+            out_dir[count] = direction
+            out_low[count] = zone_low
+            out_high[count] = zone_high
+            count += 1
+            break
+
+    return out_idx[:count], out_dir[:count], out_low[:count], out_high[:count]
+
+
+@njit(cache=True)
+def liquidity_sweep_kernel(highs, lows, closes, swing_low_idx, swing_low_px,
+                           swing_high_idx, swing_high_px, min_zone, skip_overlap, threshold):
+    """
+    Liquidity Sweep detection loop (see LiquiditySweepDetector.detect_historical).
+
+    Swing points (sorted by index) come from find_swing_points_fast().
+
+    Returns:
+        (detected_at int64[], direction int8[], zone_low float64[], zone_high float64[],
+         swept_level float64[])
+    """
+    n = len(highs)
+    out_idx = np.empty(2 * n, dtype=np.int64)
+    out_dir = np.empty(2 * n, dtype=np.int8)
+    out_low = np.empty(2 * n, dtype=np.float64)
+    out_high = np.empty(2 * n, dtype=np.float64)
+    out_swept = np.empty(2 * n, dtype=np.float64)
+    bull_lows = np.empty(n, dtype=np.float64)
+    bull_highs = np.empty(n, dtype=np.float64)
+    bear_lows = np.empty(n, dtype=np.float64)
+    bear_highs = np.empty(n, dtype=np.float64)
+    n_bull = 0
+    n_bear = 0
+    count = 0
+
+    for i in range(10, n):
+        current_low = lows[i]
+        current_high = highs[i]
+        current_close = closes[i]
+
+        # Valid swing range: index in [i-50, i-4]
+        min_idx = i - 50
+        max_idx = i - 3
+
+        # Bullish sweep: took out a swing low and closed back above it
+        if len(swing_low_idx) > 0:
+            left = np.searchsorted(swing_low_idx, min_idx)
+            right = np.searchsorted(swing_low_idx, max_idx)
+            for j in range(left, right):
+                swing_price = swing_low_px[j]
+                if current_low < swing_price and current_close > swing_price:
+                    zone_low = current_low
+                    zone_high = swing_price
+                    if zone_high <= zone_low or zone_low <= 0:
+                        continue
+                    if ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                        continue
+
+                    is_valid = True
+                    if not skip_overlap:
+                        if _overlaps_seen(bull_lows, bull_highs, n_bull, zone_low, zone_high, threshold):
+                            is_valid = False
+                        else:
+                            bull_lows[n_bull] = zone_low
+                            bull_highs[n_bull] = zone_high
+                            n_bull += 1
+                    if is_valid:
+                        out_idx[count] = i
+                        out_dir[count] = BULLISH
+                        out_low[count] = zone_low
+                        out_high[count] = zone_high
+                        out_swept[count] = swing_price
+                        count += 1
+                    break  # Only one sweep per candle
+
+        # Bearish sweep: took out a swing high and closed back below it
+        if len(swing_high_idx) > 0:
+            left = np.searchsorted(swing_high_idx, min_idx)
+            right = np.searchsorted(swing_high_idx, max_idx)
+            for j in range(left, right):
+                swing_price = swing_high_px[j]
+                if current_high > swing_price and current_close < swing_price:
+                    zone_high = current_high
+                    zone_low = swing_price
+                    if zone_high <= zone_low or zone_low <= 0:
+                        continue
+                    if ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                        continue
+
+                    is_valid = True
+                    if not skip_overlap:
+                        if _overlaps_seen(bear_lows, bear_highs, n_bear, zone_low, zone_high, threshold):
+                            is_valid = False
+                        else:
+                            bear_lows[n_bear] = zone_low
+                            bear_highs[n_bear] = zone_high
+                            n_bear += 1
+                    if is_valid:
+                        out_idx[count] = i
+                        out_dir[count] = BEARISH
+                        out_low[count] = zone_low
+                        out_high[count] = zone_high
+                        out_swept[count] = swing_price
+                        count += 1
+                    break  # Only one sweep per candle
+
+    return out_idx[:count], out_dir[:count], out_low[:count], out_high[:count], out_swept[:count]
+
+
+def build_patterns(
+    pattern_type: str,
+    detected_at: np.ndarray,
+    directions: np.ndarray,
+    zone_lows: np.ndarray,
+    zone_highs: np.ndarray,
+    timestamps: Optional[np.ndarray],
+    swept_levels: Optional[np.ndarray] = None
+) -> List[Dict[str, Any]]:
+    """Convert kernel output arrays into detect_historical() pattern dicts."""
+    patterns = []
+    for k in range(len(detected_at)):
+        i = int(detected_at[k])
+        pattern = {
+            'pattern_type': pattern_type,
+            'direction': 'bullish' if directions[k] == BULLISH else 'bearish',
+            'zone_high': float(zone_highs[k]),
+            'zone_low': float(zone_lows[k]),
+            'detected_at': i,
+            'detected_ts': int(timestamps[i]) if timestamps is not None else None
+        }
+        if swept_levels is not None:
+            pattern['swept_level'] = float(swept_levels[k])
+        patterns.append(pattern)
+    return patterns
@@ -14,11 +14,18 @@ Bearish Liquidity Sweep (Sweep High):
 - Then reverses and closes back below the high
 - Signal to go short
 """
+from collections import deque
 from typing import List, Dict, Any, Optional
 import pandas as pd
 from app.services.patterns.base import PatternDetector
-from app.models import Symbol, Pattern
-from app import db
+from app.services.patterns import kernels
+from app.services.symbol_registry import get_symbol_id
+
+# Swing points used for sweep detection: extreme of a (2 * lookback + 1)-candle window
+SWEEP_SWING_LOOKBACK = 3
+
+# Series shorter than this produce no sweeps
+SWEEP_MIN_CANDLES = 20
 
 
 class LiquiditySweepDetector(PatternDetector):
@@ -32,40 +39,22 @@ class LiquiditySweepDetector(PatternDetector):
         return 'liquidity_sweep'
 
     def find_swing_points(self, df: pd.DataFrame, lookback: int = 5) -> tuple:
-        """Find swing highs and swing lows"""
-        swing_highs = []
-        swing_lows = []
-
-        for i in range(lookback, len(df) - lookback):
-            # Check for swing high
-            is_swing_high = True
-            for j in range(1, lookback + 1):
-                if df.iloc[i]['high'] <= df.iloc[i - j]['high'] or \
-                   df.iloc[i]['high'] <= df.iloc[i + j]['high']:
-                    is_swing_high = False
-                    break
-
-            if is_swing_high:
-                swing_highs.append({
-                    'index': i,
-                    'price': df.iloc[i]['high'],
-                    'timestamp': df.iloc[i]['timestamp']
-                })
-
-            # Check for swing low
-            is_swing_low = True
-            for j in range(1, lookback + 1):
-                if df.iloc[i]['low'] >= df.iloc[i - j]['low'] or \
-                   df.iloc[i]['low'] >= df.iloc[i + j]['low']:
-                    is_swing_low = False
-                    break
-
-            if is_swing_low:
-                swing_lows.append({
-                    'index': i,
-                    'price': df.iloc[i]['low'],
-                    'timestamp': df.iloc[i]['timestamp']
-                })
+        """Find swing highs and swing lows (strictly beyond `lookback` candles each side)"""
+        import numpy as np
+        from app.services.indicators import swing_mask
+
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        timestamps = df['timestamp'].to_numpy()
+
+        swing_highs = [
+            {'index': int(i), 'price': float(highs[i]), 'timestamp': int(timestamps[i])}
+            for i in np.flatnonzero(swing_mask(highs, lookback, 'high'))
+        ]
+        swing_lows = [
+            {'index': int(i), 'price': float(lows[i]), 'timestamp': int(timestamps[i])}
+            for i in np.flatnonzero(swing_mask(lows, lookback, 'low'))
+        ]
 
         return swing_highs, swing_lows
 
@@ -143,11 +132,11 @@ class LiquiditySweepDetector(PatternDetector):
         if df is None:
             df = self.get_candles_df(symbol, timeframe, limit)
 
-        if df.empty or len(df) < 20:
+        if df.empty or len(df) < SWEEP_MIN_CANDLES:
             return []
 
-        sym = Symbol.query.filter_by(symbol=symbol).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol)
+        if symbol_id is None:
             return []
 
         # Use shared detection algorithm (skip_overlap=True since we check DB overlap below)
@@ -163,11 +152,11 @@ class LiquiditySweepDetector(PatternDetector):
             swept_level = raw.get('swept_level')
 
             # Check DB overlap (production uses persistent pattern storage)
-            if self.has_overlapping_pattern(sym.id, timeframe, direction, zone_low, zone_high):
+            if self.has_overlapping_pattern(symbol_id, timeframe, direction, zone_low, zone_high):
                 continue
 
             pattern_dict = self.save_pattern(
-                sym.id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
+                symbol_id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
                 precomputed=precomputed
             )
             if pattern_dict:
@@ -209,48 +198,12 @@ class LiquiditySweepDetector(PatternDetector):
             else:
                 return {**pattern, 'status': 'active', 'fill_percentage': 50}
 
-    def update_pattern_status(self, symbol: str, timeframe: str, current_price: float, commit: bool = True) -> int:
-        """
-        Update the status of all active liquidity sweep patterns
-
-        Args:
-            symbol: Trading pair
-            timeframe: Timeframe
-            current_price: Current market price
-            commit: Whether to commit immediately (False for batching)
-
-        Returns:
-            Number of patterns updated
-        """
-        sym = Symbol.query.filter_by(symbol=symbol).first()
-        if not sym:
-            return 0
-
-        patterns = Pattern.query.filter_by(
-            symbol_id=sym.id,
-            timeframe=timeframe,
-            pattern_type='liquidity_sweep',
-            status='active'
-        ).all()
-
-        updated = 0
-        for pattern in patterns:
-            pattern_dict = pattern.to_dict()
-            pattern_dict['direction'] = pattern.direction
-
-            result = self.check_fill(pattern_dict, current_price)
-
-            if result['status'] != pattern.status:
-                pattern.status = result['status']
-                if result['status'] == 'filled':
-                    pattern.filled_at = int(pd.Timestamp.now(tz="UTC").timestamp() * 1000)
-                updated += 1
-
-            pattern.fill_percentage = result.get('fill_percentage', 0)
-
-        if commit:
-            db.session.commit()
-        return updated
+    def status_band(self, direction: str, zone_low: float, zone_high: float) -> tuple:
+        """Invalidation and fill levels of check_fill() (one and two zone sizes beyond the zone)."""
+        zone_size = zone_high - zone_low
+        if direction == 'bullish':
+            return zone_low - zone_size, zone_high + zone_size * 2
+        return zone_low - zone_size * 2, zone_high + zone_size
 
     def detect_historical(
         self,
@@ -276,7 +229,7 @@ class LiquiditySweepDetector(PatternDetector):
         import numpy as np
         from datetime import datetime, timezone
 
-        if df.empty or len(df) < 20:
+        if df.empty or len(df) < SWEEP_MIN_CANDLES:
             return []
 
         t0 = datetime.now(timezone.utc)
@@ -293,10 +246,27 @@ class LiquiditySweepDetector(PatternDetector):
         n = len(df)
 
         # Find swing points using numpy arrays (fast)
-        swing_highs, swing_lows = self.find_swing_points_fast(highs, lows, timestamps, lookback=3)
+        swing_highs, swing_lows = self.find_swing_points_fast(highs, lows, timestamps, lookback=SWEEP_SWING_LOOKBACK)
 
         t2 = datetime.now(timezone.utc)
 
+        if kernels.jit_enabled():
+            detected_at, directions, zone_lows, zone_highs, swept = kernels.liquidity_sweep_kernel(
+                np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64),
+                np.asarray(closes, dtype=np.float64),
+                np.array([s['index'] for s in swing_lows], dtype=np.int64),
+                np.array([s['price'] for s in swing_lows], dtype=np.float64),
+                np.array([s['index'] for s in swing_highs], dtype=np.int64),
+                np.array([s['price'] for s in swing_highs], dtype=np.float64),
+                float(min_zone), bool(skip_overlap), float(Config.DEFAULT_OVERLAP_THRESHOLD)
+            )
+            patterns = kernels.build_patterns(
+                self.pattern_type, detected_at, directions, zone_lows, zone_highs, timestamps, swept
+            )
+            if verbose >= 1 and len(patterns) > 0:
+                print(f"      [LS] Found {len(patterns)} patterns in {n:,} candles (jit)", flush=True)
+            return patterns
+
         # Pre-allocate numpy arrays for overlap tracking (avoids O(n²) list-to-array conversions)
         # Initial capacity of 64, doubles when full (amortized O(1) append)
         initial_capacity = 64
@@ -478,6 +448,89 @@ class LiquiditySweepDetector(PatternDetector):
 
         return patterns
 
+    def new_incremental_state(self) -> Dict[str, Any]:
+        """
+        Liquidity Sweep state: the last 7 candles (to confirm the swing 3 bars
+        back), the swing points of the last 50 candles, and sweeps found before
+        the series reached SWEEP_MIN_CANDLES (held back, as a full scan would).
+        """
+        return {
+            'bar_index': 0,
+            'window': deque(maxlen=2 * SWEEP_SWING_LOOKBACK + 1),
+            'swing_highs': deque(),
+            'swing_lows': deque(),
+            'pending': [],
+        }
+
+    def detect_incremental(self, state, timestamps, opens, highs, lows, closes) -> List[Dict[str, Any]]:
+        """Tail-only Liquidity Sweep detection (see PatternDetector.detect_incremental)."""
+        from app.config import Config
+
+        min_zone = Config.MIN_ZONE_PERCENT
+        window = state['window']
+        swing_highs = state['swing_highs']
+        swing_lows = state['swing_lows']
+        pending = state.setdefault('pending', [])
+        patterns = []
+
+        for k in range(len(highs)):
+            i = state['bar_index']
+            # Sweeps of a series shorter than SWEEP_MIN_CANDLES wait until it is long enough
+            found = pending if i < SWEEP_MIN_CANDLES else patterns
+            current_high = float(highs[k])
+            current_low = float(lows[k])
+            current_close = float(closes[k])
+
+            # Valid swings: index in [i-50, i-4]; swings are confirmed 3 bars late,
+            # so everything still held is <= i-4
+            while swing_lows and swing_lows[0][0] < i - 50:
+                swing_lows.popleft()
+            while swing_highs and swing_highs[0][0] < i - 50:
+                swing_highs.popleft()
+
+            if i >= 10:
+                # Bullish sweep: took out a swing low and closed back above it
+                for _, swing_price in swing_lows:
+                    if current_low < swing_price and current_close > swing_price:
+                        zone_low, zone_high = current_low, swing_price
+                        if zone_high <= zone_low or zone_low <= 0:
+                            continue
+                        if ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                            continue
+                        pattern = self._incremental_pattern('bullish', zone_low, zone_high, i, timestamps[k])
+                        pattern['swept_level'] = swing_price
+                        found.append(pattern)
+                        break  # Only one sweep per candle
+
+                # Bearish sweep: took out a swing high and closed back below it
+                for _, swing_price in swing_highs:
+                    if current_high > swing_price and current_close < swing_price:
+                        zone_high, zone_low = current_high, swing_price
+                        if zone_high <= zone_low or zone_low <= 0:
+                            continue
+                        if ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                            continue
+                        pattern = self._incremental_pattern('bearish', zone_low, zone_high, i, timestamps[k])
+                        pattern['swept_level'] = swing_price
+                        found.append(pattern)
+                        break  # Only one sweep per candle
+
+            # Confirm the candle SWEEP_SWING_LOOKBACK bars back as a swing point
+            window.append((current_high, current_low))
+            if len(window) == window.maxlen:
+                center_high, center_low = window[SWEEP_SWING_LOOKBACK]
+                if center_high == max(h for h, _ in window):
+                    swing_highs.append((i - SWEEP_SWING_LOOKBACK, center_high))
+                if center_low == min(low for _, low in window):
+                    swing_lows.append((i - SWEEP_SWING_LOOKBACK, center_low))
+
+            state['bar_index'] = i + 1
+            if i + 1 == SWEEP_MIN_CANDLES:
+                patterns.extend(pending)
+                pending.clear()
+
+        return patterns
+
     def _is_valid_historical_sweep(
         self,
         zone_low: float,
@@ -12,10 +12,13 @@ Bearish Order Block:
 - The last bullish (green) candle before a strong bearish move
 - Price often returns to this zone before continuing down
 """
+import math
+from collections import deque
 from typing import List, Dict, Any, Optional
 import pandas as pd
 from app.services.patterns.base import PatternDetector
-from app.models import Symbol
+from app.services.patterns import kernels
+from app.services.symbol_registry import get_symbol_id
 from app.config import Config
 
 
@@ -59,8 +62,8 @@ class OrderBlockDetector(PatternDetector):
         if df.empty or len(df) < 5:
             return []
 
-        sym = Symbol.query.filter_by(symbol=symbol).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol)
+        if symbol_id is None:
             return []
 
         # Use shared detection algorithm (skip_overlap=True since we check DB overlap below)
@@ -75,11 +78,11 @@ class OrderBlockDetector(PatternDetector):
             detected_at = raw['detected_ts']
 
             # Check DB overlap (production uses persistent pattern storage)
-            if self.has_overlapping_pattern(sym.id, timeframe, direction, zone_low, zone_high):
+            if self.has_overlapping_pattern(symbol_id, timeframe, direction, zone_low, zone_high):
                 continue
 
             pattern_dict = self.save_pattern(
-                sym.id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
+                symbol_id, timeframe, direction, zone_low, zone_high, detected_at, symbol, df,
                 precomputed=precomputed
             )
             if pattern_dict:
@@ -139,6 +142,20 @@ class OrderBlockDetector(PatternDetector):
 
         t2 = datetime.now(timezone.utc)
 
+        if kernels.jit_enabled():
+            patterns = kernels.build_patterns(
+                self.pattern_type,
+                *kernels.order_block_kernel(
+                    np.asarray(opens, dtype=np.float64), np.asarray(closes, dtype=np.float64),
+                    np.asarray(avg_body, dtype=np.float64), float(Config.ORDER_BLOCK_STRENGTH_MULTIPLIER),
+                    float(min_zone), bool(skip_overlap), float(Config.DEFAULT_OVERLAP_THRESHOLD)
+                ),
+                timestamps
+            )
+            if verbose >= 1 and len(patterns) > 0:
+                print(f"      [OB] Found {len(patterns)} patterns in {n:,} candles (jit)", flush=True)
+            return patterns
+
         # For overlap tracking - use numpy arrays for fast vectorized checking
         seen_bullish_lows = []
         seen_bullish_highs = []
@@ -196,6 +213,47 @@ class OrderBlockDetector(PatternDetector):
 
         return patterns
 
+    def new_incremental_state(self) -> Dict[str, Any]:
+        """Order Block state: the 20-candle body-size window and the last 3 candles."""
+        return {'bar_index': 0, 'bodies': deque(maxlen=20), 'recent': deque(maxlen=3)}
+
+    def detect_incremental(self, state, timestamps, opens, highs, lows, closes) -> List[Dict[str, Any]]:
+        """Tail-only Order Block detection (see PatternDetector.detect_incremental)."""
+        min_zone = Config.MIN_ZONE_PERCENT
+        bodies = state['bodies']
+        recent = state['recent']
+        patterns = []
+
+        for k in range(len(opens)):
+            i = state['bar_index']
+            open_ = float(opens[k])
+            close = float(closes[k])
+            body = close - open_
+            bodies.append(abs(body))
+
+            # Rolling average body size over the last 20 candles (incl. this one)
+            if i >= 3 and len(bodies) == bodies.maxlen:
+                avg = math.fsum(bodies) / len(bodies)
+                if avg != 0 and abs(body) > avg * Config.ORDER_BLOCK_STRENGTH_MULTIPLIER and body != 0:
+                    direction = 'bullish' if body > 0 else 'bearish'
+
+                    # Last opposing candle among the previous 3
+                    for prev_open, prev_close in reversed(recent):
+                        prev_body = prev_close - prev_open
+                        if (direction == 'bullish' and prev_body >= 0) or (direction == 'bearish' and prev_body <= 0):
+                            continue
+                        zone_high = max(prev_open, prev_close)
+                        zone_low = min(prev_open, prev_close)
+                        if zone_low <= 0 or ((zone_high - zone_low) / zone_low) * 100 < min_zone:
+                            continue
+                        patterns.append(self._incremental_pattern(direction, zone_low, zone_high, i, timestamps[k]))
+                        break
+
+            recent.append((open_, close))
+            state['bar_index'] = i + 1
+
+        return patterns
+
     def _find_historical_opposing_candle_fast(
         self,
         opens: 'np.ndarray',
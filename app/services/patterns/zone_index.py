@@ -0,0 +1,130 @@
+"""
+Zone Overlap Index
+Size-bucketed interval structure for "keep first, drop overlapping zones" deduplication
+
+Usage:
+    index = ZoneOverlapIndex(threshold=0.7)
+    keep = index.filter(zone_lows, zone_highs)   # bool mask, in candidate order
+"""
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# Entries per block of a size bucket (blocks split at twice this)
+BLOCK_SIZE = 256
+
+
+class _SortedZones:
+    """
+    Zones of one size class sorted by low, stored as a list of sorted blocks.
+
+    Insertion is a bisect plus an insert into one block; splitting a full
+    block shifts the (short) block list, not the zones.
+    """
+
+    def __init__(self):
+        self._lows: List[List[float]] = []
+        self._highs: List[List[float]] = []
+        self._last_lows: List[float] = []  # Largest low of each block
+
+    def insert(self, zone_low: float, zone_high: float) -> None:
+        if not self._lows:
+            self._lows.append([zone_low])
+            self._highs.append([zone_high])
+            self._last_lows.append(zone_low)
+            return
+
+        b = min(bisect_right(self._last_lows, zone_low), len(self._lows) - 1)
+        lows, highs = self._lows[b], self._highs[b]
+        pos = bisect_right(lows, zone_low)
+        lows.insert(pos, zone_low)
+        highs.insert(pos, zone_high)
+        self._last_lows[b] = lows[-1]
+
+        if len(lows) > 2 * BLOCK_SIZE:
+            self._lows.insert(b + 1, lows[BLOCK_SIZE:])
+            self._highs.insert(b + 1, highs[BLOCK_SIZE:])
+            del lows[BLOCK_SIZE:]
+            del highs[BLOCK_SIZE:]
+            self._last_lows[b] = lows[-1]
+            self._last_lows.insert(b + 1, self._lows[b + 1][-1])
+
+    def scan(self, start: float, stop: float) -> Iterator[Tuple[float, float]]:
+        """(low, high) of zones with start <= low <= stop, in low order."""
+        for b in range(bisect_left(self._last_lows, start), len(self._lows)):
+            lows, highs = self._lows[b], self._highs[b]
+            for k in range(bisect_left(lows, start), len(lows)):
+                if lows[k] > stop:
+                    return
+                yield lows[k], highs[k]
+
+
+class ZoneOverlapIndex:
+    """
+    Kept zones bucketed by size, answering 'overlaps any kept zone by >= threshold'.
+
+    Overlap is measured against the smaller of the two zones. Size class c
+    holds zones with sizes in [2^(c-1), 2^c).
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._buckets: Dict[int, _SortedZones] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def overlaps(self, zone_low: float, zone_high: float) -> bool:
+        """Whether the zone overlaps any kept zone by >= threshold."""
+        if not self._count:
+            return False
+        if self.threshold <= 0:
+            return True
+
+        size = zone_high - zone_low
+        for size_class, bucket in self._buckets.items():
+            # Zones of this class are shorter than 2^class, so they start after
+            # zone_low - 2^class (small margin for rounding in high - low)
+            start = zone_low - math.ldexp(1.0, size_class) - abs(zone_low) * 1e-12
+            # Zones kept through add_if_new() start >= size * (1 - threshold) apart
+            # within a class, and any kept zone inside the candidate matches, so
+            # only the few near its edges are scanned (unbounded for threshold 1.0)
+            for kept_low, kept_high in bucket.scan(start, zone_high):
+                overlap = min(kept_high, zone_high) - max(kept_low, zone_low)
+                if overlap <= 0:
+                    continue
+                smaller = min(kept_high - kept_low, size)
+                if smaller > 0 and overlap / smaller >= self.threshold:
+                    return True
+        return False
+
+    def add(self, zone_low: float, zone_high: float) -> None:
+        """Keep a zone."""
+        size_class = math.frexp(zone_high - zone_low)[1]
+        bucket = self._buckets.get(size_class)
+        if bucket is None:
+            bucket = self._buckets[size_class] = _SortedZones()
+        bucket.insert(zone_low, zone_high)
+        self._count += 1
+
+    def add_if_new(self, zone_low: float, zone_high: float) -> bool:
+        """Keep the zone unless it overlaps a kept zone; returns whether it was kept."""
+        if self.overlaps(zone_low, zone_high):
+            return False
+        self.add(zone_low, zone_high)
+        return True
+
+    def filter(self, zone_lows: np.ndarray, zone_highs: np.ndarray) -> np.ndarray:
+        """
+        Keep-first deduplication of candidate zones, in order.
+
+        Returns:
+            Boolean mask of the candidates that were kept
+        """
+        keep = np.zeros(len(zone_lows), dtype=bool)
+        for k, (zone_low, zone_high) in enumerate(zip(zone_lows.tolist(), zone_highs.tolist())):
+            keep[k] = self.add_if_new(zone_low, zone_high)
+        return keep
@@ -0,0 +1,299 @@
+"""
+Exchange Rate Scheduler
+Weight-aware token bucket shared by every exchange caller in the process
+
+Usage:
+    from app.services.rate_scheduler import attach_rate_scheduler, PRIORITY_BACKFILL
+
+    exchange = attach_rate_scheduler(ccxt_async.binance({...}), PRIORITY_BACKFILL)
+    await exchange.fetch_ohlcv('BTC/USDT', '1m')  # Waits for its turn
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import ccxt
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower is served first)
+PRIORITY_LIVE = 0      # Minute fetch / kline stream backfill
+PRIORITY_HEALTH = 1    # Health checks, admin lookups
+PRIORITY_REPAIR = 2    # Gap repair, on-demand fetches
+PRIORITY_BACKFILL = 3  # Historical backfill
+
+# Share of the per-minute budget each priority may use
+PRIORITY_SHARES = {
+    PRIORITY_LIVE: 1.0,
+    PRIORITY_HEALTH: 1.0,
+    PRIORITY_REPAIR: 0.8,
+    PRIORITY_BACKFILL: 0.6,
+}
+
+BURST_SECONDS = 5.0  # Bucket capacity, in seconds of refill
+USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+DEFAULT_PAUSE_SECONDS = 30
+BLOCKING_YIELD_SECONDS = 0.05  # Re-check interval of a blocking caller outranked by a queued waiter
+
+
+class RateScheduler:
+    """Token bucket in exchange request weight, with per-minute priority shares."""
+
+    def __init__(
+        self,
+        weight_per_minute: int = 6000,
+        headroom: float = 0.9,
+        burst_seconds: float = BURST_SECONDS,
+        clock: Callable[[], float] = time.time
+    ):
+        self.weight_per_minute = weight_per_minute
+        self.budget = weight_per_minute * headroom
+        self.rate = self.budget / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._window = int(self._updated // 60)
+        self._window_used = 0.0
+        self._paused_until = 0.0
+        self._waiters = []  # Heap of (priority, seq, weight, future)
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.granted = {priority: 0.0 for priority in PRIORITY_SHARES}
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        window = int(now // 60)
+        if window != self._window:
+            self._window = window
+            self._window_used = 0.0
+
+    def _delay(self, weight: float, priority: int, now: float) -> float:
+        """Seconds until `weight` can be granted at `priority` (0 = now). Caller holds the lock."""
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        ceiling = self.budget * PRIORITY_SHARES.get(priority, 1.0)
+        if self._window_used > 0 and self._window_used + weight > ceiling:
+            return (self._window + 1) * 60 - now
+        # A request heavier than the bucket only waits for a full bucket
+        if self._tokens < min(weight, self.capacity):
+            return (min(weight, self.capacity) - self._tokens) / self.rate
+        return 0.0
+
+    def _outranked_delay(self, priority: int, now: float) -> Optional[float]:
+        """Delay of the first queued waiter ahead of `priority` (None if there is none). Caller holds the lock."""
+        for waiter_priority, _, weight, future in sorted(self._waiters):
+            if waiter_priority >= priority:
+                return None
+            # A closed loop's waiters are never served (acquire() drops them on the next loop)
+            if not future.done() and not future.get_loop().is_closed():
+                return self._delay(weight, waiter_priority, now)
+        return None
+
+    def _take(self, weight: float, priority: int) -> None:
+        self._tokens -= weight
+        self._window_used += weight
+        self.granted[priority] = self.granted.get(priority, 0.0) + weight
+
+    async def acquire(self, weight: float = 1.0, priority: int = PRIORITY_LIVE) -> None:
+        """Wait until `weight` may be spent at `priority`."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                # New event loop (e.g. a later asyncio.run): the old loop's waiters are gone
+                self._waiters = []
+                self._timer = None
+                self._loop = loop
+            if not self._waiters and self._delay(weight, priority, self.clock()) == 0:
+                self._take(weight, priority)
+                return
+            future = loop.create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), weight, future))
+            self._dispatch()
+        await future
+
+    def _dispatch(self) -> None:
+        """Grant waiters in priority order; re-arm the timer for the first blocked one."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            priority, _, weight, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(weight, priority, self.clock())
+            if delay > 0:
+                self._timer = self._loop.call_later(delay, self._on_timer)
+                return
+            heapq.heappop(self._waiters)
+            self._take(weight, priority)
+            future.set_result(None)
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def acquire_blocking(self, weight: float = 1.0, priority: int = PRIORITY_LIVE) -> None:
+        """
+        Blocking acquire for synchronous (threaded) ccxt callers.
+
+        Waits while an async waiter with a higher priority is queued, so a
+        health or repair thread cannot spend the tokens a queued live fetch
+        is waiting for.
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                ahead = self._outranked_delay(priority, now)
+                if ahead is not None:
+                    delay = max(ahead, BLOCKING_YIELD_SECONDS)
+                else:
+                    delay = self._delay(weight, priority, now)
+                    if delay == 0:
+                        self._take(weight, priority)
+                        return
+            time.sleep(delay)
+
+    def observe_used_weight(self, used: float) -> None:
+        """Sync with the weight the exchange reports for the current minute."""
+        with self._lock:
+            self._refill(self.clock())
+            self._window_used = max(self._window_used, float(used))
+
+    def pause(self, seconds: float) -> None:
+        """Stop granting requests for `seconds` (rate limit response)."""
+        with self._lock:
+            until = self.clock() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                logger.warning(f"Exchange rate limited - pausing all requests for {seconds:.0f}s")
+
+    async def backoff(self, seconds: float) -> None:
+        """Pause every caller and wait until the pause is over."""
+        self.pause(seconds)
+        remaining = self._paused_until - self.clock()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(self.clock())
+            return {
+                'tokens': round(self._tokens, 1),
+                'window_used': round(self._window_used, 1),
+                'budget': self.budget,
+                'waiting': sum(1 for *_, f in self._waiters if not f.done()),
+                'paused_for': round(max(0.0, self._paused_until - self.clock()), 1),
+                'granted': dict(self.granted),
+            }
+
+
+_scheduler: Optional[RateScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_rate_scheduler() -> RateScheduler:
+    """Process-wide scheduler shared by all exchange instances."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RateScheduler(Config.EXCHANGE_WEIGHT_LIMIT, Config.EXCHANGE_WEIGHT_HEADROOM)
+    return _scheduler
+
+
+def reset_rate_scheduler() -> None:
+    """Drop the process-wide scheduler (tests)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
+
+
+def _header(headers, name: str):
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _pause_seconds(exchange) -> float:
+    retry_after = _header(getattr(exchange, 'last_response_headers', None), 'retry-after')
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return DEFAULT_PAUSE_SECONDS
+
+
+def attach_rate_scheduler(exchange, priority: int = PRIORITY_LIVE, scheduler: RateScheduler = None):
+    """
+    Route a ccxt exchange (sync or async) through the shared scheduler.
+
+    ccxt passes each endpoint's cost to throttle(); for Binance the cost table
+    is the request weight divided by 5, so costs are scaled back to weight
+    through the exchange's rateLimit (cost units per minute).
+
+    Args:
+        exchange: ccxt exchange instance with enableRateLimit set
+        priority: PRIORITY_* for every request made through this instance
+        scheduler: Scheduler to use (default: process-wide)
+
+    Returns:
+        The same exchange instance
+    """
+    scheduler = scheduler or get_rate_scheduler()
+    weight_per_cost = scheduler.weight_per_minute * exchange.rateLimit / 60000.0
+    original_fetch = exchange.fetch
+
+    def weight(cost) -> float:
+        return (1 if cost is None else cost) * weight_per_cost
+
+    def observe() -> None:
+        used = _header(getattr(exchange, 'last_response_headers', None), USED_WEIGHT_HEADER)
+        if used is not None:
+            try:
+                scheduler.observe_used_weight(float(used))
+            except ValueError:
+                pass
+
+    if asyncio.iscoroutinefunction(original_fetch):
+        async def throttle(cost=None):
+            await scheduler.acquire(weight(cost), priority)
+
+        async def fetch(url, method='GET', headers=None, body=None):
+            try:
+                return await original_fetch(url, method, headers, body)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                scheduler.pause(_pause_seconds(exchange))
+                raise
+            finally:
+                observe()
+    else:
+        def throttle(cost=None):
+            scheduler.acquire_blocking(weight(cost), priority)
+
+        def fetch(url, method='GET', headers=None, body=None):
+            try:
+                return original_fetch(url, method, headers, body)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                scheduler.pause(_pause_seconds(exchange))
+                raise
+            finally:
+                observe()
+
+    exchange.enableRateLimit = True
+    exchange.throttle = throttle
+    exchange.fetch = fetch
+    return exchange
@@ -0,0 +1,183 @@
+"""
+Vectorized Multi-Timeframe Resampler
+Single-pass backfill engine: reads the 1m series once and derives every aggregation timeframe
+
+Usage:
+    from app.services.resampler import resample_all_timeframes
+
+    results = resample_all_timeframes(sym.id)   # {'5m': 105120, '15m': 35040, ...}
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, text
+
+from app import db
+from app.models import Candle
+from app.services.aggregator import AGGREGATION_TIMEFRAMES, TIMEFRAME_MINUTES
+from app.services.candle_writer import bulk_insert_candles
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60 * 1000
+DAY_MS = 1440 * MINUTE_MS
+
+# Days of 1m candles per chunk (30 days = 43,200 rows ~ 2 MB of float64)
+DEFAULT_CHUNK_DAYS = 30
+
+# (timestamps, open, high, low, close, volume)
+Bars = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def resample_bars(bars: Bars, tf_ms: int) -> Bars:
+    """
+    Reduce sorted OHLCV arrays into tf_ms periods.
+
+    Periods are aligned to the epoch (same as pandas resample for 5m..1d).
+    Empty periods are not emitted.
+    """
+    ts, o, h, low, c, v = bars
+    if len(ts) == 0:
+        return bars
+
+    keys = ts // tf_ms
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.concatenate((starts[1:], [len(ts)])) - 1
+
+    return (
+        keys[starts] * tf_ms,
+        o[starts],
+        np.maximum.reduceat(h, starts),
+        np.minimum.reduceat(low, starts),
+        c[ends],
+        np.add.reduceat(v, starts),
+    )
+
+
+def cascade_sources(timeframes: List[str]) -> Dict[str, str]:
+    """
+    Pick the source for each timeframe: the largest smaller timeframe whose
+    period divides it evenly (falls back to 1m).
+    """
+    ordered = sorted(timeframes, key=lambda tf: TIMEFRAME_MINUTES[tf])
+    sources = {}
+    built = ['1m']
+    for tf in ordered:
+        minutes = TIMEFRAME_MINUTES[tf]
+        candidates = [s for s in built if minutes % TIMEFRAME_MINUTES[s] == 0]
+        sources[tf] = max(candidates, key=lambda s: TIMEFRAME_MINUTES[s])
+        built.append(tf)
+    return sources
+
+
+def resample_chunk(minute_bars: Bars, timeframes: List[str]) -> Dict[str, Bars]:
+    """Derive every timeframe from one chunk of 1m bars in a single cascade."""
+    levels = {'1m': minute_bars}
+    for tf, source in cascade_sources(timeframes).items():
+        levels[tf] = resample_bars(levels[source], TIMEFRAME_MINUTES[tf] * MINUTE_MS)
+    return {tf: levels[tf] for tf in timeframes}
+
+
+def _load_minute_chunk(symbol_id: int, start: int, end: int) -> Bars:
+    """Load 1m candles in [start, end) as NumPy arrays."""
+    query = text("""
+        SELECT timestamp, open, high, low, close, volume
+        FROM candles
+        WHERE symbol_id = :symbol_id
+          AND timeframe = '1m'
+          AND timestamp >= :start
+          AND timestamp < :end
+        ORDER BY timestamp ASC
+    """)
+    rows = db.session.execute(
+        query, {'symbol_id': symbol_id, 'start': start, 'end': end}
+    ).fetchall()
+
+    if not rows:
+        empty = np.empty(0, dtype=np.float64)
+        return (np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty)
+
+    arr = np.array(rows, dtype=np.float64)
+    return (
+        arr[:, 0].astype(np.int64),
+        arr[:, 1], arr[:, 2], arr[:, 3], arr[:, 4],
+        np.nan_to_num(arr[:, 5], nan=0.0),
+    )
+
+
+def resample_all_timeframes(
+    symbol_id: int,
+    timeframes: List[str] = None,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+    now_ms: int = None,
+    progress_callback: Optional[Callable] = None
+) -> Dict[str, int]:
+    """
+    Aggregate a symbol's 1m history into all higher timeframes in one pass.
+
+    Args:
+        symbol_id: Symbol ID
+        timeframes: Target timeframes (default AGGREGATION_TIMEFRAMES)
+        chunk_days: Days of 1m data loaded per chunk
+        now_ms: Current time in ms (defaults to wall clock)
+        progress_callback: Optional callback(processed_ms, total_ms)
+
+    Returns:
+        Dict mapping timeframe -> candles created
+    """
+    timeframes = list(timeframes or AGGREGATION_TIMEFRAMES)
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    results = {tf: 0 for tf in timeframes}
+
+    # Where each timeframe resumes (period after its last aggregated candle)
+    last = dict(db.session.query(
+        Candle.timeframe, func.max(Candle.timestamp)
+    ).filter(
+        Candle.symbol_id == symbol_id,
+        Candle.timeframe.in_(timeframes)
+    ).group_by(Candle.timeframe).all())
+
+    first_1m, last_1m = db.session.query(
+        func.min(Candle.timestamp), func.max(Candle.timestamp)
+    ).filter(
+        Candle.symbol_id == symbol_id,
+        Candle.timeframe == '1m'
+    ).one()
+    if first_1m is None:
+        return results
+
+    next_start = {}
+    for tf in timeframes:
+        tf_ms = TIMEFRAME_MINUTES[tf] * MINUTE_MS
+        next_start[tf] = last[tf] + tf_ms if last.get(tf) is not None else 0
+
+    start = max(first_1m, min(next_start.values()))
+    start -= start % DAY_MS  # Day-aligned chunks: no period of any timeframe straddles two chunks
+    end = last_1m + MINUTE_MS
+    chunk_ms = max(1, chunk_days) * DAY_MS
+
+    for chunk_start in range(start, end, chunk_ms):
+        chunk_end = min(chunk_start + chunk_ms, end)
+        minute_bars = _load_minute_chunk(symbol_id, chunk_start, chunk_end)
+        if len(minute_bars[0]) == 0:
+            continue
+
+        for tf, bars in resample_chunk(minute_bars, timeframes).items():
+            tf_ms = TIMEFRAME_MINUTES[tf] * MINUTE_MS
+            ts = bars[0]
+            keep = (ts >= next_start[tf]) & (ts + tf_ms <= now_ms)
+            if not keep.any():
+                continue
+            out = np.column_stack([col[keep] for col in bars])
+            results[tf] += bulk_insert_candles(symbol_id, tf, out, commit=False).inserted
+
+        db.session.commit()
+
+        if progress_callback:
+            progress_callback(chunk_end - start, end - start)
+
+    logger.debug(f"symbol_id={symbol_id}: resampled {sum(results.values())} candles")
+    return results
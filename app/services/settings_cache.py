@@ -0,0 +1,189 @@
+"""
+Settings Cache
+Process-local snapshot of the settings table with cross-process invalidation
+
+Usage:
+    from app.services.settings_cache import get_setting, get_int, get_float, get_bool
+
+    min_confluence = get_int('min_confluence', 3)
+    enabled = get_bool('notifications_enabled', True)
+    topic = get_setting('ntfy_topic', Config.NTFY_TOPIC)   # Same as Setting.get()
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.config import Config
+from app.models import Setting, SettingsVersion
+
+logger = logging.getLogger(__name__)
+
+# Shared version counter in the app cache (Redis)
+VERSION_KEY = 'settings_version'
+
+# The settings_version row
+VERSION_ROW_ID = 1
+
+# session.info flag: a Setting was written in the current transaction
+CHANGED_KEY = 'settings_changed'
+
+
+def _uses_redis() -> bool:
+    return has_app_context() and current_app.config.get('CACHE_TYPE') == 'RedisCache'
+
+
+def _shared_version() -> tuple:
+    """Version of the settings every process sees (changes whenever a setting is written)."""
+    if _uses_redis():
+        from app import cache
+        try:
+            return ('redis', cache.get(VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Settings version unavailable from cache, using the DB: {e}")
+    version = db.session.query(SettingsVersion.version).filter(SettingsVersion.id == VERSION_ROW_ID).scalar()
+    return ('db', version or 0)
+
+
+def _bump_db_version(connection) -> None:
+    """Increment the settings_version row (created on first write) inside the writing transaction."""
+    table = SettingsVersion.__table__
+    result = connection.execute(
+        update(table).where(table.c.id == VERSION_ROW_ID).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(id=VERSION_ROW_ID, version=1))
+
+
+def _bump_shared_version() -> None:
+    """Tell other processes the settings changed (the DB version row was bumped with the write)."""
+    if not _uses_redis():
+        return
+    from app import cache
+    try:
+        if cache.inc(VERSION_KEY) is None:
+            cache.set(VERSION_KEY, 1, timeout=0)
+    except Exception as e:
+        logger.warning(f"Failed to bump settings version: {e}")
+
+
+class SettingsCache:
+    """All settings of this process as a dict, revalidated against the shared version."""
+
+    def __init__(self, check_interval: float = None, max_age: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.check_interval = Config.SETTINGS_CACHE_CHECK_SECONDS if check_interval is None else check_interval
+        self.max_age = Config.SETTINGS_CACHE_MAX_AGE if max_age is None else max_age
+        self.clock = clock
+        self._values: Optional[Dict[str, Optional[str]]] = None
+        self._engine = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._values = None
+
+    def _snapshot(self) -> Dict[str, Optional[str]]:
+        now = self.clock()
+        with self._lock:
+            values = self._values
+            version = None
+            if values is not None and self._engine is db.engine and now - self._loaded_at <= self.max_age:
+                if now - self._checked_at < self.check_interval:
+                    return values
+                version = _shared_version()
+                self._checked_at = now
+                if version == self._version:
+                    return values
+
+            # Version first: a write landing during the load is seen at the next check
+            if version is None:
+                version = _shared_version()
+            rows = db.session.query(Setting.key, Setting.value).all()
+            self._values = {row.key: row.value for row in rows}
+            self._engine = db.engine
+            self._version = version
+            self._loaded_at = self._checked_at = now
+            return self._values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        values = self._snapshot()
+        return values[key] if key in values else default
+
+
+_cache = SettingsCache()
+
+
+def get_settings_cache() -> SettingsCache:
+    """Process-wide settings snapshot."""
+    return _cache
+
+
+def get_setting(key: str, default: Any = None) -> Any:
+    """Raw setting value (string), or default if the setting does not exist."""
+    return _cache.get(key, default)
+
+
+def get_int(key: str, default: int) -> int:
+    """Setting as int (default if missing or not a number)."""
+    value = _cache.get(key)
+    try:
+        return int(value) if value is not None else default
+    except (TypeError, ValueError):
+        logger.warning(f"Setting {key}={value!r} is not an integer, using {default}")
+        return default
+
+
+def get_float(key: str, default: float) -> float:
+    """Setting as float (default if missing or not a number)."""
+    value = _cache.get(key)
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        logger.warning(f"Setting {key}={value!r} is not a number, using {default}")
+        return default
+
+
+def get_bool(key: str, default: bool) -> bool:
+    """Setting as bool (only 'true' is true, as stored by the admin forms; default if missing)."""
+    value = _cache.get(key)
+    if value is None:
+        return default
+    return value == 'true'
+
+
+def invalidate_settings() -> None:
+    """Force a reload on the next lookup."""
+    _cache.invalidate()
+
+
+@event.listens_for(Setting, 'after_insert')
+@event.listens_for(Setting, 'after_update')
+@event.listens_for(Setting, 'after_delete')
+def _setting_changed(mapper, connection, target):
+    _bump_db_version(connection)
+    _cache.invalidate()
+    session = object_session(target)
+    if session is not None:
+        session.info[CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _settings_committed(session):
+    if session.info.pop(CHANGED_KEY, False):
+        _cache.invalidate()  # May have been reloaded with the uncommitted rows
+        _bump_shared_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _settings_rolled_back(session):
+    if session.info.pop(CHANGED_KEY, False):
+        _cache.invalidate()
@@ -0,0 +1,156 @@
+"""
+Shared-Memory Candle Arrays
+Publish OHLCV arrays once in the parent and attach them zero-copy in optimizer workers
+
+Usage (parent):
+    with SharedCandlePool() as pool:
+        descriptors = pool.publish_symbol('BTC/USDT', {'1h': df_1h, '4h': df_4h})
+        executor.submit(worker, ..., descriptors)
+
+Usage (worker):
+    frames, handles = attach_frames(descriptors)   # {'1h': DataFrame, ...}
+    ...
+    close_handles(handles)
+"""
+import logging
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+ITEM_SIZE = 8  # int64 / float64
+
+
+@dataclass(frozen=True)
+class SharedSeries:
+    """Picklable handle to one (symbol, timeframe) series in shared memory."""
+    name: str
+    length: int
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without registering it with this process's resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: attaching registers the block, which would unlink it
+        # (or warn about a leak) when the worker exits. The parent owns it.
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+def _column_views(buf, length: int) -> Dict[str, np.ndarray]:
+    views = {}
+    for i, col in enumerate(COLUMNS):
+        dtype = np.int64 if col == 'timestamp' else np.float64
+        views[col] = np.ndarray((length,), dtype=dtype, buffer=buf, offset=i * length * ITEM_SIZE)
+    return views
+
+
+class SharedCandlePool:
+    """Owns the shared-memory blocks published by the parent process."""
+
+    def __init__(self):
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self._by_symbol: Dict[str, List[str]] = {}
+
+    def publish(self, df: pd.DataFrame) -> SharedSeries:
+        """Copy a candle DataFrame into a new shared-memory block."""
+        length = len(df)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, length * len(COLUMNS) * ITEM_SIZE))
+        views = _column_views(shm.buf, length)
+        for col in COLUMNS:
+            if col == 'volume' and col not in df:
+                views[col][:] = 0.0
+            else:
+                views[col][:] = df[col].to_numpy()
+        del views
+        self._blocks[shm.name] = shm
+        return SharedSeries(name=shm.name, length=length)
+
+    def publish_symbol(self, symbol: str, frames: Dict[str, pd.DataFrame]) -> Dict[str, SharedSeries]:
+        """
+        Publish every timeframe of a symbol.
+
+        Args:
+            frames: {timeframe: DataFrame}; None/empty frames are skipped
+
+        Returns:
+            {timeframe: SharedSeries}
+        """
+        descriptors = {}
+        for timeframe, df in frames.items():
+            if df is None or df.empty:
+                continue
+            descriptors[timeframe] = self.publish(df)
+        self._by_symbol[symbol] = [d.name for d in descriptors.values()]
+        return descriptors
+
+    def release_symbol(self, symbol: str) -> None:
+        """Unlink a symbol's blocks once its worker has finished."""
+        for name in self._by_symbol.pop(symbol, []):
+            self._release(name)
+
+    def _release(self, name: str) -> None:
+        shm = self._blocks.pop(name, None)
+        if shm is None:
+            return
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """Unlink every block still held."""
+        for name in list(self._blocks):
+            self._release(name)
+        self._by_symbol.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach_frames(
+    descriptors: Dict[str, SharedSeries]
+) -> Tuple[Dict[str, pd.DataFrame], List[shared_memory.SharedMemory]]:
+    """
+    Attach published series as DataFrames backed by shared memory (worker side).
+
+    Returns:
+        ({timeframe: DataFrame}, handles) - keep handles alive while the frames
+        are in use, then pass them to close_handles()
+    """
+    frames = {}
+    handles = []
+    for timeframe, desc in descriptors.items():
+        shm = _attach(desc.name)
+        handles.append(shm)
+        df = pd.DataFrame(_column_views(shm.buf, desc.length), copy=False)
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+        frames[timeframe] = df
+    return frames, handles
+
+
+def close_handles(handles: List[shared_memory.SharedMemory]) -> None:
+    """Detach worker-side handles (does not unlink; the parent owns the blocks)."""
+    for shm in handles:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still referenced; the mapping is released at process exit
+            pass
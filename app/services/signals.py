@@ -1,12 +1,30 @@
 """
 Signal Generation Service
 Generates trade signals from detected patterns
+
+Confluence is evaluated set-based: the latest active pattern of every
+(symbol, timeframe) comes from one windowed query and the symbol/direction
+pairs still in cooldown from one more, every symbol is evaluated in memory,
+and the resulting signals are inserted in one commit.
 """
 import json
-from typing import Optional, Dict
-from app.models import Symbol, Pattern, Signal, Setting
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Iterable, List, Set, Tuple
+from sqlalchemy import func
+from app.models import Pattern, Signal
 from app.config import Config
 from app import db
+from app.services.settings_cache import get_bool, get_float, get_int
+from app.services.symbol_registry import get_symbol, get_symbol_id, get_symbols
+
+logger = logging.getLogger(__name__)
+
+# Timeframes whose pattern a confluence signal is built from, best first
+SIGNAL_TF_PRIORITY = ['1d', '4h', '1h', '15m', '5m', '1m']
+
+# Aligned timeframes that count as higher-timeframe confirmation
+HTF_TIMEFRAMES = ['4h', '1d']
 
 
 def calculate_atr(symbol: str, timeframe: str, period: int = 14) -> float:
@@ -17,43 +35,49 @@ def calculate_atr(symbol: str, timeframe: str, period: int = 14) -> float:
         ATR value
     """
     from app.services.aggregator import get_candles_as_dataframe
+    from app.services.indicators import atr
 
     df = get_candles_as_dataframe(symbol, timeframe, limit=period + 1)
 
-    if df.empty or len(df) < period:
+    if df.empty:
         return 0.0
 
-    # Calculate True Range
-    df['prev_close'] = df['close'].shift(1)
-    df['tr1'] = df['high'] - df['low']
-    df['tr2'] = abs(df['high'] - df['prev_close'])
-    df['tr3'] = abs(df['low'] - df['prev_close'])
-    df['tr'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
+    return atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), period)
 
-    # ATR is the average of True Range
-    atr = df['tr'].tail(period).mean()
 
-    return atr if atr else 0.0
+def get_signal_settings() -> Dict:
+    """Signal generation settings (read once per batch)."""
+    return {
+        'min_confluence': get_int('min_confluence', 3),  # Require 3+ timeframes
+        'cooldown_hours': get_int('signal_cooldown_hours', 4),  # Per symbol/direction
+        'require_htf': get_bool('require_htf', True),  # Require 4h or 1d
+        'default_rr': get_float('default_rr', 3.0),
+        'min_risk_pct': get_float('min_risk_pct', 0.5),  # Minimum 0.5% risk
+    }
 
 
-def generate_signal_from_pattern(pattern: Pattern, current_price: float = None) -> Optional[Signal]:
+def generate_signal_from_pattern(pattern: Pattern, current_price: float = None,
+                                 settings: Dict = None) -> Optional[Signal]:
     """
     Generate a trade signal from a detected pattern
 
     Args:
         pattern: The pattern to generate signal from
         current_price: Current market price (optional, used for validation)
+        settings: get_signal_settings() result (read if not given)
 
     Returns:
         Signal object or None
     """
-    symbol = db.session.get(Symbol, pattern.symbol_id)
+    symbol = get_symbol(pattern.symbol_id)
     if not symbol:
         return None
 
     # Get risk parameters from settings
-    default_rr = float(Setting.get('default_rr', '3.0'))
-    min_risk_pct = float(Setting.get('min_risk_pct', '0.5'))  # Minimum 0.5% risk
+    if settings is None:
+        settings = get_signal_settings()
+    default_rr = settings['default_rr']
+    min_risk_pct = settings['min_risk_pct']
 
     # Calculate ATR for buffer
     atr = calculate_atr(symbol.symbol, pattern.timeframe)
@@ -119,28 +143,55 @@ def generate_signal_from_pattern(pattern: Pattern, current_price: float = None)
     return signal
 
 
-def check_confluence(symbol: str) -> Dict:
+def latest_active_patterns(symbol_ids: Iterable[int] = None) -> Dict[int, Dict[str, Pattern]]:
     """
-    Check for confluence across timeframes
+    Most recent active pattern per (symbol, timeframe), in one windowed query.
+
+    Args:
+        symbol_ids: Symbols to load (default: all)
 
     Returns:
-        Dict with confluence info
+        Dict of symbol_id -> {timeframe: Pattern}
     """
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
-        return {'bullish': [], 'bearish': [], 'score': 0}
+    filters = [Pattern.status == 'active', Pattern.timeframe.in_(Config.TIMEFRAMES)]
+    if symbol_ids is not None:
+        symbol_ids = list(symbol_ids)
+        if not symbol_ids:
+            return {}
+        filters.append(Pattern.symbol_id.in_(symbol_ids))
+
+    ranked = db.session.query(
+        Pattern.id.label('id'),
+        func.row_number().over(
+            partition_by=(Pattern.symbol_id, Pattern.timeframe),
+            order_by=(Pattern.detected_at.desc(), Pattern.id.desc())
+        ).label('rn')
+    ).filter(*filters).subquery()
+
+    latest: Dict[int, Dict[str, Pattern]] = {}
+    for pattern in Pattern.query.join(ranked, Pattern.id == ranked.c.id).filter(ranked.c.rn == 1):
+        latest.setdefault(pattern.symbol_id, {})[pattern.timeframe] = pattern
+    return latest
+
+
+def recent_signal_keys(cooldown_hours: int, symbol_ids: Iterable[int] = None) -> Set[Tuple[int, str]]:
+    """(symbol_id, direction) pairs with a signal inside the cooldown window, in one query."""
+    cooldown_time_ms = int((datetime.now(timezone.utc) - timedelta(hours=cooldown_hours)).timestamp() * 1000)
+    query = db.session.query(Signal.symbol_id, Signal.direction).filter(
+        Signal.created_at >= cooldown_time_ms
+    )
+    if symbol_ids is not None:
+        query = query.filter(Signal.symbol_id.in_(list(symbol_ids)))
+    return {(row.symbol_id, row.direction) for row in query.distinct()}
+
 
+def confluence_from_patterns(latest: Dict[str, Pattern]) -> Dict:
+    """Confluence info from the latest active pattern of each timeframe."""
     bullish_tfs = []
     bearish_tfs = []
 
     for tf in Config.TIMEFRAMES:
-        # Get most recent active pattern
-        pattern = Pattern.query.filter_by(
-            symbol_id=sym.id,
-            timeframe=tf,
-            status='active'
-        ).order_by(Pattern.detected_at.desc()).first()
-
+        pattern = latest.get(tf)
         if pattern:
             if pattern.direction == 'bullish':
                 bullish_tfs.append(tf)
@@ -170,111 +221,159 @@ def check_confluence(symbol: str) -> Dict:
     }
 
 
-def generate_confluence_signal(symbol: str) -> Optional[Signal]:
+def check_confluence(symbol: str) -> Dict:
     """
-    Generate a signal based on multi-timeframe confluence
+    Check for confluence across timeframes
 
     Returns:
-        Signal if confluence threshold met, else None
+        Dict with confluence info
     """
-    from datetime import datetime, timedelta, timezone
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
+        return {'bullish': [], 'bearish': [], 'score': 0}
 
-    # Settings for relaxed trading
-    min_confluence = int(Setting.get('min_confluence', '3'))  # Require 3+ timeframes
-    cooldown_hours = int(Setting.get('signal_cooldown_hours', '4'))  # 4 hour cooldown per symbol/direction
-    require_htf = Setting.get('require_htf', 'true') == 'true'  # Require higher timeframe (4h or 1d)
+    return confluence_from_patterns(latest_active_patterns([symbol_id]).get(symbol_id, {}))
 
-    confluence = check_confluence(symbol)
 
-    if confluence['score'] < min_confluence:
-        return None
+def evaluate_confluence_signals(symbol_ids: Iterable[int] = None, settings: Dict = None) -> List[Signal]:
+    """
+    Build (unsaved) confluence signals for many symbols at once.
 
-    sym = Symbol.query.filter_by(symbol=symbol).first()
-    if not sym:
-        return None
+    Two queries (latest patterns, cooldown set) regardless of symbol count;
+    the rest is evaluated in memory. ATR is only loaded for symbols that
+    end up with a signal.
 
-    # Check if higher timeframe is aligned (for relaxed trading)
-    htf_aligned = any(tf in confluence['aligned_timeframes'] for tf in ['4h', '1d'])
-    if require_htf and not htf_aligned:
-        return None  # Skip if no higher timeframe confirmation
+    Args:
+        symbol_ids: Symbols to evaluate (default: all with active patterns)
+        settings: get_signal_settings() result (read if not given)
 
-    # Check for recent signal on same symbol/direction (cooldown)
-    cooldown_time_ms = int((datetime.now(timezone.utc) - timedelta(hours=cooldown_hours)).timestamp() * 1000)
-    recent_signal = Signal.query.filter(
-        Signal.symbol_id == sym.id,
-        Signal.direction == ('long' if confluence['dominant'] == 'bullish' else 'short'),
-        Signal.created_at >= cooldown_time_ms
-    ).first()
-
-    if recent_signal:
-        return None  # Already notified recently, skip
-
-    # Get the pattern from the highest timeframe in alignment
-    tf_priority = ['1d', '4h', '1h', '15m', '5m', '1m']
-
-    pattern = None
-    for tf in tf_priority:
-        if tf in confluence['aligned_timeframes']:
-            pattern = Pattern.query.filter_by(
-                symbol_id=sym.id,
-                timeframe=tf,
-                direction=confluence['dominant'],
-                status='active'
-            ).order_by(Pattern.detected_at.desc()).first()
-            if pattern:
-                break
-
-    if not pattern:
-        return None
+    Returns:
+        List of new Signal objects, not yet added to the session
+    """
+    if settings is None:
+        settings = get_signal_settings()
+    if symbol_ids is not None:
+        symbol_ids = list(symbol_ids)
+
+    latest = latest_active_patterns(symbol_ids)
+    candidates = {}
+    for symbol_id, patterns in latest.items():
+        confluence = confluence_from_patterns(patterns)
+        if confluence['score'] < settings['min_confluence']:
+            continue
+
+        # Check if higher timeframe is aligned (for relaxed trading)
+        htf_aligned = any(tf in confluence['aligned_timeframes'] for tf in HTF_TIMEFRAMES)
+        if settings['require_htf'] and not htf_aligned:
+            continue  # Skip if no higher timeframe confirmation
+        candidates[symbol_id] = confluence
+
+    if not candidates:
+        return []
+
+    # Check for recent signals on same symbol/direction (cooldown)
+    cooling = recent_signal_keys(settings['cooldown_hours'], candidates.keys())
+
+    signals = []
+    for symbol_id, confluence in candidates.items():
+        direction = 'long' if confluence['dominant'] == 'bullish' else 'short'
+        if (symbol_id, direction) in cooling:
+            continue  # Already notified recently, skip
+
+        # Get the pattern from the highest timeframe in alignment
+        pattern = next(
+            (latest[symbol_id][tf] for tf in SIGNAL_TF_PRIORITY if tf in confluence['aligned_timeframes']),
+            None
+        )
+        if not pattern:
+            continue
+
+        # Generate signal from the highest TF pattern
+        signal = generate_signal_from_pattern(pattern, settings=settings)
+        if signal:
+            signal.confluence_score = confluence['score']
+            signal.timeframes_aligned = json.dumps(confluence['aligned_timeframes'])
+            signals.append(signal)
 
-    # Generate signal from the highest TF pattern
-    signal = generate_signal_from_pattern(pattern)
-    if signal:
-        signal.confluence_score = confluence['score']
-        signal.timeframes_aligned = json.dumps(confluence['aligned_timeframes'])
+    return signals
 
-        try:
-            db.session.add(signal)
-            db.session.commit()
 
+def generate_confluence_signals(symbol_ids: Iterable[int] = None) -> List[Signal]:
+    """
+    Generate confluence signals for many symbols, saved in one commit.
+
+    Notifications go out after the commit for symbols with notify_enabled.
+
+    Returns:
+        Saved signals
+    """
+    signals = evaluate_confluence_signals(symbol_ids)
+    if not signals:
+        return []
+
+    try:
+        db.session.add_all(signals)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        from app.services.logger import log_error
+        log_error(f"Failed to save {len(signals)} signals: {e}")
+        return []
+
+    from app.services.aggregator import get_candles_as_dataframe
+    from app.services.notifier import notify_signal
+
+    for signal in signals:
+        sym = get_symbol(signal.symbol_id)
+        # Notify for high-quality signals (if notifications enabled for this symbol)
+        if not sym or not sym.notify_enabled:
+            continue
+        try:
             # Get current price for notification
-            from app.services.aggregator import get_candles_as_dataframe
-            df = get_candles_as_dataframe(symbol, '1m', limit=1)
+            df = get_candles_as_dataframe(signal.symbol_id, '1m', limit=1)
             current_price = float(df['close'].iloc[-1]) if not df.empty else None
-
-            # Notify for high-quality signals (if notifications enabled for this symbol)
-            if sym.notify_enabled:
-                from app.services.notifier import notify_signal
-                notify_signal(signal, current_price=current_price)
+            notify_signal(signal, current_price=current_price)
         except Exception as e:
-            db.session.rollback()
-            from app.services.logger import log_error
-            log_error(f"Failed to save signal: {e}", symbol=symbol)
-            return None
+            logger.error(f"Failed to notify signal {signal.id} ({sym.symbol}): {e}")
 
-    return signal
+    return signals
+
+
+def generate_confluence_signal(symbol: str) -> Optional[Signal]:
+    """
+    Generate a signal based on multi-timeframe confluence
+
+    Returns:
+        Signal if confluence threshold met, else None
+    """
+    symbol_id = get_symbol_id(symbol)
+    if symbol_id is None:
+        return None
 
+    signals = generate_confluence_signals([symbol_id])
+    return signals[0] if signals else None
 
-def scan_and_generate_signals() -> Dict:
+
+def scan_and_generate_signals(symbol_ids: Iterable[int] = None) -> Dict:
     """
-    Scan all symbols and generate signals where confluence exists
+    Scan symbols and generate signals where confluence exists
+
+    Args:
+        symbol_ids: Only evaluate these (e.g. symbols whose patterns changed);
+                    default: all active symbols
 
     Returns:
         Results dict
     """
-    symbols = Symbol.query.filter_by(is_active=True).all()
+    symbols = get_symbols(active_only=True)
+    if symbol_ids is not None:
+        wanted = set(symbol_ids)
+        symbols = [s for s in symbols if s.id in wanted]
+
+    signals = generate_confluence_signals([s.id for s in symbols]) if symbols else []
 
-    results = {
-        'signals_generated': 0,
-        'notifications_sent': 0,
+    return {
+        'signals_generated': len(signals),
+        'notifications_sent': sum(1 for s in signals if s.status == 'notified'),
         'symbols_scanned': len(symbols)
     }
-
-    for symbol in symbols:
-        signal = generate_confluence_signal(symbol.symbol)
-        if signal:
-            results['signals_generated'] += 1
-            if signal.status == 'notified':
-                results['notifications_sent'] += 1
-
-    return results
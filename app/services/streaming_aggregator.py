@@ -0,0 +1,222 @@
+"""
+Streaming Timeframe Aggregator
+Keeps the open 5m..1d bar of every symbol in memory and rolls it forward as new 1m candles arrive
+
+Usage:
+    from app.services.streaming_aggregator import get_streaming_aggregator
+
+    agg = get_streaming_aggregator(sym.id, 'BTC/USDT')
+    created = agg.ingest(ohlcv)   # {'5m': 1, '15m': 0, ...}
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, text
+
+from app import db
+from app.models import Candle
+from app.services.aggregator import AGGREGATION_TIMEFRAMES, TIMEFRAME_MINUTES
+from app.services.candle_writer import bulk_insert_candles
+from app.services.resampler import resample_all_timeframes
+
+logger = logging.getLogger(__name__)
+
+
+class RollingBar:
+    """
+    Open OHLCV bar for one (symbol, timeframe).
+
+    next_start is the first period that has not been written yet; 1m candles
+    before it belong to periods already in the DB and are ignored.
+    """
+    __slots__ = ('timeframe', 'tf_ms', 'next_start', 'period_start',
+                 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timeframe: str, next_start: int = 0):
+        self.timeframe = timeframe
+        self.tf_ms = TIMEFRAME_MINUTES[timeframe] * 60 * 1000
+        self.next_start = next_start
+        self.period_start = None
+        self.open = self.high = self.low = self.close = self.volume = None
+
+    def feed(self, ts: int, o: float, h: float, low: float, c: float, v: float) -> Optional[List]:
+        """
+        Fold a 1m candle into the open bar.
+
+        Returns:
+            The previous bar [ts, o, h, l, c, v] if this candle starts a new period, else None
+        """
+        if ts < self.next_start:
+            return None
+
+        start = ts - ts % self.tf_ms
+        closed = None
+        if self.period_start is not None:
+            if start < self.period_start:
+                # Late candle for a period that was already rolled over
+                return None
+            if start != self.period_start:
+                closed = self._close()
+
+        if self.period_start is None:
+            self.period_start = start
+            self.open, self.high, self.low, self.close, self.volume = o, h, low, c, v
+        else:
+            if h > self.high:
+                self.high = h
+            if low < self.low:
+                self.low = low
+            self.close = c
+            self.volume += v
+
+        return closed
+
+    def flush(self, now_ms: int) -> Optional[List]:
+        """Close the open bar if its period has ended by now_ms."""
+        if self.period_start is not None and self.period_start + self.tf_ms <= now_ms:
+            return self._close()
+        return None
+
+    def _close(self) -> List:
+        bar = [self.period_start, self.open, self.high, self.low, self.close, self.volume]
+        self.next_start = self.period_start + self.tf_ms
+        self.period_start = None
+        return bar
+
+
+class StreamingAggregator:
+    """Rolling accumulators for every aggregation timeframe of one symbol."""
+
+    def __init__(self, symbol_id: int, symbol: str, timeframes: List[str] = None):
+        self.symbol_id = symbol_id
+        self.symbol = symbol
+        self.timeframes = list(timeframes or AGGREGATION_TIMEFRAMES)
+        self.bars = {tf: RollingBar(tf) for tf in self.timeframes}
+        self.last_ts = None  # Last 1m timestamp folded in
+        self.bootstrapped = False
+        self._pending = {tf: [] for tf in self.timeframes}
+
+    def _last_target_timestamps(self) -> Dict[str, int]:
+        rows = db.session.query(
+            Candle.timeframe,
+            func.max(Candle.timestamp)
+        ).filter(
+            Candle.symbol_id == self.symbol_id,
+            Candle.timeframe.in_(self.timeframes)
+        ).group_by(Candle.timeframe).all()
+        return {tf: ts for tf, ts in rows if ts is not None}
+
+    def bootstrap(self) -> None:
+        """
+        Rebuild the open bars from the DB (cold start / resume).
+
+        Timeframes with no aggregated candles yet are backfilled once by the
+        vectorized resampler so history is not streamed row by row.
+        """
+        last = self._last_target_timestamps()
+        missing = [tf for tf in self.timeframes if tf not in last]
+        if missing:
+            resample_all_timeframes(self.symbol_id, missing)
+            last = self._last_target_timestamps()
+
+        for tf, bar in self.bars.items():
+            bar.next_start = last[tf] + bar.tf_ms if tf in last else 0
+            bar.period_start = None
+
+        start_from = min(bar.next_start for bar in self.bars.values())
+        query = text("""
+            SELECT timestamp, open, high, low, close, volume
+            FROM candles
+            WHERE symbol_id = :symbol_id
+              AND timeframe = '1m'
+              AND timestamp >= :start_from
+            ORDER BY timestamp ASC
+        """)
+        rows = db.session.execute(
+            query, {'symbol_id': self.symbol_id, 'start_from': start_from}
+        ).fetchall()
+
+        self.last_ts = None
+        self._pending = {tf: [] for tf in self.timeframes}
+        self._feed_rows(rows)
+        self.bootstrapped = True
+
+        logger.debug(f"{self.symbol}: streaming aggregator bootstrapped from {len(rows)} 1m candles")
+
+    def _feed_rows(self, rows) -> None:
+        for row in rows:
+            ts, o, h, low, c, v = row[:6]
+            ts = int(ts)
+            if self.last_ts is not None and ts <= self.last_ts:
+                continue
+            if any(x is None or x <= 0 for x in (o, h, low, c)) or h < low:
+                continue
+            v = v or 0
+            for tf, bar in self.bars.items():
+                closed = bar.feed(ts, o, h, low, c, v)
+                if closed:
+                    self._pending[tf].append(closed)
+            self.last_ts = ts
+
+    def ingest(self, ohlcv: List, now_ms: int = None, commit: bool = True) -> Dict[str, int]:
+        """
+        Fold new 1m candles in and write every bar whose period has closed.
+
+        Candles already folded in (timestamp <= last seen) are skipped, so the
+        same fetch window can be passed again safely.
+
+        Args:
+            ohlcv: 1m ccxt OHLCV rows (already saved to the DB)
+            now_ms: Current time in ms (defaults to wall clock)
+            commit: Whether to commit the written bars
+
+        Returns:
+            Dict mapping timeframe -> candles created
+        """
+        if not self.bootstrapped:
+            self.bootstrap()
+
+        if ohlcv is not None and len(ohlcv):
+            self._feed_rows(sorted(ohlcv, key=lambda r: r[0]))
+
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        for tf, bar in self.bars.items():
+            closed = bar.flush(now_ms)
+            if closed:
+                self._pending[tf].append(closed)
+
+        created = {}
+        for tf in self.timeframes:
+            pending = self._pending[tf]
+            created[tf] = 0
+            if pending:
+                created[tf] = bulk_insert_candles(self.symbol_id, tf, pending, commit=False).inserted
+                self._pending[tf] = []
+
+        if commit:
+            db.session.commit()
+
+        return created
+
+
+# Per-process registry (symbol_id -> aggregator)
+_aggregators: Dict[int, StreamingAggregator] = {}
+
+
+def get_streaming_aggregator(symbol_id: int, symbol: str) -> StreamingAggregator:
+    """Get (or create) the streaming aggregator for a symbol."""
+    agg = _aggregators.get(symbol_id)
+    if agg is None:
+        agg = StreamingAggregator(symbol_id, symbol)
+        _aggregators[symbol_id] = agg
+    return agg
+
+
+def reset_streaming_aggregator(symbol_id: int = None) -> None:
+    """Drop in-memory state (one symbol, or all) so the next ingest re-bootstraps."""
+    if symbol_id is None:
+        _aggregators.clear()
+    else:
+        _aggregators.pop(symbol_id, None)
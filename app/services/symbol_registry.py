@@ -0,0 +1,134 @@
+"""
+Symbol Registry
+Process-wide cache of the symbols table, keyed by name and by id
+
+Usage:
+    from app.services.symbol_registry import get_symbol, get_symbol_id
+
+    symbol_id = get_symbol_id('BTC/USDT')  # Also accepts an id (returned as-is)
+    info = get_symbol('BTC/USDT')          # SymbolInfo(id, symbol, exchange, is_active, notify_enabled)
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from sqlalchemy import event
+
+from app import db
+from app.config import Config
+from app.models import Symbol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """Detached, read-only copy of a Symbol row."""
+    id: int
+    symbol: str
+    exchange: Optional[str]
+    is_active: bool
+    notify_enabled: bool
+
+
+class SymbolRegistry:
+    """Name/id maps of the symbols table, reloaded on invalidation or TTL expiry."""
+
+    def __init__(self, ttl: float = None):
+        self.ttl = Config.SYMBOL_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, SymbolInfo] = {}
+        self._by_id: Dict[int, SymbolInfo] = {}
+        self._loaded_at = 0.0
+        self._engine = None
+        self._stale = True
+        self._missed = set()  # Unknown keys already reloaded for since the last load
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def _load(self) -> None:
+        rows = db.session.query(
+            Symbol.id, Symbol.symbol, Symbol.exchange, Symbol.is_active, Symbol.notify_enabled
+        ).all()
+        by_name, by_id = {}, {}
+        for row in rows:
+            info = SymbolInfo(row.id, row.symbol, row.exchange, bool(row.is_active), bool(row.notify_enabled))
+            by_name[info.symbol] = info
+            by_id[info.id] = info
+        self._by_name, self._by_id = by_name, by_id
+        self._loaded_at = time.monotonic()
+        self._engine = db.engine
+        self._stale = False
+        self._missed = set()
+        logger.debug(f"Symbol registry loaded ({len(by_id)} symbols)")
+
+    def _ensure_fresh(self) -> None:
+        # A different engine means a different database (app factory / tests)
+        if self._stale or self._engine is not db.engine or time.monotonic() - self._loaded_at > self.ttl:
+            with self._lock:
+                if self._stale or self._engine is not db.engine or time.monotonic() - self._loaded_at > self.ttl:
+                    self._load()
+
+    def _reload_on_miss(self, key) -> bool:
+        """Reload once per unknown key, so a missing symbol is not re-queried on every call."""
+        with self._lock:
+            if key in self._missed:
+                return False
+            self._load()
+            self._missed.add(key)
+            return True
+
+    def get(self, symbol: Union[str, int]) -> Optional[SymbolInfo]:
+        """Look up by name ('BTC/USDT') or id."""
+        self._ensure_fresh()
+        table = self._by_id if isinstance(symbol, int) else self._by_name
+        info = table.get(symbol)
+        if info is None and self._reload_on_miss(symbol):
+            table = self._by_id if isinstance(symbol, int) else self._by_name
+            info = table.get(symbol)
+        return info
+
+    def all(self, active_only: bool = False):
+        self._ensure_fresh()
+        return [s for s in self._by_id.values() if s.is_active or not active_only]
+
+
+_registry = SymbolRegistry()
+
+
+def get_symbol(symbol: Union[str, int]) -> Optional[SymbolInfo]:
+    """SymbolInfo for a symbol name or id, or None if it does not exist."""
+    return _registry.get(symbol)
+
+
+def get_symbol_id(symbol: Union[str, int]) -> Optional[int]:
+    """
+    Id for a symbol name; ids are passed through unchanged.
+
+    Lets functions take either a name or a symbol_id without a lookup when
+    the caller already has the id.
+    """
+    if isinstance(symbol, int):
+        return symbol
+    info = _registry.get(symbol)
+    return info.id if info else None
+
+
+def get_symbols(active_only: bool = False):
+    """All cached symbols (optionally only active ones)."""
+    return _registry.all(active_only)
+
+
+def invalidate_symbols() -> None:
+    """Force a reload on the next lookup."""
+    _registry.invalidate()
+
+
+@event.listens_for(Symbol, 'after_insert')
+@event.listens_for(Symbol, 'after_update')
+@event.listens_for(Symbol, 'after_delete')
+def _symbol_changed(mapper, connection, target):
+    _registry.invalidate()
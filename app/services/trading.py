@@ -6,6 +6,8 @@ from typing import Dict, Optional
 from dataclasses import dataclass
 import pandas as pd
 
+from app.services import indicators
+
 
 @dataclass
 class TradingLevels:
@@ -32,64 +34,23 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> float:
     Returns:
         ATR value
     """
-    if df.empty or len(df) < period:
+    if df.empty:
         return 0.0
-
-    df = df.copy()
-    df['prev_close'] = df['close'].shift(1)
-    df['tr1'] = df['high'] - df['low']
-    df['tr2'] = abs(df['high'] - df['prev_close'])
-    df['tr3'] = abs(df['low'] - df['prev_close'])
-    df['tr'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
-
-    atr = df['tr'].tail(period).mean()
-    return atr if pd.notna(atr) else 0.0
+    return indicators.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), period)
 
 
 def find_swing_high(df: pd.DataFrame, start_idx: int, lookback: int = 50) -> Optional[float]:
     """Find the nearest swing high above a given index."""
     if df.empty:
         return None
-
-    end_idx = max(0, start_idx - lookback)
-    search_df = df.iloc[end_idx:start_idx]
-
-    if search_df.empty:
-        return None
-
-    # Find local highs (higher than neighbors)
-    swing_highs = []
-    for i in range(2, len(search_df) - 2):
-        if (search_df.iloc[i]['high'] > search_df.iloc[i-1]['high'] and
-            search_df.iloc[i]['high'] > search_df.iloc[i-2]['high'] and
-            search_df.iloc[i]['high'] > search_df.iloc[i+1]['high'] and
-            search_df.iloc[i]['high'] > search_df.iloc[i+2]['high']):
-            swing_highs.append(search_df.iloc[i]['high'])
-
-    return max(swing_highs) if swing_highs else search_df['high'].max()
+    return indicators.swing_level(df['high'].to_numpy(), start_idx, 'high', lookback)
 
 
 def find_swing_low(df: pd.DataFrame, start_idx: int, lookback: int = 50) -> Optional[float]:
     """Find the nearest swing low below a given index."""
     if df.empty:
         return None
-
-    end_idx = max(0, start_idx - lookback)
-    search_df = df.iloc[end_idx:start_idx]
-
-    if search_df.empty:
-        return None
-
-    # Find local lows (lower than neighbors)
-    swing_lows = []
-    for i in range(2, len(search_df) - 2):
-        if (search_df.iloc[i]['low'] < search_df.iloc[i-1]['low'] and
-            search_df.iloc[i]['low'] < search_df.iloc[i-2]['low'] and
-            search_df.iloc[i]['low'] < search_df.iloc[i+1]['low'] and
-            search_df.iloc[i]['low'] < search_df.iloc[i+2]['low']):
-            swing_lows.append(search_df.iloc[i]['low'])
-
-    return min(swing_lows) if swing_lows else search_df['low'].min()
+    return indicators.swing_level(df['low'].to_numpy(), start_idx, 'low', lookback)
 
 
 def calculate_fvg_levels(
@@ -324,24 +285,17 @@ def get_trading_levels_for_pattern(pattern, df: pd.DataFrame = None) -> Dict:
     Returns:
         Dict with trading levels
     """
-    atr = 0.0
-    swing_high = None
-    swing_low = None
-
-    if df is not None and not df.empty:
-        atr = calculate_atr(df)
-        # Find swings looking back from the pattern
-        swing_high = find_swing_high(df, len(df) - 1)
-        swing_low = find_swing_low(df, len(df) - 1)
+    # ATR and swings looking back from the latest candle
+    context = indicators.trading_context(df)
 
     levels = calculate_trading_levels(
         pattern_type=pattern.pattern_type,
         zone_low=pattern.zone_low,
         zone_high=pattern.zone_high,
         direction=pattern.direction,
-        atr=atr,
-        swing_high=swing_high,
-        swing_low=swing_low
+        atr=context['atr'],
+        swing_high=context['swing_high'],
+        swing_low=context['swing_low']
     )
 
     return {
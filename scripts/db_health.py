@@ -48,15 +48,17 @@ import asyncio
 from datetime import datetime, timezone
 from collections import defaultdict
 
-import ccxt.async_support as ccxt_async
-
 from app import create_app, db
 from app.models import Symbol, Candle, KnownGap
+from app.services.rate_scheduler import PRIORITY_REPAIR
 
 # Import shared retry utilities
 from scripts.utils.retry import async_retry_call
+from scripts.utils.fetch_utils import create_exchange
 from scripts.compute_stats import compute_stats
 from app.services.aggregator import aggregate_all_timeframes
+from app.services.candle_writer import bulk_insert_candles
+from app.services.candle_store import invalidate_candles
 
 # Meaningful batch sizes
 BATCH_SIZES = {
@@ -240,10 +242,7 @@ def validate_aggregated_candle(candle, candles_1m, tolerance=0.0001):
 
 async def fetch_missing_candles(symbol_name, gap_start_ms, gap_end_ms, verbose=False):
     """Fetch missing 1m candles from exchange for a gap."""
-    exchange = ccxt_async.binance({
-        'enableRateLimit': True,
-        'options': {'defaultType': 'spot'}
-    })
+    exchange = create_exchange('binance', priority=PRIORITY_REPAIR)
 
     try:
         all_ohlcv = []
@@ -270,9 +269,6 @@ async def fetch_missing_candles(symbol_name, gap_start_ms, gap_end_ms, verbose=F
             else:
                 break
 
-            if len(batch) == 1000:
-                await asyncio.sleep(0.2)
-
         return all_ohlcv
 
     finally:
@@ -280,37 +276,14 @@ async def fetch_missing_candles(symbol_name, gap_start_ms, gap_end_ms, verbose=F
 
 
 def save_fetched_candles(symbol_id, ohlcv, verbose=False):
-    """Save fetched candles to database."""
+    """Save fetched candles to database (bulk insert, duplicates skipped)."""
     if not ohlcv:
         return 0
 
-    timestamps = [c[0] for c in ohlcv]
-    existing = set(
-        c.timestamp for c in Candle.query.filter(
-            Candle.symbol_id == symbol_id,
-            Candle.timeframe == '1m',
-            Candle.timestamp.in_(timestamps)
-        ).all()
-    )
+    new_count = bulk_insert_candles(symbol_id, '1m', ohlcv).inserted
 
-    new_count = 0
-    for candle in ohlcv:
-        ts, o, h, l, c, v = candle
-        if ts in existing:
-            continue
-        db.session.add(Candle(
-            symbol_id=symbol_id,
-            timeframe='1m',
-            timestamp=ts,
-            open=o, high=h, low=l, close=c,
-            volume=v or 0
-        ))
-        new_count += 1
-
-    if new_count > 0:
-        db.session.commit()
-        if verbose:
-            print(f"    Saved {new_count} candles")
+    if new_count > 0 and verbose:
+        print(f"    Saved {new_count} candles")
 
     return new_count
 
@@ -478,6 +451,8 @@ def reaggregate_candle(symbol_id, symbol_name, timeframe, timestamp, candles_1m)
         ))
 
     db.session.commit()
+    if candle:
+        invalidate_candles(symbol_name, timeframe)  # May have been part of the stored verified prefix
     return True
 
 
@@ -800,6 +775,7 @@ def reset_verification(symbol_id=None, timeframe=None):
 
     count = query.update({Candle.verified_at: None})
     db.session.commit()
+    invalidate_candles(symbol_id, timeframe)
     return count
 
 
@@ -4,13 +4,13 @@ Real-time Candle Fetcher with Pattern Detection
 
 Optimized async flow:
 1. Batch query all symbols' last timestamps (single DB query)
-2. Align fetch start time across all symbols
+2. Per-symbol fetch windows (symbols far behind catch up in bounded chunks)
 3. True parallel fetch using ccxt rate limiting (no semaphore)
-4. Batch save candles
-5. Aggregate higher timeframes
+4. Bulk save candles (multi-row insert, duplicates skipped by unique key)
+5. Aggregate higher timeframes (streaming, only new 1m candles folded in)
 6. Detect patterns
 7. Update pattern status
-8. Generate signals
+8. Generate signals (symbols whose patterns changed, all symbols periodically)
 9. Expire old patterns
 10. Log run to database
 
@@ -18,21 +18,40 @@ Usage:
   python scripts/fetch.py              # Normal fetch (silent)
   python scripts/fetch.py --verbose    # Verbose output with details
   python scripts/fetch.py --gaps       # Use 'gaps' job name for cron tracking
+  python scripts/fetch.py --daemon     # Stay resident, one cycle per minute
+  python scripts/fetch.py --stream     # Stay resident, websocket kline ingestion
 
 Options:
   --verbose, -v   Show detailed output (symbols, candle counts, timing)
   --gaps          Log this run as 'gaps' job instead of 'fetch' job
-
-Cron setup:
+  --daemon        Run the same cycle every minute (aligned to the wall clock)
+                  keeping the exchange, DB pool, workers and in-memory state
+                  (streaming aggregation, incremental pattern scanners) warm;
+                  each cycle is still recorded as a CronRun. Recommended.
+  --stream        Subscribe to closed 1m klines over the exchange websocket and
+                  process each minute's bars as they arrive (REST backfills gaps)
+
+Steps 4-7 run per symbol. In --daemon/--stream mode they are sharded across
+FETCH_PROCESS_WORKERS worker processes (each with its own DB session); set it
+to 1 to process in-process. One-shot runs always process in-process.
+Per-symbol processing times are stored in the cron run's details.
+
+Daemon setup (recommended; systemd/supervisor):
+  cd /path && venv/bin/python scripts/fetch.py --daemon
+
+Cron setup (fallback; skips while the daemon holds the lock). Each run starts
+cold, so pattern detection rescans the full recent window every minute:
   * * * * * cd /path && venv/bin/python scripts/fetch.py
 """
 import sys
 import os
 import asyncio
+import functools
 import time
 import traceback
 import fcntl
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Lock file path for preventing concurrent execution (use system temp directory)
@@ -44,6 +63,7 @@ from datetime import datetime, timezone
 from scripts.utils.fetch_utils import (
     get_all_last_timestamps,
     get_aligned_fetch_start,
+    get_symbol_fetch_windows,
     fetch_symbol_batches,
     create_exchange,
     logger
@@ -52,94 +72,149 @@ from scripts.utils.fetch_utils import (
 # All timeframes to aggregate (always, regardless of current time)
 ALL_TIMEFRAMES = ['5m', '15m', '30m', '1h', '2h', '4h', '1d']
 
+# Daemon schedule: one cycle per minute, a few seconds after the minute closes
+DAEMON_INTERVAL_SECONDS = 60
+DAEMON_OFFSET_SECONDS = 2
+# Catch-up work between cycles stops this long before the next cycle is due
+DAEMON_CATCHUP_MARGIN_SECONDS = 10
+
+# Synchronous phases (DB work, process pool waits, signals, stats) run on this
+# one thread so the event loop keeps serving websockets and fetches meanwhile;
+# a single thread never shares the scoped DB session or the in-process caches
+_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fetch-sync')
+
+
+async def run_sync(func, *args):
+    """Run a synchronous phase on the sync thread without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_sync_executor, functools.partial(func, *args))
+
+
+def get_active_symbols(app):
+    """Names of all active symbols."""
+    from app.models import Symbol
+
+    with app.app_context():
+        return [s.symbol for s in Symbol.query.filter_by(is_active=True).all()]
+
+
+def refresh_stats(app):
+    """Refresh the stats cache."""
+    from scripts.compute_stats import compute_stats
+
+    with app.app_context():
+        compute_stats()
+
 
-def process_symbol(symbol_name, ohlcv, app, verbose=False):
+def process_symbol(symbol_name, ohlcv, app, verbose=False, stale_zones=()):
     """
     Process a single symbol after fetch:
     1. Save candles to DB
     2. Aggregate ALL higher timeframes
     3. Detect patterns on all fetched candles
     4. Update pattern status
+
+    stale_zones: symbol ids whose active zones were changed by another process
+    (expired patterns); this symbol's in-memory zones are dropped if listed.
     """
     import time as _time
-    from app.models import Symbol, Candle
+    from app.services.symbol_registry import get_symbol_id
     from app.services.aggregator import aggregate_new_candles
+    from app.services.candle_writer import bulk_insert_candles
+    from app.services.candle_cache import reset_candle_cache
+    from app.services.streaming_aggregator import get_streaming_aggregator, reset_streaming_aggregator
     from app.services.patterns import get_all_detectors
+    from app.services.pattern_events import drain_pattern_changes
     from app import db
 
     _t0 = _time.time()
     _timings = {}  # Track where time is spent
     with app.app_context():
         # Get symbol
-        sym = Symbol.query.filter_by(symbol=symbol_name).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol_name)
+        if symbol_id is None:
             logger.warning(f"{symbol_name}: Symbol not found in database")
             return {'symbol': symbol_name, 'new': 0, 'patterns': 0}
 
-        # 1. Save new candles with IntegrityError handling
-        from sqlalchemy.exc import IntegrityError
-
-        timestamps = [c[0] for c in ohlcv]
-        existing = set(
-            c.timestamp for c in Candle.query.filter(
-                Candle.symbol_id == sym.id,
-                Candle.timeframe == '1m',
-                Candle.timestamp.in_(timestamps)
-            ).all()
-        )
-
-        new_count = 0
-        for candle in ohlcv:
-            ts, o, h, l, c, v = candle
-            if ts in existing:
-                continue
-            db.session.add(Candle(
-                symbol_id=sym.id,
-                timeframe='1m',
-                timestamp=ts,
-                open=o, high=h, low=l, close=c,
-                volume=v or 0
-            ))
-            new_count += 1
+        if symbol_id in stale_zones:
+            from app.services.patterns.active_store import get_active_pattern_store
+            get_active_pattern_store().invalidate(symbol_id)
 
-        if new_count > 0:
-            try:
-                db.session.commit()
-                logger.debug(f"{symbol_name}: Saved {new_count} new 1m candles")
-            except IntegrityError:
-                db.session.rollback()
-                logger.warning(f"{symbol_name}: Some candles already existed (race condition)")
-                new_count = 0
-
-        # 2. Aggregate ALL higher timeframes (smart aggregation)
-        # aggregate_new_candles() automatically:
-        # - Finds last aggregated timestamp
-        # - Loads only source candles after that point
-        # - Creates all possible complete target candles
-        # - Skips current incomplete period
+        # 1. Save new candles (bulk insert, duplicates skipped by uix_candle)
+        save_error = None
+        try:
+            write = bulk_insert_candles(symbol_id, '1m', ohlcv)
+            new_count = write.inserted
+            if new_count > 0:
+                logger.debug(f"{symbol_name}: Saved {new_count} new 1m candles ({write.ignored} already existed)")
+        except Exception as e:
+            logger.error(f"{symbol_name}: Failed to save candles: {e}")
+            new_count = 0
+            save_error = f"save failed: {e}"
+
+        # 2. Aggregate ALL higher timeframes (streaming aggregation)
+        # The streaming aggregator keeps the open 5m..1d bars in memory,
+        # folds in only the new 1m candles and writes bars whose period closed.
+        # On failure, state is dropped and we fall back to aggregate_new_candles()
         _t_agg = _time.time()
-        for tf in ALL_TIMEFRAMES:
-            try:
-                aggregate_new_candles(symbol_name, '1m', tf)
-            except Exception as e:
-                db.session.rollback()
-                logger.error(f"{symbol_name}: Aggregation failed for {tf}: {e}")
-                if verbose:
-                    print(f"  Warning: Aggregation failed for {tf}: {e}")
+        created_bars = None  # timeframe -> bars written (None after a fallback)
+        try:
+            created_bars = get_streaming_aggregator(symbol_id, symbol_name).ingest(ohlcv)
+        except Exception as e:
+            db.session.rollback()
+            reset_streaming_aggregator(symbol_id)
+            reset_candle_cache(symbol_id)  # The fallback writes through the ORM, past the rings
+            logger.warning(f"{symbol_name}: Streaming aggregation failed, falling back: {e}")
+            for tf in ALL_TIMEFRAMES:
+                try:
+                    aggregate_new_candles(symbol_name, '1m', tf)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"{symbol_name}: Aggregation failed for {tf}: {e}")
+                    if verbose:
+                        print(f"  Warning: Aggregation failed for {tf}: {e}")
         _timings['aggregation'] = _time.time() - _t_agg
 
         # 3. Detect patterns on all timeframes
-        # OPTIMIZED: Load DataFrame once per timeframe, share across all detectors
-        # Pre-compute ATR/swings once per timeframe, batch commits
+        # In a resident process (daemon/stream), warm scanners only read candles
+        # closed since their last scan and feed them through the detectors'
+        # incremental state (tail-only detection). A cold scanner (first cycle, or
+        # after a failure) runs the full window scan below once, then is warmed up
+        # from that window. One-shot (cron) runs only do the full window scan.
         patterns_found = 0
         if new_count > 0:
             from app.services.aggregator import get_candles_as_dataframe
-            from app.services.trading import calculate_atr, find_swing_high, find_swing_low
+            from app.services.pattern_scanner import (
+                get_pattern_scanner, is_incremental_scanning_enabled, reset_pattern_scanners
+            )
+            from app.services.indicators import trading_context
 
             detectors = get_all_detectors()
             scan_limit = len(ohlcv) + 50  # Fetched candles + context
+            incremental = is_incremental_scanning_enabled()
+
+            def rollback_patterns():
+                # Warm scanners have already moved past the candles whose patterns
+                # this discards; drop them so the next cycle rescans the full window
+                db.session.rollback()
+                if incremental:
+                    reset_pattern_scanners(symbol_id)
 
             for tf in ['1m'] + ALL_TIMEFRAMES:
+                scanner = get_pattern_scanner(symbol_id, symbol_name, tf) if incremental else None
+                if scanner is not None and scanner.is_warm:
+                    # No higher-timeframe bar closed this cycle -> nothing new to scan
+                    if tf != '1m' and created_bars is not None and not created_bars.get(tf):
+                        continue
+                    try:
+                        patterns_found += len(scanner.scan(detectors))
+                    except Exception as e:
+                        rollback_patterns()
+                        logger.error(f"{symbol_name}: Incremental pattern scan failed on {tf}: {e}")
+                        if verbose:
+                            print(f"  Warning: Incremental pattern scan failed on {tf}: {e}")
+                    continue
+
                 # Scale limit for higher timeframes
                 tf_multiplier = {
                     '1m': 1, '5m': 5, '15m': 15, '30m': 30,
@@ -157,19 +232,16 @@ def process_symbol(symbol_name, ohlcv, app, verbose=False):
                 # Pre-compute ATR and swings ONCE per timeframe (not per pattern)
                 precomputed = None
                 if df is not None and not df.empty:
-                    precomputed = {
-                        'atr': calculate_atr(df),
-                        'swing_high': find_swing_high(df, len(df) - 1),
-                        'swing_low': find_swing_low(df, len(df) - 1)
-                    }
+                    precomputed = trading_context(df)
 
                 # Prefetch existing patterns ONCE for all detectors
                 for detector in detectors:
                     try:
-                        detector.prefetch_existing_patterns(sym.id, tf)
+                        detector.prefetch_existing_patterns(symbol_id, tf)
                     except Exception:
                         pass  # Will fall back to DB queries
 
+                window_ok = True
                 for detector in detectors:
                     try:
                         # Pass pre-loaded DataFrame and precomputed values
@@ -177,8 +249,9 @@ def process_symbol(symbol_name, ohlcv, app, verbose=False):
                         if patterns:
                             patterns_found += len(patterns)
                     except Exception as e:
+                        window_ok = False
                         # Ensure session is clean before continuing
-                        db.session.rollback()
+                        rollback_patterns()
                         logger.error(f"{symbol_name}: Pattern detection failed for {detector.__class__.__name__} on {tf}: {e}")
                         if verbose:
                             print(f"  Warning: Pattern detection failed for {detector.__class__.__name__} on {tf}: {e}")
@@ -186,35 +259,36 @@ def process_symbol(symbol_name, ohlcv, app, verbose=False):
                         # Clear cache after detection
                         detector.clear_pattern_cache()
 
+                # Carry detector state forward so the next cycle only scans new candles
+                if scanner is not None and window_ok:
+                    try:
+                        scanner.warm_up(df, detectors)
+                    except Exception as e:
+                        reset_pattern_scanners(symbol_id, tf)
+                        logger.warning(f"{symbol_name}: Pattern scanner warm-up failed on {tf}: {e}")
+
             # Single commit after all pattern detection (not per detector/timeframe)
             try:
                 db.session.commit()
             except Exception as e:
-                db.session.rollback()
+                rollback_patterns()
                 logger.error(f"{symbol_name}: Pattern commit failed: {e}")
 
         # 4. Update pattern status with current price (BATCHED - single commit)
+        # The active pattern store re-evaluates only the zones the price moved
+        # through and writes the changed rows in one bulk UPDATE
         if ohlcv:
+            from app.services.patterns.active_store import get_active_pattern_store
+
             current_price = ohlcv[-1][4]  # close price
-            detectors = get_all_detectors()
-            for detector in detectors:
-                if hasattr(detector, 'update_pattern_status'):
-                    for tf in ['1m'] + ALL_TIMEFRAMES:
-                        try:
-                            # Don't commit each call - batch them
-                            detector.update_pattern_status(symbol_name, tf, current_price, commit=False)
-                        except Exception as e:
-                            db.session.rollback()
-                            logger.error(f"{symbol_name}: Pattern status update failed for {detector.__class__.__name__} on {tf}: {e}")
-                            if verbose:
-                                print(f"  Warning: Pattern status update failed for {detector.__class__.__name__} on {tf}: {e}")
-
-            # Single commit for all status updates
             try:
+                get_active_pattern_store().update(symbol_id, current_price, get_all_detectors())
                 db.session.commit()
             except Exception as e:
                 db.session.rollback()
-                logger.error(f"{symbol_name}: Pattern status commit failed: {e}")
+                logger.error(f"{symbol_name}: Pattern status update failed: {e}")
+                if verbose:
+                    print(f"  Warning: Pattern status update failed: {e}")
 
         _elapsed = _time.time() - _t0
         if verbose and (new_count > 0 or patterns_found > 0):
@@ -222,54 +296,174 @@ def process_symbol(symbol_name, ohlcv, app, verbose=False):
 
         logger.info(f"{symbol_name}: Processed {new_count} candles, {patterns_found} patterns in {_elapsed:.1f}s")
 
-        return {
+        result = {
             'symbol': symbol_name,
             'new': new_count,
             'patterns': patterns_found,
-            'time': _elapsed
+            'time': _elapsed,
+            # Symbols whose active patterns changed (re-published by process_fetched in the main process)
+            'pattern_changes': sorted(drain_pattern_changes())
         }
+        if save_error:
+            result['error'] = save_error
+        return result
+
 
+# Flask app of a processing worker process (created on first use, reused across cycles)
+_worker_app = None
 
-async def run_fetch_cycle(symbols, app, verbose=False):
+
+def _process_shard(items, verbose=False, incremental=False, stale_zones=()):
+    """
+    Process-pool worker: run process_symbol() for one shard of (symbol, ohlcv).
+
+    Each worker process creates its own app (and so its own DB engine/session)
+    once and keeps it for the life of the process. `incremental` mirrors the
+    parent's incremental scanning setting (workers live as long as the parent);
+    `stale_zones` are symbol ids whose active zones the parent changed.
+    """
+    global _worker_app
+    if _worker_app is None:
+        from app import create_app
+        from app.services.candle_cache import enable_candle_cache
+        from app.services.pattern_scanner import enable_incremental_scanning
+        _worker_app = create_app()
+        enable_candle_cache()  # Drops rings inherited from the parent
+        enable_incremental_scanning(incremental)
+
+    results = {}
+    for symbol, ohlcv in items:
+        try:
+            results[symbol] = process_symbol(symbol, ohlcv, _worker_app, verbose, stale_zones)
+        except Exception as e:
+            logger.error(f"{symbol}: Processing failed - {e}")
+            results[symbol] = {'symbol': symbol, 'new': 0, 'patterns': 0, 'error': str(e)}
+        results[symbol]['worker'] = os.getpid()
+    return results
+
+
+def process_fetched(fetch_results, app, verbose=False, pool=None):
+    """
+    Process fetched candles for all symbols (save, aggregate, detect, status).
+
+    With a ShardedProcessPool, symbols are sharded across worker processes;
+    otherwise they are processed one at a time in this process.
+
+    Pattern changes reported by process_symbol() are published here, in the
+    main process, for the next generate_signals_batch().
+
+    Symbols whose active zones were changed here without ORM events (expired
+    patterns) are handed to the workers, which drop their in-memory zones
+    before processing them; symbols not processed this time stay queued.
+
+    Returns:
+        {symbol: process_symbol() result}
+    """
+    from app.services.pattern_events import publish_pattern_changes
+    from app.services.patterns.active_store import drain_stale_zones, mark_zones_stale
+
+    # This process's store already dropped them when they were marked
+    stale_zones = drain_stale_zones()
+
+    if pool is None:
+        results = {symbol: process_symbol(symbol, ohlcv, app, verbose) for symbol, ohlcv in fetch_results.items()}
+    else:
+        from app import db
+        from app.services.pattern_scanner import is_incremental_scanning_enabled
+        from app.services.symbol_registry import get_symbol_id
+
+        # Don't hand pooled connections to newly forked workers
+        if pool.will_spawn(fetch_results):
+            with app.app_context():
+                db.engine.dispose()
+
+        results, errors = pool.run(
+            _process_shard, fetch_results, verbose, is_incremental_scanning_enabled(), stale_zones
+        )
+        for symbol, error in errors.items():
+            results[symbol] = {'symbol': symbol, 'new': 0, 'patterns': 0, 'error': error}
+
+        if stale_zones:
+            with app.app_context():
+                processed = {get_symbol_id(s) for s, r in results.items() if 'error' not in r}
+            mark_zones_stale(stale_zones - processed)
+
+    for result in results.values():
+        publish_pattern_changes(result.get('pattern_changes', ()))
+    return results
+
+
+async def run_fetch_cycle(symbols, app, verbose=False, pool=None, exchange=None, last_timestamps=None,
+                          catchup_queue=None):
     """
     True parallel fetch cycle - ccxt handles rate limiting.
 
-    Phase 1: Batch query all timestamps (1 DB query)
+    Phase 1: Batch query all timestamps (1 DB query), one fetch window per symbol
     Phase 2: Parallel fetch all symbols (ccxt queues internally)
-    Phase 3: Sequential processing (after all fetches complete)
+    Phase 3: Process results (sharded across `pool` workers, or sequentially without one)
+
+    Each symbol fetches from its own last candle. Symbols more than
+    FETCH_CATCHUP_MAX_MINUTES behind are handed to `catchup_queue` (daemon) and
+    skipped here until caught up; without a queue they fetch one
+    FETCH_CATCHUP_MAX_MINUTES chunk per cycle, oldest first.
+
+    Args:
+        exchange: Long-lived exchange to reuse (daemon mode); created and closed here if None
+        last_timestamps: In-memory {symbol: last 1m timestamp} carried across cycles.
+                         Symbols missing from it are looked up in the DB, and it is
+                         updated with the candles processed this cycle.
+        catchup_queue: CatchupQueue for symbols too far behind (daemon mode)
     """
     import time as _time
+    from app.config import Config
 
     # Create exchange - let ccxt handle rate limiting
-    exchange = create_exchange('binance')
+    owns_exchange = exchange is None
+    if owns_exchange:
+        exchange = create_exchange('binance')
 
     now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
     target_time = datetime.now(timezone.utc).strftime('%H:%M')
 
     try:
-        # Phase 1: Get all timestamps in ONE query
+        # Phase 1: Get all timestamps in ONE query (only unknown symbols when cached)
         _t0 = _time.time()
-        last_timestamps = get_all_last_timestamps(app, symbols)
-
-        # Calculate aligned fetch start (oldest timestamp across all symbols)
-        fetch_start = get_aligned_fetch_start(last_timestamps, now_ms)
-        gap_minutes = (now_ms - fetch_start) // 60000
+        if last_timestamps is None:
+            cycle_timestamps = await run_sync(get_all_last_timestamps, app, symbols)
+        else:
+            missing = [s for s in symbols if s not in last_timestamps]
+            if missing:
+                last_timestamps.update(await run_sync(get_all_last_timestamps, app, missing))
+            cycle_timestamps = {s: last_timestamps[s] for s in symbols if s in last_timestamps}
+
+        # Individual window per symbol (from its own last candle)
+        max_catchup = Config.FETCH_CATCHUP_MAX_MINUTES
+        windows, lagging = get_symbol_fetch_windows(symbols, cycle_timestamps, now_ms, max_catchup)
+        if catchup_queue is not None:
+            for symbol, since in lagging.items():
+                catchup_queue.push(symbol, since)
+            windows = {s: w for s, w in windows.items() if s not in catchup_queue}
+        else:
+            for symbol, since in lagging.items():
+                windows[symbol] = (since, since + max_catchup * 60000)
+        max_gap = max(((until - since) // 60000 for since, until in windows.values()), default=0)
 
         if verbose:
             print(f"  Target: {target_time} UTC")
-            print(f"  Phase 1: Fetching {len(symbols)} symbols in parallel...")
-            for symbol in symbols:
-                print(f"  {symbol}: Fetching {gap_minutes} min gap...")
+            print(f"  Phase 1: Fetching {len(windows)} symbols in parallel...")
+            for symbol, (since, until) in windows.items():
+                catching_up = " (catching up)" if symbol in lagging else ""
+                print(f"  {symbol}: Fetching {(until - since) // 60000} min gap{catching_up}...")
 
-        logger.info(f"Fetch cycle: {len(symbols)} symbols, {gap_minutes} minutes gap")
+        logger.info(f"Fetch cycle: {len(windows)} symbols, max {max_gap} minutes gap, {len(lagging)} lagging")
 
         # Phase 2: Create ALL fetch tasks at once (true parallel)
         _t2 = _time.time()
         fetch_tasks = {
             symbol: asyncio.create_task(
-                fetch_symbol_batches(exchange, symbol, fetch_start, now_ms, verbose=False)
+                fetch_symbol_batches(exchange, symbol, since, until, verbose=False)
             )
-            for symbol in symbols
+            for symbol, (since, until) in windows.items()
         }
 
         # Wait for ALL fetches to complete (ccxt queues internally)
@@ -278,7 +472,8 @@ async def run_fetch_cycle(symbols, app, verbose=False):
 
         for symbol, task in fetch_tasks.items():
             try:
-                fetch_results[symbol] = await task
+                until = windows[symbol][1]
+                fetch_results[symbol] = [row for row in await task if row[0] < until]
             except Exception as e:
                 fetch_errors[symbol] = str(e)
                 fetch_results[symbol] = []
@@ -292,14 +487,21 @@ async def run_fetch_cycle(symbols, app, verbose=False):
 
         logger.info(f"Fetch phase complete: {total_candles:,} candles in {_t3-_t2:.1f}s")
 
-        # Phase 3: Process results sequentially (CPU-bound, doesn't block network)
+        # Phase 3: Process results (on the sync thread, doesn't block network)
         if verbose:
-            print(f"  Phase 2: Processing {len(symbols)} symbols...")
+            workers = f" across {pool.workers} workers" if pool else ""
+            print(f"  Phase 2: Processing {len(symbols)} symbols{workers}...")
 
         _t4 = _time.time()
+        to_process = {
+            symbol: fetch_results[symbol]
+            for symbol in symbols
+            if symbol not in fetch_errors and fetch_results.get(symbol)
+        }
+        processed = await run_sync(process_fetched, to_process, app, verbose, pool)
+
         results = []
         for symbol in symbols:
-            ohlcv = fetch_results.get(symbol, [])
             if symbol in fetch_errors:
                 results.append({
                     'symbol': symbol,
@@ -307,9 +509,12 @@ async def run_fetch_cycle(symbols, app, verbose=False):
                     'patterns': 0,
                     'error': fetch_errors[symbol]
                 })
-            elif ohlcv:
-                result = process_symbol(symbol, ohlcv, app, verbose)
-                results.append(result)
+            elif symbol in processed:
+                results.append(processed[symbol])
+                if last_timestamps is not None and not processed[symbol].get('error'):
+                    last_timestamps[symbol] = max(
+                        last_timestamps.get(symbol, 0), int(to_process[symbol][-1][0])
+                    )
             else:
                 results.append({'symbol': symbol, 'new': 0, 'patterns': 0})
 
@@ -320,25 +525,75 @@ async def run_fetch_cycle(symbols, app, verbose=False):
         return results
 
     finally:
-        await exchange.close()
+        if owns_exchange:
+            await exchange.close()
+
+
+# Epoch seconds of the last full signal sweep (None = not known yet in this process)
+_last_full_sweep = None
+
+
+def load_last_full_sweep(job_name='fetch'):
+    """Last full sweep time recorded with the job's latest completed run (None if unknown)."""
+    import json
+    from app.models import CronJob, CronRun
+
+    run = CronRun.query.join(CronJob).filter(
+        CronJob.name == job_name,
+        CronRun.ended_at.isnot(None)
+    ).order_by(CronRun.started_at.desc()).first()
+    if run is None or not run.details:
+        return None
+    try:
+        return json.loads(run.details).get('last_full_sweep')
+    except (ValueError, AttributeError):
+        return None
+
 
+def generate_signals_batch(app, verbose=False, full=None):
+    """
+    Generate signals (runs once after all fetches).
+
+    Only symbols whose active patterns changed since the last run are
+    evaluated; all active symbols are swept every SIGNAL_FULL_SWEEP_SECONDS
+    to catch cooldowns running out, setting changes and writes made by other
+    processes. The sweep time is carried in the CronRun details, so one-shot
+    cron runs keep to the same schedule as the daemon.
 
-def generate_signals_batch(app, verbose=False):
-    """Generate signals for all symbols (runs once after all fetches)."""
+    Args:
+        full: Force (True) or skip (False) the full sweep; None = by schedule
+    """
+    global _last_full_sweep
     import time as _time
+    from app.config import Config
+    from app.services.pattern_events import drain_pattern_changes, publish_pattern_changes
     from app.services.signals import scan_and_generate_signals
 
+    now = _time.time()
+    changed = drain_pattern_changes()
+
     with app.app_context():
         try:
+            if full is None:
+                if _last_full_sweep is None:
+                    _last_full_sweep = load_last_full_sweep()
+                full = _last_full_sweep is None or now - _last_full_sweep >= Config.SIGNAL_FULL_SWEEP_SECONDS
             _t0 = _time.time()
-            result = scan_and_generate_signals()
+            result = scan_and_generate_signals(None if full else changed)
+            if full:
+                _last_full_sweep = now
             elapsed = _time.time() - _t0
+            scope = 'all' if full else 'changed'
             if verbose:
-                print(f"  Generated {result['signals_generated']} signals ({elapsed:.1f}s)")
-            logger.info(f"Generated {result['signals_generated']} signals in {elapsed:.1f}s")
+                print(f"  Generated {result['signals_generated']} signals "
+                      f"({result['symbols_scanned']} {scope} symbols, {elapsed:.1f}s)")
+            logger.info(f"Generated {result['signals_generated']} signals "
+                        f"({result['symbols_scanned']} {scope} symbols) in {elapsed:.1f}s")
+            result['full_sweep'] = full
             result['time'] = elapsed
             return result
         except Exception as e:
+            publish_pattern_changes(changed)  # Retry these next cycle
             logger.error(f"Signal generation failed: {e}")
             if verbose:
                 print(f"  Signal error: {e}")
@@ -348,37 +603,23 @@ def generate_signals_batch(app, verbose=False):
 def expire_old_patterns(app, verbose=False):
     """Mark expired patterns based on timeframe-specific expiry."""
     import time as _time
-    from app.models import Pattern
-    from app.config import Config
+    from app.services.patterns import expire_patterns
     from app import db
 
     with app.app_context():
         _t0 = _time.time()
-        now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
-        active_patterns = Pattern.query.filter_by(status='active').all()
-
-        expired_count = 0
-        for pattern in active_patterns:
-            expiry_hours = Config.PATTERN_EXPIRY_HOURS.get(
-                pattern.timeframe,
-                Config.DEFAULT_PATTERN_EXPIRY_HOURS
-            )
-            expiry_ms = expiry_hours * 60 * 60 * 1000
-            expires_at = pattern.detected_at + expiry_ms
-
-            if now_ms > expires_at:
-                pattern.status = 'expired'
-                expired_count += 1
-
+        by_timeframe = expire_patterns()
+        expired_count = sum(by_timeframe.values())
         if expired_count > 0:
             db.session.commit()
 
         elapsed = _time.time() - _t0
-        logger.info(f"Expired {expired_count} patterns in {elapsed:.1f}s")
+        counts = ', '.join(f"{tf}={n}" for tf, n in by_timeframe.items() if n)
+        logger.info(f"Expired {expired_count} patterns in {elapsed:.3f}s" + (f" ({counts})" if counts else ""))
         if verbose:
-            print(f"  Expired {expired_count} patterns ({elapsed:.1f}s)")
+            print(f"  Expired {expired_count} patterns ({elapsed:.3f}s)")
 
-        return {'expired': expired_count, 'time': elapsed}
+        return {'expired': expired_count, 'by_timeframe': by_timeframe, 'time': elapsed}
 
 
 def start_cron_run(app, job_name='fetch'):
@@ -415,8 +656,9 @@ def start_cron_run(app, job_name='fetch'):
 
 def complete_cron_run(app, run_id, success=True, error_message=None,
                       symbols_processed=0, candles_fetched=0, patterns_found=0,
-                      signals_generated=0, notifications_sent=0):
-    """Complete a cron run with results."""
+                      signals_generated=0, notifications_sent=0, details=None):
+    """Complete a cron run with results (details: optional dict stored as JSON)."""
+    import json
     from app.models import CronRun
     from app import db
 
@@ -439,6 +681,8 @@ def complete_cron_run(app, run_id, success=True, error_message=None,
             run.patterns_found = patterns_found
             run.signals_generated = signals_generated
             run.notifications_sent = notifications_sent
+            if details is not None:
+                run.details = json.dumps(details)
             db.session.commit()
 
             logger.info(f"Cron run completed: success={success}, symbols={symbols_processed}, candles={candles_fetched}")
@@ -464,63 +708,78 @@ def release_lock(lock_file):
             pass
 
 
-def main():
-    import argparse
-    parser = argparse.ArgumentParser(description='Candle fetcher with pattern detection')
-    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
-    parser.add_argument('--gaps', action='store_true', help='Fill data gaps (hourly job)')
-    args = parser.parse_args()
-
-    # Acquire lock to prevent concurrent execution
-    lock_file = acquire_lock()
-    if lock_file is None:
-        print("Another instance is already running, skipping")
-        logger.warning("Fetch skipped: another instance is running")
-        return
-
-    job_name = 'gaps' if args.gaps else 'fetch'
+def next_cycle_time(now, interval=DAEMON_INTERVAL_SECONDS, offset=DAEMON_OFFSET_SECONDS):
+    """Next wall-clock-aligned cycle start after `now` (epoch seconds): k * interval + offset."""
+    return (int((now - offset) // interval) + 1) * interval + offset
 
-    ts = datetime.now(timezone.utc).strftime('%H:%M:%S')
-    print(f"[{ts}] {'Filling gaps' if args.gaps else 'Fetching'}...", end=' ', flush=True)
 
+async def run_job(app, job_name='fetch', verbose=False, pool=None, exchange=None,
+                  last_timestamps=None, scheduled_at=None, fetched=None, catchup_queue=None):
+    """
+    One complete fetch job, tracked as a CronRun: fetch + process all active
+    symbols, generate signals, expire patterns, refresh stats.
+
+    Args:
+        pool: ShardedProcessPool for the processing phase (None = in-process)
+        exchange: Warm exchange to reuse (daemon); a fresh one is created if None
+        last_timestamps: In-memory last 1m timestamps carried across daemon cycles
+        scheduled_at: Scheduled start (epoch seconds, daemon) or close time of the
+                      streamed bars (stream) - latency is recorded with the run
+        fetched: {symbol: closed 1m rows} already received (stream mode); skips
+                 the REST fetch and only processes these symbols
+        catchup_queue: CatchupQueue taking over symbols too far behind (daemon)
+
+    The synchronous phases run on the sync thread (run_sync), so websocket
+    streams and other tasks on the event loop keep running meanwhile.
+
+    Returns:
+        True if the job ran, False if it was disabled or there was nothing to do
+    """
     start_time = time.time()
     run_id = None
-    error_msg = None
-
-    from app import create_app
-    from app.models import Symbol
-
-    app = create_app()
+    if fetched is not None:
+        mode = 'stream'
+    else:
+        mode = 'daemon' if scheduled_at is not None else 'cron'
 
     try:
         # Start tracking the run
-        run_id = start_cron_run(app, job_name)
+        run_id = await run_sync(start_cron_run, app, job_name)
         if run_id is None:
             print("Job disabled, skipping")
-            return
+            return False
 
-        with app.app_context():
-            symbols = [s.symbol for s in Symbol.query.filter_by(is_active=True).all()]
+        if fetched is not None:
+            symbols = list(fetched)
+        else:
+            symbols = await run_sync(get_active_symbols, app)
 
         if not symbols:
             print("No active symbols found")
             logger.warning("No active symbols found")
-            complete_cron_run(app, run_id, success=True, symbols_processed=0)
-            return
+            await run_sync(functools.partial(complete_cron_run, app, run_id, success=True, symbols_processed=0))
+            return False
 
-        if args.verbose:
+        if verbose:
             print(f"\n  {len(symbols)} symbols")
 
         logger.info(f"Starting fetch cycle for {len(symbols)} symbols")
 
         # 1. Fetch and process all symbols (parallel)
-        results = asyncio.run(run_fetch_cycle(symbols, app, args.verbose))
+        if fetched is not None:
+            processed = await run_sync(process_fetched, fetched, app, verbose, pool)
+            results = [processed[symbol] for symbol in symbols]
+        else:
+            results = await run_fetch_cycle(
+                symbols, app, verbose, pool, exchange=exchange, last_timestamps=last_timestamps,
+                catchup_queue=catchup_queue
+            )
 
         # 2. Generate signals
-        signal_result = generate_signals_batch(app, args.verbose)
+        signal_result = await run_sync(generate_signals_batch, app, verbose)
 
         # 3. Expire old patterns
-        expire_result = expire_old_patterns(app, args.verbose)
+        expire_result = await run_sync(expire_old_patterns, app, verbose)
 
         # Summary
         total_new = sum(r.get('new', 0) for r in results)
@@ -528,53 +787,242 @@ def main():
         total_signals = signal_result.get('signals_generated', 0)
         errors = [r.get('error') for r in results if r.get('error')]
 
+        details = {
+            'mode': mode,
+            'workers': pool.workers if pool else 1,
+            'last_full_sweep': _last_full_sweep,
+            'symbol_times': {r['symbol']: round(r['time'], 3) for r in results if 'time' in r}
+        }
+        if scheduled_at is not None:
+            # How late the cycle started, and scheduled start -> results persisted
+            details['start_lag_ms'] = int((start_time - scheduled_at) * 1000)
+            details['cycle_latency_ms'] = int((time.time() - scheduled_at) * 1000)
+
         # Log success (or partial success with errors)
-        complete_cron_run(
-            app, run_id,
+        await run_sync(functools.partial(
+            complete_cron_run, app, run_id,
             success=len(errors) == 0,
             error_message='; '.join(errors[:3]) if errors else None,
             symbols_processed=len(symbols),
             candles_fetched=total_new,
             patterns_found=total_patterns,
             signals_generated=total_signals,
-            notifications_sent=0  # Updated by notification service if used
-        )
+            notifications_sent=0,  # Updated by notification service if used
+            details=details
+        ))
 
         # Refresh stats cache
-        from scripts.compute_stats import compute_stats
         _t_stats = time.time()
-        with app.app_context():
-            compute_stats()
+        await run_sync(refresh_stats, app)
         stats_time = time.time() - _t_stats
-        if args.verbose:
+        if verbose:
             print(f"  Stats cache refreshed ({stats_time:.1f}s)")
 
         elapsed = time.time() - start_time
 
         logger.info(f"Fetch cycle complete: {total_new} candles, {total_patterns} patterns, {total_signals} signals in {elapsed:.1f}s")
 
-        if args.verbose:
+        if verbose:
             print(f"[{datetime.now(timezone.utc).strftime('%H:%M:%S')}] "
                   f"Total: {total_new} candles, {total_patterns} patterns, {total_signals} signals "
                   f"({elapsed:.1f}s)")
         else:
             print(f"done. {total_new} candles, {total_patterns} patterns, {total_signals} signals ({elapsed:.1f}s)")
+        return True
 
     except Exception as e:
         error_msg = f"{type(e).__name__}: {str(e)}"
         print(f"ERROR: {error_msg}")
         logger.error(f"Fetch cycle failed: {error_msg}", exc_info=True)
-        if args.verbose:
+        if verbose:
             traceback.print_exc()
 
         # Log failure
-        complete_cron_run(
-            app, run_id,
+        await run_sync(functools.partial(
+            complete_cron_run, app, run_id,
             success=False,
-            error_message=error_msg
-        )
+            error_message=error_msg,
+            details={'mode': mode, 'last_full_sweep': _last_full_sweep}
+        ))
+        return False
+
+
+async def run_daemon(app, job_name='fetch', verbose=False, pool=None):
+    """
+    Resident fetch loop: run_job() once per minute, aligned to the wall clock.
+
+    The exchange (with markets loaded), the app's DB pool, the processing pool
+    and the last-timestamp map stay alive across cycles, and so does the
+    in-process state of the workers (streaming aggregation bars, pattern
+    scanners). A cycle that overruns skips the missed slots; the next cycle
+    fetches the whole gap. Symbols too far behind are caught up by a
+    CatchupQueue in the idle time between cycles. Stops cleanly on SIGINT/SIGTERM.
+    """
+    import signal
+    from app.config import Config
+    from scripts.utils.catchup_queue import CatchupQueue
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    exchange = create_exchange('binance')
+    last_timestamps = {}
+    catchup_queue = CatchupQueue(Config.FETCH_CATCHUP_MAX_MINUTES)
+
+    async def fetch_chunk(symbol, since, until):
+        return await fetch_symbol_batches(exchange, symbol, since, until)
+
+    async def process_chunk(batch):
+        return await run_sync(process_fetched, batch, app, verbose, pool)
+
+    try:
+        await exchange.load_markets()
+        logger.info(f"Fetch daemon started (workers={pool.workers if pool else 1})")
+
+        while not stop.is_set():
+            scheduled_at = next_cycle_time(time.time())
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(0.0, scheduled_at - time.time()))
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            ts = datetime.now(timezone.utc).strftime('%H:%M:%S')
+            print(f"[{ts}] {'Filling gaps' if job_name == 'gaps' else 'Fetching'}...", end=' ', flush=True)
+            await run_job(
+                app, job_name, verbose, pool,
+                exchange=exchange, last_timestamps=last_timestamps, scheduled_at=scheduled_at,
+                catchup_queue=catchup_queue
+            )
+
+            # Use the rest of the minute for symbols that are catching up
+            if len(catchup_queue):
+                deadline = next_cycle_time(time.time()) - DAEMON_CATCHUP_MARGIN_SECONDS
+                caught = await catchup_queue.drain(fetch_chunk, process_chunk, last_timestamps, deadline)
+                logger.info(f"Catch-up: {caught} candles, {len(catchup_queue)} symbol(s) still behind")
+
+            missed = int((time.time() - scheduled_at) // DAEMON_INTERVAL_SECONDS)
+            if missed > 0:
+                logger.warning(f"Fetch cycle overran by {missed} slot(s)")
+    finally:
+        await exchange.close()
+        logger.info("Fetch daemon stopped")
+
+
+async def run_stream(app, job_name='fetch', verbose=False, pool=None):
+    """
+    Websocket ingestion: process closed 1m klines as the exchange pushes them.
+
+    Subscribes to the kline stream of every active symbol (KlineStream), and
+    runs each per-minute batch of closed bars through the same pipeline as a
+    fetch cycle (run_job with fetched=...). Gaps - startup, reconnects, missed
+    bars - are fetched over REST with fetch_symbol_batches. The symbol list is
+    read once at startup; restart the process to pick up new symbols.
+    Batches from different connections are processed one job at a time, off
+    the event loop, so every connection keeps reading meanwhile.
+    Stops cleanly on SIGINT/SIGTERM.
+    """
+    import signal
+    from app.config import Config
+    from scripts.utils.kline_stream import KlineStream, MAX_STREAMS_PER_CONNECTION
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    symbols = get_active_symbols(app)
+    if not symbols:
+        print("No active symbols found")
+        logger.warning("No active symbols found")
+        return
+
+    # Symbols without candles start from the same default gap as a fetch cycle
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    last_timestamps = get_all_last_timestamps(app, symbols)
+    default_last = get_aligned_fetch_start({}, now_ms) - 60000
+    for symbol in symbols:
+        last_timestamps.setdefault(symbol, default_last)
+
+    exchange = create_exchange('binance')
+
+    async def backfill(symbol, since, until):
+        return await fetch_symbol_batches(exchange, symbol, since, until)
+
+    job_lock = asyncio.Lock()
+
+    async def on_bars(batch):
+        closed_at = (max(rows[-1][0] for rows in batch.values()) + 60000) / 1000
+        async with job_lock:
+            ts = datetime.now(timezone.utc).strftime('%H:%M:%S')
+            print(f"[{ts}] Streamed {len(batch)} symbols...", end=' ', flush=True)
+            await run_job(app, job_name, verbose, pool, scheduled_at=closed_at, fetched=batch)
+
+    streams = [
+        KlineStream(symbols[i:i + MAX_STREAMS_PER_CONNECTION], on_bars, backfill,
+                    last_timestamps=last_timestamps, url=Config.KLINE_STREAM_URL)
+        for i in range(0, len(symbols), MAX_STREAMS_PER_CONNECTION)
+    ]
+    try:
+        await exchange.load_markets()
+        logger.info(f"Kline stream started for {len(symbols)} symbols ({len(streams)} connection(s))")
+        await asyncio.gather(*(stream.run(stop) for stream in streams))
+    finally:
+        await exchange.close()
+        logger.info("Kline stream stopped")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Candle fetcher with pattern detection')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--gaps', action='store_true', help='Fill data gaps (hourly job)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Stay resident and run a cycle every minute (instead of cron)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stay resident and ingest closed 1m klines over the websocket')
+    args = parser.parse_args()
+
+    # Acquire lock to prevent concurrent execution
+    # (a running daemon holds it, so cron-started runs skip)
+    lock_file = acquire_lock()
+    if lock_file is None:
+        print("Another instance is already running, skipping")
+        logger.warning("Fetch skipped: another instance is running")
+        return
+
+    job_name = 'gaps' if args.gaps else 'fetch'
+
+    from app import create_app
+    from app.config import Config
+    from app.services.candle_cache import enable_candle_cache
+    from app.services.pattern_scanner import enable_incremental_scanning
+    from scripts.utils.process_pool import ShardedProcessPool
+
+    app = create_app()
+    enable_candle_cache()
+    # Scanner state and worker processes only outlive the cycle in a resident process
+    resident = args.daemon or args.stream
+    enable_incremental_scanning(resident)
+    pool = None
+    if resident and Config.FETCH_PROCESS_WORKERS > 1:
+        pool = ShardedProcessPool(Config.FETCH_PROCESS_WORKERS)
+
+    try:
+        if args.stream:
+            asyncio.run(run_stream(app, job_name, args.verbose, pool))
+        elif args.daemon:
+            asyncio.run(run_daemon(app, job_name, args.verbose, pool))
+        else:
+            ts = datetime.now(timezone.utc).strftime('%H:%M:%S')
+            print(f"[{ts}] {'Filling gaps' if args.gaps else 'Fetching'}...", end=' ', flush=True)
+            asyncio.run(run_job(app, job_name, args.verbose, pool))
 
     finally:
+        if pool is not None:
+            pool.close()
         # Always release the lock
         release_lock(lock_file)
 
@@ -4,6 +4,8 @@ Historical Data Fetcher with Gap Detection
 
 Features:
 - Async parallel fetching for speed
+- Full fetch split into chunks fetched concurrently across symbols, with
+  per-chunk checkpoints (BackfillChunk) - rerun to resume an interrupted load
 - Gap detection and filling
 - Progress tracking via database
 - Hourly cron for gap filling, manual for initial load
@@ -74,6 +76,7 @@ from scripts.utils.fetch_utils import (
     create_exchange,
     logger
 )
+from app.services.rate_scheduler import get_rate_scheduler, PRIORITY_BACKFILL, PRIORITY_REPAIR
 
 # Import retry utilities for error handling
 from scripts.utils.retry import (
@@ -234,7 +237,7 @@ async def fetch_range_with_save(
                     logger.warning(f"{symbol}: Rate limit hit, cooling off {wait_time}s (attempt {retries}/{MAX_RETRIES})")
                     if verbose:
                         print(f"\n    Rate limit hit, cooling off {wait_time}s...")
-                    await asyncio.sleep(wait_time)
+                    await get_rate_scheduler().backoff(wait_time)
 
                 elif is_timeout_error(e):
                     logger.warning(f"{symbol}: Timeout, retrying in {TIMEOUT_RETRY_DELAY_SECONDS}s (attempt {retries}/{MAX_RETRIES})")
@@ -275,45 +278,14 @@ async def fetch_range_with_save(
 
 
 def _save_candles_batch(app, symbol_id: int, candles: List) -> int:
-    """Save candles to database, skipping duplicates."""
-    from app import db
-    from app.models import Candle
+    """Save candles to database via the bulk writer, skipping duplicates."""
+    from app.services.candle_writer import bulk_insert_candles
 
     if not candles:
         return 0
 
     with app.app_context():
-        # Get existing timestamps
-        timestamps = [c[0] for c in candles]
-        existing = set(
-            c.timestamp for c in Candle.query.filter(
-                Candle.symbol_id == symbol_id,
-                Candle.timeframe == '1m',
-                Candle.timestamp.in_(timestamps)
-            ).all()
-        )
-
-        new_count = 0
-        for candle in candles:
-            ts, o, h, l, c, v = candle
-            if ts in existing:
-                continue
-            if any(x is None or x <= 0 for x in [o, h, l, c]):
-                continue
-
-            db.session.add(Candle(
-                symbol_id=symbol_id,
-                timeframe='1m',
-                timestamp=ts,
-                open=o, high=h, low=l, close=c,
-                volume=v or 0
-            ))
-            new_count += 1
-
-        if new_count > 0:
-            db.session.commit()
-
-        return new_count
+        return bulk_insert_candles(symbol_id, '1m', candles).inserted
 
 
 async def fill_gaps_for_symbol(
@@ -407,47 +379,6 @@ async def fill_gaps_for_symbol(
     return {'symbol': symbol_name, 'gaps': len(gaps), 'filled': total_filled}
 
 
-async def fetch_symbol_full(
-    exchange,
-    symbol_name: str,
-    symbol_id: int,
-    days: int,
-    verbose: bool = False,
-    index: int = 0,
-    total: int = 1,
-    app=None
-) -> dict:
-    """Fetch full history for a symbol with incremental saves."""
-    from app import create_app
-
-    now = datetime.now(timezone.utc)
-    start_ts = int((now - timedelta(days=days)).timestamp() * 1000)
-    end_ts = int(now.timestamp() * 1000)
-
-    # Always show progress (symbol name with index)
-    print(f"  [{index+1}/{total}] {symbol_name} ", end='', flush=True)
-
-    if verbose:
-        print(f"\n    Range: {days} days")
-
-    if app is None:
-        app = create_app()
-
-    # Fetch with incremental saves
-    fetched_count, new_count = await fetch_range_with_save(
-        exchange, symbol_name, symbol_id, start_ts, end_ts, app, verbose
-    )
-
-    # Show result on same line (after dots)
-    if not verbose:
-        print(f" {fetched_count:,} candles, {new_count:,} new", flush=True)
-    else:
-        print(f"    Saved {new_count:,} new candles")
-
-    logger.info(f"{symbol_name}: Fetched {fetched_count:,} candles, {new_count:,} new")
-    return {'symbol': symbol_name, 'fetched': fetched_count, 'new': new_count}
-
-
 async def run_gap_fill(
     symbols: List[Tuple[str, int]],
     days: int,
@@ -469,7 +400,7 @@ async def run_gap_fill(
     # Create app once to avoid repeated "Logging system active" messages
     app = create_app()
 
-    exchange = create_exchange('binance')
+    exchange = create_exchange('binance', priority=PRIORITY_REPAIR)
 
     # Semaphore to limit concurrent requests
     semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
@@ -511,31 +442,52 @@ async def run_full_fetch(
     days: int,
     verbose: bool = False
 ):
-    """Fetch full history for all symbols (sequential for progress display)."""
+    """
+    Fetch full history for all symbols with the resumable backfill engine.
+
+    Chunks of all symbols are fetched concurrently under the backfill share
+    of the rate budget; an interrupted run resumes from its checkpoints.
+    """
     from app import create_app
+    from app.services.backfill import BackfillEngine
 
     app = create_app()
-    exchange = create_exchange('binance')
+    exchange = create_exchange('binance', priority=PRIORITY_BACKFILL)
+
+    now = datetime.now(timezone.utc)
+    start_ts = int((now - timedelta(days=days)).timestamp() * 1000)
+    end_ts = (int(now.timestamp() * 1000) // 60000) * 60000  # Closed candles only
 
     logger.info(f"Starting full fetch for {len(symbols)} symbols, {days} days")
 
+    def progress(done, total, new):
+        print(f"\r  {progress_bar(done, total)} {done}/{total} chunks, {new:,} new", end='', flush=True)
+
     try:
-        results = []
-        total = len(symbols)
-        for i, (name, sid) in enumerate(symbols):
-            result = await fetch_symbol_full(exchange, name, sid, days, verbose, index=i, total=total, app=app)
-            results.append(result)
+        engine = BackfillEngine(exchange, app, progress=progress)
+        results = await engine.run(symbols, start_ts, end_ts)
+        print(flush=True)
+
+        for result in results.values():
+            line = f"  {result['symbol']}: {result['fetched']:,} candles, {result['new']:,} new"
+            if result['resumed']:
+                line += f" ({result['resumed']} chunks already complete)"
+            if result['errors']:
+                line += f" - {result['errors']} chunk(s) incomplete, rerun to resume"
+            if verbose or result['errors']:
+                print(line)
+            logger.info(line.strip())
 
-        return results
+        return list(results.values())
     finally:
         await exchange.close()
 
 
 def aggregate_all_symbols(verbose: bool = False, app=None, symbol_filter: str = None):
-    """Aggregate 1m candles to all higher timeframes."""
+    """Aggregate 1m candles to all higher timeframes (single pass per symbol)."""
     from app import create_app
     from app.models import Symbol
-    from app.services.aggregator import aggregate_all_timeframes
+    from app.services.resampler import resample_all_timeframes
 
     if app is None:
         app = create_app()
@@ -553,7 +505,7 @@ def aggregate_all_symbols(verbose: bool = False, app=None, symbol_filter: str =
             if verbose:
                 print(f"  [{i+1}/{len(symbols)}] {sym.symbol}...", end=' ', flush=True)
             try:
-                results = aggregate_all_timeframes(sym.symbol)
+                results = resample_all_timeframes(sym.id)
                 totals = sum(results.values())
                 total_candles += totals
                 if verbose:
@@ -611,7 +563,8 @@ def show_status():
 def delete_all():
     """Delete all data."""
     from app import create_app, db
-    from app.models import Candle, Pattern, Signal, Notification, Log
+    from app.models import BackfillChunk, Candle, Pattern, Signal, Notification, Log
+    from app.services.candle_store import invalidate_candles
 
     app = create_app()
     with app.app_context():
@@ -628,7 +581,9 @@ def delete_all():
         Pattern.query.delete()
         Log.query.delete()
         Candle.query.delete()
+        BackfillChunk.query.delete()  # Checkpoints refer to the deleted candles
         db.session.commit()
+        invalidate_candles()
         logger.info("All data deleted")
         print("Done.")
         return True
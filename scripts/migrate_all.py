@@ -76,6 +76,7 @@ def migrate():
             for col, col_type in pattern_cols.items():
                 add_column_if_not_exists('patterns', col, col_type, changes)
             add_index_if_not_exists('patterns', 'idx_pattern_list', '(status, detected_at)', changes)
+            add_index_if_not_exists('patterns', 'idx_pattern_expiry', '(status, timeframe, detected_at)', changes)
 
         # users table
         if table_exists('users'):
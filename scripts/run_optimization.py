@@ -21,7 +21,7 @@ Options:
     -e, --expiry        Comma-separated expiry multipliers (default: 0.5,1.0,2.0)
     -f, --full          Full mode: re-run ALL combinations (creates new job)
     -p, --parallel      Use parallel processing (3-4x faster for multiple symbols)
-    -w, --workers       Number of parallel workers (default: 4, max: 8)
+    -w, --workers       Number of parallel workers (default: 4, max: 16)
     -l, --list          List all optimization jobs
     -r, --results       Show all optimization results
     -b, --best          Show best parameters by symbol
@@ -420,7 +420,7 @@ def main():
     parser.add_argument('--reset', action='store_true', help='Delete ALL optimization data (requires confirmation)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show detailed progress')
     parser.add_argument('-p', '--parallel', action='store_true', help='Use parallel processing (3-4x faster)')
-    parser.add_argument('-w', '--workers', type=int, default=4, help='Number of parallel workers (default: 4, max: 8)')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='Number of parallel workers (default: 4, max: 16)')
 
     args = parser.parse_args()
 
@@ -0,0 +1,128 @@
+"""
+Catch-up queue for symbols that fell far behind.
+
+A symbol whose gap exceeds the per-cycle budget (FETCH_CATCHUP_MAX_MINUTES)
+is taken out of the regular fetch cycle and caught up here, oldest candles
+first, in chunks of at most that many minutes. Chunks are processed strictly
+in order so the streaming aggregator and pattern scanners see a contiguous
+series. Once a symbol is within one chunk of now it leaves the queue and the
+regular cycle picks it up again.
+
+The fetch daemon drains the queue in the idle time between cycles. One-shot
+cron runs have no queue and catch lagging symbols up one chunk per cycle inline.
+
+Usage:
+    from scripts.utils.catchup_queue import CatchupQueue
+
+    queue = CatchupQueue(chunk_minutes=1000)
+    queue.push('NEW/USDT', since_ms)
+    await queue.drain(fetch, process, deadline=next_cycle - 5)
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+logger = logging.getLogger('fetch')
+
+MINUTE_MS = 60000
+
+FetchChunk = Callable[[str, int, int], Awaitable[List[List]]]
+ProcessBatch = Callable[[Dict[str, List[List]]], Awaitable[Dict[str, dict]]]
+
+
+class CatchupQueue:
+    """Lagging symbols and the timestamp each one resumes from."""
+
+    def __init__(self, chunk_minutes: int = 1000, clock: Callable[[], float] = time.time):
+        self.chunk_minutes = chunk_minutes
+        self.clock = clock
+        self._since: Dict[str, int] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._since
+
+    def __len__(self) -> int:
+        return len(self._since)
+
+    def push(self, symbol: str, since: int) -> None:
+        """Queue a symbol (no-op if it is already catching up)."""
+        if symbol not in self._since:
+            logger.info(f"{symbol}: Queued for catch-up from {since}")
+            self._since[symbol] = since
+
+    def pending(self) -> Dict[str, int]:
+        return dict(self._since)
+
+    async def run_round(self, fetch: FetchChunk, process: ProcessBatch,
+                        last_timestamps: Dict[str, int] = None) -> int:
+        """
+        Fetch and process one chunk for every queued symbol.
+
+        Args:
+            fetch: async fetch(symbol, since, until) -> ohlcv rows
+            process: async process({symbol: rows}) -> {symbol: result}
+            last_timestamps: Caller's last-timestamp map, updated as symbols advance
+
+        Returns:
+            Candles processed in this round
+        """
+        if not self._since:
+            return 0
+
+        now_ms = int(self.clock() * 1000)
+        chunk_ms = self.chunk_minutes * MINUTE_MS
+        windows = {
+            symbol: (since, min(since + chunk_ms, now_ms))
+            for symbol, since in self._since.items()
+        }
+
+        fetched = await asyncio.gather(
+            *(fetch(symbol, since, until) for symbol, (since, until) in windows.items()),
+            return_exceptions=True
+        )
+
+        batch = {}
+        for (symbol, (since, until)), rows in zip(windows.items(), fetched):
+            if isinstance(rows, Exception):
+                logger.error(f"{symbol}: Catch-up fetch failed: {rows}")
+                continue
+            rows = [r for r in rows if since <= r[0] < until]
+            if rows:
+                batch[symbol] = rows
+            else:
+                # Nothing listed in this range (e.g. before the symbol existed): skip ahead
+                self._advance(symbol, until, now_ms, last_timestamps, None)
+
+        results = await process(batch) if batch else {}
+        total = 0
+        for symbol, rows in batch.items():
+            result = results.get(symbol, {})
+            if result.get('error'):
+                logger.error(f"{symbol}: Catch-up processing failed: {result['error']}")
+                continue
+            total += len(rows)
+            self._advance(symbol, rows[-1][0] + MINUTE_MS, now_ms, last_timestamps, rows[-1][0])
+        return total
+
+    def _advance(self, symbol: str, since: int, now_ms: int,
+                 last_timestamps: Dict[str, int], last_ts: int = None) -> None:
+        self._since[symbol] = since
+        if last_ts is not None and last_timestamps is not None:
+            last_timestamps[symbol] = max(last_timestamps.get(symbol, 0), last_ts)
+        if now_ms - since <= self.chunk_minutes * MINUTE_MS:
+            del self._since[symbol]
+            if last_timestamps is not None and last_ts is None:
+                last_timestamps[symbol] = max(last_timestamps.get(symbol, 0), since - MINUTE_MS)
+            logger.info(f"{symbol}: Caught up, back in the regular fetch cycle")
+
+    async def drain(self, fetch: FetchChunk, process: ProcessBatch,
+                    last_timestamps: Dict[str, int] = None, deadline: float = None) -> int:
+        """Run rounds until the queue is empty or `deadline` (epoch seconds) has passed."""
+        total = 0
+        while self._since and (deadline is None or self.clock() < deadline):
+            before = dict(self._since)
+            total += await self.run_round(fetch, process, last_timestamps)
+            if self._since == before:
+                break  # Every fetch/process failed - retry on the next drain
+        return total
@@ -7,7 +7,9 @@ fetch_historical.py (historical/gap-fill) scripts.
 Features:
 - Batch timestamp queries (single DB query for all symbols)
 - Aligned fetch start time calculation
-- True parallel async fetching with ccxt rate limiting
+- True parallel async fetching, rate limited by the shared request-weight
+  scheduler (app.services.rate_scheduler)
+- Bulk candle saves via app.services.candle_writer
 - Proper logging and error handling
 
 Usage:
@@ -25,6 +27,11 @@ from typing import Dict, List, Tuple
 
 import ccxt.async_support as ccxt_async
 
+from app.services.rate_scheduler import (
+    attach_rate_scheduler,
+    get_rate_scheduler,
+    PRIORITY_LIVE,
+)
 from scripts.utils.retry import (
     is_rate_limit_error,
     is_timeout_error,
@@ -133,34 +140,90 @@ def get_aligned_fetch_start(
     return fetch_start
 
 
-def create_exchange(exchange_id: str = 'binance', **options) -> ccxt_async.Exchange:
+def get_symbol_fetch_windows(
+    symbols: List[str],
+    timestamps: Dict[str, int],
+    now_ms: int,
+    max_catchup_minutes: int = 1000,
+    default_gap_minutes: int = 500
+) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, int]]:
+    """
+    Calculate an individual fetch window per symbol.
+
+    Each symbol fetches from the minute after its own last candle, so one
+    lagging or new symbol no longer widens the window of all the others.
+    Symbols further behind than max_catchup_minutes are returned separately
+    (with their start) so the caller can catch them up in bounded chunks.
+
+    Args:
+        symbols: Symbols to fetch
+        timestamps: Dict of symbol -> last timestamp (from get_all_last_timestamps)
+        now_ms: Current time in milliseconds
+        max_catchup_minutes: Largest gap fetched in a regular cycle
+        default_gap_minutes: Gap for symbols without data (default 500 minutes)
+
+    Returns:
+        (windows, lagging) - {symbol: (since, until)} for regular fetches and
+        {symbol: since} for symbols whose gap exceeds max_catchup_minutes.
+        All starts are aligned to the minute boundary.
+
+    Example:
+        >>> windows, lagging = get_symbol_fetch_windows(
+        ...     ['BTC/USDT', 'NEW/USDT'], {'BTC/USDT': 1702503480000}, 1702503600000)
+        >>> windows['BTC/USDT']
+        (1702503540000, 1702503600000)
     """
-    Create an async exchange instance with rate limiting enabled.
+    windows = {}
+    lagging = {}
+    for symbol in symbols:
+        last_ts = timestamps.get(symbol)
+        if last_ts is None:
+            since = now_ms - default_gap_minutes * 60000
+        else:
+            since = last_ts + 60000
+        since = (since // 60000) * 60000
+
+        if (now_ms - since) // 60000 > max_catchup_minutes:
+            lagging[symbol] = since
+        else:
+            windows[symbol] = (since, now_ms)
+    return windows, lagging
+
+
+def create_exchange(
+    exchange_id: str = 'binance',
+    priority: int = PRIORITY_LIVE,
+    **options
+) -> ccxt_async.Exchange:
+    """
+    Create an async exchange instance rate limited by the shared scheduler.
 
     Args:
         exchange_id: Exchange identifier (default 'binance')
+        priority: Scheduler priority for this instance's requests
+            (PRIORITY_LIVE, PRIORITY_REPAIR, PRIORITY_BACKFILL, ...)
         **options: Additional options to pass to exchange constructor
 
     Returns:
         Configured async exchange instance
 
     Example:
-        >>> exchange = create_exchange('binance')
+        >>> exchange = create_exchange('binance', priority=PRIORITY_BACKFILL)
         >>> # ... use exchange ...
         >>> await exchange.close()
     """
     exchange_class = getattr(ccxt_async, exchange_id)
 
     default_options = {
-        'enableRateLimit': True,  # Let ccxt handle rate limiting
+        'enableRateLimit': True,  # Requests go through throttle() -> rate scheduler
         'options': {'defaultType': 'spot'},
     }
 
     # Merge with provided options
     config = {**default_options, **options}
 
-    exchange = exchange_class(config)
-    logger.debug(f"Created {exchange_id} exchange with rate limiting enabled")
+    exchange = attach_rate_scheduler(exchange_class(config), priority)
+    logger.debug(f"Created {exchange_id} exchange (rate scheduler priority {priority})")
 
     return exchange
 
@@ -178,7 +241,8 @@ async def fetch_symbol_batches(
     Fetch all candle batches for a single symbol within a time range.
 
     This function handles pagination automatically, fetching multiple batches
-    until all data in the range is retrieved. ccxt handles rate limiting internally.
+    until all data in the range is retrieved. Request pacing is done by the
+    exchange's rate scheduler; a rate limit error pauses every caller.
 
     Args:
         exchange: ccxt async exchange instance
@@ -247,7 +311,7 @@ async def fetch_symbol_batches(
                     logger.warning(f"{symbol}: Rate limit hit, cooling off {wait_time}s (attempt {retries}/{MAX_RETRIES})")
                     if verbose:
                         print(f"    {symbol}: Rate limit, waiting {wait_time}s...")
-                    await asyncio.sleep(wait_time)
+                    await get_rate_scheduler().backoff(wait_time)
 
                 elif is_timeout_error(e):
                     logger.warning(f"{symbol}: Timeout, retrying in {TIMEOUT_RETRY_DELAY_SECONDS}s (attempt {retries}/{MAX_RETRIES})")
@@ -296,7 +360,7 @@ async def fetch_symbols_parallel(
     Fetch candles for multiple symbols in true parallel.
 
     Creates tasks for all symbols and waits for them to complete.
-    ccxt handles rate limiting internally, queueing requests as needed.
+    The rate scheduler queues requests as needed.
 
     Args:
         symbols: List of symbols to fetch
@@ -367,10 +431,13 @@ def save_candles_to_db(
     """
     Save candles to database, skipping duplicates.
 
+    Uses the shared bulk writer (multi-row INSERT that relies on the
+    uix_candle unique key instead of a pre-SELECT of existing timestamps).
+
     Args:
         app: Flask application instance
         symbol_name: Symbol name (e.g., 'BTC/USDT')
-        candles: List of OHLCV candles
+        candles: List of OHLCV candles (or an (n, 6) NumPy array)
         timeframe: Candle timeframe (default '1m')
 
     Returns:
@@ -380,49 +447,21 @@ def save_candles_to_db(
         >>> new_count = save_candles_to_db(app, 'BTC/USDT', candles)
         >>> print(f"Saved {new_count} new candles")
     """
-    from app.models import Symbol, Candle
-    from app import db
+    from app.services.candle_writer import bulk_insert_candles
+    from app.services.symbol_registry import get_symbol_id
 
-    if not candles:
+    if candles is None or len(candles) == 0:
         return 0
 
     with app.app_context():
-        sym = Symbol.query.filter_by(symbol=symbol_name).first()
-        if not sym:
+        symbol_id = get_symbol_id(symbol_name)
+        if symbol_id is None:
             logger.warning(f"{symbol_name}: Symbol not found in database")
             return 0
 
-        # Get existing timestamps
-        timestamps = [c[0] for c in candles]
-        existing = set(
-            c.timestamp for c in Candle.query.filter(
-                Candle.symbol_id == sym.id,
-                Candle.timeframe == timeframe,
-                Candle.timestamp.in_(timestamps)
-            ).all()
-        )
-
-        new_count = 0
-        for candle in candles:
-            ts, o, h, l, c, v = candle
-            if ts in existing:
-                continue
-
-            # Validate candle data
-            if any(x is None or x <= 0 for x in [o, h, l, c]):
-                continue
-
-            db.session.add(Candle(
-                symbol_id=sym.id,
-                timeframe=timeframe,
-                timestamp=ts,
-                open=o, high=h, low=l, close=c,
-                volume=v or 0
-            ))
-            new_count += 1
-
-        if new_count > 0:
-            db.session.commit()
-            logger.debug(f"{symbol_name}: Saved {new_count} new candles")
-
-        return new_count
+        result = bulk_insert_candles(symbol_id, timeframe, candles)
+
+        if result.inserted > 0:
+            logger.debug(f"{symbol_name}: Saved {result.inserted} new candles ({result.ignored} already existed)")
+
+        return result.inserted
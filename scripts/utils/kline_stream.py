@@ -0,0 +1,237 @@
+"""
+Streaming 1m kline ingestion over the exchange websocket.
+
+Closed 1m bars are handed to a callback in per-minute batches; gaps (on
+reconnect or a missed bar) are filled through the REST `backfill` callback.
+
+Usage:
+    from scripts.utils.kline_stream import KlineStream
+
+    stream = KlineStream(symbols, on_bars=process_batch, backfill=fetch_gap,
+                         last_timestamps=last_ts)
+    await stream.run(stop_event)
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger('fetch')
+
+# Binance combined stream endpoint (streams are passed as ?streams=a/b/c)
+DEFAULT_STREAM_URL = 'wss://stream.binance.com:9443/stream'
+
+# Binance allows up to 1024 streams per connection
+MAX_STREAMS_PER_CONNECTION = 1024
+
+MINUTE_MS = 60000
+
+BarsCallback = Callable[[Dict[str, List[List]]], Awaitable[None]]
+BackfillCallback = Callable[[str, int, int], Awaitable[List[List]]]
+
+
+def stream_name(symbol: str) -> str:
+    """'BTC/USDT' -> 'btcusdt@kline_1m'"""
+    return f"{symbol.replace('/', '').lower()}@kline_1m"
+
+
+def parse_kline_message(message: dict) -> Optional[tuple]:
+    """
+    Parse a combined-stream kline message.
+
+    Returns:
+        (exchange_symbol, ohlcv_row, is_closed), e.g. ('BTCUSDT', [ts, o, h, l, c, v], True),
+        or None for anything that is not a kline event
+    """
+    data = message.get('data', message)
+    if not isinstance(data, dict) or data.get('e') != 'kline':
+        return None
+    k = data['k']
+    row = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+    return data.get('s', k.get('s')), row, bool(k['x'])
+
+
+class KlineStream:
+    """One websocket connection streaming closed 1m klines for a set of symbols."""
+
+    def __init__(
+        self,
+        symbols: List[str],
+        on_bars: BarsCallback,
+        backfill: BackfillCallback,
+        last_timestamps: Dict[str, int] = None,
+        url: str = DEFAULT_STREAM_URL,
+        flush_delay: float = 1.0,
+        reconnect_min_delay: float = 1.0,
+        reconnect_max_delay: float = 60.0,
+        heartbeat: float = 30.0,
+        clock: Callable[[], float] = time.time
+    ):
+        if len(symbols) > MAX_STREAMS_PER_CONNECTION:
+            raise ValueError(f"At most {MAX_STREAMS_PER_CONNECTION} symbols per connection")
+        self.symbols = list(symbols)
+        self.on_bars = on_bars
+        self.backfill = backfill
+        # Last closed 1m bar delivered per symbol (shared with the caller)
+        self.last_timestamps = last_timestamps if last_timestamps is not None else {}
+        self.url = url
+        self.flush_delay = flush_delay
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.heartbeat = heartbeat
+        self.clock = clock  # Epoch seconds (decides what has closed when backfilling)
+
+        self._by_exchange_symbol = {s.replace('/', '').upper(): s for s in self.symbols}
+        self._pending: Dict[str, Dict[int, List]] = {}
+        self._in_flight: Dict[str, int] = {}  # Newest bar per symbol of the batch being processed
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+        self._flush_lock = asyncio.Lock()
+        self.connects = 0
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.url}?streams={'/'.join(stream_name(s) for s in self.symbols)}"
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Stream until `stop` is set, reconnecting with backoff on any failure."""
+        delay = self.reconnect_min_delay
+        async with aiohttp.ClientSession() as session:
+            while not stop.is_set():
+                try:
+                    await self._run_connection(session, stop)
+                    delay = self.reconnect_min_delay
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Kline stream disconnected: {e}; reconnecting in {delay:.0f}s")
+                if stop.is_set():
+                    break
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks)
+        await self.flush()
+
+    async def _run_connection(self, session: aiohttp.ClientSession, stop: asyncio.Event) -> None:
+        async with session.ws_connect(self.stream_url, heartbeat=self.heartbeat) as ws:
+            self.connects += 1
+            logger.info(f"Kline stream connected ({len(self.symbols)} symbols)")
+
+            # Anything that closed while we were away comes from REST
+            await self._backfill_all()
+
+            stop_wait = asyncio.ensure_future(stop.wait())
+            try:
+                while True:
+                    receive = asyncio.ensure_future(ws.receive())
+                    done, _ = await asyncio.wait({receive, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                    if stop_wait in done:
+                        receive.cancel()
+                        return
+                    msg = receive.result()
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        await self._handle_message(json.loads(msg.data))
+                    elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                      aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                        raise ConnectionError(f"websocket closed ({msg.type.name})")
+            finally:
+                stop_wait.cancel()
+
+    async def _handle_message(self, message: dict) -> None:
+        parsed = parse_kline_message(message)
+        if parsed is None:
+            return
+        exchange_symbol, row, is_closed = parsed
+        symbol = self._by_exchange_symbol.get(exchange_symbol)
+        if symbol is None or not is_closed:
+            return
+
+        last_ts = self._last_seen(symbol)
+        if last_ts is not None and row[0] <= last_ts:
+            return  # Already delivered (replayed after reconnect/backfill)
+        if last_ts is not None and row[0] > last_ts + MINUTE_MS:
+            await self._backfill_symbol(symbol, last_ts + MINUTE_MS, row[0])
+
+        self._add(symbol, [row])
+
+    def _last_seen(self, symbol: str) -> Optional[int]:
+        pending = self._pending.get(symbol)
+        if pending:
+            return max(pending)
+        if symbol in self._in_flight:
+            return self._in_flight[symbol]
+        return self.last_timestamps.get(symbol)
+
+    def _add(self, symbol: str, rows: List[List]) -> None:
+        if not rows:
+            return
+        bucket = self._pending.setdefault(symbol, {})
+        for row in rows:
+            bucket[int(row[0])] = row
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_delay, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """
+        Deliver all pending closed bars (oldest first per symbol).
+
+        last_timestamps only advances once the batch was processed; if
+        processing fails, the next bar for a symbol shows up as a gap and the
+        missed bars are fetched again over REST.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = {symbol: [bars[ts] for ts in sorted(bars)] for symbol, bars in self._pending.items()}
+            self._pending = {}
+            self._in_flight = {symbol: rows[-1][0] for symbol, rows in batch.items()}
+            try:
+                await self.on_bars(batch)
+            except Exception as e:
+                logger.error(f"Kline batch processing failed ({len(batch)} symbols): {e}")
+                return
+            finally:
+                self._in_flight = {}
+            for symbol, rows in batch.items():
+                self.last_timestamps[symbol] = max(self.last_timestamps.get(symbol, 0), rows[-1][0])
+
+    async def _backfill_all(self) -> None:
+        now_ms = int(self.clock() * 1000)
+        until = (now_ms // MINUTE_MS) * MINUTE_MS  # Start of the still-open minute
+        tasks = {}
+        for symbol in self.symbols:
+            last_ts = self._last_seen(symbol)
+            if last_ts is not None and last_ts + MINUTE_MS < until:
+                tasks[symbol] = self._backfill_symbol(symbol, last_ts + MINUTE_MS, until)
+        if tasks:
+            await asyncio.gather(*tasks.values())
+
+    async def _backfill_symbol(self, symbol: str, since: int, until: int) -> None:
+        """Fetch closed bars in [since, until) over REST and queue them."""
+        try:
+            rows = await self.backfill(symbol, since, until)
+        except Exception as e:
+            logger.error(f"{symbol}: Kline gap backfill failed: {e}")
+            return
+        rows = [r for r in rows if since <= r[0] < until]
+        if rows:
+            logger.info(f"{symbol}: Backfilled {len(rows)} candles over REST")
+            self._add(symbol, rows)
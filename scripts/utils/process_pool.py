@@ -0,0 +1,138 @@
+"""
+Sharded process pool for per-symbol work.
+
+Symbols are sharded across a fixed set of single-process executors by a stable
+hash of the symbol name, so the same symbol always lands on the same worker
+process. That keeps per-process state (streaming aggregators, pattern
+scanners) warm across cycles for as long as the pool lives, while different
+symbols are processed in parallel.
+
+Each worker owns its own Flask app and DB session; the worker function is
+responsible for creating them (once per process) and must be a picklable
+module-level function taking (items, *args) and returning {key: result}.
+
+Usage:
+    from scripts.utils.process_pool import ShardedProcessPool
+
+    with ShardedProcessPool(workers=4) as pool:
+        results, errors = pool.run(_process_shard, {'BTC/USDT': ohlcv, ...}, verbose)
+"""
+import logging
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger('fetch')
+
+
+def shard_index(key: str, shards: int) -> int:
+    """Stable shard for a key (same across processes and runs, unlike hash())."""
+    return zlib.crc32(str(key).encode('utf-8')) % shards
+
+
+def shard_items(items: Dict[Hashable, Any], shards: int) -> List[List[Tuple[Hashable, Any]]]:
+    """Split {key: value} into `shards` lists of (key, value), keeping key order within a shard."""
+    buckets: List[List[Tuple[Hashable, Any]]] = [[] for _ in range(shards)]
+    for key, value in items.items():
+        buckets[shard_index(key, shards)].append((key, value))
+    return buckets
+
+
+class ShardedProcessPool:
+    """One single-process executor per shard, created lazily and reused across runs."""
+
+    def __init__(self, workers: int):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self._executors: List[Optional[ProcessPoolExecutor]] = [None] * workers
+
+    def _executor(self, shard: int) -> ProcessPoolExecutor:
+        executor = self._executors[shard]
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=1)
+            self._executors[shard] = executor
+        return executor
+
+    def will_spawn(self, items: Dict[Hashable, Any]) -> bool:
+        """Whether running these items starts (forks) at least one new worker process."""
+        return any(
+            bucket and self._executors[shard] is None
+            for shard, bucket in enumerate(shard_items(items, self.workers))
+        )
+
+    def _discard(self, shard: int) -> None:
+        """Drop a shard's executor (its process died or hung); a new one is started on next use."""
+        executor = self._executors[shard]
+        self._executors[shard] = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(
+        self,
+        fn: Callable[..., Dict[Hashable, Any]],
+        items: Dict[Hashable, Any],
+        *args,
+        timeout: float = None
+    ) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+        """
+        Run fn(shard_items, *args) for every non-empty shard in parallel.
+
+        Args:
+            fn: Module-level worker returning {key: result} for its shard
+            items: {key: value} to distribute
+            timeout: Seconds to wait for all shards (None = no limit)
+
+        Returns:
+            (results, errors) - results merged across shards, and
+            {key: error message} for every key whose shard failed
+        """
+        futures = {}
+        for shard, bucket in enumerate(shard_items(items, self.workers)):
+            if not bucket:
+                continue
+            try:
+                futures[self._executor(shard).submit(fn, bucket, *args)] = (shard, bucket)
+            except (BrokenProcessPool, RuntimeError):
+                # Executor broke since the last run - start a fresh process and retry once
+                self._discard(shard)
+                futures[self._executor(shard).submit(fn, bucket, *args)] = (shard, bucket)
+
+        done, not_done = wait(futures, timeout=timeout)
+
+        results: Dict[Hashable, Any] = {}
+        errors: Dict[Hashable, str] = {}
+        for future in done:
+            shard, bucket = futures[future]
+            try:
+                results.update(future.result())
+            except Exception as e:
+                logger.error(f"Worker shard {shard} failed ({len(bucket)} items): {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._discard(shard)
+                for key, _ in bucket:
+                    errors[key] = f"worker failed: {e}"
+
+        for future in not_done:
+            shard, bucket = futures[future]
+            logger.error(f"Worker shard {shard} timed out ({len(bucket)} items)")
+            self._discard(shard)
+            for key, _ in bucket:
+                errors[key] = "worker timed out"
+
+        return results, errors
+
+    def close(self) -> None:
+        for shard in range(self.workers):
+            executor = self._executors[shard]
+            self._executors[shard] = None
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -23,6 +23,8 @@ from typing import Callable, Any, Optional
 
 import ccxt
 
+from app.services.rate_scheduler import get_rate_scheduler
+
 # Configure module logger
 logger = logging.getLogger('fetch')
 
@@ -156,7 +158,8 @@ async def async_retry_call(
                 if on_retry:
                     on_retry(attempt, e, wait_time)
                 if attempts_left > 0:
-                    await asyncio.sleep(wait_time)
+                    # Pause every exchange caller, not just this one
+                    await get_rate_scheduler().backoff(wait_time)
 
             elif is_timeout_error(e):
                 wait_time = TIMEOUT_RETRY_DELAY_SECONDS
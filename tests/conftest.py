@@ -12,6 +12,10 @@ import pytest
 import os
 from datetime import datetime, timezone, timedelta
 
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
 # Set test environment before importing app
 os.environ['FLASK_ENV'] = 'testing'
 
@@ -465,9 +469,49 @@ def user_expiring_soon(app):
         return user.id
 
 
+@pytest.fixture
+def count_queries(app):
+    """List that collects every SQL statement executed on the test engine"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
 def login_user(client, email, password):
     """Helper function to log in a user"""
     return client.post('/auth/login', data={
         'email': email,
         'password': password
     }, follow_redirects=True)
+
+
+def add_pattern(symbol_id, timeframe='1h', pattern_type='imbalance', direction='bullish',
+                zone_low=100.0, zone_high=102.0, detected_at=1700000000000, status='active'):
+    """Add a Pattern to the session (caller commits)"""
+    pattern = Pattern(
+        symbol_id=symbol_id, timeframe=timeframe, pattern_type=pattern_type, direction=direction,
+        zone_low=zone_low, zone_high=zone_high, detected_at=detected_at, status=status
+    )
+    db.session.add(pattern)
+    return pattern
+
+
+def random_walk(n, seed, interval_ms=3600000):
+    """Synthetic OHLCV DataFrame (random walk) for pattern detection tests"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.0, n))
+    open_ = np.concatenate(([100.0], close[:-1])) + rng.normal(0, 0.3, n)
+    spread = np.abs(rng.normal(0, 0.7, n))
+    return pd.DataFrame({
+        'timestamp': 1700000000000 + np.arange(n, dtype=np.int64) * interval_ms,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': 1000.0,
+    })
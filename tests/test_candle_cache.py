@@ -0,0 +1,203 @@
+"""
+Tests for the in-process hot candle cache.
+
+Covers:
+- Ring appends, capacity bound and views that stay valid across appends
+- get_candles_as_dataframe() served from the ring matches the DB read
+- Reads return views of the ring arrays and run no queries
+- Committed bulk inserts extend the ring, rolled back ones do not
+- Gaps and rows inserted inside the cached range drop the ring
+- Limits deeper than the ring and a disabled cache fall back to the DB
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import db
+from app.models import Symbol
+from app.services import candle_cache as candle_cache_module
+from app.services.aggregator import get_candles_as_dataframe
+from app.services.candle_cache import CandleRing, enable_candle_cache, get_candle_cache
+from app.services.candle_writer import bulk_insert_candles
+
+MINUTE_MS = 60000
+BASE_TS = 1700000000000 - (1700000000000 % MINUTE_MS)
+
+
+def make_rows(start, count, price=100.0):
+    return [
+        [BASE_TS + (start + i) * MINUTE_MS, price + i, price + i + 2, price + i - 1, price + i + 1, 10.0 + i]
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def cache(app):
+    cache = enable_candle_cache(capacity=50)
+    yield cache
+    enable_candle_cache(capacity=0)
+
+
+@pytest.fixture
+def symbol_id(app):
+    sym = Symbol(symbol='BTC/USDT', exchange='binance')
+    db.session.add(sym)
+    db.session.commit()
+    bulk_insert_candles(sym.id, '1m', make_rows(0, 80))
+    return sym.id
+
+
+def db_frame(symbol_id, limit):
+    enabled = get_candle_cache().capacity
+    get_candle_cache().capacity = 0
+    try:
+        return get_candles_as_dataframe(symbol_id, '1m', limit)
+    finally:
+        get_candle_cache().capacity = enabled
+
+
+class TestCandleRing:
+    """Tests for the ring buffer itself"""
+
+    def make_ring(self, count, capacity=10):
+        arr = np.array(make_rows(0, count), dtype=np.float64)
+        return CandleRing(capacity, MINUTE_MS, arr[:, 0].astype(np.int64), arr[:, 1:],
+                          complete=count < capacity, loaded_at=0.0)
+
+    def test_capacity_bound(self):
+        ring = self.make_ring(8)
+        assert ring.complete
+
+        arr = np.array(make_rows(8, 5), dtype=np.float64)
+        ring.append(arr[:, 0].astype(np.int64), arr[:, 1:])
+
+        assert len(ring) == 10
+        assert ring.first_ts == BASE_TS + 3 * MINUTE_MS
+        assert ring.last_ts == BASE_TS + 12 * MINUTE_MS
+        assert not ring.complete
+
+    def test_views_survive_appends(self):
+        ring = self.make_ring(10)
+        before = ring.tail(10)
+        expected = before.copy()
+
+        for start in range(10, 200, 7):
+            arr = np.array(make_rows(start, 7), dtype=np.float64)
+            ring.append(arr[:, 0].astype(np.int64), arr[:, 1:])
+
+        pd.testing.assert_frame_equal(before, expected)
+        assert ring.tail(3)['timestamp'].tolist() == [BASE_TS + m * MINUTE_MS for m in (203, 204, 205)]
+
+    def test_views_are_read_only(self):
+        df = self.make_ring(10).tail(5)
+        with pytest.raises(ValueError):
+            df.loc[0, 'close'] = 1.0
+        df['tr'] = df['high'] - df['low']  # New columns are fine
+
+    def test_after(self):
+        ring = self.make_ring(10)
+        assert ring.after(BASE_TS + 7 * MINUTE_MS)['timestamp'].tolist() == [
+            BASE_TS + 8 * MINUTE_MS, BASE_TS + 9 * MINUTE_MS
+        ]
+        assert ring.after(BASE_TS + 9 * MINUTE_MS).empty
+
+
+class TestCandleCacheReads:
+    """Tests for reads through get_candles_as_dataframe()"""
+
+    def test_matches_db(self, cache, symbol_id):
+        from_ring = get_candles_as_dataframe(symbol_id, '1m', 30)
+        pd.testing.assert_frame_equal(from_ring, db_frame(symbol_id, 30), check_dtype=False)
+
+    def test_zero_copy_without_queries(self, cache, symbol_id, count_queries):
+        first = get_candles_as_dataframe(symbol_id, '1m', 20)
+        loads = len(count_queries)
+        second = get_candles_as_dataframe(symbol_id, '1m', 40)
+
+        assert len(count_queries) == loads
+        assert np.shares_memory(first['close'].to_numpy(), second['close'].to_numpy())
+
+    def test_deeper_than_ring_reads_db(self, cache, symbol_id, count_queries):
+        get_candles_as_dataframe(symbol_id, '1m', 20)
+        loads = len(count_queries)
+
+        df = get_candles_as_dataframe(symbol_id, '1m', 70)
+
+        assert len(df) == 70
+        assert len(count_queries) > loads
+
+    def test_short_series_is_complete(self, cache, app):
+        sym = Symbol(symbol='NEW/USDT', exchange='binance')
+        db.session.add(sym)
+        db.session.commit()
+        bulk_insert_candles(sym.id, '1m', make_rows(0, 5))
+
+        assert len(get_candles_as_dataframe(sym.id, '1m', 40)) == 5
+        assert get_candle_cache().get_dataframe(sym.id, '1m', 40) is not None
+
+    def test_disabled_reads_db(self, app, symbol_id):
+        assert get_candle_cache().get_dataframe(symbol_id, '1m', 10) is None
+        assert len(get_candles_as_dataframe(symbol_id, '1m', 10)) == 10
+
+
+class TestCandleCacheWrites:
+    """Tests for keeping rings in step with committed writes"""
+
+    def test_commit_extends_ring(self, cache, symbol_id, count_queries):
+        get_candles_as_dataframe(symbol_id, '1m', 10)
+
+        bulk_insert_candles(symbol_id, '1m', make_rows(80, 3))
+        loads = len(count_queries)
+        df = get_candles_as_dataframe(symbol_id, '1m', 10)
+
+        assert len(count_queries) == loads
+        assert df['timestamp'].iloc[-1] == BASE_TS + 82 * MINUTE_MS
+        pd.testing.assert_frame_equal(df, db_frame(symbol_id, 10), check_dtype=False)
+
+    def test_rollback_discards(self, cache, symbol_id):
+        get_candles_as_dataframe(symbol_id, '1m', 10)
+
+        bulk_insert_candles(symbol_id, '1m', make_rows(80, 3), commit=False)
+        db.session.rollback()
+
+        df = get_candles_as_dataframe(symbol_id, '1m', 10)
+        assert df['timestamp'].iloc[-1] == BASE_TS + 79 * MINUTE_MS
+
+    def test_gap_drops_ring(self, cache, symbol_id):
+        get_candles_as_dataframe(symbol_id, '1m', 10)
+
+        bulk_insert_candles(symbol_id, '1m', make_rows(85, 2))
+
+        assert (symbol_id, '1m') not in cache._rings
+        df = get_candles_as_dataframe(symbol_id, '1m', 10)
+        pd.testing.assert_frame_equal(df, db_frame(symbol_id, 10), check_dtype=False)
+
+    def test_fill_inside_range_drops_ring(self, cache, app):
+        sym = Symbol(symbol='GAP/USDT', exchange='binance')
+        db.session.add(sym)
+        db.session.commit()
+        rows = make_rows(0, 20)
+        bulk_insert_candles(sym.id, '1m', rows[:10] + rows[11:])
+        get_candles_as_dataframe(sym.id, '1m', 10)
+
+        bulk_insert_candles(sym.id, '1m', [rows[10]])
+
+        assert (sym.id, '1m') not in cache._rings
+        assert len(get_candles_as_dataframe(sym.id, '1m', 40)) == 20
+
+    def test_duplicates_keep_ring(self, cache, symbol_id):
+        get_candles_as_dataframe(symbol_id, '1m', 10)
+
+        bulk_insert_candles(symbol_id, '1m', make_rows(75, 6))
+
+        assert (symbol_id, '1m') in cache._rings
+        assert get_candles_as_dataframe(symbol_id, '1m', 1)['timestamp'].iloc[0] == BASE_TS + 80 * MINUTE_MS
+
+    def test_ttl_reloads(self, cache, symbol_id, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(cache, 'clock', lambda: clock[0])
+        ring = cache._ring(symbol_id, '1m')
+
+        clock[0] += candle_cache_module.Config.CANDLE_CACHE_TTL + 1
+
+        assert cache._ring(symbol_id, '1m') is not ring
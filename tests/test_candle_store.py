@@ -0,0 +1,209 @@
+"""
+Tests for the columnar candle store.
+
+Covers:
+- Append / memory-mapped read round trip
+- Incremental sync up to the first unverified candle
+- DataFrame parity with get_candles_as_dataframe(verified_only=True)
+- Verified prefix + DB tail for get_all_candles
+- Rebuild when stored candles are unverified, deleted or invalidated
+- Full-range DB check only on request or after CANDLE_STORE_VERIFY_SECONDS
+"""
+import numpy as np
+import pytest
+
+from app import db
+from app.models import Candle
+from app.services.aggregator import get_candles_as_dataframe
+from app.services.candle_store import (
+    CandleStore,
+    get_all_candles,
+    get_candle_store,
+    get_verified_candles,
+    invalidate_candles
+)
+
+BASE_TS = 1699920000000
+HOUR = 3600000
+
+
+@pytest.fixture
+def store_app(app, tmp_path):
+    """App with the candle store enabled in a temporary directory"""
+    app.config['CANDLE_STORE_ENABLED'] = True
+    app.config['CANDLE_STORE_DIR'] = str(tmp_path / 'candles')
+    return app
+
+
+@pytest.fixture
+def store_symbol(store_app, sample_symbol):
+    """sample_symbol with 10 hourly candles; the first 6 are verified"""
+    with store_app.app_context():
+        for i in range(10):
+            db.session.add(Candle(
+                symbol_id=sample_symbol, timeframe='1h', timestamp=BASE_TS + i * HOUR,
+                open=100 + i, high=102 + i, low=99 + i, close=101 + i, volume=10 + i,
+                verified_at=BASE_TS if i < 6 else None
+            ))
+        db.session.commit()
+        return sample_symbol
+
+
+def verify_all(symbol_id):
+    Candle.query.filter_by(symbol_id=symbol_id).update({'verified_at': BASE_TS})
+    db.session.commit()
+
+
+class TestCandleStore:
+    """Tests for CandleStore file operations"""
+
+    def test_append_and_read(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        store.append('X/USDT', '1h', {
+            'timestamp': np.array([1, 2], dtype=np.int64),
+            'open': np.array([1.0, 2.0]), 'high': np.array([1.5, 2.5]),
+            'low': np.array([0.5, 1.5]), 'close': np.array([1.2, 2.2]),
+            'volume': np.array([10.0, 20.0]),
+        })
+        store.append('X/USDT', '1h', {
+            'timestamp': np.array([3], dtype=np.int64),
+            'open': np.array([3.0]), 'high': np.array([3.5]),
+            'low': np.array([2.5]), 'close': np.array([3.2]),
+            'volume': np.array([30.0]),
+        })
+
+        columns = store.read('X/USDT', '1h')
+        assert isinstance(columns['close'], np.memmap)
+        assert columns['timestamp'].tolist() == [1, 2, 3]
+        assert columns['volume'].tolist() == [10.0, 20.0, 30.0]
+
+    def test_rebuild_keeps_existing_maps(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        row = {name: np.arange(1, 4) for name in ['timestamp', 'open', 'high', 'low', 'close', 'volume']}
+        store.append('X/USDT', '1h', row)
+        mapped = store.read('X/USDT', '1h')
+
+        # sync() rebuild: reset the count, then append a shorter series
+        store._write_count(store._series_dir('X/USDT', '1h'), 0, None)
+        store.append('X/USDT', '1h', {name: np.array([7]) for name in row})
+
+        assert mapped['close'].tolist() == [1.0, 2.0, 3.0]
+        assert store.read('X/USDT', '1h')['close'].tolist() == [7.0]
+
+    def test_read_missing_series(self, tmp_path):
+        columns = CandleStore(str(tmp_path)).read('NONE/USDT', '1h')
+        assert len(columns['timestamp']) == 0
+
+    def test_invalidate(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        store.append('X/USDT', '1h', {name: np.array([1]) for name in
+                                       ['timestamp', 'open', 'high', 'low', 'close', 'volume']})
+        store.invalidate('X/USDT')
+        assert store.count('X/USDT', '1h') == 0
+
+    def test_invalidate_timeframe_across_symbols(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        row = {name: np.array([1]) for name in ['timestamp', 'open', 'high', 'low', 'close', 'volume']}
+        for symbol in ('X/USDT', 'Y/USDT'):
+            for tf in ('1h', '4h'):
+                store.append(symbol, tf, row)
+
+        store.invalidate(timeframe='1h')
+        assert [store.count(s, '1h') for s in ('X/USDT', 'Y/USDT')] == [0, 0]
+        assert [store.count(s, '4h') for s in ('X/USDT', 'Y/USDT')] == [1, 1]
+
+        store.invalidate()
+        assert store.count('X/USDT', '4h') == 0
+
+
+class TestCandleStoreSync:
+    """Tests for DB sync and DataFrame access"""
+
+    def test_sync_stops_at_first_unverified(self, store_app, store_symbol):
+        with store_app.app_context():
+            store = get_candle_store()
+            assert store.sync('BTC/USDT', '1h') == 6
+            assert store.sync('BTC/USDT', '1h') == 0
+
+            verify_all(store_symbol)
+            assert store.sync('BTC/USDT', '1h') == 4
+            assert store.count('BTC/USDT', '1h') == 10
+
+    def test_matches_db_verified_dataframe(self, store_app, store_symbol):
+        with store_app.app_context():
+            expected = get_candles_as_dataframe('BTC/USDT', '1h', verified_only=True)
+            df = get_verified_candles('BTC/USDT', '1h')
+
+            assert list(df.columns) == list(expected.columns)
+            assert df['timestamp'].tolist() == expected['timestamp'].tolist()
+            assert df['close'].tolist() == expected['close'].tolist()
+
+    def test_all_candles_includes_unverified_tail(self, store_app, store_symbol):
+        with store_app.app_context():
+            df = get_all_candles('BTC/USDT', '1h')
+
+            assert len(df) == 10
+            assert df['timestamp'].is_monotonic_increasing
+            assert get_candle_store().count('BTC/USDT', '1h') == 6
+
+    def test_disabled_store_reads_db(self, store_app, store_symbol):
+        with store_app.app_context():
+            store_app.config['CANDLE_STORE_ENABLED'] = False
+            df = get_verified_candles('BTC/USDT', '1h')
+
+            assert len(df) == 6
+            assert get_candle_store().count('BTC/USDT', '1h') == 0
+
+
+class TestCandleStoreConsistency:
+    """Tests for stored candles rewritten or deleted in the DB"""
+
+    def test_unverified_candle_rebuilds_prefix(self, store_app, store_symbol):
+        with store_app.app_context():
+            store = get_candle_store()
+            store.sync('BTC/USDT', '1h')
+
+            # db_health re-aggregation: rewrite + unverify without telling the store
+            candle = Candle.query.filter_by(symbol_id=store_symbol, timestamp=BASE_TS + 2 * HOUR).one()
+            candle.verified_at = None
+            db.session.commit()
+
+            assert store.sync('BTC/USDT', '1h', verify=True) == 2
+            assert len(get_verified_candles('BTC/USDT', '1h')) == 2
+            assert store.count('BTC/USDT', '1h') == 2
+
+    def test_range_check_skipped_within_interval(self, store_app, store_symbol, count_queries):
+        with store_app.app_context():
+            store = get_candle_store()
+            store.sync('BTC/USDT', '1h')
+            count_queries.clear()
+
+            assert len(get_verified_candles('BTC/USDT', '1h')) == 6
+            assert not [s for s in count_queries if 'COUNT(*)' in s]
+
+    def test_deleted_candle_rebuilds(self, store_app, store_symbol):
+        with store_app.app_context():
+            store_app.config['CANDLE_STORE_VERIFY_SECONDS'] = 0
+            store = get_candle_store()
+            store.sync('BTC/USDT', '1h')
+
+            Candle.query.filter_by(symbol_id=store_symbol, timestamp=BASE_TS).delete()
+            db.session.commit()
+
+            df = get_verified_candles('BTC/USDT', '1h')
+            assert df['timestamp'].tolist() == [BASE_TS + i * HOUR for i in range(1, 6)]
+
+    def test_rewritten_candle_after_invalidate(self, store_app, store_symbol):
+        with store_app.app_context():
+            store = get_candle_store()
+            store.sync('BTC/USDT', '1h')
+
+            # Rewritten and re-verified: same rows, only the store invalidation catches it
+            candle = Candle.query.filter_by(symbol_id=store_symbol, timestamp=BASE_TS).one()
+            candle.close = 555.0
+            db.session.commit()
+            invalidate_candles(store_symbol, '1h')
+
+            df = get_verified_candles('BTC/USDT', '1h')
+            assert df['close'].iloc[0] == 555.0
+            assert len(df) == 6
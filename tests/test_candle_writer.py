@@ -0,0 +1,109 @@
+"""
+Tests for the bulk candle writer.
+
+Covers:
+- Raw ccxt OHLCV lists and NumPy arrays as input
+- Duplicate handling via the uix_candle unique constraint (no pre-SELECT)
+- Validation of invalid OHLC rows
+- inserted/ignored/invalid counts
+"""
+import numpy as np
+import pytest
+
+from app.models import Candle
+from app.services.candle_writer import bulk_insert_candles, CandleWriteResult
+
+
+class TestBulkInsertCandles:
+    """Tests for bulk_insert_candles"""
+
+    def test_inserts_ccxt_rows(self, app, sample_symbol):
+        """Raw ccxt OHLCV lists are inserted and counted."""
+        with app.app_context():
+            candles = [
+                [1700000000000, 100, 101, 99, 100.5, 1000],
+                [1700000060000, 100.5, 102, 100, 101, 1100],
+            ]
+            result = bulk_insert_candles(sample_symbol, '1m', candles)
+
+            assert result.inserted == 2
+            assert result.ignored == 0
+            assert Candle.query.filter_by(symbol_id=sample_symbol, timeframe='1m').count() == 2
+
+    def test_accepts_numpy_array(self, app, sample_symbol):
+        """An (n, 6) NumPy array is accepted and timestamps stay exact."""
+        with app.app_context():
+            arr = np.array([
+                [1700000000000, 100, 101, 99, 100.5, 1000],
+                [1700000060000, 100.5, 102, 100, 101, 1100],
+            ], dtype=np.float64)
+            result = bulk_insert_candles(sample_symbol, '5m', arr)
+
+            assert result.inserted == 2
+            timestamps = sorted(c.timestamp for c in Candle.query.filter_by(timeframe='5m').all())
+            assert timestamps == [1700000000000, 1700000060000]
+
+    def test_duplicates_are_ignored(self, app, sample_symbol):
+        """Existing rows are skipped by the unique constraint and reported as ignored."""
+        with app.app_context():
+            first = [[1700000000000, 100, 101, 99, 100.5, 1000]]
+            bulk_insert_candles(sample_symbol, '1m', first)
+
+            candles = [
+                [1700000000000, 100, 101, 99, 100.5, 1000],   # Duplicate
+                [1700000060000, 100.5, 102, 100, 101, 1100],  # New
+            ]
+            result = bulk_insert_candles(sample_symbol, '1m', candles)
+
+            assert result.inserted == 1
+            assert result.ignored == 1
+            assert Candle.query.filter_by(symbol_id=sample_symbol).count() == 2
+
+    def test_duplicate_within_batch(self, app, sample_symbol):
+        """The same timestamp twice in one batch is written once."""
+        with app.app_context():
+            candles = [
+                [1700000000000, 100, 101, 99, 100.5, 1000],
+                [1700000000000, 100, 101, 99, 100.5, 1000],
+            ]
+            result = bulk_insert_candles(sample_symbol, '1m', candles)
+
+            assert result.inserted == 1
+            assert result.ignored == 1
+
+    def test_drops_invalid_rows(self, app, sample_symbol):
+        """Non-positive prices, missing prices and high < low are rejected."""
+        with app.app_context():
+            candles = [
+                [1700000000000, 0, 101, 99, 100.5, 1000],      # Zero open
+                [1700000060000, 100, None, 99, 100.5, 1000],   # Missing high
+                [1700000120000, 100, 98, 99, 100.5, 1000],     # high < low
+                [1700000180000, 100, 101, 99, 100.5, None],    # Missing volume is OK
+            ]
+            result = bulk_insert_candles(sample_symbol, '1m', candles)
+
+            assert result.invalid == 3
+            assert result.inserted == 1
+            candle = Candle.query.filter_by(symbol_id=sample_symbol).one()
+            assert candle.volume == 0
+
+    def test_chunking(self, app, sample_symbol):
+        """Batches larger than chunk_size are split without losing rows."""
+        with app.app_context():
+            base = 1700000000000
+            candles = [[base + i * 60000, 100, 101, 99, 100, 1] for i in range(25)]
+            result = bulk_insert_candles(sample_symbol, '1m', candles, chunk_size=10)
+
+            assert result.inserted == 25
+            assert result.total == 25
+
+    def test_empty_input(self, app, sample_symbol):
+        """Empty input is a no-op."""
+        with app.app_context():
+            assert bulk_insert_candles(sample_symbol, '1m', []) == CandleWriteResult()
+
+    def test_rejects_malformed_shape(self, app, sample_symbol):
+        """Rows without six columns raise ValueError."""
+        with app.app_context():
+            with pytest.raises(ValueError):
+                bulk_insert_candles(sample_symbol, '1m', [[1700000000000, 100, 101]])
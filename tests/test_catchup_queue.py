@@ -0,0 +1,125 @@
+"""
+Tests for the catch-up queue used by the fetch daemon.
+
+Covers:
+- Chunks fetched and processed oldest first, bounded by chunk size
+- Symbols leave the queue once within one chunk of now
+- Failed fetch/processing does not advance
+- Empty ranges are skipped
+- Drain stops at the deadline
+"""
+import pytest
+
+from scripts.utils.catchup_queue import CatchupQueue
+
+MINUTE_MS = 60000
+NOW_MS = 1700000040000 + 10000 * MINUTE_MS
+
+
+def rows_between(since, until):
+    return [[ts, 1.0, 1.0, 1.0, 1.0, 1.0] for ts in range(since, until, MINUTE_MS)]
+
+
+class FakeExchange:
+    def __init__(self, listed_from=0, fail=()):
+        self.calls = []
+        self.listed_from = listed_from
+        self.fail = set(fail)
+
+    async def fetch(self, symbol, since, until):
+        self.calls.append((symbol, since, until))
+        if symbol in self.fail:
+            raise RuntimeError('timeout')
+        # Exchanges return a full page from `since`, possibly past `until`
+        return rows_between(max(since, self.listed_from), since + 1000 * MINUTE_MS)
+
+
+class FakePipeline:
+    def __init__(self, fail=()):
+        self.batches = []
+        self.fail = set(fail)
+
+    async def process(self, batch):
+        self.batches.append(batch)
+        return {
+            s: {'symbol': s, 'new': len(rows), 'error': 'save failed' if s in self.fail else None}
+            for s, rows in batch.items()
+        }
+
+
+def make_queue():
+    return CatchupQueue(chunk_minutes=1000, clock=lambda: NOW_MS / 1000)
+
+
+class TestCatchupQueue:
+    """Tests for CatchupQueue rounds and draining"""
+
+    @pytest.mark.asyncio
+    async def test_rounds_are_contiguous_and_bounded(self):
+        queue = make_queue()
+        start = NOW_MS - 2500 * MINUTE_MS
+        queue.push('OLD/USDT', start)
+        exchange, pipeline, last = FakeExchange(), FakePipeline(), {}
+
+        await queue.run_round(exchange.fetch, pipeline.process, last)
+        await queue.run_round(exchange.fetch, pipeline.process, last)
+
+        first, second = [b['OLD/USDT'] for b in pipeline.batches]
+        assert first[0][0] == start and len(first) == 1000
+        assert second[0][0] == first[-1][0] + MINUTE_MS
+        assert last['OLD/USDT'] == second[-1][0]
+        # 500 minutes left = within one chunk of now -> back to the regular cycle
+        assert 'OLD/USDT' not in queue
+
+    @pytest.mark.asyncio
+    async def test_push_keeps_progress(self):
+        queue = make_queue()
+        queue.push('OLD/USDT', NOW_MS - 5000 * MINUTE_MS)
+        await queue.run_round(FakeExchange().fetch, FakePipeline().process)
+
+        queue.push('OLD/USDT', NOW_MS - 5000 * MINUTE_MS)
+
+        assert queue.pending()['OLD/USDT'] == NOW_MS - 4000 * MINUTE_MS
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_advance(self):
+        queue = make_queue()
+        queue.push('A/USDT', NOW_MS - 5000 * MINUTE_MS)
+        queue.push('B/USDT', NOW_MS - 5000 * MINUTE_MS)
+
+        await queue.run_round(FakeExchange(fail=['A/USDT']).fetch, FakePipeline(fail=['B/USDT']).process)
+
+        assert queue.pending() == {'A/USDT': NOW_MS - 5000 * MINUTE_MS, 'B/USDT': NOW_MS - 5000 * MINUTE_MS}
+
+    @pytest.mark.asyncio
+    async def test_skips_range_before_listing(self):
+        queue = make_queue()
+        queue.push('NEW/USDT', NOW_MS - 5000 * MINUTE_MS)
+        exchange = FakeExchange(listed_from=NOW_MS - 3000 * MINUTE_MS)
+        pipeline = FakePipeline()
+
+        await queue.run_round(exchange.fetch, pipeline.process)
+        await queue.run_round(exchange.fetch, pipeline.process)
+        await queue.run_round(exchange.fetch, pipeline.process)
+
+        assert len(pipeline.batches) == 1
+        assert pipeline.batches[0]['NEW/USDT'][0][0] == NOW_MS - 3000 * MINUTE_MS
+
+    @pytest.mark.asyncio
+    async def test_drain(self):
+        queue = make_queue()
+        queue.push('OLD/USDT', NOW_MS - 5000 * MINUTE_MS)
+
+        total = await queue.drain(FakeExchange().fetch, FakePipeline().process)
+
+        assert total == 4000
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_drain_respects_deadline_and_failures(self):
+        queue = make_queue()
+        queue.push('OLD/USDT', NOW_MS - 5000 * MINUTE_MS)
+
+        assert await queue.drain(FakeExchange().fetch, FakePipeline().process, deadline=0) == 0
+        assert await queue.drain(FakeExchange(fail=['OLD/USDT']).fetch, FakePipeline().process) == 0
+        assert 'OLD/USDT' in queue
@@ -0,0 +1,183 @@
+"""
+Tests for the resident fetch daemon helpers in scripts/fetch.py.
+
+Covers:
+- Wall-clock-aligned cycle schedule
+- run_fetch_cycle() reuses a caller-owned exchange and the in-memory
+  last-timestamp map (DB lookup only for unknown symbols)
+- Per-symbol fetch windows; lagging symbols catch up in bounded chunks
+- Processing runs on the sync thread without blocking the event loop
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from scripts import fetch
+from scripts.fetch import next_cycle_time, run_fetch_cycle
+
+MINUTE_MS = 60000
+
+
+class TestNextCycleTime:
+    """Tests for the daemon schedule"""
+
+    def test_aligned_to_minute_plus_offset(self):
+        assert next_cycle_time(1000.0, interval=60, offset=2) == 1022
+        assert next_cycle_time(1021.9, interval=60, offset=2) == 1022
+
+    def test_strictly_after_now(self):
+        assert next_cycle_time(1022.0, interval=60, offset=2) == 1082
+
+    def test_skips_missed_slots(self):
+        assert next_cycle_time(1200.5, interval=60, offset=2) == 1202
+
+
+class TestRunFetchCycleState:
+    """Tests for exchange reuse and cached last timestamps"""
+
+    def run_cycle(self, symbols, last_timestamps, db_timestamps, candles):
+        exchange = MagicMock()
+        exchange.close = AsyncMock()
+
+        def fake_process(to_process, app, verbose=False, pool=None):
+            return {s: {'symbol': s, 'new': len(rows), 'patterns': 0} for s, rows in to_process.items()}
+
+        with patch.object(fetch, 'get_all_last_timestamps', return_value=db_timestamps) as lookup, \
+                patch.object(fetch, 'fetch_symbol_batches', AsyncMock(side_effect=lambda ex, s, *a, **k: candles[s])), \
+                patch.object(fetch, 'process_fetched', side_effect=fake_process):
+            results = asyncio.run(run_fetch_cycle(
+                symbols, MagicMock(), exchange=exchange, last_timestamps=last_timestamps
+            ))
+        return results, exchange, lookup
+
+    def test_caller_exchange_is_not_closed(self):
+        results, exchange, _ = self.run_cycle(
+            ['A/USDT'], {'A/USDT': 0}, {}, {'A/USDT': [[MINUTE_MS, 1, 1, 1, 1, 1]]}
+        )
+
+        exchange.close.assert_not_called()
+        assert results[0]['new'] == 1
+
+    def test_only_unknown_symbols_looked_up(self):
+        last = {'A/USDT': MINUTE_MS}
+        candles = {
+            'A/USDT': [[2 * MINUTE_MS, 1, 1, 1, 1, 1]],
+            'B/USDT': [[2 * MINUTE_MS, 1, 1, 1, 1, 1], [3 * MINUTE_MS, 1, 1, 1, 1, 1]],
+        }
+
+        _, _, lookup = self.run_cycle(['A/USDT', 'B/USDT'], last, {'B/USDT': MINUTE_MS}, candles)
+
+        assert lookup.call_args[0][1] == ['B/USDT']
+        assert last == {'A/USDT': 2 * MINUTE_MS, 'B/USDT': 3 * MINUTE_MS}
+
+    def test_failed_symbol_keeps_old_timestamp(self):
+        last = {'A/USDT': MINUTE_MS}
+        candles = {'A/USDT': [[2 * MINUTE_MS, 1, 1, 1, 1, 1]]}
+
+        with patch.object(fetch, 'get_all_last_timestamps', return_value={}), \
+                patch.object(fetch, 'fetch_symbol_batches', AsyncMock(return_value=candles['A/USDT'])), \
+                patch.object(fetch, 'process_fetched', return_value={
+                    'A/USDT': {'symbol': 'A/USDT', 'new': 0, 'patterns': 0, 'error': 'save failed: x'}
+                }):
+            exchange = MagicMock()
+            exchange.close = AsyncMock()
+            asyncio.run(run_fetch_cycle(['A/USDT'], MagicMock(), exchange=exchange, last_timestamps=last))
+
+        assert last == {'A/USDT': MINUTE_MS}
+
+
+class TestSyncPhases:
+    """Tests for running the synchronous phases off the event loop"""
+
+    def test_processing_does_not_block_loop(self):
+        ticks = []
+        during = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        def slow_process(to_process, app, verbose=False, pool=None):
+            before = len(ticks)
+            time.sleep(0.2)
+            during.append(len(ticks) - before)
+            return {s: {'symbol': s, 'new': len(rows), 'patterns': 0} for s, rows in to_process.items()}
+
+        async def main():
+            task = asyncio.create_task(ticker())
+            try:
+                exchange = MagicMock()
+                exchange.close = AsyncMock()
+                await run_fetch_cycle(['A/USDT'], MagicMock(), exchange=exchange, last_timestamps={'A/USDT': 0})
+            finally:
+                task.cancel()
+
+        with patch.object(fetch, 'fetch_symbol_batches', AsyncMock(return_value=[[MINUTE_MS, 1, 1, 1, 1, 1]])), \
+                patch.object(fetch, 'process_fetched', side_effect=slow_process):
+            asyncio.run(main())
+
+        assert during[0] > 5
+
+
+class TestPerSymbolWindows:
+    """Tests for per-symbol windows and catch-up in run_fetch_cycle"""
+
+    def run_cycle(self, timestamps, catchup_queue=None):
+        calls = {}
+
+        async def fake_fetch(exchange, symbol, since, until, **kwargs):
+            calls[symbol] = (since, until)
+            return [[ts, 1, 1, 1, 1, 1] for ts in range(since, since + 1000 * MINUTE_MS, MINUTE_MS)]
+
+        processed = {}
+
+        def fake_process(to_process, app, verbose=False, pool=None):
+            processed.update(to_process)
+            return {s: {'symbol': s, 'new': len(rows), 'patterns': 0} for s, rows in to_process.items()}
+
+        exchange = MagicMock()
+        exchange.close = AsyncMock()
+        with patch.object(fetch, 'get_all_last_timestamps', return_value=timestamps), \
+                patch.object(fetch, 'fetch_symbol_batches', side_effect=fake_fetch), \
+                patch.object(fetch, 'process_fetched', side_effect=fake_process):
+            asyncio.run(run_fetch_cycle(
+                list(timestamps), MagicMock(), exchange=exchange, catchup_queue=catchup_queue
+            ))
+        return calls, processed
+
+    def test_windows_are_per_symbol(self):
+        import time
+        now_ms = int(time.time() * 1000) // MINUTE_MS * MINUTE_MS
+        calls, processed = self.run_cycle({
+            'A/USDT': now_ms - 2 * MINUTE_MS,
+            'B/USDT': now_ms - 100 * MINUTE_MS,
+        })
+
+        assert calls['A/USDT'][0] == now_ms - MINUTE_MS
+        assert calls['B/USDT'][0] == now_ms - 99 * MINUTE_MS
+        # Nothing past "now" is kept
+        assert all(row[0] < calls[s][1] for s, rows in processed.items() for row in rows)
+
+    def test_lagging_symbol_fetches_one_chunk_inline(self):
+        import time
+        now_ms = int(time.time() * 1000) // MINUTE_MS * MINUTE_MS
+        since = now_ms - 4999 * MINUTE_MS
+        calls, processed = self.run_cycle({'OLD/USDT': since - MINUTE_MS})
+
+        assert calls['OLD/USDT'] == (since, since + 1000 * MINUTE_MS)
+        assert len(processed['OLD/USDT']) == 1000
+
+    def test_lagging_symbol_goes_to_queue(self):
+        import time
+        from scripts.utils.catchup_queue import CatchupQueue
+        now_ms = int(time.time() * 1000) // MINUTE_MS * MINUTE_MS
+        queue = CatchupQueue(1000)
+        calls, _ = self.run_cycle({
+            'A/USDT': now_ms - 2 * MINUTE_MS,
+            'OLD/USDT': now_ms - 5000 * MINUTE_MS,
+        }, catchup_queue=queue)
+
+        assert 'OLD/USDT' not in calls
+        assert 'OLD/USDT' in queue
+        assert 'A/USDT' in calls
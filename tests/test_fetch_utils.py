@@ -13,6 +13,7 @@ from unittest.mock import AsyncMock, patch
 from scripts.utils.fetch_utils import (
     get_all_last_timestamps,
     get_aligned_fetch_start,
+    get_symbol_fetch_windows,
     fetch_symbol_batches,
     fetch_symbols_parallel,
     save_candles_to_db,
@@ -73,6 +74,48 @@ class TestGetAlignedFetchStart:
         assert result == expected
 
 
+class TestGetSymbolFetchWindows:
+    """Tests for get_symbol_fetch_windows function."""
+
+    NOW = 1700000040000  # Minute-aligned
+
+    def test_each_symbol_starts_after_its_own_last_candle(self):
+        """A lagging symbol does not widen the others' windows."""
+        timestamps = {
+            'BTC/USDT': self.NOW - 2 * 60000,
+            'ETH/USDT': self.NOW - 300 * 60000,
+        }
+
+        windows, lagging = get_symbol_fetch_windows(['BTC/USDT', 'ETH/USDT'], timestamps, self.NOW)
+
+        assert windows['BTC/USDT'] == (self.NOW - 60000, self.NOW)
+        assert windows['ETH/USDT'] == (self.NOW - 299 * 60000, self.NOW)
+        assert lagging == {}
+
+    def test_unknown_symbol_uses_default_gap(self):
+        """Symbols without data fetch the default gap."""
+        windows, _ = get_symbol_fetch_windows(['NEW/USDT'], {}, self.NOW, default_gap_minutes=500)
+
+        assert windows['NEW/USDT'] == (self.NOW - 500 * 60000, self.NOW)
+
+    def test_large_gap_is_lagging(self):
+        """Gaps above the budget are returned separately with their start."""
+        timestamps = {'BTC/USDT': self.NOW - 60000, 'OLD/USDT': self.NOW - 5000 * 60000}
+
+        windows, lagging = get_symbol_fetch_windows(
+            ['BTC/USDT', 'OLD/USDT'], timestamps, self.NOW, max_catchup_minutes=1000
+        )
+
+        assert list(windows) == ['BTC/USDT']
+        assert lagging == {'OLD/USDT': self.NOW - 4999 * 60000}
+
+    def test_starts_aligned_to_minute(self):
+        """Window starts are aligned to the minute boundary."""
+        windows, _ = get_symbol_fetch_windows(['BTC/USDT'], {'BTC/USDT': self.NOW - 90123}, self.NOW)
+
+        assert windows['BTC/USDT'][0] % 60000 == 0
+
+
 class TestGetAllLastTimestamps:
     """Tests for get_all_last_timestamps function."""
 
@@ -367,6 +410,20 @@ class TestCreateExchange:
         exchange = create_exchange('binance', timeout=30000)
         assert exchange.timeout == 30000
 
+    @pytest.mark.asyncio
+    async def test_requests_go_through_rate_scheduler(self):
+        """Should route request throttling through the shared scheduler."""
+        from app.services.rate_scheduler import get_rate_scheduler, PRIORITY_BACKFILL
+
+        exchange = create_exchange('binance', priority=PRIORITY_BACKFILL)
+        before = get_rate_scheduler().granted[PRIORITY_BACKFILL]
+        try:
+            await exchange.throttle(0.4)
+        finally:
+            await exchange.close()
+
+        assert get_rate_scheduler().granted[PRIORITY_BACKFILL] - before == pytest.approx(2)
+
 
 class TestIntegration:
     """Integration tests for fetch utilities."""
@@ -0,0 +1,89 @@
+"""
+Tests for the first-touch index.
+
+Covers:
+- Scalar and array queries match a brute-force scan (lows and highs)
+- Search windows (start/stop) and misses
+- Caching on OHLCV dicts
+"""
+import numpy as np
+import pytest
+
+from app.services.first_touch import FirstTouchIndex, get_first_touch_index
+
+
+def brute_first(values, start, stop, hit):
+    for i in range(start, stop):
+        if hit(values[i]):
+            return i
+    return stop
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 1.0, 1000))
+    return close + rng.random(1000), close - rng.random(1000)
+
+
+class TestFirstTouchIndex:
+    """Tests for FirstTouchIndex queries"""
+
+    @pytest.mark.parametrize('block_size', [1, 4, 64])
+    def test_matches_brute_force(self, series, block_size):
+        highs, lows = series
+        index = FirstTouchIndex(highs, lows, block_size=block_size)
+        rng = np.random.default_rng(5)
+
+        for _ in range(200):
+            start = int(rng.integers(0, 1000))
+            stop = int(rng.integers(start, 1001))
+            levels = rng.normal(100, 15, 5)
+
+            expected_low = [brute_first(lows, start, stop, lambda v, x=x: v <= x) for x in levels]
+            expected_high = [brute_first(highs, start, stop, lambda v, x=x: v >= x) for x in levels]
+
+            assert index.first_low_at_or_below(start, levels, stop).tolist() == expected_low
+            assert index.first_high_at_or_above(start, levels, stop).tolist() == expected_high
+            assert index.first_low_at_or_below(start, levels[0], stop) == expected_low[0]
+            assert index.first_high_at_or_above(start, levels[0], stop) == expected_high[0]
+
+    def test_miss_returns_end(self, series):
+        highs, lows = series
+        index = FirstTouchIndex(highs, lows)
+
+        assert index.first_low_at_or_below(0, -1.0) == len(lows)
+        assert index.first_high_at_or_above(0, 1e9) == len(highs)
+        assert index.first_low_at_or_below(10, -1.0, stop=20) == 20
+        assert index.first_low_at_or_below(len(lows), 1e9) == len(lows)
+
+    def test_short_series(self):
+        index = FirstTouchIndex(np.array([2.0, 5.0]), np.array([1.0, 3.0]))
+
+        assert index.first_high_at_or_above(0, 4.0) == 1
+        assert index.first_low_at_or_below(1, 1.0) == 2
+        assert index.first_low_at_or_below(0, np.array([0.5, 1.0, 3.0])).tolist() == [2, 0, 0]
+
+
+class TestGetFirstTouchIndex:
+    """Tests for the per-OHLCV-dict cache"""
+
+    def test_cached_on_dict(self, series):
+        highs, lows = series
+        ohlcv = {'high': highs, 'low': lows}
+
+        index = get_first_touch_index(ohlcv)
+
+        assert get_first_touch_index(ohlcv) is index
+
+    def test_rebuilt_when_arrays_replaced(self, series):
+        highs, lows = series
+        ohlcv = {'high': highs, 'low': lows}
+        index = get_first_touch_index(ohlcv)
+
+        ohlcv['low'] = lows[:10].copy()
+        ohlcv['high'] = highs[:10].copy()
+
+        rebuilt = get_first_touch_index(ohlcv)
+        assert rebuilt is not index
+        assert rebuilt.n == 10
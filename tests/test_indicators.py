@@ -0,0 +1,115 @@
+"""
+Tests for the array-based indicators.
+
+Covers:
+- ATR / true range match the DataFrame-based calculation
+- Swing levels match the iloc-based find_swing_high/low loops
+- swing_mask() matches the strict neighbour comparison
+- trading_context() output and empty inputs
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.indicators import swing_level, swing_mask, trading_context, true_range
+from app.services.trading import calculate_atr, find_swing_high, find_swing_low
+
+
+def make_df(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[close[:1], close[:-1]]
+    high = np.maximum(open_, close) + rng.exponential(0.5, n)
+    low = np.minimum(open_, close) - rng.exponential(0.5, n)
+    # Round so equal neighbours (ties) occur
+    return pd.DataFrame({
+        'timestamp': np.arange(n, dtype=np.int64) * 60000,
+        'open': open_.round(1), 'high': high.round(1), 'low': low.round(1), 'close': close.round(1),
+        'volume': np.ones(n)
+    })
+
+
+def reference_atr(df, period=14):
+    if df.empty or len(df) < period:
+        return 0.0
+    df = df.copy()
+    df['prev_close'] = df['close'].shift(1)
+    df['tr1'] = df['high'] - df['low']
+    df['tr2'] = abs(df['high'] - df['prev_close'])
+    df['tr3'] = abs(df['low'] - df['prev_close'])
+    df['tr'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
+    value = df['tr'].tail(period).mean()
+    return value if pd.notna(value) else 0.0
+
+
+def reference_swing(df, start_idx, column, lookback=50):
+    search_df = df.iloc[max(0, start_idx - lookback):start_idx]
+    if search_df.empty:
+        return None
+    better = (lambda a, b: a > b) if column == 'high' else (lambda a, b: a < b)
+    swings = [
+        search_df.iloc[i][column] for i in range(2, len(search_df) - 2)
+        if all(better(search_df.iloc[i][column], search_df.iloc[i + j][column]) for j in (-2, -1, 1, 2))
+    ]
+    pick = max if column == 'high' else min
+    if swings:
+        return pick(swings)
+    return search_df[column].max() if column == 'high' else search_df[column].min()
+
+
+class TestATR:
+    """Tests for true range and ATR"""
+
+    @pytest.mark.parametrize('n', [0, 5, 13, 14, 15, 200])
+    def test_matches_dataframe_calculation(self, n):
+        df = make_df(n)
+        assert calculate_atr(df) == pytest.approx(reference_atr(df))
+        assert calculate_atr(df, period=5) == pytest.approx(reference_atr(df, period=5))
+
+    def test_first_candle_is_high_minus_low(self):
+        tr = true_range([10.0, 12.0], [8.0, 11.0], [9.0, 11.5])
+        assert tr.tolist() == [2.0, 3.0]  # |12 - 9| beats 12 - 11
+
+
+class TestSwings:
+    """Tests for fractal swing points"""
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_swing_levels_match_loops(self, seed):
+        df = make_df(120, seed=seed)
+        for start_idx in (0, 3, 10, 51, 119):
+            assert find_swing_high(df, start_idx) == reference_swing(df, start_idx, 'high')
+            assert find_swing_low(df, start_idx) == reference_swing(df, start_idx, 'low')
+
+    def test_precomputed_mask_matches_window_mask(self):
+        highs = make_df(120, seed=9)['high'].to_numpy()
+        mask = swing_mask(highs, 2, 'high')
+        for end in range(0, 121, 7):
+            assert swing_level(highs, end, 'high', mask=mask) == swing_level(highs, end, 'high')
+
+    @pytest.mark.parametrize('order', [1, 2, 3, 5])
+    def test_mask_matches_strict_comparison(self, order):
+        lows = make_df(80, seed=order)['low'].to_numpy()
+        expected = [
+            i for i in range(order, len(lows) - order)
+            if all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, order + 1))
+        ]
+        assert np.flatnonzero(swing_mask(lows, order, 'low')).tolist() == expected
+
+    def test_short_series(self):
+        assert not swing_mask([1.0, 2.0, 1.0], order=2).any()
+
+
+class TestTradingContext:
+    """Tests for the precomputed ATR/swing dict"""
+
+    def test_matches_individual_calls(self):
+        df = make_df(100, seed=4)
+        context = trading_context(df)
+        assert context['atr'] == pytest.approx(reference_atr(df))
+        assert context['swing_high'] == reference_swing(df, len(df) - 1, 'high')
+        assert context['swing_low'] == reference_swing(df, len(df) - 1, 'low')
+
+    def test_empty(self):
+        assert trading_context(pd.DataFrame()) == {'atr': 0.0, 'swing_high': None, 'swing_low': None}
+        assert trading_context(None)['swing_high'] is None
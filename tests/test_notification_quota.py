@@ -0,0 +1,112 @@
+"""
+Tests for batched notification quotas.
+
+Covers:
+- Daily counts per user from one GROUP BY (failed and earlier sends ignored)
+- Eligibility honours tier limits and pattern type access
+- Grouping by notification delay
+- Recipient lookup takes the same number of queries for any number of users
+"""
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.models import Subscription, User, UserNotification
+from app.services.notification_quota import (
+    daily_notification_counts, get_notification_audience, today_start_utc
+)
+from app.services.notifier import get_eligible_subscribers, get_subscribers_with_delay
+
+
+def add_user(name, plan='pro'):
+    user = User(email=f'{name}@test.com', username=name, is_active=True, is_verified=True,
+                ntfy_topic=f'topic_{name}', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Subscription(user_id=user.id, plan=plan, status='active'))
+    db.session.commit()
+    return user.id
+
+
+def add_sent(user_id, count=1, success=True, sent_at=None):
+    for _ in range(count):
+        db.session.add(UserNotification(user_id=user_id, signal_id=1, success=success,
+                                        sent_at=sent_at or datetime.now(timezone.utc)))
+    db.session.commit()
+
+
+class TestDailyCounts:
+    """Tests for daily_notification_counts()"""
+
+    def test_counts_todays_successful_sends(self, app):
+        first, second, idle = add_user('first'), add_user('second'), add_user('idle')
+        add_sent(first, 3)
+        add_sent(first, 2, success=False)
+        add_sent(first, sent_at=today_start_utc() - timedelta(minutes=1))
+        add_sent(second)
+
+        assert daily_notification_counts() == {first: 3, second: 1}
+        assert daily_notification_counts([second, idle]) == {second: 1}
+        assert daily_notification_counts([]) == {}
+
+    def test_matches_per_user_count(self, app):
+        user_id = add_user('single')
+        add_sent(user_id, 4)
+        user = db.session.get(User, user_id)
+        assert daily_notification_counts([user_id])[user_id] == user.get_daily_notification_count()
+
+
+class TestAudience:
+    """Tests for eligibility resolved in memory"""
+
+    def test_daily_limits(self, app):
+        free_fresh = add_user('free_fresh', plan='free')
+        free_done = add_user('free_done', plan='free')  # Limit 1
+        pro_busy = add_user('pro_busy')  # Limit 20
+        premium = add_user('premium_busy', plan='premium')  # Unlimited
+        add_sent(free_done)
+        add_sent(pro_busy, 19)
+        add_sent(premium, 50)
+
+        audience = get_notification_audience()
+        ids = {u.id for u in audience.eligible()}
+
+        assert ids == {free_fresh, pro_busy, premium}
+
+    def test_pattern_types(self, app):
+        free = add_user('free_user', plan='free')
+        pro = add_user('pro_user')
+        premium = add_user('premium_user', plan='premium')
+
+        assert {u.id for u in get_eligible_subscribers('imbalance')} == {free, pro, premium}
+        assert {u.id for u in get_eligible_subscribers('order_block')} == {pro, premium}
+        assert {u.id for u in get_eligible_subscribers('breaker_block')} == {premium}
+
+    def test_by_delay(self, app):
+        free = add_user('free_user', plan='free')
+        pro = add_user('pro_user')
+
+        by_delay = get_subscribers_with_delay()
+
+        assert [u.id for u in by_delay[600]] == [free]
+        assert [u.id for u in by_delay[0]] == [pro]
+
+
+class TestQueryCount:
+    """Tests for O(1) recipient lookup"""
+
+    def test_constant_queries(self, app, count_queries):
+        def queries_for_lookup():
+            db.session.expire_all()
+            count_queries.clear()
+            get_eligible_subscribers('order_block')
+            return len(count_queries)
+
+        add_sent(add_user('u0', plan='free'))
+        few = queries_for_lookup()
+
+        for i in range(1, 12):
+            user_id = add_user(f'u{i}', plan=('free', 'pro', 'premium')[i % 3])
+            add_sent(user_id, i % 3)
+        many = queries_for_lookup()
+
+        assert few == many == 2  # Users with subscriptions + counts
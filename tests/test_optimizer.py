@@ -193,6 +193,85 @@ class TestOptimizerSimulateTrades:
         assert trade['rr_achieved'] == -1.0
 
 
+class TestBatchSimulation:
+    """Tests for the batched all-parameter simulation kernel"""
+
+    @staticmethod
+    def _random_market(n, tf_ms, seed):
+        rng = np.random.default_rng(seed)
+        close = 100 + np.cumsum(rng.normal(0, 1.0, n))
+        open_ = np.concatenate(([100.0], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.7, n))
+        return {
+            'timestamp': 1699920000000 + np.arange(n, dtype=np.int64) * tf_ms,
+            'open': open_,
+            'high': np.maximum(open_, close) + spread,
+            'low': np.minimum(open_, close) - spread,
+            'close': close,
+        }
+
+    @staticmethod
+    def _random_patterns(ohlcv, seed, step=11):
+        rng = np.random.default_rng(seed)
+        patterns = []
+        for i in range(0, len(ohlcv['low']) - 10, step):
+            zone_low = float(ohlcv['low'][i])
+            patterns.append({
+                'detected_at': i,
+                'zone_low': zone_low,
+                'zone_high': zone_low + abs(rng.normal(0, 1.5)) + 0.01,
+                'direction': 'bullish' if rng.random() < 0.5 else 'bearish',
+            })
+        return patterns
+
+    def test_matches_per_combo_simulation(self):
+        """Every combo of the full grid matches _simulate_trades_fast exactly."""
+        import itertools
+        from app.models.optimization import PARAMETER_GRID
+
+        opt = ParameterOptimizer()
+        ohlcv = self._random_market(1500, 3600000, seed=1)
+        drill = self._random_market(6000, 900000, seed=2)
+        data_cache = {('S/USDT', '1h'): (None, ohlcv, 0, 0), ('S/USDT', '15m'): (None, drill, 0, 0)}
+        patterns = self._random_patterns(ohlcv, seed=3)
+
+        keys = list(PARAMETER_GRID.keys())
+        combos = [dict(zip(keys, values)) for values in itertools.product(*PARAMETER_GRID.values())]
+        combos.append(dict(combos[0], entry_method='midpoint'))
+
+        batch = opt._simulate_trades_batch(
+            ohlcv, patterns, combos, timeframe='1h', data_cache=data_cache, symbol='S/USDT'
+        )
+
+        assert len(batch) == len(combos)
+        assert sum(len(trades) for trades in batch) > 0
+        for params, trades in zip(combos, batch):
+            expected = opt._simulate_trades_fast(
+                ohlcv, patterns, params, timeframe='1h', data_cache=data_cache, symbol='S/USDT'
+            )
+            assert trades == expected
+
+    def test_trade_window_limits_resolution(self):
+        """max_trade_candles caps how far SL/TP are searched after entry."""
+        opt = ParameterOptimizer()
+        ohlcv = self._random_market(1500, 3600000, seed=4)
+        patterns = self._random_patterns(ohlcv, seed=5)
+        params = [{'rr_target': 5.0, 'sl_buffer_pct': 30, 'expiry_multiplier': 1.0}]
+
+        unlimited = opt._simulate_trades_batch(ohlcv, patterns, params, timeframe='1h')[0]
+        limited = opt._simulate_trades_batch(ohlcv, patterns, params, timeframe='1h', max_trade_candles=5)[0]
+
+        assert len(limited) < len(unlimited)
+        assert all(t['duration_candles'] <= 6 for t in limited)
+
+    def test_empty_inputs(self):
+        opt = ParameterOptimizer()
+        ohlcv = self._random_market(50, 3600000, seed=6)
+
+        assert opt._simulate_trades_batch(ohlcv, [], [{}, {}], timeframe='1h') == [[], []]
+        assert opt._simulate_trades_batch(ohlcv, self._random_patterns(ohlcv, 7), [], timeframe='1h') == []
+
+
 class TestOptimizerCalculateStatistics:
     """Tests for statistics calculation"""
 
@@ -0,0 +1,159 @@
+"""
+Tests for per-symbol pattern change events and event-driven signal generation.
+
+Covers:
+- New patterns and status changes publish the symbol; other updates do not
+- Zones closed by the active pattern store and expired patterns publish
+- process_fetched() re-publishes changes reported by process_symbol()
+- generate_signals_batch() evaluates only changed symbols between full sweeps
+- A fresh (cron) process resumes the sweep schedule from the last CronRun
+"""
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app import db
+from app.models import CronJob, CronRun, Setting, Symbol
+from app.services.pattern_events import drain_pattern_changes, publish_pattern_changes
+from app.services.patterns import expire_patterns, get_all_detectors
+from app.services.patterns.active_store import get_active_pattern_store
+from scripts import fetch
+from tests.conftest import add_pattern
+
+NOW_MS = 1700000000000
+
+
+def add_symbol(name):
+    sym = Symbol(symbol=name, exchange='binance', is_active=True, notify_enabled=False)
+    db.session.add(sym)
+    db.session.commit()
+    return sym.id
+
+
+@pytest.fixture(autouse=True)
+def clean_events(app):
+    drain_pattern_changes()
+    get_active_pattern_store().invalidate()
+    yield
+    drain_pattern_changes()
+    get_active_pattern_store().invalidate()
+
+
+class TestPublishing:
+    """Tests for what publishes a change"""
+
+    def test_orm_insert_and_status_change(self, app, sample_symbol):
+        pattern = add_pattern(sample_symbol)
+        db.session.commit()
+        assert drain_pattern_changes() == {sample_symbol}
+
+        pattern.fill_percentage = 40.0
+        db.session.commit()
+        assert drain_pattern_changes() == set()
+
+        pattern.status = 'invalidated'
+        db.session.commit()
+        assert drain_pattern_changes() == {sample_symbol}
+
+    def test_store_closing_zone(self, app, sample_symbol):
+        add_pattern(sample_symbol)
+        db.session.commit()
+        store = get_active_pattern_store()
+        store.update(sample_symbol, 105.0, get_all_detectors())  # Outside the zone
+        db.session.commit()
+        drain_pattern_changes()
+
+        store.update(sample_symbol, 101.0, get_all_detectors())  # Partial fill only
+        assert drain_pattern_changes() == set()
+
+        store.update(sample_symbol, 99.0, get_all_detectors())
+        db.session.commit()
+        assert drain_pattern_changes() == {sample_symbol}
+
+    def test_expiry_publishes_affected_symbols(self, app, sample_symbol):
+        other = add_symbol('ETH/USDT')
+        add_pattern(sample_symbol, detected_at=NOW_MS - 100 * 3600000)  # Past the 72h 1h expiry
+        add_pattern(other)
+        db.session.commit()
+        drain_pattern_changes()
+
+        expired = expire_patterns(NOW_MS)
+        db.session.commit()
+
+        assert expired['1h'] == 1
+        assert drain_pattern_changes() == {sample_symbol}
+
+    def test_process_fetched_republishes(self, app, monkeypatch):
+        def fake_process(symbol, ohlcv, app, verbose=False):
+            return {'symbol': symbol, 'new': 0, 'patterns': 0, 'pattern_changes': ohlcv}
+
+        monkeypatch.setattr(fetch, 'process_symbol', fake_process)
+        fetch.process_fetched({'A/USDT': [3], 'B/USDT': [], 'C/USDT': [7]}, app)
+
+        assert drain_pattern_changes() == {3, 7}
+
+
+class TestEventDrivenSignals:
+    """Tests for generate_signals_batch() scope"""
+
+    @pytest.fixture
+    def confluent_symbols(self, app):
+        Setting.set('min_confluence', '3')
+        Setting.set('require_htf', 'false')
+        ids = []
+        for name in ('A/USDT', 'B/USDT'):
+            symbol_id = add_symbol(name)
+            for i, tf in enumerate(['1h', '4h', '1d']):
+                add_pattern(symbol_id, timeframe=tf, detected_at=NOW_MS + i)
+            ids.append(symbol_id)
+        db.session.commit()
+        drain_pattern_changes()
+        return ids
+
+    def test_only_changed_symbols(self, app, confluent_symbols):
+        first, second = confluent_symbols
+        publish_pattern_changes([second])
+
+        result = fetch.generate_signals_batch(app, full=False)
+
+        assert result['full_sweep'] is False
+        assert result['symbols_scanned'] == 1
+        assert result['signals_generated'] == 1
+        assert drain_pattern_changes() == set()
+
+    def test_nothing_changed(self, app, confluent_symbols):
+        result = fetch.generate_signals_batch(app, full=False)
+        assert result['symbols_scanned'] == 0
+        assert result['signals_generated'] == 0
+
+    def test_full_sweep_on_schedule(self, app, confluent_symbols, monkeypatch):
+        monkeypatch.setattr(fetch, '_last_full_sweep', None)
+
+        result = fetch.generate_signals_batch(app)
+
+        assert result['full_sweep'] is True
+        assert result['signals_generated'] == 2
+        assert fetch._last_full_sweep is not None
+        assert fetch.generate_signals_batch(app)['full_sweep'] is False
+
+    def test_cron_run_resumes_schedule(self, app, confluent_symbols, monkeypatch):
+        """A new process reads the last sweep time from the previous CronRun"""
+        monkeypatch.setattr(fetch, '_last_full_sweep', None)
+        job = CronJob(name='fetch', schedule='* * * * *')
+        db.session.add(job)
+        db.session.commit()
+        db.session.add(CronRun(
+            job_id=job.id, ended_at=datetime.now(timezone.utc),
+            details=json.dumps({'mode': 'cron', 'last_full_sweep': time.time() - 60})
+        ))
+        db.session.commit()
+
+        assert fetch.generate_signals_batch(app)['full_sweep'] is False
+
+        monkeypatch.setattr(fetch, '_last_full_sweep', None)
+        CronRun.query.update({'details': json.dumps({'last_full_sweep': time.time() - 3600})})
+        db.session.commit()
+
+        assert fetch.generate_signals_batch(app)['full_sweep'] is True
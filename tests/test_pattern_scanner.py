@@ -0,0 +1,252 @@
+"""
+Tests for incremental (tail-only) pattern detection.
+
+Covers:
+- detect_incremental() fed in arbitrary chunks matches detect_historical(skip_overlap=True)
+- Liquidity sweeps of a series shorter than SWEEP_MIN_CANDLES are held back
+- Warm-up consumes the already-scanned window without saving anything
+- scan() only reads and saves patterns from candles after last_ts
+- Registry reset
+- process_symbol() keeps scanner state only in resident processes
+- A rolled-back timeframe leaves no warm scanner past unsaved patterns
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import db
+from app.models import Pattern
+from app.services.candle_writer import bulk_insert_candles
+from app.services.patterns import get_all_detectors
+from app.services.patterns.fair_value_gap import FVGDetector
+from app.services.patterns.liquidity import SWEEP_MIN_CANDLES, LiquiditySweepDetector
+from app.services.patterns.order_block import OrderBlockDetector
+from app.services import pattern_scanner
+from app.services.pattern_scanner import (
+    SeriesPatternScanner,
+    enable_incremental_scanning,
+    get_pattern_scanner,
+    reset_pattern_scanners
+)
+from tests.conftest import random_walk
+
+DETECTORS = [FVGDetector, OrderBlockDetector, LiquiditySweepDetector]
+
+
+@pytest.fixture(autouse=True)
+def fresh_scanners():
+    """Clean scanner registry around each test"""
+    reset_pattern_scanners()
+    yield
+    reset_pattern_scanners()
+
+
+def feed_in_chunks(detector, df, sizes):
+    state = detector.new_incremental_state()
+    found = []
+    start = 0
+    for size in sizes:
+        chunk = df.iloc[start:start + size]
+        found.extend(detector.detect_incremental(
+            state,
+            chunk['timestamp'].to_numpy(), chunk['open'].to_numpy(), chunk['high'].to_numpy(),
+            chunk['low'].to_numpy(), chunk['close'].to_numpy()
+        ))
+        start += size
+    return found
+
+
+class TestDetectIncremental:
+    """Incremental detection matches the window scan"""
+
+    @pytest.mark.parametrize('detector_cls', DETECTORS)
+    @pytest.mark.parametrize('seed', [3, 17])
+    def test_chunked_matches_historical(self, detector_cls, seed):
+        df = random_walk(1500, seed)
+        detector = detector_cls()
+        expected = detector.detect_historical(df, skip_overlap=True)
+
+        rng = np.random.default_rng(seed)
+        sizes = rng.integers(1, 40, 200).tolist()
+        found = feed_in_chunks(detector, df, sizes)
+
+        assert len(expected) > 0
+        assert found == expected
+
+    @pytest.mark.parametrize('detector_cls', DETECTORS)
+    def test_one_candle_at_a_time(self, detector_cls):
+        df = random_walk(300, 5)
+        detector = detector_cls()
+
+        assert feed_in_chunks(detector, df, [1] * len(df)) == detector.detect_historical(df, skip_overlap=True)
+
+    def test_sweeps_held_until_minimum_length(self):
+        # Rising lows with a swing low at bar 4, swept (and closed back above) at bar 12
+        n = SWEEP_MIN_CANDLES
+        lows = 99 + 0.01 * np.arange(n)
+        lows[4], lows[12] = 95.0, 94.0
+        df = pd.DataFrame({
+            'timestamp': 1700000000000 + np.arange(n, dtype=np.int64) * 3600000,
+            'open': 100.0, 'high': 101 + 0.01 * np.arange(n), 'low': lows, 'close': 100.0,
+            'volume': 1000.0,
+        })
+        detector = LiquiditySweepDetector()
+
+        short = df.iloc[:-1]
+        assert detector.detect_historical(short, skip_overlap=True) == []
+        assert feed_in_chunks(detector, short, [1] * len(short)) == []
+
+        expected = detector.detect_historical(df, skip_overlap=True)
+        assert [p['detected_at'] for p in expected] == [12]
+        assert feed_in_chunks(detector, df, [len(short), 1]) == expected
+
+
+def to_rows(df):
+    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].values.tolist()
+
+
+class TestSeriesPatternScanner:
+    """Tail-only scanning against the DB"""
+
+    def test_warm_up_saves_nothing(self, app, sample_symbol):
+        with app.app_context():
+            df = random_walk(200, 7)
+            bulk_insert_candles(sample_symbol, '1h', to_rows(df))
+
+            scanner = SeriesPatternScanner(sample_symbol, 'BTC/USDT', '1h')
+            scanner.warm_up(df, get_all_detectors())
+
+            assert scanner.is_warm
+            assert scanner.last_ts == int(df['timestamp'].iloc[-1])
+            assert Pattern.query.count() == 0
+            assert scanner.scan(get_all_detectors()) == []
+
+    def test_scan_only_new_candles(self, app, sample_symbol):
+        with app.app_context():
+            df = random_walk(400, 11)
+            head, tail = df.iloc[:300], df.iloc[300:]
+            detectors = get_all_detectors()
+            bulk_insert_candles(sample_symbol, '1h', to_rows(head))
+
+            scanner = SeriesPatternScanner(sample_symbol, 'BTC/USDT', '1h')
+            scanner.warm_up(head, detectors)
+
+            bulk_insert_candles(sample_symbol, '1h', to_rows(tail))
+            saved = scanner.scan(detectors)
+            db.session.commit()
+
+            tail_start = int(tail['timestamp'].iloc[0])
+            assert saved
+            assert all(p['detected_at'] >= tail_start for p in saved)
+            assert Pattern.query.count() == len(saved)
+            assert scanner.last_ts == int(df['timestamp'].iloc[-1])
+
+            # Every saved pattern is one the full-window scan finds on the tail
+            window = {
+                (p['pattern_type'], p['direction'], p['detected_ts'])
+                for d in detectors for p in d.detect_historical(df, skip_overlap=True)
+            }
+            assert {(p['type'], p['direction'], p['detected_at']) for p in saved} <= window
+
+            # Nothing new -> nothing scanned or saved
+            assert scanner.scan(detectors) == []
+
+    def test_save_skips_existence_lookup(self, app, sample_symbol, monkeypatch):
+        with app.app_context():
+            df = random_walk(400, 11)
+            detectors = get_all_detectors()
+            bulk_insert_candles(sample_symbol, '1h', to_rows(df.iloc[:300]))
+            scanner = SeriesPatternScanner(sample_symbol, 'BTC/USDT', '1h')
+            scanner.warm_up(df.iloc[:300], detectors)
+            bulk_insert_candles(sample_symbol, '1h', to_rows(df.iloc[300:]))
+
+            calls = []
+            for detector in detectors:
+                original = detector.save_pattern
+
+                def spy(*args, _original=original, **kwargs):
+                    calls.append(kwargs.get('check_existing'))
+                    return _original(*args, **kwargs)
+
+                monkeypatch.setattr(detector, 'save_pattern', spy)
+
+            scanner.scan(detectors)
+
+            assert calls
+            assert all(check is False for check in calls)
+
+
+class TestRegistry:
+    """Process-wide scanner registry"""
+
+    def test_get_and_reset(self):
+        scanner = get_pattern_scanner(1, 'A/USDT', '1h')
+
+        assert get_pattern_scanner(1, 'A/USDT', '1h') is scanner
+        assert get_pattern_scanner(1, 'A/USDT', '4h') is not scanner
+
+        reset_pattern_scanners(1, '1h')
+        assert get_pattern_scanner(1, 'A/USDT', '1h') is not scanner
+
+
+class TestResidentMode:
+    """process_symbol() warms scanners only when incremental scanning is enabled"""
+
+    @pytest.fixture
+    def minute_rows(self, sample_symbol):
+        yield to_rows(random_walk(120, 5, interval_ms=60000))
+        enable_incremental_scanning(False)
+
+    def test_one_shot_run_skips_warm_up(self, app, minute_rows, monkeypatch):
+        from scripts import fetch
+
+        warmed = []
+        monkeypatch.setattr(SeriesPatternScanner, 'warm_up', lambda self, df, d: warmed.append(self))
+        enable_incremental_scanning(False)
+
+        result = fetch.process_symbol('BTC/USDT', minute_rows, app)
+
+        assert result['new'] == len(minute_rows)
+        assert warmed == []
+        assert pattern_scanner._scanners == {}
+
+    def test_resident_run_warms_scanners(self, app, sample_symbol, minute_rows):
+        from scripts import fetch
+
+        enable_incremental_scanning()
+        fetch.process_symbol('BTC/USDT', minute_rows, app)
+
+        assert get_pattern_scanner(sample_symbol, 'BTC/USDT', '1m').is_warm
+
+    def test_failed_timeframe_keeps_earlier_patterns(self, app, sample_symbol, minute_rows, monkeypatch):
+        """A rollback on a later timeframe makes the earlier ones rescan their window next cycle"""
+        from scripts import fetch
+
+        found = []
+        original_detect = {cls: cls.detect for cls in DETECTORS}
+
+        def detect(self, symbol, timeframe, *args, **kwargs):
+            if timeframe == '5m' and isinstance(self, LiquiditySweepDetector):
+                raise RuntimeError('detector failed')
+            patterns = original_detect[type(self)](self, symbol, timeframe, *args, **kwargs)
+            if timeframe == '1m':
+                found.extend((p['type'], p['direction'], p['detected_at']) for p in patterns)
+            return patterns
+
+        for cls in DETECTORS:
+            monkeypatch.setattr(cls, 'detect', detect)
+        enable_incremental_scanning()
+        fetch.process_symbol('BTC/USDT', minute_rows[:-1], app)
+
+        assert found
+        assert not get_pattern_scanner(sample_symbol, 'BTC/USDT', '1m').is_warm
+
+        monkeypatch.undo()
+        fetch.process_symbol('BTC/USDT', minute_rows, app)
+
+        with app.app_context():
+            saved = {
+                (p.pattern_type, p.direction, p.detected_at)
+                for p in Pattern.query.filter_by(symbol_id=sample_symbol, timeframe='1m')
+            }
+        assert set(found) <= saved
@@ -0,0 +1,200 @@
+"""
+Tests for the in-memory active pattern store.
+
+Covers:
+- Status updates match a full check_fill() pass over every active pattern
+- Only zones the price moved through are written, in one UPDATE statement
+- ORM changes (new pattern, expiry) reload the symbol's zones
+- Rows changed behind the store's back are not overwritten
+- Overlap prefetch served without a query
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app import db
+from app.models import Pattern
+from app.services.patterns import get_all_detectors, get_detector
+from app.services.patterns.active_store import ZoneSet, get_active_pattern_store
+from app.services.patterns.fair_value_gap import FVGDetector
+from tests.conftest import add_pattern
+
+TIMEFRAMES = ['1m', '1h']
+
+
+@pytest.fixture
+def store(app):
+    store = get_active_pattern_store()
+    store.invalidate()
+    yield store
+    store.invalidate()
+
+
+def reference_state(patterns, price):
+    """Old update_pattern_status(): check_fill() on every active pattern."""
+    state = {}
+    for p in patterns:
+        if p['status'] != 'active':
+            state[p['id']] = (p['status'], p['fill'])
+            continue
+        result = get_detector(p['pattern_type']).check_fill(
+            {'zone_low': p['zone_low'], 'zone_high': p['zone_high'], 'direction': p['direction']}, price
+        )
+        p['status'], p['fill'] = result['status'], result['fill_percentage']
+        state[p['id']] = (p['status'], p['fill'])
+    return state
+
+
+class TestZoneSet:
+    """Tests for the sorted band index"""
+
+    def test_touched_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        lows = rng.uniform(90, 110, 500)
+        highs = lows + rng.exponential(1.0, 500)
+        zones = ZoneSet(np.arange(500), lows, highs, np.full(500, np.nan), lows, highs)
+
+        for a, b in [(95.0, 95.5), (100.0, 104.0), (80.0, 85.0), (103.3, 103.3)]:
+            expected = {i for i in range(500) if lows[i] <= b and highs[i] >= a}
+            assert set(zones.ids[zones.touched(a, b)].tolist()) == expected
+
+    def test_overlaps(self):
+        zones = ZoneSet([1], [100.0], [110.0], [np.nan], [100.0], [110.0])
+        assert zones.overlaps(102.0, 104.0, 0.7)
+        assert not zones.overlaps(108.0, 118.0, 0.7)
+
+    def test_overlaps_matches_brute_force(self):
+        rng = np.random.default_rng(11)
+        lows = rng.uniform(90, 110, 300)
+        highs = lows + rng.exponential(1.0, 300)
+        zones = ZoneSet(np.arange(300), lows, highs, np.full(300, np.nan), lows, highs)
+        detector = FVGDetector()
+
+        def brute(a, b):
+            return any(detector._calculate_zone_overlap(lo, hi, a, b) >= 0.7
+                       for lo, hi in zip(zones.lows, zones.highs))
+
+        candidates = [(a, a + w) for a, w in zip(rng.uniform(88, 112, 200), rng.exponential(1.0, 200))]
+        assert [zones.overlaps(a, b, 0.7) for a, b in candidates] == [brute(a, b) for a, b in candidates]
+
+        # Removing zones drops the built index
+        zones.remove(np.arange(0, 300, 2))
+        assert [zones.overlaps(a, b, 0.7) for a, b in candidates] == [brute(a, b) for a, b in candidates]
+
+
+class TestActivePatternStore:
+    """Tests for status updates through the store"""
+
+    def test_matches_full_check_fill(self, app, sample_symbol, store):
+        rng = random.Random(3)
+        for k in range(60):
+            low = rng.uniform(90, 110)
+            add_pattern(sample_symbol, rng.choice(TIMEFRAMES),
+                        pattern_type=rng.choice(['imbalance', 'order_block', 'liquidity_sweep']),
+                        direction=rng.choice(['bullish', 'bearish']),
+                        zone_low=low, zone_high=low + rng.uniform(0.2, 3), detected_at=1700000000000 + k)
+        db.session.commit()
+        reference = [
+            {'id': p.id, 'pattern_type': p.pattern_type, 'direction': p.direction,
+             'zone_low': p.zone_low, 'zone_high': p.zone_high, 'status': 'active', 'fill': None}
+            for p in Pattern.query.all()
+        ]
+
+        price = 100.0
+        for _ in range(40):
+            price += rng.uniform(-1.5, 1.5)
+            store.update(sample_symbol, price, get_all_detectors())
+            db.session.commit()
+
+            expected = reference_state(reference, price)
+            for p in Pattern.query.all():
+                status, fill = expected[p.id]
+                assert p.status == status
+                if fill is not None:
+                    assert p.fill_percentage == pytest.approx(fill)
+                assert (p.filled_at is not None) == (status == 'filled')
+
+    def test_writes_only_touched_rows_in_one_statement(self, app, sample_symbol, store, count_queries):
+        add_pattern(sample_symbol)
+        add_pattern(sample_symbol, zone_low=90.0, zone_high=92.0)
+        add_pattern(sample_symbol, pattern_type='order_block', direction='bearish',
+                    zone_low=110.0, zone_high=112.0)
+        db.session.commit()
+
+        store.update(sample_symbol, 105.0, get_all_detectors())  # First pass evaluates all
+        db.session.commit()
+        count_queries.clear()
+
+        store.update(sample_symbol, 101.0, get_all_detectors())  # Only the 100-102 zone is crossed
+        db.session.commit()
+
+        updates = [s for s in count_queries if s.lstrip().upper().startswith('UPDATE')]
+        assert len(updates) == 1
+        fills = {p.zone_low: p.fill_percentage for p in Pattern.query.all()}
+        assert fills[100.0] == pytest.approx(50.0)
+        assert fills[90.0] == 0
+        assert fills[110.0] == 0
+
+        count_queries.clear()
+        store.update(sample_symbol, 101.0, get_all_detectors())  # Nothing moved
+        assert not [s for s in count_queries if s.lstrip().upper().startswith('UPDATE')]
+
+    def test_filled_zone_leaves_store(self, app, sample_symbol, store):
+        add_pattern(sample_symbol)
+        db.session.commit()
+
+        assert store.update(sample_symbol, 99.0, get_all_detectors()) == 1
+        db.session.commit()
+
+        assert Pattern.query.one().status == 'filled'
+        assert store.zones(sample_symbol, '1h', 'imbalance', 'bullish') is not None
+        assert len(store.zones(sample_symbol, '1h', 'imbalance', 'bullish')) == 0
+        assert store.update(sample_symbol, 105.0, get_all_detectors()) == 0
+
+    def test_new_pattern_reloads(self, app, sample_symbol, store):
+        store.update(sample_symbol, 105.0, get_all_detectors())
+        assert store.zones(sample_symbol, '1h', 'imbalance', 'bullish') is None
+
+        add_pattern(sample_symbol)
+        db.session.commit()
+
+        assert len(store.zones(sample_symbol, '1h', 'imbalance', 'bullish')) == 1
+
+    def test_status_guard(self, app, sample_symbol, store):
+        pattern = add_pattern(sample_symbol)
+        db.session.commit()
+        store.update(sample_symbol, 105.0, get_all_detectors())
+
+        # Expired by another process: the store still holds the zone
+        db.session.execute(Pattern.__table__.update().values(status='expired'))
+        db.session.commit()
+        store.update(sample_symbol, 99.0, get_all_detectors())
+        db.session.commit()
+
+        assert db.session.get(Pattern, pattern.id).status == 'expired'
+
+    def test_update_pattern_status_single_timeframe(self, app, sample_symbol, store):
+        add_pattern(sample_symbol, '1h')
+        add_pattern(sample_symbol, '1m', detected_at=1)
+        db.session.commit()
+
+        assert FVGDetector().update_pattern_status('BTC/USDT', '1h', 99.0) == 1
+
+        assert {p.timeframe: p.status for p in Pattern.query.all()} == {'1h': 'filled', '1m': 'active'}
+
+
+class TestOverlapPrefetch:
+    """Tests for overlap checks served from the store"""
+
+    def test_prefetch_without_query(self, app, sample_symbol, store, count_queries):
+        add_pattern(sample_symbol)
+        db.session.commit()
+        detector = FVGDetector()
+        detector.prefetch_existing_patterns(sample_symbol, '1h')
+        count_queries.clear()
+
+        detector.prefetch_existing_patterns(sample_symbol, '1h')
+        assert detector.has_overlapping_pattern(sample_symbol, '1h', 'bullish', 100.2, 101.8)
+        assert not detector.has_overlapping_pattern(sample_symbol, '1h', 'bearish', 100.2, 101.8)
+        assert count_queries == []
@@ -0,0 +1,140 @@
+"""
+Tests for set-based pattern expiry.
+
+Covers:
+- Same patterns expired as the per-row Pattern.is_expired check
+- Counts per timeframe, default expiry for unlisted timeframes
+- Only active patterns are touched
+- The active pattern store drops expired zones
+- Fetch workers drop zones expired by the main process
+"""
+import random
+
+import pytest
+
+from app import db
+from app.config import Config
+from app.models import Pattern, Symbol
+from app.services.patterns import expire_patterns, get_all_detectors
+from app.services.patterns.active_store import drain_stale_zones, get_active_pattern_store, mark_zones_stale
+from scripts import fetch
+from tests.conftest import add_pattern
+
+HOUR_MS = 60 * 60 * 1000
+NOW_MS = 1700000000000
+
+
+def hours_ago(age_hours):
+    return int(NOW_MS - age_hours * HOUR_MS)
+
+
+class TestExpirePatterns:
+    """Tests for expire_patterns()"""
+
+    def test_matches_per_row_expiry(self, app, sample_symbol):
+        rng = random.Random(5)
+        timeframes = list(Config.PATTERN_EXPIRY_HOURS) + ['3m']
+        for _ in range(200):
+            add_pattern(sample_symbol, rng.choice(timeframes), detected_at=hours_ago(rng.uniform(0, 400)))
+        db.session.commit()
+
+        # Reference: the old loop over every active pattern
+        expected = {p.id for p in Pattern.query.all() if NOW_MS > p.expires_at}
+
+        by_timeframe = expire_patterns(NOW_MS)
+        db.session.commit()
+
+        assert {p.id for p in Pattern.query.filter_by(status='expired')} == expected
+        assert sum(by_timeframe.values()) == len(expected)
+
+    def test_counts_per_timeframe(self, app, sample_symbol):
+        add_pattern(sample_symbol, '1m', detected_at=hours_ago(5))     # 4h expiry: expired
+        add_pattern(sample_symbol, '1m', detected_at=hours_ago(3))     # Still active
+        add_pattern(sample_symbol, '1h', detected_at=hours_ago(80))    # 72h expiry: expired
+        add_pattern(sample_symbol, '3m', detected_at=hours_ago(80))    # Default 72h: expired
+        add_pattern(sample_symbol, '1m', detected_at=hours_ago(5), status='filled')
+        db.session.commit()
+
+        by_timeframe = expire_patterns(NOW_MS)
+        db.session.commit()
+
+        assert by_timeframe['1m'] == 1
+        assert by_timeframe['1h'] == 1
+        assert by_timeframe['*'] == 1
+        assert by_timeframe['1d'] == 0
+        statuses = sorted(p.status for p in Pattern.query.all())
+        assert statuses == ['active', 'expired', 'expired', 'expired', 'filled']
+
+    def test_drops_store_zones(self, app, sample_symbol):
+        add_pattern(sample_symbol, '1h', detected_at=hours_ago(80))
+        db.session.commit()
+        store = get_active_pattern_store()
+        store.update(sample_symbol, 105.0, get_all_detectors())
+        assert len(store.zones(sample_symbol, '1h', 'imbalance', 'bullish')) == 1
+
+        expire_patterns(NOW_MS)
+        db.session.commit()
+
+        assert store.zones(sample_symbol, '1h', 'imbalance', 'bullish') is None
+
+
+
+class InProcessPool:
+    """ShardedProcessPool stand-in running the shard function in this process."""
+
+    def will_spawn(self, items):
+        return False
+
+    def run(self, fn, items, *args):
+        return fn(list(items.items()), *args), {}
+
+
+class TestWorkerInvalidation:
+    """Tests for expired zones in fetch worker stores"""
+
+    @pytest.fixture(autouse=True)
+    def clean_stale(self, app):
+        drain_stale_zones()
+        yield
+        drain_stale_zones()
+
+    def test_expiry_marks_symbols_stale(self, app, sample_symbol):
+        other = Symbol(symbol='ETH/USDT', exchange='binance', is_active=True)
+        db.session.add(other)
+        db.session.commit()
+        add_pattern(sample_symbol, '1h', detected_at=hours_ago(80))
+        add_pattern(other.id, '1h', detected_at=hours_ago(1))
+        db.session.commit()
+
+        expire_patterns(NOW_MS)
+        db.session.commit()
+
+        assert drain_stale_zones() == {sample_symbol}
+
+    def test_process_symbol_drops_stale_zones(self, app, sample_symbol):
+        add_pattern(sample_symbol, '1h', detected_at=hours_ago(1))
+        db.session.commit()
+        store = get_active_pattern_store()
+        store.zones(sample_symbol, '1h', 'imbalance', 'bullish')  # Loaded, as in a worker
+
+        fetch.process_symbol('BTC/USDT', [], app)
+        assert sample_symbol in store._symbols
+
+        fetch.process_symbol('BTC/USDT', [], app, stale_zones={sample_symbol})
+        assert sample_symbol not in store._symbols
+
+    def test_process_fetched_hands_stale_zones_to_workers(self, app, sample_symbol, monkeypatch):
+        seen = []
+
+        def fake_process(symbol, ohlcv, app, verbose=False, stale_zones=()):
+            seen.append(set(stale_zones))
+            return {'symbol': symbol, 'new': 0, 'patterns': 0}
+
+        monkeypatch.setattr(fetch, 'process_symbol', fake_process)
+        monkeypatch.setattr(fetch, '_worker_app', app)
+        mark_zones_stale([sample_symbol, 999])
+
+        fetch.process_fetched({'BTC/USDT': []}, app, pool=InProcessPool())
+
+        assert seen == [{sample_symbol, 999}]
+        assert drain_stale_zones() == {999}  # Not processed this cycle, still queued
@@ -223,3 +223,44 @@ class TestZoneSize:
             # Zero or negative low should not be tradeable
             assert detector.is_zone_tradeable(0, 100.0) is False
             assert detector.is_zone_tradeable(-1, 100.0) is False
+
+
+class TestFVGVectorizedDetection:
+    """Tests for array-op detection with sorted-zone overlap dedup"""
+
+    @staticmethod
+    def _random_walk(n, volatility, seed):
+        import numpy as np
+        import pandas as pd
+
+        rng = np.random.default_rng(seed)
+        close = 100 + np.cumsum(rng.normal(0, volatility, n))
+        open_ = np.concatenate(([100.0], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.7, n))
+        return pd.DataFrame({
+            'timestamp': 1700000000000 + np.arange(n, dtype=np.int64) * 3600000,
+            'open': open_,
+            'high': np.maximum(open_, close) + spread,
+            'low': np.minimum(open_, close) - spread,
+            'close': close,
+            'volume': 1000.0,
+        })
+
+    def test_matches_reference_loop(self, monkeypatch):
+        from app.services.patterns import kernels
+        monkeypatch.setattr(kernels, 'jit_enabled', lambda: False)
+        detector = FVGDetector()
+
+        for volatility in (0.5, 2.0):
+            df = self._random_walk(5000, volatility, seed=9)
+            for min_zone_pct in (0.0, 0.15, 1.0):
+                for skip_overlap in (False, True):
+                    expected = detector.detect_historical(
+                        df, min_zone_pct, skip_overlap, vectorized=False
+                    )
+                    patterns = detector.detect_historical(df, min_zone_pct, skip_overlap)
+
+                    assert patterns == expected
+
+    def test_too_few_candles(self):
+        assert FVGDetector().detect_historical(self._random_walk(2, 1.0, seed=1)) == []
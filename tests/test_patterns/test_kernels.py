@@ -0,0 +1,82 @@
+"""
+Tests for the optional compiled pattern detection kernels.
+
+The kernels must produce exactly the patterns of the pure-Python
+detect_historical() loops. They run as plain Python when numba is not
+installed, so parity is checked in either environment.
+"""
+import pytest
+
+from app.services.patterns import kernels
+from app.services.patterns.fair_value_gap import FVGDetector
+from app.services.patterns.liquidity import LiquiditySweepDetector
+from app.services.patterns.order_block import OrderBlockDetector
+from tests.conftest import random_walk
+
+DETECTORS = [FVGDetector, OrderBlockDetector, LiquiditySweepDetector]
+
+
+def detect_both(monkeypatch, detector, df, **kwargs):
+    """Run detect_historical through the pure-Python loop and the kernel."""
+    monkeypatch.setattr(kernels, 'jit_enabled', lambda: False)
+    # FVG defaults to the vectorized path; compare against the reference loop
+    loop_kwargs = dict(kwargs, vectorized=False) if isinstance(detector, FVGDetector) else kwargs
+    python_patterns = detector.detect_historical(df, **loop_kwargs)
+    monkeypatch.setattr(kernels, 'jit_enabled', lambda: True)
+    kernel_patterns = detector.detect_historical(df, **kwargs)
+    return python_patterns, kernel_patterns
+
+
+class TestKernelParity:
+    """Kernel output matches the pure-Python detectors"""
+
+    @pytest.mark.parametrize('fixture_name', [
+        'sample_candles_bullish_fvg',
+        'sample_candles_bearish_fvg',
+        'sample_candles_no_fvg',
+        'sample_candles_small_fvg',
+    ])
+    @pytest.mark.parametrize('detector_cls', DETECTORS)
+    def test_pattern_fixtures(self, app, request, monkeypatch, fixture_name, detector_cls):
+        request.getfixturevalue(fixture_name)
+        with app.app_context():
+            detector = detector_cls()
+            df = detector.get_candles_df('BTC/USDT', '1h')
+
+            for skip_overlap in (False, True):
+                python_patterns, kernel_patterns = detect_both(
+                    monkeypatch, detector, df, skip_overlap=skip_overlap
+                )
+                assert kernel_patterns == python_patterns
+
+    @pytest.mark.parametrize('detector_cls', DETECTORS)
+    @pytest.mark.parametrize('min_zone_pct', [0.0, 0.15, 0.5])
+    @pytest.mark.parametrize('skip_overlap', [False, True])
+    def test_random_walk(self, monkeypatch, detector_cls, min_zone_pct, skip_overlap):
+        df = random_walk(3000, seed=17)
+
+        python_patterns, kernel_patterns = detect_both(
+            monkeypatch, detector_cls(), df, min_zone_pct=min_zone_pct, skip_overlap=skip_overlap
+        )
+
+        assert len(python_patterns) > 0
+        assert kernel_patterns == python_patterns
+
+    def test_liquidity_sweep_keeps_swept_level(self, monkeypatch):
+        _, kernel_patterns = detect_both(monkeypatch, LiquiditySweepDetector(), random_walk(500, seed=3))
+
+        assert kernel_patterns
+        assert all('swept_level' in p for p in kernel_patterns)
+
+
+class TestJitEnabled:
+    """Backend selection"""
+
+    def test_disabled_without_numba(self, monkeypatch):
+        monkeypatch.setattr(kernels, 'HAS_NUMBA', False)
+        assert kernels.jit_enabled() is False
+
+    def test_disabled_by_config(self, monkeypatch):
+        monkeypatch.setattr(kernels, 'HAS_NUMBA', True)
+        monkeypatch.setattr(kernels.Config, 'PATTERN_JIT_ENABLED', False)
+        assert kernels.jit_enabled() is False
@@ -0,0 +1,87 @@
+"""
+Tests for the size-bucketed zone overlap index used in historical deduplication.
+"""
+import numpy as np
+
+from app.services.patterns import zone_index
+from app.services.patterns.zone_index import ZoneOverlapIndex
+
+
+def brute_force_keep(lows, highs, threshold):
+    """Reference keep-first dedup: compare against every kept zone."""
+    kept = []
+    mask = []
+    for low, high in zip(lows, highs):
+        overlapping = False
+        for k_low, k_high in kept:
+            overlap = max(0.0, min(k_high, high) - max(k_low, low))
+            smaller = min(k_high - k_low, high - low)
+            if (overlap / smaller if smaller > 0 else 0) >= threshold:
+                overlapping = True
+                break
+        if not overlapping:
+            kept.append((low, high))
+        mask.append(not overlapping)
+    return mask
+
+
+class TestZoneOverlapIndex:
+    """Tests for ZoneOverlapIndex"""
+
+    def test_contained_zone_overlaps(self):
+        index = ZoneOverlapIndex(0.7)
+        index.add(100.0, 110.0)
+
+        assert index.overlaps(102.0, 104.0)
+        assert index.overlaps(95.0, 120.0)
+        assert not index.overlaps(108.0, 118.0)
+        assert not index.overlaps(110.0, 112.0)
+
+    def test_add_if_new(self):
+        index = ZoneOverlapIndex(0.5)
+
+        assert index.add_if_new(1.0, 2.0)
+        assert not index.add_if_new(1.2, 1.9)
+        assert index.add_if_new(1.8, 3.0)
+        assert len(index) == 2
+
+    def test_filter_matches_brute_force(self):
+        rng = np.random.default_rng(4)
+        lows = rng.uniform(90, 110, 2000)
+        highs = lows + rng.exponential(0.5, 2000) + 1e-6
+
+        for threshold in (0.0, 0.3, 0.7, 1.0):
+            keep = ZoneOverlapIndex(threshold).filter(lows, highs)
+            assert keep.tolist() == brute_force_keep(lows.tolist(), highs.tolist(), threshold)
+
+    def test_mixed_sizes_match_brute_force(self):
+        rng = np.random.default_rng(7)
+        lows = rng.uniform(90, 110, 3000)
+        sizes = np.exp(rng.uniform(np.log(1e-3), np.log(20.0), 3000))  # Many size classes
+        sizes[0] = 1000.0  # One wide zone first
+        highs = lows + sizes
+
+        for threshold in (0.3, 0.7, 1.0):
+            keep = ZoneOverlapIndex(threshold).filter(lows, highs)
+            assert keep.tolist() == brute_force_keep(lows.tolist(), highs.tolist(), threshold)
+
+    def test_block_splits(self, monkeypatch):
+        monkeypatch.setattr(zone_index, 'BLOCK_SIZE', 4)
+        rng = np.random.default_rng(11)
+        lows = rng.permutation(np.arange(200, dtype=np.float64) * 10)  # Disjoint, unsorted
+        highs = lows + 1.0
+
+        index = ZoneOverlapIndex(0.5)
+        assert index.filter(lows, highs).all()
+        assert len(index) == 200
+        assert index.overlaps(1230.2, 1230.8)
+        assert not index.overlaps(1235.0, 1236.0)
+
+    def test_wide_zone_does_not_widen_other_scans(self):
+        index = ZoneOverlapIndex(0.7)
+        index.add(0.0, 10000.0)
+        for i in range(500):
+            index.add(20000.0 + i * 10, 20000.0 + i * 10 + 1)
+
+        small = index._buckets[1]  # Sizes in [1, 2)
+        assert sum(1 for _ in small.scan(24000.0 - 2.0, 24000.5)) <= 2
@@ -0,0 +1,82 @@
+"""
+Tests for the sharded process pool used by the fetch processing phase.
+
+Covers:
+- Stable sharding (same key -> same shard, every key assigned once)
+- Results merged across shards
+- Same key is processed by the same worker process on every run
+- A failing shard reports errors for its keys only
+"""
+import os
+
+import pytest
+
+from scripts.utils.process_pool import ShardedProcessPool, shard_index, shard_items
+
+
+def _square_shard(items, offset=0):
+    return {key: {'value': value * value + offset, 'pid': os.getpid()} for key, value in items}
+
+
+def _failing_shard(items):
+    if any(key == 'BAD/USDT' for key, _ in items):
+        raise ValueError('boom')
+    return {key: value for key, value in items}
+
+
+SYMBOLS = [f'SYM{i}/USDT' for i in range(20)]
+
+
+class TestSharding:
+    """Tests for shard assignment"""
+
+    def test_stable(self):
+        assert [shard_index(s, 4) for s in SYMBOLS] == [shard_index(s, 4) for s in SYMBOLS]
+        assert all(0 <= shard_index(s, 3) < 3 for s in SYMBOLS)
+
+    def test_every_key_once(self):
+        buckets = shard_items({s: i for i, s in enumerate(SYMBOLS)}, 4)
+
+        keys = [key for bucket in buckets for key, _ in bucket]
+        assert sorted(keys) == sorted(SYMBOLS)
+        assert len(buckets) == 4
+
+    def test_rejects_zero_workers(self):
+        with pytest.raises(ValueError):
+            ShardedProcessPool(0)
+
+
+class TestShardedProcessPool:
+    """Tests for running work across worker processes"""
+
+    def test_results_merged(self):
+        items = {s: i for i, s in enumerate(SYMBOLS)}
+        with ShardedProcessPool(3) as pool:
+            results, errors = pool.run(_square_shard, items, 1)
+
+        assert errors == {}
+        assert {k: v['value'] for k, v in results.items()} == {s: i * i + 1 for s, i in items.items()}
+
+    def test_same_worker_per_key(self):
+        items = {s: i for i, s in enumerate(SYMBOLS)}
+        with ShardedProcessPool(3) as pool:
+            first, _ = pool.run(_square_shard, items)
+            second, _ = pool.run(_square_shard, items)
+
+        assert {k: v['pid'] for k, v in first.items()} == {k: v['pid'] for k, v in second.items()}
+        assert len({v['pid'] for v in first.values()}) == 3
+        assert os.getpid() not in {v['pid'] for v in first.values()}
+
+    def test_failing_shard_reports_its_keys(self):
+        items = {s: 1 for s in SYMBOLS + ['BAD/USDT']}
+        with ShardedProcessPool(4) as pool:
+            results, errors = pool.run(_failing_shard, items)
+
+        bad_shard = shard_index('BAD/USDT', 4)
+        failed = {s for s in items if shard_index(s, 4) == bad_shard}
+        assert set(errors) == failed
+        assert set(results) == set(items) - failed
+
+    def test_empty(self):
+        with ShardedProcessPool(2) as pool:
+            assert pool.run(_square_shard, {}) == ({}, {})
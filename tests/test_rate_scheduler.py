@@ -0,0 +1,172 @@
+"""
+Tests for the shared exchange rate scheduler.
+
+Covers:
+- Token bucket pacing in request weight
+- Strict priority order between waiters (live before backfill)
+- Per-minute budget shares per priority
+- Used-weight header feedback and 429 pauses through attached ccxt exchanges
+"""
+import asyncio
+import time
+
+import ccxt
+import ccxt.async_support as ccxt_async
+import pytest
+
+from app.services.rate_scheduler import (
+    RateScheduler,
+    attach_rate_scheduler,
+    PRIORITY_BACKFILL,
+    PRIORITY_LIVE,
+    PRIORITY_REPAIR,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1699999980.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket:
+    """Tests for pacing and budget shares"""
+
+    def test_blocks_until_refilled(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(time, 'sleep', clock.sleep)
+        # 600/min -> 10 weight/s, bucket of 10
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=1, clock=clock)
+
+        scheduler.acquire_blocking(10)
+        start = clock.now
+        scheduler.acquire_blocking(5)
+
+        assert clock.now - start == pytest.approx(0.5)
+
+    def test_backfill_limited_to_its_share(self, monkeypatch):
+        clock = FakeClock(1699999980.0)  # Start of a minute
+        monkeypatch.setattr(time, 'sleep', clock.sleep)
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=60, clock=clock)
+
+        for _ in range(36):
+            scheduler.acquire_blocking(10, PRIORITY_BACKFILL)
+        assert clock.now == 1699999980.0  # 360 = 60% of the minute, no waiting
+
+        scheduler.acquire_blocking(10, PRIORITY_LIVE)
+        assert clock.now == 1699999980.0  # Live still has room
+
+        scheduler.acquire_blocking(10, PRIORITY_BACKFILL)
+        assert clock.now == 1700000040.0  # Backfill waits for the next minute
+
+    def test_used_weight_header_counts_against_budget(self, monkeypatch):
+        clock = FakeClock(1699999980.0)
+        monkeypatch.setattr(time, 'sleep', clock.sleep)
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=60, clock=clock)
+
+        scheduler.observe_used_weight(480)  # Another process used most of the minute
+        scheduler.acquire_blocking(10, PRIORITY_REPAIR)
+
+        assert clock.now == 1700000040.0
+
+
+class TestPriorities:
+    """Tests for waiter ordering"""
+
+    @pytest.mark.asyncio
+    async def test_live_served_before_queued_backfill(self):
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=1)
+        await scheduler.acquire(10)  # Empty the bucket
+        order = []
+
+        async def request(name, priority):
+            await scheduler.acquire(5, priority)
+            order.append(name)
+
+        backfill = [asyncio.create_task(request(f'backfill{i}', PRIORITY_BACKFILL)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        live = asyncio.create_task(request('live', PRIORITY_LIVE))
+        await asyncio.wait_for(asyncio.gather(*backfill, live), timeout=5)
+
+        assert order == ['live', 'backfill0', 'backfill1']
+
+    @pytest.mark.asyncio
+    async def test_blocking_caller_yields_to_queued_live(self):
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=1)
+        await scheduler.acquire(10)  # Empty the bucket
+        order = []
+
+        async def live():
+            await scheduler.acquire(5, PRIORITY_LIVE)
+            order.append('live')
+
+        def repair():
+            scheduler.acquire_blocking(5, PRIORITY_REPAIR)
+            order.append('repair')
+
+        live_task = asyncio.create_task(live())
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(asyncio.gather(live_task, asyncio.to_thread(repair)), timeout=5)
+
+        assert order == ['live', 'repair']
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = RateScheduler(600, headroom=1.0, burst_seconds=1)
+        await scheduler.acquire(10)
+
+        waiter = asyncio.create_task(scheduler.acquire(5, PRIORITY_BACKFILL))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(scheduler.acquire(5), timeout=2)
+
+        assert scheduler.stats()['waiting'] == 0
+
+
+class TestAttach:
+    """Tests for ccxt integration"""
+
+    @pytest.mark.asyncio
+    async def test_ccxt_cost_converted_to_binance_weight(self):
+        scheduler = RateScheduler(6000)
+        exchange = attach_rate_scheduler(ccxt_async.binance(), PRIORITY_BACKFILL, scheduler)
+        try:
+            await exchange.throttle(0.4)  # klines
+        finally:
+            await exchange.close()
+
+        assert scheduler.granted[PRIORITY_BACKFILL] == pytest.approx(2)
+
+    def test_sync_exchange_reports_used_weight(self):
+        scheduler = RateScheduler(6000)
+        exchange = ccxt.binance()
+
+        def fake_fetch(url, method='GET', headers=None, body=None):
+            exchange.last_response_headers = {'X-MBX-USED-WEIGHT-1M': '1234'}
+            return {}
+
+        exchange.fetch = fake_fetch
+        attach_rate_scheduler(exchange, PRIORITY_LIVE, scheduler)
+        exchange.fetch('https://api.binance.com/api/v3/time')
+
+        assert scheduler.stats()['window_used'] == 1234
+
+    def test_rate_limit_response_pauses_everyone(self):
+        scheduler = RateScheduler(6000)
+        exchange = ccxt.binance()
+
+        def fake_fetch(url, method='GET', headers=None, body=None):
+            exchange.last_response_headers = {'Retry-After': '7'}
+            raise ccxt.RateLimitExceeded('binance 429 Too Many Requests')
+
+        exchange.fetch = fake_fetch
+        attach_rate_scheduler(exchange, PRIORITY_LIVE, scheduler)
+        with pytest.raises(ccxt.RateLimitExceeded):
+            exchange.fetch('https://api.binance.com/api/v3/klines')
+
+        assert scheduler.stats()['paused_for'] == pytest.approx(7, abs=0.5)
@@ -0,0 +1,126 @@
+"""
+Tests for the vectorized multi-timeframe resampler.
+
+Covers:
+- reduceat OHLCV reduction and cascade source selection
+- Parity with the pandas-based aggregate_new_candles()
+- Chunking, resume after last aggregated candle, incomplete period exclusion
+"""
+import numpy as np
+
+from app import db
+from app.models import Candle
+from app.services.aggregator import AGGREGATION_TIMEFRAMES, aggregate_new_candles
+from app.services.candle_writer import bulk_insert_candles
+from app.services.resampler import (
+    cascade_sources,
+    resample_bars,
+    resample_all_timeframes
+)
+
+# 2023-11-14 00:00:00 UTC
+BASE_TS = 1699920000000
+MINUTE = 60000
+DAY = 1440 * MINUTE
+
+
+def make_1m(count, skip=()):
+    """Deterministic 1m candles from BASE_TS (indices in skip are left out as gaps)."""
+    rng = np.random.default_rng(42)
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, count))
+    candles = []
+    for i in range(count):
+        if i in skip:
+            continue
+        c = float(closes[i])
+        candles.append([BASE_TS + i * MINUTE, c - 0.1, c + 0.5, c - 0.6, c, float(i % 13 + 1)])
+    return candles
+
+
+def as_bars(candles):
+    arr = np.array(candles, dtype=np.float64)
+    return (arr[:, 0].astype(np.int64), arr[:, 1], arr[:, 2], arr[:, 3], arr[:, 4], arr[:, 5])
+
+
+def get_bars(symbol_id, timeframe):
+    return [
+        (c.timestamp, round(c.open, 6), round(c.high, 6), round(c.low, 6), round(c.close, 6), round(c.volume, 6))
+        for c in Candle.query.filter_by(symbol_id=symbol_id, timeframe=timeframe)
+        .order_by(Candle.timestamp).all()
+    ]
+
+
+class TestResampleBars:
+    """Tests for the array-level reduction"""
+
+    def test_reduces_ohlcv(self):
+        ts, o, h, low, c, v = resample_bars(as_bars([
+            [BASE_TS, 10, 12, 9, 11, 1],
+            [BASE_TS + MINUTE, 11, 15, 10, 14, 2],
+            [BASE_TS + 5 * MINUTE, 14, 14, 8, 9, 3],
+        ]), 5 * MINUTE)
+
+        assert ts.tolist() == [BASE_TS, BASE_TS + 5 * MINUTE]
+        assert o.tolist() == [10, 14]
+        assert h.tolist() == [15, 14]
+        assert low.tolist() == [9, 8]
+        assert c.tolist() == [14, 9]
+        assert v.tolist() == [3, 3]
+
+    def test_cascade_sources(self):
+        sources = cascade_sources(AGGREGATION_TIMEFRAMES)
+
+        assert sources['5m'] == '1m'
+        assert sources['15m'] == '5m'
+        assert sources['1h'] == '30m'
+        assert sources['4h'] == '2h'
+        assert sources['1d'] == '4h'
+
+    def test_cascade_sources_partial(self):
+        """Without intermediate levels, each timeframe still finds a divisor."""
+        assert cascade_sources(['15m', '1h']) == {'15m': '1m', '1h': '15m'}
+
+
+class TestResampleAllTimeframes:
+    """Tests for the DB-backed single-pass backfill"""
+
+    def test_matches_pandas_aggregation(self, app, sample_symbol):
+        """Every timeframe matches aggregate_new_candles() exactly, gaps included."""
+        with app.app_context():
+            candles = make_1m(2 * 1440 + 90, skip={3, 4, 500, 1441})
+            bulk_insert_candles(sample_symbol, '1m', candles)
+
+            results = resample_all_timeframes(sample_symbol, chunk_days=1)
+            streamed = {tf: get_bars(sample_symbol, tf) for tf in AGGREGATION_TIMEFRAMES}
+
+            Candle.query.filter(
+                Candle.symbol_id == sample_symbol,
+                Candle.timeframe != '1m'
+            ).delete()
+            db.session.commit()
+            for tf in AGGREGATION_TIMEFRAMES:
+                aggregate_new_candles('BTC/USDT', '1m', tf)
+                assert streamed[tf] == get_bars(sample_symbol, tf), tf
+                assert results[tf] == len(streamed[tf])
+
+    def test_resumes_after_last_candle(self, app, sample_symbol):
+        with app.app_context():
+            bulk_insert_candles(sample_symbol, '1m', make_1m(60))
+            bulk_insert_candles(sample_symbol, '5m', [[BASE_TS + 20 * MINUTE, 1, 1, 1, 1, 1]])
+
+            results = resample_all_timeframes(sample_symbol, ['5m'])
+
+            assert results == {'5m': 7}
+            assert Candle.query.filter_by(symbol_id=sample_symbol, timeframe='5m').count() == 8
+
+    def test_excludes_incomplete_period(self, app, sample_symbol):
+        with app.app_context():
+            bulk_insert_candles(sample_symbol, '1m', make_1m(12))
+
+            results = resample_all_timeframes(sample_symbol, ['5m', '15m'], now_ms=BASE_TS + 12 * MINUTE)
+
+            assert results == {'5m': 2, '15m': 0}
+
+    def test_no_source_candles(self, app, sample_symbol):
+        with app.app_context():
+            assert resample_all_timeframes(sample_symbol, ['5m']) == {'5m': 0}
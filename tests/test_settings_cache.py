@@ -0,0 +1,189 @@
+"""
+Tests for the process-wide settings cache.
+
+Covers:
+- Setting.get() served from one snapshot query
+- Typed accessors and their defaults
+- ORM writes and rolled back writes invalidate the snapshot
+- Writes by other processes are seen at the next version check, even
+  within the same second (settings_version row)
+- The Redis version counter is bumped after committed writes only
+"""
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models import Setting, SettingsVersion
+from app.services import settings_cache
+from app.services.settings_cache import (
+    SettingsCache, get_bool, get_float, get_int, get_setting, invalidate_settings
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    cache = SettingsCache(check_interval=5, max_age=300)
+    now = [1000.0]
+    cache.clock = lambda: now[0]
+    monkeypatch.setattr(settings_cache, '_cache', cache)
+    return now
+
+
+class TestLookup:
+    """Tests for reads"""
+
+    def test_get_and_default(self, app):
+        Setting.set('min_confluence', '4')
+        assert Setting.get('min_confluence') == '4'
+        assert Setting.get('missing', 'x') == 'x'
+        assert get_setting('missing') is None
+
+    def test_typed(self, app):
+        Setting.set('min_confluence', '4')
+        Setting.set('default_rr', '2.5')
+        Setting.set('require_htf', 'False')
+        Setting.set('bad_int', 'abc')
+
+        assert get_int('min_confluence', 3) == 4
+        assert get_float('default_rr', 3.0) == 2.5
+        assert get_bool('require_htf', True) is False
+        assert get_bool('missing', True) is True
+        assert get_int('bad_int', 7) == 7
+
+    def test_bool_is_exact_true(self, app):
+        Setting.set('require_htf', 'true')
+        Setting.set('notifications_enabled', '1')
+
+        assert get_bool('require_htf', False) is True
+        assert get_bool('notifications_enabled', True) is False  # Same as Setting.get(...) == 'true'
+
+    def test_repeated_lookups_use_one_query(self, app, count_queries):
+        Setting.set('a', '1')
+        invalidate_settings()
+        count_queries.clear()
+
+        for _ in range(100):
+            Setting.get('a')
+            Setting.get('b', 'default')
+
+        assert len([s for s in count_queries if 'settings' in s]) <= 2  # Version + snapshot
+
+
+class TestInvalidation:
+    """Tests for freshness"""
+
+    def test_set_is_visible_immediately(self, app):
+        Setting.set('min_confluence', '3')
+        assert get_int('min_confluence', 0) == 3
+
+        Setting.set('min_confluence', '5')
+        assert get_int('min_confluence', 0) == 5
+
+    def test_orm_delete(self, app):
+        Setting.set('api_key_hash', 'abc')
+        assert Setting.get('api_key_hash') == 'abc'
+
+        db.session.delete(db.session.get(Setting, 'api_key_hash'))
+        db.session.commit()
+
+        assert Setting.get('api_key_hash') is None
+
+    def test_rollback_drops_uncommitted_value(self, app):
+        Setting.set('default_rr', '3.0')
+        setting = db.session.get(Setting, 'default_rr')
+        setting.value = '9.0'
+        db.session.flush()
+        assert Setting.get('default_rr') == '9.0'  # Same transaction sees its own write
+
+        db.session.rollback()
+
+        assert Setting.get('default_rr') == '3.0'
+
+    def test_other_process_write_seen_after_check_interval(self, app, clock):
+        Setting.set('ntfy_priority', '3')
+        assert Setting.get('ntfy_priority') == '3'
+
+        # Another process: new row and version bump, no ORM events here
+        db.session.execute(text("INSERT INTO settings (key, value) VALUES ('ntfy_topic', 'alerts')"))
+        db.session.execute(text("UPDATE settings_version SET version = version + 1"))
+        db.session.commit()
+
+        assert Setting.get('ntfy_topic') is None  # Within the check interval
+        clock[0] += 6
+        assert Setting.get('ntfy_topic') == 'alerts'
+
+    def test_same_second_edit_seen_after_check_interval(self, app, clock):
+        Setting.set('min_confluence', '3')
+        assert Setting.get('min_confluence') == '3'
+
+        # Another process edits the value within the same second (updated_at unchanged)
+        db.session.execute(text("UPDATE settings SET value = '4' WHERE key = 'min_confluence'"))
+        db.session.execute(text("UPDATE settings_version SET version = version + 1"))
+        db.session.commit()
+
+        clock[0] += 6
+        assert Setting.get('min_confluence') == '4'
+
+    def test_writes_bump_version_row(self, app):
+        def version():
+            return db.session.query(SettingsVersion.version).scalar() or 0
+
+        start = version()
+        Setting.set('a', '1')
+        Setting.set('a', '2')
+        db.session.delete(db.session.get(Setting, 'a'))
+        db.session.commit()
+        assert version() == start + 3
+
+        Setting.set('b', '1')
+        db.session.get(Setting, 'b').value = '2'
+        db.session.flush()
+        db.session.rollback()
+        assert version() == start + 4  # Rolled back with the write
+
+    def test_max_age_reload(self, app, clock):
+        Setting.set('log_level', 'INFO')
+        assert Setting.get('log_level') == 'INFO'
+
+        # Raw update that does not bump the version
+        db.session.execute(text("UPDATE settings SET value = 'DEBUG' WHERE key = 'log_level'"))
+        db.session.commit()
+
+        clock[0] += 6
+        assert Setting.get('log_level') == 'INFO'
+        clock[0] += 300
+        assert Setting.get('log_level') == 'DEBUG'
+
+
+class TestRedisVersion:
+    """Tests for the shared version counter"""
+
+    def test_bumped_after_commit_only(self, app, monkeypatch):
+        bumps = []
+        monkeypatch.setattr(settings_cache, '_bump_shared_version', lambda: bumps.append(1))
+
+        Setting.set('a', '1')
+        assert len(bumps) == 1
+
+        db.session.get(Setting, 'a').value = '2'
+        db.session.flush()
+        db.session.rollback()
+        assert len(bumps) == 1
+
+        db.session.commit()  # Nothing written
+        assert len(bumps) == 1
+
+    def test_redis_version_drives_reload(self, app, clock, monkeypatch):
+        version = [1]
+        monkeypatch.setattr(settings_cache, '_shared_version', lambda: ('redis', version[0]))
+
+        Setting.set('a', '1')
+        assert Setting.get('a') == '1'
+        db.session.execute(text("UPDATE settings SET value = '2' WHERE key = 'a'"))
+        db.session.commit()
+
+        clock[0] += 6
+        assert Setting.get('a') == '1'  # Version unchanged
+        version[0] += 1
+        clock[0] += 6
+        assert Setting.get('a') == '2'
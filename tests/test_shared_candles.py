@@ -0,0 +1,147 @@
+"""
+Tests for shared-memory candle arrays used by parallel optimizer workers.
+
+Covers:
+- Publish / attach round trip
+- Block release on symbol completion and pool close
+- Worker results from shared memory match the in-process sweep
+- Compact worker results (no DataFrames, trimmed trades)
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.optimizer import (
+    ParameterOptimizer,
+    WORKER_RESULT_TRADES,
+    _compact_worker_result,
+    _process_symbol_worker
+)
+from app.services.shared_candles import SharedCandlePool, attach_frames, close_handles
+
+PARAMETER_GRID = {
+    'min_zone_pct': [0.15],
+    'use_overlap': [True],
+    'rr_target': [1.5, 2.0],
+    'sl_buffer_pct': [10.0],
+    'expiry_multiplier': [1.0],
+}
+
+
+def make_candles(n=400, seed=7):
+    """Random-walk hourly candles."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.0, n))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.8, n))
+    return pd.DataFrame({
+        'timestamp': 1699920000000 + np.arange(n, dtype=np.int64) * 3600000,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(10, 100, n),
+    })
+
+
+class TestSharedCandlePool:
+    """Tests for publishing and attaching series"""
+
+    def test_round_trip(self):
+        df = make_candles(50)
+        with SharedCandlePool() as pool:
+            descriptors = pool.publish_symbol('SHM/USDT', {'1h': df, '4h': None})
+            assert list(descriptors) == ['1h']
+
+            frames, handles = attach_frames(descriptors)
+            attached = frames['1h']
+            assert attached['timestamp'].tolist() == df['timestamp'].tolist()
+            assert np.allclose(attached['close'], df['close'])
+            assert 'datetime' in attached.columns
+
+            del frames, attached
+            close_handles(handles)
+
+    def test_release_unlinks_blocks(self):
+        pool = SharedCandlePool()
+        descriptors = pool.publish_symbol('SHM/USDT', {'1h': make_candles(10)})
+        name = descriptors['1h'].name
+
+        pool.release_symbol('SHM/USDT')
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        pool.close()
+
+    def test_close_unlinks_everything(self):
+        pool = SharedCandlePool()
+        names = [d.name for d in pool.publish_symbol('A/USDT', {'1h': make_candles(10)}).values()]
+        names += [d.name for d in pool.publish_symbol('B/USDT', {'1h': make_candles(10)}).values()]
+
+        pool.close()
+
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+
+class TestSharedMemoryWorker:
+    """Tests for _process_symbol_worker with shared-memory input"""
+
+    def test_worker_matches_in_process_sweep(self, app):
+        df = make_candles()
+        with app.app_context():
+            expected = ParameterOptimizer()._process_symbol(
+                symbol='SHM/USDT',
+                timeframes=['1h'],
+                pattern_types=['imbalance'],
+                parameter_grid=PARAMETER_GRID,
+                data_override={'1h': df},
+            )
+
+        with SharedCandlePool() as pool:
+            descriptors = pool.publish_symbol('SHM/USDT', {'1h': df})
+            result = _process_symbol_worker(
+                'SHM/USDT', ['1h'], ['imbalance'], PARAMETER_GRID, {}, descriptors
+            )
+
+        assert result['error'] is None
+        assert result['data_cache'] == {}
+        assert result['pattern_cache'] == {}
+        assert [r['stats'] for r in result['results']] == [r['stats'] for r in expected['results']]
+
+    def test_missing_timeframe_does_not_hit_db(self, app):
+        with SharedCandlePool() as pool:
+            descriptors = pool.publish_symbol('SHM/USDT', {'1h': make_candles()})
+            result = _process_symbol_worker(
+                'SHM/USDT', ['1h', '4h'], ['imbalance'], PARAMETER_GRID, {}, descriptors
+            )
+
+        statuses = {(r['timeframe'], r['status']) for r in result['results']}
+        assert ('4h', 'failed') in statuses
+        assert ('1h', 'completed') in statuses
+
+
+class TestCompactWorkerResult:
+    """Tests for trimming worker results before pickling"""
+
+    def test_trims_trades_and_caches(self):
+        trades = [{'i': i} for i in range(WORKER_RESULT_TRADES + 50)]
+        result = {
+            'symbol': 'X/USDT',
+            'data_cache': {('X/USDT', '1h'): (pd.DataFrame(), None, None, None)},
+            'pattern_cache': {('X/USDT', '1h'): []},
+            'results': [{'status': 'completed', 'trades': trades}, {'status': 'failed'}],
+            'best_result': {'trades': trades},
+        }
+
+        compact = _compact_worker_result(result)
+
+        assert compact['data_cache'] == {}
+        assert compact['pattern_cache'] == {}
+        assert len(compact['results'][0]['trades']) == WORKER_RESULT_TRADES
+        assert compact['results'][0]['trades'][-1] == trades[-1]
+        assert len(compact['best_result']['trades']) == WORKER_RESULT_TRADES
+        assert len(result['results'][0]['trades']) == WORKER_RESULT_TRADES + 50
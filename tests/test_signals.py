@@ -2,12 +2,14 @@
 Tests for Signal Generation
 """
 from unittest.mock import patch, MagicMock
-from app.models import Pattern, Setting, Candle
+from app.models import Pattern, Setting, Candle, Signal, Symbol
 from app.services.signals import (
     calculate_atr,
     generate_signal_from_pattern,
     check_confluence,
-    generate_confluence_signal
+    generate_confluence_signal,
+    generate_confluence_signals,
+    latest_active_patterns
 )
 from app import db
 
@@ -566,3 +568,71 @@ class TestConfluenceSignal:
             assert signal is not None
             # Entry should be from 1d pattern (zone_high=120.0)
             assert signal.entry_price == 120.0
+
+
+class TestBatchConfluence:
+    """Tests for set-based confluence across many symbols"""
+
+    def add_symbol(self, name, timeframes, direction='bullish', detected_at=1700000000000):
+        sym = Symbol(symbol=name, exchange='binance', is_active=True, notify_enabled=False)
+        db.session.add(sym)
+        db.session.flush()
+        for i, tf in enumerate(timeframes):
+            db.session.add(Pattern(
+                symbol_id=sym.id, timeframe=tf, pattern_type='imbalance', direction=direction,
+                zone_high=105.0, zone_low=100.0, detected_at=detected_at + i, status='active'
+            ))
+        return sym.id
+
+    def test_latest_pattern_per_timeframe(self, app, sample_symbol):
+        with app.app_context():
+            for i, direction in enumerate(['bearish', 'bullish', 'bearish']):
+                db.session.add(Pattern(
+                    symbol_id=sample_symbol, timeframe='1h', pattern_type='imbalance', direction=direction,
+                    zone_high=105.0, zone_low=100.0, detected_at=1700000000000 + i, status='active'
+                ))
+            db.session.add(Pattern(
+                symbol_id=sample_symbol, timeframe='4h', pattern_type='imbalance', direction='bullish',
+                zone_high=105.0, zone_low=100.0, detected_at=1800000000000, status='filled'
+            ))
+            db.session.commit()
+
+            latest = latest_active_patterns([sample_symbol])[sample_symbol]
+
+            assert list(latest) == ['1h']
+            assert latest['1h'].detected_at == 1700000000002
+            assert latest['1h'].direction == 'bearish'
+
+    def test_query_count_independent_of_symbols(self, app, count_queries):
+        with app.app_context():
+            Setting.set('min_confluence', '3')
+            Setting.set('require_htf', 'false')
+            ids = [self.add_symbol(f'S{i}/USDT', ['1m', '5m']) for i in range(20)]
+            db.session.commit()
+            count_queries.clear()
+
+            assert generate_confluence_signals(ids) == []
+
+            assert len([s for s in count_queries if 'FROM patterns' in s]) == 1
+            assert not [s for s in count_queries if 'FROM signals' in s]
+
+    def test_batch_respects_cooldown(self, app):
+        with app.app_context():
+            Setting.set('min_confluence', '3')
+            Setting.set('require_htf', 'false')
+            cooling = self.add_symbol('A/USDT', ['1h', '4h', '1d'])
+            fresh = self.add_symbol('B/USDT', ['1h', '4h', '1d'])
+            bearish = self.add_symbol('C/USDT', ['1h', '4h', '1d'], direction='bearish')
+            weak = self.add_symbol('D/USDT', ['1h', '4h'])
+            db.session.add(Signal(
+                symbol_id=cooling, direction='long', entry_price=105.0, stop_loss=99.0,
+                take_profit_1=111.0, risk_reward=3.0, status='pending'
+            ))
+            db.session.commit()
+
+            signals = generate_confluence_signals([cooling, fresh, bearish, weak])
+
+            assert sorted((s.symbol_id, s.direction) for s in signals) == [(fresh, 'long'), (bearish, 'short')]
+            assert all(s.id is not None for s in signals)
+            assert all(s.confluence_score == 3 for s in signals)
+            assert Signal.query.count() == 3
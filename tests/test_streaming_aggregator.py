@@ -0,0 +1,173 @@
+"""
+Tests for the streaming timeframe aggregator.
+
+Covers:
+- RollingBar OHLCV folding and period rollover
+- Bootstrap from the DB (cold start and resume)
+- Only closed periods are written
+- Results match the resample-based aggregate_new_candles()
+"""
+import pytest
+
+from app import db
+from app.models import Candle
+from app.services.aggregator import aggregate_new_candles
+from app.services.candle_writer import bulk_insert_candles
+from app.services.streaming_aggregator import (
+    RollingBar,
+    StreamingAggregator,
+    get_streaming_aggregator,
+    reset_streaming_aggregator
+)
+
+# 2023-11-14 00:00:00 UTC (aligned to every timeframe up to 1d)
+BASE_TS = 1699920000000
+MINUTE = 60000
+
+
+def make_1m(start_minute, count):
+    """Build deterministic 1m candles starting at BASE_TS + start_minute."""
+    candles = []
+    for i in range(start_minute, start_minute + count):
+        price = 100 + (i % 7)
+        candles.append([BASE_TS + i * MINUTE, price, price + 2, price - 1, price + 1, 10 + i])
+    return candles
+
+
+@pytest.fixture(autouse=True)
+def fresh_aggregators():
+    """Reset in-memory aggregator state around each test"""
+    reset_streaming_aggregator()
+    yield
+    reset_streaming_aggregator()
+
+
+def seed_anchors(symbol_id, timeframes):
+    """Write one already-aggregated bar just before BASE_TS (resume, not cold start)."""
+    for tf in timeframes:
+        tf_ms = RollingBar(tf).tf_ms
+        bulk_insert_candles(symbol_id, tf, [[BASE_TS - tf_ms, 100, 101, 99, 100, 1]])
+
+
+def get_bars(symbol_id, timeframe):
+    """Aggregated bars written from BASE_TS on (anchors excluded)."""
+    return [
+        (c.timestamp, c.open, c.high, c.low, c.close, c.volume)
+        for c in Candle.query.filter(
+            Candle.symbol_id == symbol_id,
+            Candle.timeframe == timeframe,
+            Candle.timestamp >= BASE_TS
+        ).order_by(Candle.timestamp).all()
+    ]
+
+
+class TestRollingBar:
+    """Tests for the single-timeframe accumulator"""
+
+    def test_folds_and_rolls_over(self):
+        bar = RollingBar('5m')
+        closed = [bar.feed(ts, o, h, low, c, v) for ts, o, h, low, c, v in make_1m(0, 6)]
+
+        assert closed[:5] == [None] * 5
+        assert closed[5] == [BASE_TS, 100, 106, 99, 105, 10 + 11 + 12 + 13 + 14]
+
+    def test_flush_only_after_period_end(self):
+        bar = RollingBar('5m')
+        for row in make_1m(0, 3):
+            bar.feed(*row)
+
+        assert bar.flush(BASE_TS + 4 * MINUTE) is None
+        assert bar.flush(BASE_TS + 5 * MINUTE)[0] == BASE_TS
+
+    def test_ignores_already_written_periods(self):
+        bar = RollingBar('5m', next_start=BASE_TS + 5 * MINUTE)
+        assert bar.feed(*make_1m(4, 1)[0]) is None
+        assert bar.period_start is None
+
+
+class TestStreamingAggregator:
+    """Tests for StreamingAggregator against the DB"""
+
+    def test_writes_closed_bars_only(self, app, sample_symbol):
+        with app.app_context():
+            seed_anchors(sample_symbol, ['5m'])
+            candles = make_1m(0, 12)
+            bulk_insert_candles(sample_symbol, '1m', candles)
+
+            agg = StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m'])
+            created = agg.ingest(candles, now_ms=BASE_TS + 12 * MINUTE)
+
+            assert created == {'5m': 2}
+            assert [b[0] for b in get_bars(sample_symbol, '5m')] == [BASE_TS, BASE_TS + 5 * MINUTE]
+
+    def test_incremental_ingest(self, app, sample_symbol):
+        with app.app_context():
+            seed_anchors(sample_symbol, ['5m', '15m'])
+            agg = StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m', '15m'])
+            first = make_1m(0, 7)
+            bulk_insert_candles(sample_symbol, '1m', first)
+            agg.ingest(first, now_ms=BASE_TS + 7 * MINUTE)
+
+            second = make_1m(7, 10)
+            bulk_insert_candles(sample_symbol, '1m', second)
+            created = agg.ingest(second, now_ms=BASE_TS + 17 * MINUTE)
+
+            assert created == {'5m': 2, '15m': 1}
+            assert len(get_bars(sample_symbol, '5m')) == 3
+
+    def test_resume_matches_resample(self, app, sample_symbol):
+        """A fresh aggregator resumes from the DB and matches aggregate_new_candles()."""
+        with app.app_context():
+            seed_anchors(sample_symbol, ['5m'])
+            candles = make_1m(0, 40)
+            bulk_insert_candles(sample_symbol, '1m', candles[:20])
+            StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m']).ingest(
+                candles[:20], now_ms=BASE_TS + 20 * MINUTE
+            )
+
+            # New process: state rebuilt from the DB
+            bulk_insert_candles(sample_symbol, '1m', candles[20:])
+            StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m']).ingest(
+                candles[20:], now_ms=BASE_TS + 40 * MINUTE
+            )
+            streamed = get_bars(sample_symbol, '5m')
+
+            Candle.query.filter(
+                Candle.symbol_id == sample_symbol,
+                Candle.timeframe == '5m',
+                Candle.timestamp >= BASE_TS
+            ).delete()
+            db.session.commit()
+            aggregate_new_candles('BTC/USDT', '1m', '5m')
+
+            assert len(streamed) == 8
+            assert streamed == get_bars(sample_symbol, '5m')
+
+    def test_duplicate_window_is_noop(self, app, sample_symbol):
+        with app.app_context():
+            seed_anchors(sample_symbol, ['5m'])
+            candles = make_1m(0, 10)
+            bulk_insert_candles(sample_symbol, '1m', candles)
+            agg = StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m'])
+            agg.ingest(candles, now_ms=BASE_TS + 10 * MINUTE)
+
+            assert agg.ingest(candles, now_ms=BASE_TS + 10 * MINUTE) == {'5m': 0}
+            assert len(get_bars(sample_symbol, '5m')) == 2
+
+    def test_cold_start_uses_full_aggregation(self, app, sample_symbol):
+        """With no aggregated candles yet, history is backfilled by the resampler."""
+        with app.app_context():
+            candles = make_1m(0, 10)
+            bulk_insert_candles(sample_symbol, '1m', candles)
+            agg = StreamingAggregator(sample_symbol, 'BTC/USDT', ['5m'])
+            agg.ingest(candles, now_ms=BASE_TS + 10 * MINUTE)
+
+            assert len(get_bars(sample_symbol, '5m')) == 2
+            assert agg.bars['5m'].next_start == BASE_TS + 10 * MINUTE
+
+    def test_registry(self, app, sample_symbol):
+        agg = get_streaming_aggregator(sample_symbol, 'BTC/USDT')
+        assert get_streaming_aggregator(sample_symbol, 'BTC/USDT') is agg
+
+        reset_streaming_aggregator(sample_symbol)
+        assert get_streaming_aggregator(sample_symbol, 'BTC/USDT') is not agg
@@ -0,0 +1,113 @@
+"""
+Tests for the process-wide symbol registry.
+
+Covers:
+- Lookup by name and by id, ids passed through get_symbol_id
+- One query serves repeated lookups
+- ORM inserts/updates/deletes invalidate the cache
+- Rows added outside the ORM are found through a reload on the first miss
+- TTL expiry picks up changes made by other processes
+"""
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models import Symbol
+from app.services import symbol_registry
+from app.services.symbol_registry import (
+    SymbolRegistry, get_symbol, get_symbol_id, get_symbols, invalidate_symbols
+)
+
+
+@pytest.fixture
+def symbols(app):
+    with app.app_context():
+        btc = Symbol(symbol='BTC/USDT', exchange='binance', is_active=True)
+        eth = Symbol(symbol='ETH/USDT', exchange='binance', is_active=False)
+        db.session.add_all([btc, eth])
+        db.session.commit()
+        invalidate_symbols()
+        return {'BTC/USDT': btc.id, 'ETH/USDT': eth.id}
+
+
+class TestLookup:
+    """Tests for name/id lookups"""
+
+    def test_by_name_and_id(self, app, symbols):
+        info = get_symbol('BTC/USDT')
+        assert info.id == symbols['BTC/USDT']
+        assert info.exchange == 'binance'
+        assert info.is_active is True
+        assert get_symbol(symbols['ETH/USDT']).symbol == 'ETH/USDT'
+
+    def test_symbol_id(self, app, symbols):
+        assert get_symbol_id('ETH/USDT') == symbols['ETH/USDT']
+        assert get_symbol_id(12345) == 12345  # Ids are not looked up
+        assert get_symbol_id('NOPE/USDT') is None
+
+    def test_active_only(self, app, symbols):
+        assert [s.symbol for s in get_symbols(active_only=True)] == ['BTC/USDT']
+        assert len(get_symbols()) == 2
+
+    def test_repeated_lookups_use_one_query(self, app, symbols, count_queries):
+        for _ in range(50):
+            get_symbol_id('BTC/USDT')
+            get_symbol_id('ETH/USDT')
+
+        assert len([s for s in count_queries if 'symbols' in s]) == 1
+
+
+class TestInvalidation:
+    """Tests for cache freshness"""
+
+    def test_orm_insert_invalidates(self, app, symbols):
+        assert get_symbol_id('SOL/USDT') is None
+
+        sol = Symbol(symbol='SOL/USDT', exchange='binance')
+        db.session.add(sol)
+        db.session.commit()
+
+        assert get_symbol_id('SOL/USDT') == sol.id
+
+    def test_orm_update_invalidates(self, app, symbols):
+        assert get_symbol('BTC/USDT').is_active is True
+
+        sym = db.session.get(Symbol, symbols['BTC/USDT'])
+        sym.is_active = False
+        db.session.commit()
+
+        assert get_symbol('BTC/USDT').is_active is False
+
+    def test_orm_delete_invalidates(self, app, symbols):
+        db.session.delete(db.session.get(Symbol, symbols['ETH/USDT']))
+        db.session.commit()
+
+        assert get_symbol('ETH/USDT') is None
+
+    def test_miss_reloads_once(self, app, symbols, count_queries):
+        db.session.execute(text(
+            "INSERT INTO symbols (symbol, exchange, is_active, notify_enabled) "
+            "VALUES ('XRP/USDT', 'binance', 1, 1)"
+        ))
+        db.session.commit()
+
+        assert get_symbol_id('XRP/USDT') is not None
+        before = len(count_queries)
+        assert get_symbol_id('NOPE/USDT') is None
+        assert get_symbol_id('NOPE/USDT') is None
+        # Only the first miss for an unknown name reloads
+        assert len(count_queries) - before == 1
+
+    def test_ttl_expiry_reloads(self, app, symbols, monkeypatch):
+        registry = SymbolRegistry(ttl=60)
+        monkeypatch.setattr(symbol_registry, '_registry', registry)
+        clock = [1000.0]
+        monkeypatch.setattr(symbol_registry.time, 'monotonic', lambda: clock[0])
+
+        assert get_symbol('BTC/USDT').is_active is True
+        db.session.execute(text("UPDATE symbols SET is_active = 0 WHERE symbol = 'BTC/USDT'"))
+        db.session.commit()
+
+        assert get_symbol('BTC/USDT').is_active is True  # Cached
+        clock[0] += 61
+        assert get_symbol('BTC/USDT').is_active is False